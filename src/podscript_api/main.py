@@ -1,20 +1,29 @@
+import asyncio
+import atexit
+import json
 import logging
+import mimetypes
+import os
+import re
+import threading
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Dict, List, Optional
 from urllib.parse import quote
 
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Response, UploadFile, File, Query, Depends
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Response, UploadFile, File, Query, Depends, Header, Request
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from podscript_shared.config import load_config
 from podscript_api.routers import auth as auth_router
 from podscript_api.routers import credits as credits_router
 from podscript_api.routers import payment as payment_router
-from podscript_api.middleware.auth import get_current_user, get_current_user_optional, CurrentUser
+from podscript_api.middleware.auth import AuthError, auth_configured, get_current_user, get_current_user_optional, CurrentUser
+from podscript_api.scheduler import JobScheduler
 from podscript_api.routers.credits import (
     calculate_credit_cost,
     deduct_user_credits,
@@ -27,7 +36,11 @@ from podscript_shared.models import (
     HistoryStatus,
     HistoryUpdateRequest,
     MediaType,
+    SearchHit,
+    SearchResponse,
+    SearchResult,
     SourceType,
+    TagsSource,
     TaskCreateRequest,
     TaskDetail,
     TaskLog,
@@ -36,10 +49,13 @@ from podscript_shared.models import (
     TaskSummary,
     TranscriptSegment,
 )
-from podscript_shared.history import HistoryManager
-from podscript_shared.keywords import extract_keywords
-from podscript_pipeline import run_pipeline, run_pipeline_from_file, run_download_only, run_transcribe_only
+from podscript_shared.history import HistoryManager, HistoryPartitions, encode_cursor
+from podscript_shared.search import TranscriptIndex, backfill as backfill_search
+from podscript_shared.task_store import create_task_store
+from podscript_shared.keywords import KeywordPool, backfill_tags, needs_tags, read_task_text
+from podscript_pipeline import run_pipeline, run_pipeline_from_file, run_download_only, run_download_pipelined, run_transcribe_only, start_transcribe_remote, start_transcribe_tingwu
 from podscript_pipeline.asr import get_available_providers, ASR_PROVIDER_WHISPER, ASR_PROVIDER_TINGWU
+from podscript_pipeline.download import AUDIO_EXTENSIONS
 
 # Configure logging
 logging.basicConfig(
@@ -57,39 +73,60 @@ app.include_router(auth_router.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(credits_router.router, prefix="/api/credits", tags=["Credits"])
 app.include_router(payment_router.router, prefix="/api/payment", tags=["Payment"])
 
-TASKS: Dict[str, TaskDetail] = {}
+# Task state and metadata (user_id, source_url, credits_deducted) - metadata not exposed in API response
+task_store = create_task_store(cfg.artifacts_dir)
 
-# Track task metadata (user_id, credits_deducted) - not exposed in API response
-TASK_METADATA: Dict[str, Dict[str, Any]] = {}
+# Dedicated worker pools: downloads and transcriptions are capped separately
+scheduler = JobScheduler()
 
 
-def add_task_log(task_id: str, message: str, level: str = "info"):
-    """Add a log entry to a task."""
-    if task_id in TASKS:
-        log_entry = TaskLog(
-            time=datetime.now().strftime("%H:%M:%S"),
-            level=level,
-            message=message
-        )
-        TASKS[task_id].logs.append(log_entry)
+@app.on_event("startup")
+async def recover_interrupted_tasks():
+    """Fail tasks whose owner process died while they were queued or in progress, refunding their credits."""
+    for task_id in task_store.fail_interrupted("服务重启，任务已中断，请重新提交"):
+        add_task_log(task_id, "服务重启，任务已中断，请重新提交", "error")
+        meta = task_store.get_meta(task_id)
+        credits_to_refund = meta.get("credits_deducted", 0)
+        user_id = meta.get("user_id")
+        if credits_to_refund > 0 and user_id:
+            try:
+                await refund_user_credits(
+                    user_id=user_id,
+                    amount=credits_to_refund,
+                    task_id=task_id,
+                    description=f"任务中断退款"
+                )
+                logger.info(f"[{task_id}] Refunded {credits_to_refund} credits to user {user_id} after restart")
+                add_task_log(task_id, f"已退还 {credits_to_refund} 积分")
+                task_store.update_meta(task_id, credits_deducted=0)
+            except Exception as refund_error:
+                logger.error(f"[{task_id}] Failed to refund credits: {refund_error}")
+                add_task_log(task_id, f"积分退款失败，请联系客服", "error")
 
 
-# Store source URLs for history tracking (task_id -> source_url)
-TASK_SOURCES: Dict[str, str] = {}
+def add_task_log(task_id: str, message: str, level: str = "info"):
+    """Add a log entry to a task."""
+    log_entry = TaskLog(
+        time=datetime.now().strftime("%H:%M:%S"),
+        level=level,
+        message=message
+    )
+    task_store.add_log(task_id, log_entry)
 
 
 def save_task_to_history(task_id: str, provider: str = "whisper"):
     """
-    Save a completed task to history.json.
+    Save a completed task to the history store.
 
     This function reads metadata from the task directory and creates a history record.
+    Search indexing and keyword tags follow on the post-processing queue.
     """
     import json
 
     try:
         task_dir = Path(cfg.artifacts_dir) / task_id
-        history_path = Path(cfg.artifacts_dir) / "history.json"
-        manager = HistoryManager(history_path)
+        owner = _task_owner(task_id)
+        manager = get_history_manager(owner)
 
         # Try to get title, duration, etc. from result.json
         title = None
@@ -106,7 +143,7 @@ def save_task_to_history(task_id: str, provider: str = "whisper"):
         # Get file size from audio file and use filename as title
         file_size = 0
         audio_file = None
-        for ext in [".mp3", ".m4a", ".wav", ".mp4", ".webm"]:
+        for ext in AUDIO_EXTENSIONS:
             for f in task_dir.glob(f"*{ext}"):
                 audio_file = f
                 file_size = f.stat().st_size
@@ -127,10 +164,10 @@ def save_task_to_history(task_id: str, provider: str = "whisper"):
             title = f"转写任务 {task_id[:8]}"
 
         # Determine media type
-        media_type = MediaType.VIDEO if audio_file and audio_file.suffix in [".mp4", ".webm"] else MediaType.AUDIO
+        media_type = _media_type(audio_file) if audio_file else MediaType.AUDIO
 
         # Get source URL and type
-        source_url = TASK_SOURCES.get(task_id)
+        source_url = task_store.get_meta(task_id).get("source_url")
         if source_url:
             if "youtube.com" in source_url or "youtu.be" in source_url:
                 source_type = SourceType.YOUTUBE
@@ -139,14 +176,7 @@ def save_task_to_history(task_id: str, provider: str = "whisper"):
         else:
             source_type = SourceType.UPLOAD
 
-        # Extract keywords from markdown
-        tags = []
-        md_path = task_dir / "result.md"
-        if md_path.exists():
-            md_text = md_path.read_text(encoding="utf-8")[:5000]  # Limit to 5000 chars
-            tags = extract_keywords(md_text, top_k=5)
-
-        # Create history record
+        # Create history record (tags are patched in once extracted)
         record = HistoryRecord(
             task_id=task_id,
             title=title,
@@ -155,29 +185,175 @@ def save_task_to_history(task_id: str, provider: str = "whisper"):
             media_type=media_type,
             duration=duration,
             file_size=file_size,
-            tags=tags,
+            tags=[],
             created_at=datetime.now(timezone.utc),
             viewed=False,
             thumbnail_url=None,
             status=HistoryStatus.COMPLETED,
+            owner=owner,
         )
 
         manager.add_record(record)
-        logger.info(f"[{task_id}] Saved to history with tags: {tags}")
+        logger.info(f"[{task_id}] Saved to history")
+
+        scheduler.submit_postprocess(task_id, _postprocess_task, task_id, owner)
 
     except Exception as e:
         logger.error(f"[{task_id}] Failed to save to history: {e}", exc_info=True)
 
 
-def get_history_manager() -> HistoryManager:
-    """Get a HistoryManager instance for the artifacts directory."""
-    history_path = Path(cfg.artifacts_dir) / "history.json"
-    return HistoryManager(history_path)
+def _postprocess_task(task_id: str, owner: Optional[str]) -> None:
+    """Index a finished task for search and tag its history record."""
+    try:
+        segments = task_store.get_segments(task_id)
+        if segments:
+            get_transcript_index().add(task_id, segments, owner=owner)
+    except Exception as e:
+        logger.error(f"[{task_id}] Failed to index transcript: {e}", exc_info=True)
+
+    try:
+        manager = get_history_manager(owner)
+        if not needs_tags(manager.get_record(task_id)):
+            return
+        text = read_task_text(Path(cfg.artifacts_dir) / task_id)
+        if text is None:
+            return
+        tags = get_keyword_pool().extract(text, top_k=5) if text.strip() else []
+        # Don't overwrite tags the user set meanwhile; an empty result is
+        # still recorded so the backfill doesn't retry it
+        if needs_tags(manager.get_record(task_id)):
+            manager.update_record(task_id, tags=tags, tags_source=TagsSource.AUTO)
+            logger.info(f"[{task_id}] Tagged history record: {tags}")
+    except Exception as e:
+        logger.error(f"[{task_id}] Keyword extraction failed: {e}", exc_info=True)
+
+
+_history_partitions: Optional[HistoryPartitions] = None
+_history_partitions_lock = threading.Lock()
+
+
+def get_history_partitions() -> HistoryPartitions:
+    """
+    Get the per-user history stores (HISTORY_STORE backend).
+
+    On first use, shared-store records whose task metadata names an owner
+    are moved into that owner's partition.
+    """
+    global _history_partitions
+    with _history_partitions_lock:
+        if _history_partitions is None:
+            partitions = HistoryPartitions(cfg.artifacts_dir)
+            partitions.split_shared(_task_owner)
+            _history_partitions = partitions
+        return _history_partitions
+
+
+def get_history_manager(user_id: Optional[str] = None) -> HistoryManager:
+    """Get a user's history store (None: the shared store for tasks without an owner)."""
+    return get_history_partitions().get(user_id)
+
+
+def _task_owner(task_id: str) -> Optional[str]:
+    """The user_id a task belongs to, from its metadata (None if unknown)."""
+    return task_store.get_meta(task_id).get("user_id")
+
+
+def _history_owner(current_user: Optional[CurrentUser]) -> Optional[str]:
+    """
+    The history partition a request works on: the caller's own, or the
+    shared store for anonymous callers while authentication isn't configured.
+
+    Raises:
+        AuthError: Anonymous caller when authentication is configured
+    """
+    if current_user:
+        return current_user.user_id
+    if auth_configured():
+        raise AuthError("未登录或登录已过期")
+    return None
+
+
+_transcript_index: Optional[TranscriptIndex] = None
+_transcript_index_lock = threading.Lock()
+
+
+def get_transcript_index() -> TranscriptIndex:
+    """
+    Get the shared transcript search index (ARTIFACTS_DIR/search.db).
+
+    On first use, history records from before the index existed are indexed
+    in a background thread.
+    """
+    global _transcript_index
+    with _transcript_index_lock:
+        if _transcript_index is None:
+            _transcript_index = TranscriptIndex(Path(cfg.artifacts_dir) / "search.db")
+            threading.Thread(target=_backfill_search, args=(_transcript_index,), name="search-backfill", daemon=True).start()
+        return _transcript_index
+
+
+_keyword_pool: Optional[KeywordPool] = None
+_keyword_pool_lock = threading.Lock()
+
+
+def get_keyword_pool() -> KeywordPool:
+    """
+    Get the shared keyword extraction pool (KEYWORD_WORKERS processes, jieba preloaded).
+
+    On first use, completed history records without tags are tagged in a
+    background thread.
+    """
+    global _keyword_pool
+    with _keyword_pool_lock:
+        if _keyword_pool is None:
+            _keyword_pool = KeywordPool()
+            atexit.register(_keyword_pool.shutdown, wait=False)
+            threading.Thread(target=_backfill_tags, args=(_keyword_pool,), name="tags-backfill", daemon=True).start()
+        return _keyword_pool
+
+
+def _backfill_tags(pool: KeywordPool) -> None:
+    try:
+        for manager in get_history_partitions().managers():
+            backfill_tags(manager, cfg.artifacts_dir, pool)
+    except Exception as e:
+        logger.error(f"Keyword backfill failed: {e}", exc_info=True)
+
+
+def _backfill_search(index: TranscriptIndex) -> None:
+    try:
+        for manager in get_history_partitions().managers():
+            owners = {r.task_id: r.owner for r in manager.load().records if r.status == HistoryStatus.COMPLETED}
+            backfill_search(index, owners, cfg.artifacts_dir, owner_of=lambda task_id, owners=owners: owners[task_id] or _task_owner(task_id))
+    except Exception as e:
+        logger.error(f"Search backfill failed: {e}", exc_info=True)
+
+
+# Task directories are named by uuid4().hex[:12]
+TASK_DIR_PATTERN = re.compile(r"[0-9a-f]{12}")
+
+
+class ArtifactFiles(StaticFiles):
+    """
+    Serves task directories and local-storage objects from ARTIFACTS_DIR.
+
+    Everything else under it (tasks.db, search.db, history/, caches) holds
+    every user's data and answers 404.
+    """
+
+    async def get_response(self, path: str, scope):
+        from starlette.exceptions import HTTPException as StarletteHTTPException
+        from podscript_pipeline.storage import LOCAL_STORAGE_DIR
+
+        parts = Path(path).parts
+        if len(parts) < 2 or not (parts[0] == LOCAL_STORAGE_DIR or TASK_DIR_PATTERN.fullmatch(parts[0])):
+            raise StarletteHTTPException(status_code=404)
+        return await super().get_response(path, scope)
 
 
 static_dir = Path(cfg.artifacts_dir)
 static_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/artifacts", StaticFiles(directory=str(static_dir)), name="artifacts")
+app.mount("/artifacts", ArtifactFiles(directory=str(static_dir)), name="artifacts")
 ui_dir = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=str(ui_dir)), name="static")
 
@@ -205,6 +381,16 @@ async def get_asr_providers():
     return get_available_providers()
 
 
+@app.get("/asr/tingwu/stats")
+async def get_tingwu_stats(current_user: CurrentUser = Depends(get_current_user)):
+    """Get Tingwu and storage request latency counters and the number of jobs being polled (signed-in users only)."""
+    from podscript_pipeline.storage import storage_stats
+    from podscript_pipeline.tingwu_adapter import request_stats
+    from podscript_pipeline.tingwu_poller import get_poller
+
+    return {"requests": request_stats(), "storage": storage_stats(), "pending_jobs": get_poller().pending()}
+
+
 class ModelDownloadRequest(BaseModel):
     model_name: str
 
@@ -214,6 +400,7 @@ async def download_whisper_model(req: ModelDownloadRequest, bg: BackgroundTasks)
     """Download a Whisper model."""
     try:
         from podscript_pipeline.whisper_adapter import download_model, WHISPER_MODELS, is_model_downloaded
+        from podscript_pipeline import whisper_pool
 
         if req.model_name not in WHISPER_MODELS:
             raise HTTPException(status_code=400, detail=f"Unknown model: {req.model_name}")
@@ -224,7 +411,11 @@ async def download_whisper_model(req: ModelDownloadRequest, bg: BackgroundTasks)
         # Download in background
         def _download():
             try:
-                download_model(req.model_name)
+                if whisper_pool.WHISPER_POOL_ENABLED:
+                    # Keep torch out of the API process
+                    whisper_pool.get_pool().download(req.model_name)
+                else:
+                    download_model(req.model_name)
                 logger.info(f"Whisper model {req.model_name} downloaded successfully")
             except Exception as e:
                 logger.error(f"Failed to download model {req.model_name}: {e}")
@@ -257,26 +448,49 @@ async def get_whisper_models():
 
 @app.get("/history", response_model=HistoryListResponse)
 async def get_history(
-    page: int = Query(default=1, ge=1, description="Page number"),
+    page: int = Query(default=1, ge=1, description="Page number (ignored when cursor is given)"),
     limit: int = Query(default=20, ge=1, le=100, description="Records per page"),
     status: Optional[str] = Query(default=None, description="Filter by status"),
+    tag: Optional[str] = Query(default=None, description="Filter by tag"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
 ):
-    """Get paginated list of transcription history records."""
-    manager = get_history_manager()
-    records, total = manager.list_records(page=page, limit=limit, status=status)
+    """
+    Get the caller's transcription history records, newest first.
+
+    Pass the returned next_cursor back as cursor to fetch the following
+    page (stable under concurrent inserts, constant cost per page). Offset
+    pages via page remain for older clients. The first page also carries
+    per-tag facet counts.
+    """
+    manager = get_history_manager(_history_owner(current_user))
+    if cursor or page == 1:
+        try:
+            records, next_cursor = manager.list_page(cursor=cursor, limit=limit, status=status, tag=tag)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        total = manager.count(status=status, tag=tag)
+    else:
+        records, total = manager.list_records(page=page, limit=limit, status=status, tag=tag)
+        next_cursor = encode_cursor(records[-1]) if records and page * limit < total else None
 
     return HistoryListResponse(
         total=total,
         page=page,
         limit=limit,
         records=records,
+        next_cursor=next_cursor,
+        facets=None if cursor else manager.tag_counts(status=status),
     )
 
 
 @app.get("/history/{task_id}", response_model=HistoryRecord)
-async def get_history_record(task_id: str):
+async def get_history_record(
+    task_id: str,
+    current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
+):
     """Get a single history record by task ID."""
-    manager = get_history_manager()
+    manager = get_history_manager(_history_owner(current_user))
     record = manager.get_record(task_id)
 
     if not record:
@@ -286,9 +500,13 @@ async def get_history_record(task_id: str):
 
 
 @app.patch("/history/{task_id}")
-async def update_history_record(task_id: str, req: HistoryUpdateRequest):
+async def update_history_record(
+    task_id: str,
+    req: HistoryUpdateRequest,
+    current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
+):
     """Update a history record (viewed status or tags)."""
-    manager = get_history_manager()
+    manager = get_history_manager(_history_owner(current_user))
 
     # Build kwargs for update
     kwargs = {}
@@ -296,6 +514,7 @@ async def update_history_record(task_id: str, req: HistoryUpdateRequest):
         kwargs["viewed"] = req.viewed
     if req.tags is not None:
         kwargs["tags"] = req.tags
+        kwargs["tags_source"] = TagsSource.USER
 
     if not kwargs:
         return {"success": True}  # Nothing to update
@@ -308,17 +527,52 @@ async def update_history_record(task_id: str, req: HistoryUpdateRequest):
 
 
 @app.delete("/history/{task_id}")
-async def delete_history_record(task_id: str):
+async def delete_history_record(
+    task_id: str,
+    current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
+):
     """Soft delete a history record (sets status to DELETED)."""
-    manager = get_history_manager()
+    manager = get_history_manager(_history_owner(current_user))
 
     success = manager.delete_record(task_id)
     if not success:
         raise HTTPException(status_code=404, detail="History record not found")
+    get_transcript_index().remove(task_id)
 
     return {"success": True}
 
 
+@app.get("/search", response_model=SearchResponse)
+async def search_transcripts(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    limit: int = Query(default=20, ge=1, le=100, description="Maximum transcripts returned"),
+    hits: int = Query(default=3, ge=1, le=20, description="Matching segments per transcript"),
+    current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
+):
+    """
+    Full-text search over the caller's completed transcripts (Chinese via jieba, English, mixed).
+
+    The index is filtered to the caller's transcripts before ranking; matches
+    deleted from their history record are dropped.
+    """
+    owner = _history_owner(current_user)
+    matches = await run_in_threadpool(get_transcript_index().search, q, limit, hits, owner)
+    manager = get_history_manager(owner)
+
+    results = []
+    for match in matches:
+        record = manager.get_record(match["task_id"])
+        if record is None or record.status == HistoryStatus.DELETED:
+            continue
+        results.append(SearchResult(
+            task_id=match["task_id"],
+            title=record.title,
+            created_at=record.created_at,
+            hits=[SearchHit(**hit) for hit in match["hits"]],
+        ))
+    return SearchResponse(query=q, results=results)
+
+
 @app.get("/media-info/{task_id}")
 async def get_media_info(task_id: str):
     """Get media file info from artifacts directory (doesn't require in-memory task)."""
@@ -331,15 +585,23 @@ async def get_media_info(task_id: str):
     media_url = ""
     media_type = "audio"
 
-    for ext in [".mp3", ".m4a", ".wav", ".mp4", ".webm", ".ogg", ".flac"]:
+    for ext in AUDIO_EXTENSIONS:
         for file in task_dir.glob(f"*{ext}"):
             media_url = f"/artifacts/{task_id}/{quote(file.name)}"
-            if ext in [".mp4", ".webm"]:
-                media_type = "video"
+            media_type = (await run_in_threadpool(_media_type, file)).value
             break
         if media_url:
             break
 
+    # Browser-direct upload that was never copied locally: play it from the bucket
+    remote_file = task_dir / REMOTE_AUDIO_FILE
+    if not media_url and remote_file.exists():
+        from podscript_pipeline.storage import get_backend
+
+        remote = json.loads(remote_file.read_text(encoding="utf-8"))
+        media_url = await run_in_threadpool(get_backend(cfg).sign, remote["object_key"])
+        media_type = _media_type(Path(remote.get("filename") or "audio"), probe=False).value
+
     return {
         "media_url": media_url,
         "media_type": media_type,
@@ -348,10 +610,55 @@ async def get_media_info(task_id: str):
 
 # ============== Task APIs ==============
 
+# Tingwu-bound URL tasks stream the download straight into object storage
+TINGWU_PIPELINED = os.getenv("TINGWU_PIPELINED", "1") == "1"
+TINGWU_PIPELINE_KEEP_LOCAL = os.getenv("TINGWU_PIPELINE_KEEP_LOCAL", "1") == "1"  # Local copy for playback
+REMOTE_AUDIO_FILE = "remote_audio.json"
+
+
+def _write_remote_audio(task_id: str, object_key: str, filename: Optional[str]) -> None:
+    """Record that a task's audio lives only in object storage (used for playback)."""
+    task_dir = Path(cfg.artifacts_dir) / task_id
+    task_dir.mkdir(parents=True, exist_ok=True)
+    (task_dir / REMOTE_AUDIO_FILE).write_text(
+        json.dumps({"object_key": object_key, "filename": filename}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+
+
+def _download_pipelined(task_id: str, source_url: str) -> Optional[str]:
+    """
+    Download and upload in one pass for a Tingwu task.
+
+    Returns:
+        Audio path for the task, or None if the source can't be streamed or
+        streaming failed (the caller falls back to a regular download)
+    """
+    from podscript_pipeline.storage import get_storage_provider_name, is_storage_configured
+
+    if not is_storage_configured(cfg):
+        return None
+    try:
+        add_task_log(task_id, f"边下载边上传到 {get_storage_provider_name(cfg)}...")
+        streamed = run_download_pipelined(
+            task_id, source_url, cfg.artifacts_dir, keep_local=TINGWU_PIPELINE_KEEP_LOCAL
+        )
+    except Exception as e:
+        logger.warning(f"[{task_id}] Pipelined download failed, falling back to regular download: {e}")
+        add_task_log(task_id, "流式上传失败，改用普通下载", "warn")
+        return None
+    if streamed is None:
+        return None
+
+    task_store.update_meta(task_id, object_key=streamed["object_key"], filename=streamed["filename"])
+    if not streamed["audio_path"]:
+        _write_remote_audio(task_id, streamed["object_key"], streamed["filename"])
+    return streamed["audio_path"] or str(Path(cfg.artifacts_dir) / task_id / streamed["filename"])
+
+
 @app.post("/tasks", response_model=TaskSummary)
 async def create_task(
     req: TaskCreateRequest,
-    bg: BackgroundTasks,
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """Create a download task (step 1). Use POST /tasks/{id}/transcribe for step 2.
@@ -360,31 +667,33 @@ async def create_task(
     """
     task_id = uuid.uuid4().hex[:12]
     logger.info(f"[{task_id}] Creating download task for URL: {req.source_url} (user: {current_user.user_id})")
-    TASKS[task_id] = TaskDetail(id=task_id, status=TaskStatus.queued, progress=0.0)
-    # Store source URL for history tracking
-    TASK_SOURCES[task_id] = str(req.source_url)
-    # Store task metadata (user_id)
-    TASK_METADATA[task_id] = {"user_id": current_user.user_id, "credits_deducted": 0}
+    task_store.maybe_evict()
+    # Store source URL for history tracking and task metadata (user_id)
+    task_store.create(
+        TaskDetail(id=task_id, status=TaskStatus.queued, progress=0.0),
+        user_id=current_user.user_id,
+        source_url=str(req.source_url),
+    )
 
     def _download():
         try:
             logger.info(f"[{task_id}] Starting download...")
             add_task_log(task_id, "开始下载...")
-            TASKS[task_id].status = TaskStatus.downloading
-            TASKS[task_id].progress = 0.1
-            audio_path, mime_type = run_download_only(task_id, str(req.source_url), cfg.artifacts_dir)
-            logger.info(f"[{task_id}] Download complete: {audio_path} (mime: {mime_type})")
+            task_store.update(task_id, status=TaskStatus.downloading, progress=0.1)
+            audio_path = None
+            if req.provider == ASR_PROVIDER_TINGWU and TINGWU_PIPELINED:
+                audio_path = _download_pipelined(task_id, str(req.source_url))
+            if audio_path is None:
+                audio_path, _ = run_download_only(task_id, str(req.source_url), cfg.artifacts_dir)
+            logger.info(f"[{task_id}] Download complete: {audio_path}")
             add_task_log(task_id, f"下载完成: {Path(audio_path).name}")
-            TASKS[task_id].status = TaskStatus.downloaded
-            TASKS[task_id].progress = 0.5
-            TASKS[task_id].audio_path = audio_path
+            task_store.update(task_id, status=TaskStatus.downloaded, progress=0.5, audio_path=audio_path)
         except Exception as e:
             logger.error(f"[{task_id}] Download failed: {e}", exc_info=True)
             add_task_log(task_id, f"下载失败: {str(e)}", "error")
-            TASKS[task_id].status = TaskStatus.failed
-            TASKS[task_id].error = {"message": str(e)}
+            task_store.update(task_id, status=TaskStatus.failed, error={"message": str(e)})
 
-    bg.add_task(_download)
+    scheduler.submit_download(task_id, _download)
     return TaskSummary(id=task_id, status=TaskStatus.queued, progress=0.0)
 
 
@@ -410,10 +719,40 @@ def _get_audio_duration(audio_path: str) -> float:
     return 3600.0  # Default to 1 hour if can't determine
 
 
+# Containers that may hold video; other extensions are always audio
+VIDEO_CONTAINER_EXTENSIONS = (".mp4", ".webm")
+
+
+def _media_type(path: Path, probe: bool = True) -> MediaType:
+    """
+    Whether a task's media file is audio or video.
+
+    Downloads are saved as audio.<ext> and are audio-only whatever the
+    container (yt-dlp keeps the native codec, e.g. Opus in .webm). Other
+    .mp4/.webm files (uploads) are probed for a video stream; cover art
+    doesn't count. Without probing they are assumed to be video.
+    """
+    if path.suffix.lower() not in VIDEO_CONTAINER_EXTENSIONS or path.stem == "audio":
+        return MediaType.AUDIO
+    if not probe:
+        return MediaType.VIDEO
+    import subprocess
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'quiet', '-select_streams', 'V', '-show_entries', 'stream=codec_type',
+             '-of', 'csv=p=0', str(path)],
+            capture_output=True, text=True, timeout=30
+        )
+        if result.returncode == 0:
+            return MediaType.VIDEO if result.stdout.strip() else MediaType.AUDIO
+    except Exception as e:
+        logger.warning(f"Could not probe media type: {e}")
+    return MediaType.VIDEO
+
+
 @app.post("/tasks/{task_id}/transcribe", response_model=TaskSummary)
 async def transcribe_task(
     task_id: str,
-    bg: BackgroundTasks,
     current_user: CurrentUser = Depends(get_current_user),
     provider: str = Query(default=ASR_PROVIDER_WHISPER, description="ASR provider: 'whisper' or 'tingwu'"),
     model_name: Optional[str] = Query(default=None, description="Model name (for Whisper)"),
@@ -431,13 +770,13 @@ async def transcribe_task(
     - Tingwu: custom prompt for LLM post-processing
       Example: "生成详细摘要" or "提取关键信息"
     """
-    task = TASKS.get(task_id)
+    task = task_store.get(task_id)
     if not task:
         logger.warning(f"[{task_id}] Transcribe request for non-existent task")
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Verify task ownership
-    task_meta = TASK_METADATA.get(task_id, {})
+    task_meta = task_store.get_meta(task_id)
     if task_meta.get("user_id") and task_meta["user_id"] != current_user.user_id:
         logger.warning(f"[{task_id}] User {current_user.user_id} attempted to transcribe task owned by {task_meta.get('user_id')}")
         raise HTTPException(status_code=403, detail="You don't have permission to transcribe this task")
@@ -449,36 +788,53 @@ async def transcribe_task(
         logger.warning(f"[{task_id}] Transcribe request but no audio_path")
         raise HTTPException(status_code=400, detail="No audio file found for this task")
 
-    # Calculate credit cost based on audio duration
-    audio_duration = _get_audio_duration(task.audio_path)
-    credit_cost = calculate_credit_cost(audio_duration)
-    hours_str = f"{audio_duration/3600:.1f}小时"
+    # Claim the task before charging, so concurrent submits can't both pass the check
+    if not task_store.transition(task_id, TaskStatus.downloaded, status=TaskStatus.queued):
+        logger.warning(f"[{task_id}] Transcribe request lost the race for the task")
+        raise HTTPException(status_code=409, detail="Task is already being transcribed")
 
-    logger.info(f"[{task_id}] Audio duration: {audio_duration:.0f}s, credit cost: {credit_cost}")
-    add_task_log(task_id, f"音频时长: {hours_str}, 预计消耗: {credit_cost} 积分")
-
-    # Check and deduct credits
     try:
-        new_balance = await deduct_user_credits(
-            user_id=current_user.user_id,
-            amount=credit_cost,
-            task_id=task_id,
-            description=f"转写消费 ({hours_str})"
-        )
-        # Store credits_deducted for potential refund
-        if task_id in TASK_METADATA:
-            TASK_METADATA[task_id]["credits_deducted"] = credit_cost
-        else:
-            TASK_METADATA[task_id] = {"user_id": current_user.user_id, "credits_deducted": credit_cost}
-
-        logger.info(f"[{task_id}] Deducted {credit_cost} credits from user {current_user.user_id}, new balance: {new_balance}")
-        add_task_log(task_id, f"已扣除 {credit_cost} 积分，剩余: {new_balance}")
-    except HTTPException:
-        # Re-raise HTTP exceptions (e.g., 402 insufficient credits)
+        # Browser-direct and pipelined uploads are already in object storage: Tingwu
+        # gets the object as-is, Whisper a local copy (fetched if there isn't one)
+        object_key = task_meta.get("object_key")
+        local = Path(task.audio_path).exists()
+        remote = bool(object_key) and (provider == ASR_PROVIDER_TINGWU or not local)
+        remote_url = None
+        if remote:
+            from podscript_pipeline.storage import get_backend
+            remote_url = await run_in_threadpool(get_backend(cfg).sign, object_key)
+
+        # Calculate credit cost based on audio duration (ffprobe reads remote URLs too)
+        audio_duration = await run_in_threadpool(_get_audio_duration, task.audio_path if local else remote_url)
+        credit_cost = calculate_credit_cost(audio_duration)
+        hours_str = f"{audio_duration/3600:.1f}小时"
+
+        logger.info(f"[{task_id}] Audio duration: {audio_duration:.0f}s, credit cost: {credit_cost}")
+        add_task_log(task_id, f"音频时长: {hours_str}, 预计消耗: {credit_cost} 积分")
+
+        # Check and deduct credits
+        try:
+            new_balance = await deduct_user_credits(
+                user_id=current_user.user_id,
+                amount=credit_cost,
+                task_id=task_id,
+                description=f"转写消费 ({hours_str})"
+            )
+            # Store credits_deducted for potential refund
+            task_store.update_meta(task_id, user_id=current_user.user_id, credits_deducted=credit_cost)
+
+            logger.info(f"[{task_id}] Deducted {credit_cost} credits from user {current_user.user_id}, new balance: {new_balance}")
+            add_task_log(task_id, f"已扣除 {credit_cost} 积分，剩余: {new_balance}")
+        except HTTPException:
+            # Re-raise HTTP exceptions (e.g., 402 insufficient credits)
+            raise
+        except Exception as e:
+            logger.error(f"[{task_id}] Credit deduction failed: {e}")
+            raise HTTPException(status_code=500, detail="积分扣除失败，请稍后重试")
+    except BaseException:
+        # Release the claim so the task can be submitted again
+        task_store.transition(task_id, TaskStatus.queued, status=TaskStatus.downloaded)
         raise
-    except Exception as e:
-        logger.error(f"[{task_id}] Credit deduction failed: {e}")
-        raise HTTPException(status_code=500, detail="积分扣除失败，请稍后重试")
 
     provider_name = "Whisper 离线" if provider == ASR_PROVIDER_WHISPER else "通义听悟"
     logger.info(f"[{task_id}] Starting transcription with {provider_name}: {task.audio_path}")
@@ -487,28 +843,14 @@ async def transcribe_task(
         logger.info(f"[{task_id}] Custom prompt: {prompt[:50]}...")
         add_task_log(task_id, f"使用自定义 Prompt: {prompt[:30]}...")
 
-    def _transcribe():
-        def log_callback(msg: str):
-            add_task_log(task_id, msg)
+    def log_callback(msg: str):
+        add_task_log(task_id, msg)
 
+    def _complete(results: dict):
         try:
-            TASKS[task_id].status = TaskStatus.transcribing
-            TASKS[task_id].progress = 0.55
-
-            results = run_transcribe_only(
-                task_id=task_id,
-                audio_path=task.audio_path,
-                artifacts_dir=cfg.artifacts_dir,
-                provider=provider,
-                model_name=model_name,
-                language=language,
-                prompt=prompt,
-                log_callback=log_callback,
-            )
-
-            # Populate partial_segments for streaming display
+            # Replace streamed segments with the final transcript
             segments = results.get("segments", [])
-            TASKS[task_id].partial_segments = [
+            task_store.set_segments(task_id, [
                 TranscriptSegment(
                     start=seg.get("start", 0),
                     end=seg.get("end", 0),
@@ -516,15 +858,16 @@ async def transcribe_task(
                     speaker=str(seg.get("speaker", ""))
                 )
                 for seg in segments
-            ]
+            ])
 
             add_task_log(task_id, f"转写完成，共 {len(segments)} 个语音片段")
-            TASKS[task_id].status = TaskStatus.completed
-            TASKS[task_id].progress = 1.0
             srt_url = f"/artifacts/{task_id}/result.srt"
             md_url = f"/artifacts/{task_id}/result.md"
-            TASKS[task_id].results = TaskResults(
-                srt_url=srt_url, markdown_url=md_url, meta=results.get("meta", {})
+            task_store.update(
+                task_id,
+                status=TaskStatus.completed,
+                progress=1.0,
+                results=TaskResults(srt_url=srt_url, markdown_url=md_url, meta=results.get("meta", {})),
             )
             add_task_log(task_id, "结果已保存，转写任务完成！")
 
@@ -532,53 +875,133 @@ async def transcribe_task(
             save_task_to_history(task_id, provider=provider)
             add_task_log(task_id, "已添加到历史记录")
         except Exception as e:
-            logger.error(f"[{task_id}] Transcription failed: {e}", exc_info=True)
-            add_task_log(task_id, f"转写失败: {str(e)}", "error")
-            TASKS[task_id].status = TaskStatus.failed
-            TASKS[task_id].error = {"message": str(e)}
+            _fail(e)
+
+    def _fail(e: Exception):
+        logger.error(f"[{task_id}] Transcription failed: {e}", exc_info=True)
+        add_task_log(task_id, f"转写失败: {str(e)}", "error")
+        task_store.update(task_id, status=TaskStatus.failed, error={"message": str(e)})
 
-            # Refund credits on failure
-            meta = TASK_METADATA.get(task_id, {})
-            credits_to_refund = meta.get("credits_deducted", 0)
-            user_id = meta.get("user_id")
+        # Refund credits on failure
+        meta = task_store.get_meta(task_id)
+        credits_to_refund = meta.get("credits_deducted", 0)
+        user_id = meta.get("user_id")
 
-            if credits_to_refund > 0 and user_id:
+        if credits_to_refund > 0 and user_id:
+            try:
+                import asyncio
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
                 try:
-                    import asyncio
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        new_balance = loop.run_until_complete(refund_user_credits(
-                            user_id=user_id,
-                            amount=credits_to_refund,
-                            task_id=task_id,
-                            description=f"转写失败退款"
-                        ))
-                        logger.info(f"[{task_id}] Refunded {credits_to_refund} credits to user {user_id}, new balance: {new_balance}")
-                        add_task_log(task_id, f"已退还 {credits_to_refund} 积分")
-                        # Clear credits_deducted to prevent double refund
-                        TASK_METADATA[task_id]["credits_deducted"] = 0
-                    finally:
-                        loop.close()
-                except Exception as refund_error:
-                    logger.error(f"[{task_id}] Failed to refund credits: {refund_error}")
-                    add_task_log(task_id, f"积分退款失败，请联系客服", "error")
-
-    bg.add_task(_transcribe)
-    return TaskSummary(id=task_id, status=TaskStatus.transcribing, progress=0.6)
+                    new_balance = loop.run_until_complete(refund_user_credits(
+                        user_id=user_id,
+                        amount=credits_to_refund,
+                        task_id=task_id,
+                        description=f"转写失败退款"
+                    ))
+                    logger.info(f"[{task_id}] Refunded {credits_to_refund} credits to user {user_id}, new balance: {new_balance}")
+                    add_task_log(task_id, f"已退还 {credits_to_refund} 积分")
+                    # Clear credits_deducted to prevent double refund
+                    task_store.update_meta(task_id, credits_deducted=0)
+                finally:
+                    loop.close()
+            except Exception as refund_error:
+                logger.error(f"[{task_id}] Failed to refund credits: {refund_error}")
+                add_task_log(task_id, f"积分退款失败，请联系客服", "error")
+
+    def _on_tingwu_done(future):
+        try:
+            results = future.result()
+        except Exception as e:
+            _fail(e)
+            return
+        _complete(results)
+
+    def _transcribe():
+        def segment_callback(segment: dict):
+            # Streamed as each window is decoded; replaced by the final list below
+            task_store.append_segments(task_id, [TranscriptSegment(**segment)])
+
+        try:
+            task_store.update(task_id, status=TaskStatus.transcribing, progress=0.55)
+            task_store.set_segments(task_id, [])
+
+            if provider == ASR_PROVIDER_TINGWU:
+                if remote:
+                    # Already in the bucket: submit the object as-is, no re-upload
+                    future = start_transcribe_remote(
+                        task_id=task_id,
+                        audio_url=remote_url,
+                        artifacts_dir=cfg.artifacts_dir,
+                        prompt=prompt,
+                        duration_s=audio_duration,
+                        log_callback=log_callback,
+                    )
+                else:
+                    future = start_transcribe_tingwu(
+                        task_id=task_id,
+                        audio_path=task.audio_path,
+                        artifacts_dir=cfg.artifacts_dir,
+                        prompt=prompt,
+                        log_callback=log_callback,
+                    )
+                add_task_log(task_id, "等待转写完成...")
+                # The shared poller tracks the job from here; this worker is
+                # released and results are saved when the job completes
+                future.add_done_callback(_on_tingwu_done)
+                return
+
+            if remote and not local:
+                from podscript_pipeline.http_download import download_file
+
+                add_task_log(task_id, "从对象存储下载音频...")
+                download_file(remote_url, Path(task.audio_path))
+
+            results = run_transcribe_only(
+                task_id=task_id,
+                audio_path=task.audio_path,
+                artifacts_dir=cfg.artifacts_dir,
+                provider=provider,
+                model_name=model_name,
+                language=language,
+                prompt=prompt,
+                log_callback=log_callback,
+                segment_callback=segment_callback,
+            )
+        except Exception as e:
+            _fail(e)
+            return
+        _complete(results)
+
+    # Wait for a free slot; status stays 'queued' until a worker picks it up.
+    # Tingwu jobs only upload and submit, so they don't take local ASR slots
+    try:
+        if provider == ASR_PROVIDER_TINGWU:
+            position = scheduler.submit_cloud(task_id, _transcribe)
+            queue_stats = scheduler.cloud.stats()
+        else:
+            position = scheduler.submit_transcription(task_id, _transcribe)
+            queue_stats = scheduler.transcriptions.stats()
+    except (ValueError, RuntimeError) as e:
+        # Fails the task and refunds the credits just deducted
+        await run_in_threadpool(_fail, e)
+        raise HTTPException(status_code=409, detail=str(e))
+    if queue_stats["running"] >= queue_stats["max_workers"]:
+        add_task_log(task_id, f"转写任务排队中，当前排在第 {position} 位")
+    return TaskSummary(id=task_id, status=TaskStatus.queued, progress=0.5)
 
 
 @app.get("/tasks/{task_id}", response_model=TaskDetail)
 async def get_task(task_id: str):
-    task = TASKS.get(task_id)
+    task = task_store.get(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return task.model_copy(update={"queue_position": scheduler.queue_position(task_id)})
 
 
 @app.get("/tasks/{task_id}/results", response_model=TaskResults)
 async def get_results(task_id: str):
-    task = TASKS.get(task_id)
+    task = task_store.get(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     if task.status != TaskStatus.completed or not task.results:
@@ -589,12 +1012,143 @@ async def get_results(task_id: str):
 @app.get("/tasks/{task_id}/logs")
 async def get_logs(task_id: str) -> List[TaskLog]:
     """Get task execution logs."""
-    task = TASKS.get(task_id)
+    task = task_store.get(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task.logs
 
 
+# Server-Sent Events settings
+SSE_POLL_INTERVAL_S = 0.5  # How often the stream checks the store for changes
+SSE_KEEPALIVE_S = 15  # Comment line sent when idle to keep proxies from closing the stream
+
+
+def _parse_event_cursor(last_event_id: Optional[str]) -> tuple:
+    """Parse a 'logs:segments:generation' event ID into (log_offset, segment_offset, generation)."""
+    try:
+        parts = [int(p) for p in (last_event_id or "").split(":")]
+    except ValueError:
+        return 0, 0, 0
+    if len(parts) == 2:
+        parts.append(0)  # IDs from before segment generations
+    if len(parts) != 3:
+        return 0, 0, 0
+    logs, segments, generation = parts
+    return max(0, logs), max(0, segments), generation
+
+
+def _sse(event: str, data: str, event_id: Optional[str] = None) -> str:
+    """Format a single Server-Sent Event."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _read_task_deltas(task_id: str, log_offset: int, segment_offset: int, generation: int):
+    """
+    Read the task summary plus logs/segments added since the given offsets.
+
+    If the segment list was replaced since generation, segments are read
+    from the start; the current generation is returned with them.
+    """
+    task = task_store.get_summary(task_id)
+    if task is None:
+        return None, [], [], generation
+    logs = task_store.get_logs(task_id, offset=log_offset)
+    current = task_store.get_segment_generation(task_id)
+    segments = task_store.get_segments(task_id, offset=segment_offset if current == generation else 0)
+    if task_store.get_segment_generation(task_id) != current:
+        segments = []  # Replaced while reading; the next poll starts over
+    return task, logs, segments, current
+
+
+@app.get("/tasks/{task_id}/events")
+async def task_events(
+    task_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """
+    Stream task progress as Server-Sent Events.
+
+    Events:
+    - status: {status, progress, error, results, queue_position} when any of them change
+    - log: a new TaskLog entry
+    - segment: a new TranscriptSegment
+    - reset: the segment list was replaced (e.g. streamed segments by the
+      final transcript); drop received segments, the new list follows
+    - end: sent once the task is completed or failed, then the stream closes
+
+    Every log/segment/reset event carries an ID of the form
+    "<logs>:<segments>:<generation>" (counts delivered so far and the
+    segment list's generation). Reconnecting with Last-Event-ID resumes from
+    that point instead of replaying the whole task.
+    """
+    if not await run_in_threadpool(task_store.exists, task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    log_offset, segment_offset, generation = _parse_event_cursor(last_event_id)
+
+    async def event_stream():
+        nonlocal log_offset, segment_offset, generation
+        last_state = None
+        idle_s = 0.0
+
+        while not await request.is_disconnected():
+            task, logs, segments, current = await run_in_threadpool(
+                _read_task_deltas, task_id, log_offset, segment_offset, generation
+            )
+            if task is None:
+                yield _sse("end", json.dumps({"status": "deleted"}))
+                return
+
+            sent = False
+            for entry in logs:
+                log_offset += 1
+                yield _sse("log", entry.model_dump_json(), f"{log_offset}:{segment_offset}:{generation}")
+                sent = True
+            if current != generation:
+                had_segments = segment_offset > 0
+                generation, segment_offset = current, 0
+                if had_segments:
+                    yield _sse("reset", json.dumps({"generation": generation}), f"{log_offset}:0:{generation}")
+                    sent = True
+            for segment in segments:
+                segment_offset += 1
+                yield _sse("segment", segment.model_dump_json(), f"{log_offset}:{segment_offset}:{generation}")
+                sent = True
+
+            state = {
+                "status": task.status.value,
+                "progress": task.progress,
+                "error": task.error,
+                "results": task.results.model_dump() if task.results else None,
+                "queue_position": scheduler.queue_position(task_id),
+            }
+            if state != last_state:
+                last_state = state
+                yield _sse("status", json.dumps(state, ensure_ascii=False))
+                sent = True
+
+            if task.status in (TaskStatus.completed, TaskStatus.failed):
+                yield _sse("end", json.dumps({"status": task.status.value}))
+                return
+
+            idle_s = 0.0 if sent else idle_s + SSE_POLL_INTERVAL_S
+            if idle_s >= SSE_KEEPALIVE_S:
+                idle_s = 0.0
+                yield ": keepalive\n\n"
+            await asyncio.sleep(SSE_POLL_INTERVAL_S)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 class TranscriptSegmentResponse(BaseModel):
     """Transcript segment for the result viewer API (includes id for UI)."""
     id: int
@@ -616,7 +1170,7 @@ async def get_transcript(task_id: str):
     """Get structured transcript data for the result viewer."""
     import json
 
-    task = TASKS.get(task_id)
+    task = task_store.get(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     if task.status != TaskStatus.completed or not task.results:
@@ -654,11 +1208,10 @@ async def get_transcript(task_id: str):
     media_type = "audio"
 
     # Check for common audio/video files
-    for ext in [".mp3", ".m4a", ".wav", ".mp4", ".webm"]:
+    for ext in AUDIO_EXTENSIONS:
         for file in task_dir.glob(f"*{ext}"):
             media_url = f"/artifacts/{task_id}/{file.name}"
-            if ext in [".mp4", ".webm"]:
-                media_type = "video"
+            media_type = (await run_in_threadpool(_media_type, file)).value
             break
         if media_url:
             break
@@ -740,9 +1293,12 @@ async def upload_task(
     """
     task_id = uuid.uuid4().hex[:12]
     logger.info(f"[{task_id}] Uploading file: {file.filename} (user: {current_user.user_id})")
-    TASKS[task_id] = TaskDetail(id=task_id, status=TaskStatus.queued, progress=0.0)
+    task_store.maybe_evict()
     # Store task metadata (user_id)
-    TASK_METADATA[task_id] = {"user_id": current_user.user_id, "credits_deducted": 0}
+    task_store.create(
+        TaskDetail(id=task_id, status=TaskStatus.queued, progress=0.0),
+        user_id=current_user.user_id,
+    )
 
     task_dir = Path(cfg.artifacts_dir) / task_id
     task_dir.mkdir(parents=True, exist_ok=True)
@@ -760,9 +1316,108 @@ async def upload_task(
     content_type = file.content_type or "application/octet-stream"
 
     # Mark as downloaded immediately since file is already uploaded
-    TASKS[task_id].status = TaskStatus.downloaded
-    TASKS[task_id].progress = 0.5
-    TASKS[task_id].audio_path = str(destination)
+    task_store.update(task_id, status=TaskStatus.downloaded, progress=0.5, audio_path=str(destination))
+    add_task_log(task_id, "文件上传完成")
+
+    return TaskSummary(id=task_id, status=TaskStatus.downloaded, progress=0.5)
+
+
+# Browser-direct uploads: presigned PUT straight to object storage (bucket CORS must allow PUT)
+DIRECT_UPLOAD_ENABLED = os.getenv("DIRECT_UPLOAD_ENABLED", "0") == "1"
+DIRECT_UPLOAD_EXPIRES_S = int(os.getenv("DIRECT_UPLOAD_EXPIRES_S", "3600"))
+
+
+class UploadSessionRequest(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+
+
+class UploadSession(BaseModel):
+    task_id: str
+    upload_url: str
+    method: str = "PUT"
+    headers: Dict[str, str] = {}
+    expires_in: int
+
+
+@app.post("/uploads", response_model=UploadSession)
+async def create_upload_session(
+    req: UploadSessionRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Start a browser-direct upload (step 1, alternative to /tasks/upload).
+
+    Returns a presigned PUT URL: the browser uploads the file straight to
+    object storage, then calls POST /uploads/{task_id}/complete. Responds 501
+    when direct uploads are disabled or unsupported by the storage backend,
+    so clients fall back to /tasks/upload.
+    """
+    from podscript_pipeline.storage import get_backend, upload_object_key
+
+    if not DIRECT_UPLOAD_ENABLED:
+        raise HTTPException(status_code=501, detail="Direct uploads are disabled")
+
+    task_id = uuid.uuid4().hex[:12]
+    filename = Path(req.filename).name or "audio"
+    content_type = req.content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    object_key = upload_object_key(cfg, task_id, filename)
+    try:
+        upload_url = await run_in_threadpool(
+            get_backend(cfg).sign_put, object_key, content_type, DIRECT_UPLOAD_EXPIRES_S
+        )
+    except (NotImplementedError, ValueError) as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    logger.info(f"[{task_id}] Direct upload session: {filename} ({req.size} bytes, user: {current_user.user_id})")
+    task_store.maybe_evict()
+    task_store.create(
+        TaskDetail(id=task_id, status=TaskStatus.queued, progress=0.0),
+        claim=False,  # No job runs until the client completes the upload
+        user_id=current_user.user_id,
+        object_key=object_key,
+        filename=filename,
+    )
+    add_task_log(task_id, f"上传文件: {filename} (直传对象存储)")
+
+    return UploadSession(
+        task_id=task_id,
+        upload_url=upload_url,
+        headers={"Content-Type": content_type},
+        expires_in=DIRECT_UPLOAD_EXPIRES_S,
+    )
+
+
+@app.post("/uploads/{task_id}/complete", response_model=TaskSummary)
+async def complete_upload_session(
+    task_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Register a finished browser-direct upload; the task becomes 'downloaded'."""
+    from podscript_pipeline.storage import get_backend
+
+    meta = task_store.get_meta(task_id)
+    if not meta or not meta.get("object_key"):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    if meta.get("user_id") and meta["user_id"] != current_user.user_id:
+        raise HTTPException(status_code=403, detail="You don't have permission to access this task")
+
+    # Only an open session can be completed: a second call must not reopen the task for transcription
+    task = task_store.get_summary(task_id)
+    if task.status != TaskStatus.queued:
+        raise HTTPException(status_code=409, detail=f"Upload session is already completed, current: {task.status}")
+
+    object_key = meta["object_key"]
+    if not await run_in_threadpool(get_backend(cfg).exists, object_key):
+        raise HTTPException(status_code=400, detail="对象存储中未找到上传的文件")
+
+    # The bytes stay in the bucket; the local copy is only fetched if Whisper needs it
+    audio_path = Path(cfg.artifacts_dir) / task_id / meta.get("filename", "audio")
+    if not task_store.transition(
+        task_id, TaskStatus.queued, status=TaskStatus.downloaded, progress=0.5, audio_path=str(audio_path)
+    ):
+        raise HTTPException(status_code=409, detail="Upload session is already completed")
+    _write_remote_audio(task_id, object_key, meta.get("filename"))
     add_task_log(task_id, "文件上传完成")
 
     return TaskSummary(id=task_id, status=TaskStatus.downloaded, progress=0.5)
@@ -779,7 +1434,6 @@ class DirectUrlTranscribeRequest(BaseModel):
 @app.post("/tasks/transcribe-url", response_model=TaskSummary)
 async def transcribe_url(
     req: DirectUrlTranscribeRequest,
-    bg: BackgroundTasks,
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
@@ -803,13 +1457,15 @@ async def transcribe_url(
     logger.info(f"[{task_id}] Creating direct URL transcription task with {provider_name} (user: {current_user.user_id})")
     logger.info(f"[{task_id}] Audio URL: {req.audio_url[:80]}...")
 
-    TASKS[task_id] = TaskDetail(id=task_id, status=TaskStatus.transcribing, progress=0.1)
+    task_store.maybe_evict()
+    # Store task metadata
+    task_store.create(
+        TaskDetail(id=task_id, status=TaskStatus.queued, progress=0.1),
+        user_id=current_user.user_id,
+    )
     task_dir = Path(cfg.artifacts_dir) / task_id
     task_dir.mkdir(parents=True, exist_ok=True)
 
-    # Store task metadata
-    TASK_METADATA[task_id] = {"user_id": current_user.user_id, "credits_deducted": 0}
-
     # Deduct 1 credit minimum upfront (can't determine duration before download)
     credit_cost = 1
     try:
@@ -819,17 +1475,15 @@ async def transcribe_url(
             task_id=task_id,
             description=f"直链转写消费"
         )
-        TASK_METADATA[task_id]["credits_deducted"] = credit_cost
+        task_store.update_meta(task_id, credits_deducted=credit_cost)
         logger.info(f"[{task_id}] Deducted {credit_cost} credits, new balance: {new_balance}")
     except HTTPException:
         # Clean up task if credit deduction fails
-        del TASKS[task_id]
-        del TASK_METADATA[task_id]
+        task_store.delete(task_id)
         raise
     except Exception as e:
         logger.error(f"[{task_id}] Credit deduction failed: {e}")
-        del TASKS[task_id]
-        del TASK_METADATA[task_id]
+        task_store.delete(task_id)
         raise HTTPException(status_code=500, detail="积分扣除失败，请稍后重试")
 
     add_task_log(task_id, f"已扣除 {credit_cost} 积分")
@@ -838,61 +1492,156 @@ async def transcribe_url(
     if req.prompt:
         add_task_log(task_id, f"使用自定义 Prompt: {req.prompt[:30]}...")
 
+    def _save_results(result: dict):
+        # Save results
+        task_store.update(task_id, progress=0.9)
+        add_task_log(task_id, "保存转写结果...")
+
+        from podscript_pipeline.formatters import to_srt, to_markdown
+        import json
+
+        segments = result.get("segments", [])
+
+        # Replace streamed segments with the final transcript
+        task_store.set_segments(task_id, [
+            TranscriptSegment(
+                start=seg.get("start", 0),
+                end=seg.get("end", 0),
+                text=seg.get("text", ""),
+                speaker=str(seg.get("speaker", ""))
+            )
+            for seg in segments
+        ])
+
+        # Save JSON
+        json_path = task_dir / "result.json"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+        # Save SRT (to_srt expects dict with 'segments' key)
+        srt_path = task_dir / "result.srt"
+        srt_content = to_srt(result)
+        srt_path.write_text(srt_content, encoding="utf-8")
+
+        # Save Markdown (to_markdown expects dict with 'segments' key)
+        md_path = task_dir / "result.md"
+        md_content = to_markdown(result)
+        md_path.write_text(md_content, encoding="utf-8")
+
+        task_store.update(
+            task_id,
+            status=TaskStatus.completed,
+            progress=1.0,
+            results=TaskResults(
+                srt_url=f"/artifacts/{task_id}/result.srt",
+                markdown_url=f"/artifacts/{task_id}/result.md",
+                meta={"segments": len(segments)}
+            ),
+        )
+        add_task_log(task_id, "结果已保存，转写任务完成！")
+
+    def _fail(e: Exception):
+        logger.error(f"[{task_id}] Direct URL transcription failed: {e}", exc_info=True)
+        add_task_log(task_id, f"转写失败: {str(e)}", "error")
+        task_store.update(task_id, status=TaskStatus.failed, error={"message": str(e)})
+
+        # Refund credits on failure
+        meta = task_store.get_meta(task_id)
+        credits_to_refund = meta.get("credits_deducted", 0)
+        user_id = meta.get("user_id")
+
+        if credits_to_refund > 0 and user_id:
+            try:
+                import asyncio
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                try:
+                    new_balance = loop.run_until_complete(refund_user_credits(
+                        user_id=user_id,
+                        amount=credits_to_refund,
+                        task_id=task_id,
+                        description=f"直链转写失败退款"
+                    ))
+                    logger.info(f"[{task_id}] Refunded {credits_to_refund} credits to user {user_id}")
+                    add_task_log(task_id, f"已退还 {credits_to_refund} 积分")
+                    task_store.update_meta(task_id, credits_deducted=0)
+                finally:
+                    loop.close()
+            except Exception as refund_error:
+                logger.error(f"[{task_id}] Failed to refund credits: {refund_error}")
+                add_task_log(task_id, f"积分退款失败，请联系客服", "error")
+
+    def _on_tingwu_done(future):
+        try:
+            result = future.result()
+            add_task_log(task_id, f"转写完成，共 {len(result.get('segments', []))} 个语音片段")
+            _save_results(result)
+        except Exception as e:
+            _fail(e)
+
     def _transcribe():
         def log_callback(msg: str):
             add_task_log(task_id, msg)
 
+        def segment_callback(segment: dict):
+            task_store.append_segments(task_id, [TranscriptSegment(**segment)])
+
         try:
-            TASKS[task_id].progress = 0.2
+            task_store.update(task_id, status=TaskStatus.transcribing, progress=0.2)
 
             if req.provider == ASR_PROVIDER_TINGWU:
                 # For Tingwu: use URL directly without downloading
-                from podscript_pipeline.tingwu_adapter import submit_transcribe_job, poll_transcribe_result
+                from podscript_pipeline.tingwu_adapter import submit_transcribe_job
+                from podscript_pipeline.tingwu_poller import get_poller
 
                 add_task_log(task_id, "提交转写任务到通义听悟...")
-                TASKS[task_id].progress = 0.3
+                task_store.update(task_id, progress=0.3)
 
                 job_id = submit_transcribe_job(cfg, req.audio_url, custom_prompt=req.prompt)
                 add_task_log(task_id, f"任务已提交: {job_id}")
-                TASKS[task_id].progress = 0.4
+                task_store.update(task_id, progress=0.4)
+
+                # Polling pace and timeout scale with the audio duration (ffprobe reads the URL)
+                duration = _get_audio_duration(req.audio_url)
 
                 add_task_log(task_id, "等待转写完成...")
-                result = poll_transcribe_result(cfg, job_id)
-                add_task_log(task_id, f"转写完成，共 {len(result.get('segments', []))} 个语音片段")
+                # The shared poller tracks the job from here; this worker is
+                # released and results are saved when the job completes
+                get_poller().watch(cfg, job_id, duration_s=duration).add_done_callback(_on_tingwu_done)
+                return
 
             else:
                 # For Whisper: download audio first then transcribe
-                import httpx
+                from podscript_pipeline.http_download import download_file
 
                 add_task_log(task_id, "下载音频文件...")
-                TASKS[task_id].progress = 0.2
-
-                # Download the audio file
-                with httpx.Client(timeout=300) as client:
-                    resp = client.get(req.audio_url, follow_redirects=True)
-                    resp.raise_for_status()
-
-                    # Determine filename from URL or Content-Disposition
-                    filename = "audio.mp3"
-                    content_disp = resp.headers.get("content-disposition", "")
-                    if "filename=" in content_disp:
-                        import re
-                        match = re.search(r'filename="?([^";\n]+)"?', content_disp)
-                        if match:
-                            filename = match.group(1)
-                    else:
-                        # Try to get filename from URL path
-                        from urllib.parse import urlparse
-                        parsed = urlparse(req.audio_url)
-                        if parsed.path:
-                            filename = Path(parsed.path).name or filename
-
-                    audio_path = task_dir / filename
-                    audio_path.write_bytes(resp.content)
-                    add_task_log(task_id, f"音频下载完成: {filename}")
-                    TASKS[task_id].audio_path = str(audio_path)
-
-                TASKS[task_id].progress = 0.4
+                task_store.update(task_id, progress=0.2)
+
+                # Download the audio file (streamed to disk, resumable)
+                download_path = task_dir / "audio.download"
+                headers = download_file(req.audio_url, download_path)
+
+                # Determine filename from URL or Content-Disposition
+                filename = "audio.mp3"
+                content_disp = headers.get("content-disposition", "")
+                if "filename=" in content_disp:
+                    import re
+                    match = re.search(r'filename="?([^";\n]+)"?', content_disp)
+                    if match:
+                        filename = match.group(1)
+                else:
+                    # Try to get filename from URL path
+                    from urllib.parse import urlparse
+                    parsed = urlparse(req.audio_url)
+                    if parsed.path:
+                        filename = Path(parsed.path).name or filename
+
+                audio_path = task_dir / Path(filename).name
+                download_path.replace(audio_path)
+                add_task_log(task_id, f"音频下载完成: {filename}")
+                task_store.update(task_id, audio_path=str(audio_path))
+
+                task_store.update(task_id, progress=0.4)
                 add_task_log(task_id, "开始 Whisper 转写...")
 
                 result = run_asr(
@@ -903,84 +1652,21 @@ async def transcribe_url(
                     language=req.language,
                     prompt=req.prompt,
                     log_callback=log_callback,
+                    segment_callback=segment_callback,
                 )
                 add_task_log(task_id, f"转写完成，共 {len(result.get('segments', []))} 个语音片段")
-
-            # Save results
-            TASKS[task_id].progress = 0.9
-            add_task_log(task_id, "保存转写结果...")
-
-            from podscript_pipeline.formatters import to_srt, to_markdown
-            import json
-
-            segments = result.get("segments", [])
-
-            # Populate partial_segments for streaming display
-            TASKS[task_id].partial_segments = [
-                TranscriptSegment(
-                    start=seg.get("start", 0),
-                    end=seg.get("end", 0),
-                    text=seg.get("text", ""),
-                    speaker=str(seg.get("speaker", ""))
-                )
-                for seg in segments
-            ]
-
-            # Save JSON
-            json_path = task_dir / "result.json"
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-
-            # Save SRT (to_srt expects dict with 'segments' key)
-            srt_path = task_dir / "result.srt"
-            srt_content = to_srt(result)
-            srt_path.write_text(srt_content, encoding="utf-8")
-
-            # Save Markdown (to_markdown expects dict with 'segments' key)
-            md_path = task_dir / "result.md"
-            md_content = to_markdown(result)
-            md_path.write_text(md_content, encoding="utf-8")
-
-            TASKS[task_id].status = TaskStatus.completed
-            TASKS[task_id].progress = 1.0
-            TASKS[task_id].results = TaskResults(
-                srt_url=f"/artifacts/{task_id}/result.srt",
-                markdown_url=f"/artifacts/{task_id}/result.md",
-                meta={"segments": len(segments)}
-            )
-            add_task_log(task_id, "结果已保存，转写任务完成！")
+                _save_results(result)
 
         except Exception as e:
-            logger.error(f"[{task_id}] Direct URL transcription failed: {e}", exc_info=True)
-            add_task_log(task_id, f"转写失败: {str(e)}", "error")
-            TASKS[task_id].status = TaskStatus.failed
-            TASKS[task_id].error = {"message": str(e)}
+            _fail(e)
 
-            # Refund credits on failure
-            meta = TASK_METADATA.get(task_id, {})
-            credits_to_refund = meta.get("credits_deducted", 0)
-            user_id = meta.get("user_id")
-
-            if credits_to_refund > 0 and user_id:
-                try:
-                    import asyncio
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        new_balance = loop.run_until_complete(refund_user_credits(
-                            user_id=user_id,
-                            amount=credits_to_refund,
-                            task_id=task_id,
-                            description=f"直链转写失败退款"
-                        ))
-                        logger.info(f"[{task_id}] Refunded {credits_to_refund} credits to user {user_id}")
-                        add_task_log(task_id, f"已退还 {credits_to_refund} 积分")
-                        TASK_METADATA[task_id]["credits_deducted"] = 0
-                    finally:
-                        loop.close()
-                except Exception as refund_error:
-                    logger.error(f"[{task_id}] Failed to refund credits: {refund_error}")
-                    add_task_log(task_id, f"积分退款失败，请联系客服", "error")
-
-    bg.add_task(_transcribe)
-    return TaskSummary(id=task_id, status=TaskStatus.transcribing, progress=0.1)
+    try:
+        if req.provider == ASR_PROVIDER_TINGWU:
+            scheduler.submit_cloud(task_id, _transcribe)
+        else:
+            scheduler.submit_transcription(task_id, _transcribe)
+    except (ValueError, RuntimeError) as e:
+        # Fails the task and refunds the credit just deducted
+        await run_in_threadpool(_fail, e)
+        raise HTTPException(status_code=409, detail=str(e))
+    return TaskSummary(id=task_id, status=TaskStatus.queued, progress=0.1)
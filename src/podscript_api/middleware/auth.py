@@ -117,6 +117,12 @@ def _decode_jwt(token: str) -> Dict[str, Any]:
         raise AuthError("Authentication failed")
 
 
+def auth_configured() -> bool:
+    """Whether tokens can be validated (SUPABASE_JWT_SECRET or SUPABASE_URL is set)."""
+    config = load_config()
+    return bool(config.supabase_jwt_secret or config.supabase_url)
+
+
 async def get_current_user(
     access_token: Optional[str] = Cookie(default=None),
 ) -> CurrentUser:
@@ -0,0 +1,195 @@
+"""
+Job scheduler for download and transcription work.
+
+Jobs run on dedicated worker threads instead of Starlette's shared
+threadpool, so CPU-heavy ASR work is capped at a fixed concurrency and
+excess requests wait in a FIFO queue. Cloud (Tingwu) transcriptions only
+upload and submit before handing off to the shared poller, so they get
+their own queue rather than taking local ASR slots. Post-processing of
+finished tasks (search indexing, keyword tagging) has its own queue, so it
+never holds up the next transcription.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Concurrency limits (configurable via environment)
+DEFAULT_DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "2"))
+DEFAULT_ASR_WORKERS = int(os.getenv("ASR_WORKERS", "1"))
+DEFAULT_CLOUD_WORKERS = int(os.getenv("CLOUD_WORKERS", "4"))
+DEFAULT_POSTPROCESS_WORKERS = int(os.getenv("POSTPROCESS_WORKERS", "1"))
+
+
+class JobQueue:
+    """
+    FIFO job queue served by a fixed number of worker threads.
+
+    Worker threads are started lazily on first submit and live for the
+    lifetime of the process.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        """
+        Initialize the queue.
+
+        Args:
+            name: Queue name used for thread names and logging
+            max_workers: Maximum number of jobs running at the same time
+        """
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._pending: "OrderedDict[str, Callable[[], Any]]" = OrderedDict()
+        self._running: Set[str] = set()
+        self._cond = threading.Condition()
+        self._threads: list = []
+        self._shutdown = False
+
+    def submit(self, job_id: str, fn: Callable[..., Any], *args, **kwargs) -> int:
+        """
+        Add a job to the end of the queue.
+
+        Args:
+            job_id: Unique job identifier (the task ID)
+            fn: Callable to run on a worker thread
+            *args, **kwargs: Arguments passed to fn
+
+        Returns:
+            1-based queue position of the job at submission time
+
+        Raises:
+            ValueError: If a job with the same ID is already queued or running
+        """
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError(f"Job queue '{self.name}' is shut down")
+            if job_id in self._pending or job_id in self._running:
+                raise ValueError(f"Job {job_id} is already scheduled on '{self.name}'")
+            self._pending[job_id] = lambda: fn(*args, **kwargs)
+            position = len(self._pending)
+            self._ensure_workers()
+            self._cond.notify()
+        logger.info(f"[{job_id}] Queued on '{self.name}' at position {position}")
+        return position
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Return the 1-based position of a waiting job, or None if not waiting."""
+        with self._cond:
+            for i, pending_id in enumerate(self._pending, start=1):
+                if pending_id == job_id:
+                    return i
+        return None
+
+    def is_running(self, job_id: str) -> bool:
+        """Check whether a job is currently executing."""
+        with self._cond:
+            return job_id in self._running
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth and worker utilisation."""
+        with self._cond:
+            return {
+                "waiting": len(self._pending),
+                "running": len(self._running),
+                "max_workers": self.max_workers,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs and let workers exit once the queue drains."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _ensure_workers(self) -> None:
+        """Start worker threads up to max_workers (caller holds the lock)."""
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"{self.name}-worker-{len(self._threads)}",
+                daemon=True,
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._shutdown:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                job_id, job = self._pending.popitem(last=False)
+                self._running.add(job_id)
+
+            try:
+                job()
+            except Exception as e:
+                # Jobs handle their own errors; this only guards the worker thread
+                logger.error(f"[{job_id}] Unhandled error in '{self.name}' job: {e}", exc_info=True)
+            finally:
+                with self._cond:
+                    self._running.discard(job_id)
+
+
+class JobScheduler:
+    """
+    Scheduler with separate slots for downloads, transcriptions, cloud
+    transcriptions and post-processing.
+
+    Downloads are network-bound and local transcriptions CPU-bound, so each
+    gets its own queue and its own concurrency cap; cloud jobs never wait
+    behind (or block) local ASR.
+    """
+
+    def __init__(
+        self,
+        download_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+        asr_workers: int = DEFAULT_ASR_WORKERS,
+        cloud_workers: int = DEFAULT_CLOUD_WORKERS,
+        postprocess_workers: int = DEFAULT_POSTPROCESS_WORKERS,
+    ):
+        self.downloads = JobQueue("download", download_workers)
+        self.transcriptions = JobQueue("asr", asr_workers)
+        self.cloud = JobQueue("cloud", cloud_workers)
+        self.postprocessing = JobQueue("postprocess", postprocess_workers)
+
+    def submit_download(self, task_id: str, fn: Callable[..., Any], *args, **kwargs) -> int:
+        """Queue a download job. Returns its queue position."""
+        return self.downloads.submit(task_id, fn, *args, **kwargs)
+
+    def submit_transcription(self, task_id: str, fn: Callable[..., Any], *args, **kwargs) -> int:
+        """Queue a transcription job. Returns its queue position."""
+        return self.transcriptions.submit(task_id, fn, *args, **kwargs)
+
+    def submit_cloud(self, task_id: str, fn: Callable[..., Any], *args, **kwargs) -> int:
+        """Queue a cloud (Tingwu) transcription job. Returns its queue position."""
+        return self.cloud.submit(task_id, fn, *args, **kwargs)
+
+    def submit_postprocess(self, task_id: str, fn: Callable[..., Any], *args, **kwargs) -> int:
+        """Queue post-processing for a finished task. Returns its queue position."""
+        return self.postprocessing.submit(task_id, fn, *args, **kwargs)
+
+    def queue_position(self, task_id: str) -> Optional[int]:
+        """Return the task's position in whichever queue it is waiting in."""
+        for queue in (self.transcriptions, self.cloud, self.downloads):
+            position = queue.position(task_id)
+            if position is not None:
+                return position
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return stats for every queue."""
+        return {
+            "download": self.downloads.stats(),
+            "asr": self.transcriptions.stats(),
+            "cloud": self.cloud.stats(),
+            "postprocess": self.postprocessing.stats(),
+        }
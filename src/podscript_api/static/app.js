@@ -40,6 +40,7 @@ const els = {
 
 let currentTaskId = null
 let pollTimer = null
+let taskEvents = null  // EventSource for /tasks/{id}/events
 let isReadyToTranscribe = false
 let hasDirectAudioUrl = false  // Track if direct audio URL is provided
 let displayedSegmentCount = 0  // Track how many segments have been rendered
@@ -149,12 +150,13 @@ async function handleApiError(res, defaultMsg) {
   }
 }
 
-async function createTask(sourceUrl) {
+async function createTask(sourceUrl, provider) {
   const res = await fetch('/tasks', {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     credentials: 'include',
-    body: JSON.stringify({ source_url: sourceUrl })
+    // The provider lets Tingwu tasks upload to storage while downloading
+    body: JSON.stringify({ source_url: sourceUrl, provider: provider })
   })
   if (!res.ok) {
     await handleApiError(res, '请求失败')
@@ -162,7 +164,43 @@ async function createTask(sourceUrl) {
   return res.json()
 }
 
+// Upload straight to object storage with a presigned PUT; null if unavailable
+async function uploadDirect(file) {
+  const res = await fetch('/uploads', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    credentials: 'include',
+    body: JSON.stringify({ filename: file.name, content_type: file.type || null, size: file.size })
+  })
+  if (res.status === 501) return null
+  if (!res.ok) {
+    await handleApiError(res, '上传失败')
+  }
+  const session = await res.json()
+
+  const put = await fetch(session.upload_url, { method: session.method, headers: session.headers, body: file })
+  if (!put.ok) {
+    throw new Error(`直传失败 (${put.status})`)
+  }
+
+  const done = await fetch(`/uploads/${session.task_id}/complete`, { method: 'POST', credentials: 'include' })
+  if (!done.ok) {
+    await handleApiError(done, '上传失败')
+  }
+  return done.json()
+}
+
 async function uploadTask(file) {
+  try {
+    const task = await uploadDirect(file)
+    if (task) return task
+  } catch (e) {
+    if (e.message.includes('积分不足') || e.message.includes('请先登录')) {
+      throw e
+    }
+    console.warn('Direct upload failed, falling back to server upload:', e)
+  }
+
   const fd = new FormData()
   fd.append('file', file)
   const res = await fetch('/tasks/upload', { method: 'POST', credentials: 'include', body: fd })
@@ -447,7 +485,8 @@ function resetUI() {
   if (els.fileLabelText) els.fileLabelText.textContent = '点击或拖拽上传本地音/视频文件'
 }
 
-function getStatusText(status) {
+function getStatusText(status, queuePosition) {
+  if (status === 'queued' && queuePosition) return `排队中（第 ${queuePosition} 位）`
   const map = {
     'queued': '排队中',
     'downloading': '下载中...',
@@ -468,7 +507,7 @@ async function startDownload() {
 
   if (els.downloadBtn) els.downloadBtn.disabled = true
   try {
-    const task = await createTask(url)
+    const task = await createTask(url, getSelectedProvider())
     currentTaskId = task.id
     if (els.taskId) els.taskId.textContent = currentTaskId
     if (els.status) els.status.textContent = getStatusText(task.status)
@@ -634,30 +673,89 @@ async function transcribe() {
   }
 }
 
+// Subscribe to task events over SSE (status, log and segment deltas).
+// Returns false when EventSource is unavailable so callers can fall back to polling.
+function streamTaskEvents(onStatus, onFallback) {
+  closeTaskEvents()
+  if (!window.EventSource) return false
+
+  const logs = []
+  const segments = []
+  const source = new EventSource(`/tasks/${currentTaskId}/events`)
+  taskEvents = source
+
+  source.addEventListener('log', (e) => {
+    logs.push(JSON.parse(e.data))
+    updateLogViewer(logs)
+  })
+  source.addEventListener('segment', (e) => {
+    segments.push(JSON.parse(e.data))
+    updateStreamingTranscript(segments)
+  })
+  source.addEventListener('reset', () => {
+    // The segment list was replaced; the new one follows as segment events
+    segments.length = 0
+    displayedSegmentCount = 0
+    if (els.transcriptSegments) els.transcriptSegments.innerHTML = ''
+  })
+  source.addEventListener('status', (e) => onStatus(JSON.parse(e.data)))
+  source.addEventListener('end', () => closeTaskEvents())
+  source.onerror = () => {
+    // The browser reconnects (with Last-Event-ID) on its own; only fall back if it gave up
+    if (source.readyState === EventSource.CLOSED && taskEvents === source) {
+      closeTaskEvents()
+      onFallback()
+    }
+  }
+  return true
+}
+
+function closeTaskEvents() {
+  if (taskEvents) {
+    taskEvents.close()
+    taskEvents = null
+  }
+}
+
+// Handle a download-phase status update. Returns true once polling can stop.
+function handleDownloadStatus(t) {
+  if (els.status) els.status.textContent = getStatusText(t.status, t.queue_position)
+  setProgress(t.progress)
+
+  // Download complete - enable transcribe button
+  if (t.status === 'downloaded') {
+    isReadyToTranscribe = true
+    updateTranscribeButton()
+    return true
+  }
+
+  // Failed
+  if (t.status === 'failed' && t.error) {
+    setDownloadError(t.error.message || '下载失败')
+    return true
+  }
+  return false
+}
+
 async function poll() {
+  clearInterval(pollTimer)
+  const onStatus = (t) => {
+    if (handleDownloadStatus(t)) closeTaskEvents()
+  }
+  if (streamTaskEvents(onStatus, startDownloadPolling)) return
+  startDownloadPolling()
+}
+
+function startDownloadPolling() {
   clearInterval(pollTimer)
   pollTimer = setInterval(async () => {
     try {
       const t = await fetchTask(currentTaskId)
-      if (els.status) els.status.textContent = getStatusText(t.status)
-      setProgress(t.progress)
+      if (handleDownloadStatus(t)) clearInterval(pollTimer)
 
       // Update logs
       const logs = await fetchLogs(currentTaskId)
       updateLogViewer(logs)
-
-      // Download complete - enable transcribe button
-      if (t.status === 'downloaded') {
-        clearInterval(pollTimer)
-        isReadyToTranscribe = true
-        updateTranscribeButton()
-      }
-
-      // Failed
-      if (t.status === 'failed' && t.error) {
-        clearInterval(pollTimer)
-        setDownloadError(t.error.message || '下载失败')
-      }
     } catch (e) {
       clearInterval(pollTimer)
       setDownloadError('状态轮询失败')
@@ -665,78 +763,91 @@ async function poll() {
   }, 1000)
 }
 
-async function pollTranscription() {
-  clearInterval(pollTimer)
-  pollTimer = setInterval(async () => {
-    try {
-      const t = await fetchTask(currentTaskId)
-      if (els.status) els.status.textContent = getStatusText(t.status)
-      setProgress(t.progress)
-
-      // Update transcription progress
-      if (els.transcribeStatus) els.transcribeStatus.textContent = getStatusText(t.status)
-      setTranscribeProgress(t.progress)
+// Handle a transcription-phase status update. Returns true once polling can stop.
+async function handleTranscriptionStatus(t) {
+  if (els.status) els.status.textContent = getStatusText(t.status, t.queue_position)
+  setProgress(t.progress)
 
-      // Update logs
-      const logs = await fetchLogs(currentTaskId)
-      updateLogViewer(logs)
+  // Update transcription progress
+  if (els.transcribeStatus) els.transcribeStatus.textContent = getStatusText(t.status, t.queue_position)
+  setTranscribeProgress(t.progress)
 
-      // Update streaming transcript with partial segments
-      if (t.partial_segments && t.partial_segments.length > 0) {
-        updateStreamingTranscript(t.partial_segments)
-      }
+  // Update streaming transcript with partial segments (polling mode only; SSE sends segment events)
+  if (t.partial_segments && t.partial_segments.length > 0) {
+    updateStreamingTranscript(t.partial_segments)
+  }
 
-      // Transcription complete - show results and enable view button
-      if (t.status === 'completed') {
-        clearInterval(pollTimer)
-        isReadyToTranscribe = false
-        if (els.transcribeBtn) els.transcribeBtn.disabled = true
-        if (els.transcribeHint) {
-          els.transcribeHint.textContent = '转写完成！'
-          els.transcribeHint.style.color = '#2ea043'
-        }
-        if (els.transcribeStatus) els.transcribeStatus.textContent = '完成！'
+  // Transcription complete - show results and enable view button
+  if (t.status === 'completed') {
+    isReadyToTranscribe = false
+    if (els.transcribeBtn) els.transcribeBtn.disabled = true
+    if (els.transcribeHint) {
+      els.transcribeHint.textContent = '转写完成！'
+      els.transcribeHint.style.color = '#2ea043'
+    }
+    if (els.transcribeStatus) els.transcribeStatus.textContent = '完成！'
 
-        // Show result links
-        if (els.srtLink) els.srtLink.href = `/artifacts/${currentTaskId}/result.srt`
-        if (els.mdLink) els.mdLink.href = `/artifacts/${currentTaskId}/result.md`
-        if (els.viewResultLink) els.viewResultLink.href = `/static/result.html?task_id=${currentTaskId}`
-        if (els.links) els.links.hidden = false
+    // Show result links
+    if (els.srtLink) els.srtLink.href = `/artifacts/${currentTaskId}/result.srt`
+    if (els.mdLink) els.mdLink.href = `/artifacts/${currentTaskId}/result.md`
+    if (els.viewResultLink) els.viewResultLink.href = `/static/result.html?task_id=${currentTaskId}`
+    if (els.links) els.links.hidden = false
 
-        // T023: Refresh history list after transcription completes
-        if (window.historyModule && window.historyModule.refreshHistory) {
-          window.historyModule.refreshHistory()
-        }
+    // T023: Refresh history list after transcription completes
+    if (window.historyModule && window.historyModule.refreshHistory) {
+      window.historyModule.refreshHistory()
+    }
 
-        // If we have partial_segments, display them now (final update)
-        if (t.partial_segments && t.partial_segments.length > 0) {
-          updateStreamingTranscript(t.partial_segments)
-        } else {
-          // Fallback: fetch full transcript from result endpoint
-          try {
-            const transcript = await fetch(`/tasks/${currentTaskId}/transcript`)
-            if (transcript.ok) {
-              const data = await transcript.json()
-              if (data.segments && data.segments.length > 0) {
-                updateStreamingTranscript(data.segments)
-              }
-            }
-          } catch (e) {
-            console.log('Could not fetch transcript:', e)
+    // Fallback: fetch full transcript from result endpoint if nothing was streamed
+    if (displayedSegmentCount === 0) {
+      try {
+        const transcript = await fetch(`/tasks/${currentTaskId}/transcript`)
+        if (transcript.ok) {
+          const data = await transcript.json()
+          if (data.segments && data.segments.length > 0) {
+            updateStreamingTranscript(data.segments)
           }
         }
+      } catch (e) {
+        console.log('Could not fetch transcript:', e)
       }
+    }
+    return true
+  }
 
-      // Failed
-      if (t.status === 'failed' && t.error) {
-        clearInterval(pollTimer)
-        setTranscribeError(t.error.message || '转写失败')
-        isReadyToTranscribe = false
-        updateTranscribeButton()
-        if (els.transcribeStatus) els.transcribeStatus.textContent = '失败'
-        resetStreamingTranscript()
-        if (els.result) els.result.hidden = false
-      }
+  // Failed
+  if (t.status === 'failed' && t.error) {
+    setTranscribeError(t.error.message || '转写失败')
+    isReadyToTranscribe = false
+    updateTranscribeButton()
+    if (els.transcribeStatus) els.transcribeStatus.textContent = '失败'
+    resetStreamingTranscript()
+    if (els.result) els.result.hidden = false
+    return true
+  }
+  return false
+}
+
+async function pollTranscription() {
+  clearInterval(pollTimer)
+  const onStatus = async (t) => {
+    if (await handleTranscriptionStatus(t)) closeTaskEvents()
+  }
+  if (streamTaskEvents(onStatus, startTranscriptionPolling)) return
+  startTranscriptionPolling()
+}
+
+function startTranscriptionPolling() {
+  clearInterval(pollTimer)
+  pollTimer = setInterval(async () => {
+    try {
+      const t = await fetchTask(currentTaskId)
+
+      // Update logs
+      const logs = await fetchLogs(currentTaskId)
+      updateLogViewer(logs)
+
+      if (await handleTranscriptionStatus(t)) clearInterval(pollTimer)
     } catch (e) {
       clearInterval(pollTimer)
       setTranscribeError('状态轮询失败')
@@ -106,6 +106,32 @@ async function fetchHistory(page = 1, limit = 5) {
   return res.json()
 }
 
+/**
+ * Fetch one page of history by cursor (pass the previous page's next_cursor).
+ * Unlike page offsets, cursors stay put when new records arrive while scrolling.
+ */
+async function fetchHistoryPage({ cursor = null, limit = 20, tag = null } = {}) {
+  const params = new URLSearchParams({ limit })
+  if (cursor) params.set('cursor', cursor)
+  if (tag) params.set('tag', tag)
+  const res = await fetch(`/history?${params}`)
+  if (!res.ok) {
+    throw new Error('Failed to fetch history')
+  }
+  return res.json()
+}
+
+/**
+ * Call onReach whenever the sentinel element scrolls into (or near) view
+ */
+function observeScrollEnd(sentinel, onReach) {
+  const observer = new IntersectionObserver((entries) => {
+    if (entries.some((entry) => entry.isIntersecting)) onReach()
+  }, { rootMargin: '200px' })
+  observer.observe(sentinel)
+  return observer
+}
+
 /**
  * Mark a record as viewed via API
  */
@@ -590,6 +616,8 @@ function setupModalListeners() {
 window.historyModule = {
   loadHistory,
   refreshHistory,
+  fetchHistoryPage,
+  observeScrollEnd,
   markAsViewed,
   showOperationMenu,
   initHistoryElements,
@@ -1,3 +1,3 @@
-from .pipeline import run_pipeline, run_pipeline_from_file, run_download_only, run_transcribe_only
+from .pipeline import run_pipeline, run_pipeline_from_file, run_download_only, run_download_pipelined, run_transcribe_only, run_transcribe_remote, start_transcribe_remote, start_transcribe_tingwu
 
-__all__ = ["run_pipeline", "run_pipeline_from_file", "run_download_only", "run_transcribe_only"]
\ No newline at end of file
+__all__ = ["run_pipeline", "run_pipeline_from_file", "run_download_only", "run_download_pipelined", "run_transcribe_only", "run_transcribe_remote", "start_transcribe_remote", "start_transcribe_tingwu"]
@@ -6,8 +6,9 @@ Supports multiple transcription backends:
 """
 import logging
 import os
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Tuple
 
 from podscript_shared.config import load_config
 
@@ -20,20 +21,15 @@ ASR_PROVIDER_WHISPER = "whisper"
 # Lazy import to handle missing SDKs
 upload_audio = None
 submit_transcribe_job = None
-poll_transcribe_result = None
 
 
 def _import_tingwu_adapters():
-    global upload_audio, submit_transcribe_job, poll_transcribe_result
+    global upload_audio, submit_transcribe_job
     try:
         from podscript_pipeline.storage import upload_audio as _upload_audio
-        from podscript_pipeline.tingwu_adapter import (
-            submit_transcribe_job as _submit_transcribe_job,
-            poll_transcribe_result as _poll_transcribe_result
-        )
+        from podscript_pipeline.tingwu_adapter import submit_transcribe_job as _submit_transcribe_job
         upload_audio = _upload_audio
         submit_transcribe_job = _submit_transcribe_job
-        poll_transcribe_result = _poll_transcribe_result
         return True
     except ImportError as e:
         logger.warning(f"Failed to import tingwu adapters: {e}")
@@ -54,12 +50,9 @@ def get_available_providers() -> Dict[str, Dict[str, Any]]:
     cfg = load_config()
 
     # Check Tingwu availability
-    # Tingwu requires: credentials, app key, and storage (OSS or COS)
-    storage_ok = (
-        cfg.storage_provider in ("oss", "cos")
-        and cfg.storage_bucket
-        and cfg.storage_region
-    )
+    # Tingwu requires: credentials, app key, and storage (OSS, COS or local)
+    from podscript_pipeline.storage import is_storage_configured
+    storage_ok = is_storage_configured(cfg)
     tingwu_available = bool(
         os.getenv("TINGWU_ENABLED") == "1"
         and cfg.access_key_id
@@ -97,6 +90,7 @@ def transcribe(
     language: Optional[str] = None,
     prompt: Optional[str] = None,
     log_callback: Optional[Callable[[str], None]] = None,
+    segment_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> Dict[str, Any]:
     """
     Transcribe audio using specified provider.
@@ -111,6 +105,8 @@ def transcribe(
             - Whisper: initial_prompt for vocabulary/style hints (~900 chars max)
             - Tingwu: custom prompt for LLM post-processing
         log_callback: Optional callback for progress logging
+        segment_callback: Optional callback receiving segments as they are
+            decoded (Whisper only; Tingwu returns everything at the end)
 
     Returns:
         Dict with transcription results
@@ -124,13 +120,72 @@ def transcribe(
     if prompt:
         log(f"Using custom prompt: {prompt[:50]}...")
 
+    # Identical audio + settings: reuse the earlier result instead of running ASR again
+    cache, key = _transcript_cache_lookup(input_path, provider, model_name, language, prompt)
+    if cache and key:
+        cached = cache.get(key)
+        if cached is not None:
+            log(f"Transcript cache hit ({key[:12]}), skipping ASR: {len(cached.get('segments', []))} segments")
+            return cached
+
+    result = _transcribe_with_provider(
+        task_id, input_path, provider, model_name, language, prompt, log_callback, segment_callback
+    )
+    if cache and key:
+        cache.put(key, result)
+    return result
+
+
+def _transcript_cache_lookup(
+    input_path: Path,
+    provider: str,
+    model_name: Optional[str],
+    language: Optional[str],
+    prompt: Optional[str],
+) -> Tuple[Optional[Any], Optional[str]]:
+    """Return (cache, key) for this request, or (None, None) if caching is off or fails."""
+    from podscript_pipeline.transcript_cache import cache_key, get_transcript_cache, hash_file
+
+    try:
+        cache = get_transcript_cache()
+        if cache is None:
+            return None, None
+        if provider == ASR_PROVIDER_TINGWU:
+            # Tingwu ignores the model/language settings
+            model_name = language = None
+        return cache, cache_key(hash_file(Path(input_path)), provider, model_name, language, prompt)
+    except OSError as e:
+        logger.warning(f"Transcript cache unavailable: {e}")
+        return None, None
+
+
+def _transcribe_with_provider(
+    task_id: str,
+    input_path: Path,
+    provider: str,
+    model_name: Optional[str],
+    language: Optional[str],
+    prompt: Optional[str],
+    log_callback: Optional[Callable[[str], None]],
+    segment_callback: Optional[Callable[[Dict[str, Any]], None]],
+) -> Dict[str, Any]:
+    """Dispatch to the ASR backend for provider."""
+    def log(msg: str):
+        logger.info(f"[{task_id}] {msg}")
+        if log_callback:
+            log_callback(msg)
+
     if provider == ASR_PROVIDER_WHISPER:
-        return _transcribe_with_whisper(task_id, input_path, model_name, language, prompt, log_callback)
+        return _transcribe_with_whisper(
+            task_id, input_path, model_name, language, prompt, log_callback, segment_callback
+        )
     elif provider == ASR_PROVIDER_TINGWU:
         return _transcribe_with_tingwu(task_id, input_path, prompt, log_callback)
     else:
         log(f"Unknown provider: {provider}, falling back to Whisper")
-        return _transcribe_with_whisper(task_id, input_path, model_name, language, prompt, log_callback)
+        return _transcribe_with_whisper(
+            task_id, input_path, model_name, language, prompt, log_callback, segment_callback
+        )
 
 
 def _transcribe_with_whisper(
@@ -140,6 +195,7 @@ def _transcribe_with_whisper(
     language: Optional[str],
     prompt: Optional[str],
     log_callback: Optional[Callable[[str], None]],
+    segment_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> Dict[str, Any]:
     """Transcribe using OpenAI Whisper."""
     def log(msg: str):
@@ -157,12 +213,47 @@ def _transcribe_with_whisper(
         log(f"Using default Whisper model: {model_name}")
 
     try:
+        from podscript_pipeline import whisper_pool
+
+        if whisper_pool.WHISPER_POOL_ENABLED:
+            pool = whisper_pool.get_pool()
+
+            # Long recordings: split at silences and transcribe chunks in parallel
+            from podscript_pipeline import audio, whisper_chunked
+
+            if whisper_chunked.WHISPER_CHUNKED and pool.size > 1:
+                if Path(input_path).suffix == ".pcm":
+                    duration = audio.pcm_duration(input_path)
+                else:
+                    duration = audio.probe_duration(input_path)
+                if whisper_chunked.should_chunk(duration, pool.size):
+                    return whisper_chunked.transcribe_chunked(
+                        audio_path=input_path,
+                        pool=pool,
+                        model_name=model_name,
+                        language=language,
+                        initial_prompt=prompt,
+                        log_callback=log_callback,
+                        segment_callback=segment_callback,
+                    )
+
+            # Run inference in a worker process that keeps the model resident
+            return pool.transcribe(
+                audio_path=input_path,
+                model_name=model_name,
+                language=language,
+                initial_prompt=prompt,
+                log_callback=log_callback,
+                segment_callback=segment_callback,
+            )
+
         result = whisper_adapter.transcribe_audio(
             audio_path=input_path,
             model_name=model_name,
             language=language,
             initial_prompt=prompt,
             log_callback=log_callback,
+            segment_callback=segment_callback,
         )
         return result
     except Exception as e:
@@ -170,13 +261,75 @@ def _transcribe_with_whisper(
         raise
 
 
+def start_tingwu_transcription(
+    task_id: str,
+    input_path: Path,
+    prompt: Optional[str] = None,
+    log_callback: Optional[Callable[[str], None]] = None,
+) -> Future:
+    """
+    Upload audio and submit it to Tingwu without waiting for the result.
+
+    The job is then tracked by the shared poller, so the calling worker is
+    free as soon as this returns. A transcript cache hit resolves at once.
+
+    Args:
+        task_id: Unique task identifier for logging
+        input_path: Path to the audio file
+        prompt: Custom prompt for Tingwu LLM post-processing
+        log_callback: Optional callback for progress logging
+
+    Returns:
+        Future resolving to the transcription result dict
+    """
+    cache, key = _transcript_cache_lookup(input_path, ASR_PROVIDER_TINGWU, None, None, prompt)
+    if cache and key:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"[{task_id}] Transcript cache hit ({key[:12]}), skipping ASR")
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+
+    future = _submit_tingwu(task_id, input_path, prompt, log_callback)
+    if cache and key:
+        def _store(result: Dict[str, Any]) -> Dict[str, Any]:
+            cache.put(key, result)
+            return result
+
+        from podscript_pipeline.tingwu_poller import then
+        future = then(future, _store)
+    return future
+
+
 def _transcribe_with_tingwu(
     task_id: str,
     input_path: Path,
     prompt: Optional[str],
     log_callback: Optional[Callable[[str], None]],
 ) -> Dict[str, Any]:
-    """Transcribe using Alibaba Cloud Tingwu."""
+    """Transcribe using Alibaba Cloud Tingwu, waiting for the result."""
+    def log(msg: str):
+        logger.info(f"[{task_id}] {msg}")
+        if log_callback:
+            log_callback(msg)
+
+    try:
+        result = _submit_tingwu(task_id, input_path, prompt, log_callback).result()
+        log(f"Transcription complete: {len(result.get('segments', []))} segments")
+        return result
+    except Exception as e:
+        logger.error(f"[{task_id}] Tingwu transcription error: {e}", exc_info=True)
+        raise
+
+
+def _submit_tingwu(
+    task_id: str,
+    input_path: Path,
+    prompt: Optional[str],
+    log_callback: Optional[Callable[[str], None]],
+) -> Future:
+    """Upload and submit a Tingwu job; the returned future tracks it on the shared poller."""
     def log(msg: str):
         logger.info(f"[{task_id}] {msg}")
         if log_callback:
@@ -185,12 +338,9 @@ def _transcribe_with_tingwu(
     cfg = load_config()
 
     # Verify Tingwu configuration
-    # Supports both Alibaba OSS and Tencent COS for storage
-    storage_ok = (
-        cfg.storage_provider in ("oss", "cos")
-        and cfg.storage_bucket
-        and cfg.storage_region
-    )
+    # Supports Alibaba OSS, Tencent COS and the local-disk stand-in for storage
+    from podscript_pipeline.storage import is_storage_configured
+    storage_ok = is_storage_configured(cfg)
     use_tingwu = (
         os.getenv("TINGWU_ENABLED") == "1"
         and cfg.access_key_id
@@ -209,23 +359,21 @@ def _transcribe_with_tingwu(
     from podscript_pipeline.storage import get_storage_provider_name
     storage_name = get_storage_provider_name(cfg)
 
-    try:
-        log(f"Uploading audio to {storage_name}...")
-        audio_url = upload_audio(cfg, input_path)
-        log(f"Audio uploaded successfully")
+    log(f"Uploading audio to {storage_name}...")
+    audio_url = upload_audio(cfg, input_path)
+    log(f"Audio uploaded successfully")
 
-        log("Submitting transcribe job to Tingwu...")
-        job_id = submit_transcribe_job(cfg, audio_url, custom_prompt=prompt)
-        log(f"Job submitted: {job_id}")
+    log("Submitting transcribe job to Tingwu...")
+    job_id = submit_transcribe_job(cfg, audio_url, custom_prompt=prompt)
+    log(f"Job submitted: {job_id}")
 
-        log("Polling for transcription result...")
-        result = poll_transcribe_result(cfg, job_id)
-        log(f"Transcription complete: {len(result.get('segments', []))} segments")
+    # Polling pace and timeout scale with the audio duration
+    from podscript_pipeline.audio import probe_duration
+    from podscript_pipeline.tingwu_poller import get_poller
+    duration = probe_duration(input_path)
 
-        return result
-    except Exception as e:
-        logger.error(f"[{task_id}] Tingwu transcription error: {e}", exc_info=True)
-        raise
+    log("Polling for transcription result...")
+    return get_poller().watch(cfg, job_id, duration_s=duration)
 
 
 # For backward compatibility
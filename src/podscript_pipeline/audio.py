@@ -0,0 +1,98 @@
+"""
+Raw PCM helpers shared by the Whisper chunking code.
+
+Audio is decoded once with ffmpeg into 16 kHz mono signed 16-bit PCM (the
+format Whisper works in), after which any time window can be read straight
+from the file without decoding again.
+"""
+import logging
+import subprocess
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000  # Whisper's native sample rate
+BYTES_PER_SAMPLE = 2  # s16le
+
+
+def probe_duration(audio_path: Path) -> Optional[float]:
+    """Get media duration in seconds using ffprobe, or None if it can't be read."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', str(audio_path)],
+            capture_output=True, text=True, timeout=30
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return float(result.stdout.strip())
+    except Exception as e:
+        logger.warning(f"Could not get audio duration for {audio_path}: {e}")
+    return None
+
+
+def decode_to_pcm(input_path: Path, output_path: Path) -> Path:
+    """
+    Decode any media file to 16 kHz mono s16le PCM.
+
+    Args:
+        input_path: Source media file
+        output_path: Destination .pcm file (headerless)
+
+    Returns:
+        output_path
+
+    Raises:
+        RuntimeError: If ffmpeg fails
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+        "-i", str(input_path),
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "s16le", "-acodec", "pcm_s16le",
+        str(output_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg decode failed: {result.stderr.strip()[-500:]}")
+    return output_path
+
+
+def pcm_duration(pcm_path: Path) -> float:
+    """Duration in seconds of a PCM file produced by decode_to_pcm."""
+    return Path(pcm_path).stat().st_size / (SAMPLE_RATE * BYTES_PER_SAMPLE)
+
+
+def open_pcm(pcm_path: Path) -> "np.memmap":
+    """Memory-map a PCM file as int16 samples (nothing is read until sliced)."""
+    import numpy as np  # Installed with openai-whisper
+
+    return np.memmap(pcm_path, dtype=np.int16, mode="r")
+
+
+def read_pcm(pcm_path: Path, start: float = 0.0, end: Optional[float] = None) -> "np.ndarray":
+    """
+    Read a time window from a PCM file as float32 samples in [-1, 1].
+
+    The file is memory-mapped, so only the requested window is paged in and
+    converted; the rest of the recording never occupies process memory.
+
+    Args:
+        pcm_path: PCM file produced by decode_to_pcm
+        start: Window start in seconds
+        end: Window end in seconds (None for end of file)
+
+    Returns:
+        1-D float32 array, ready to pass to model.transcribe()
+    """
+    import numpy as np  # Installed with openai-whisper
+
+    samples = open_pcm(pcm_path)
+    first = max(0, int(start * SAMPLE_RATE))
+    last = len(samples) if end is None else min(len(samples), int(end * SAMPLE_RATE))
+    window = samples[first:max(first, last)].astype(np.float32)
+    window /= 32768.0
+    return window
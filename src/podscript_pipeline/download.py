@@ -1,9 +1,11 @@
 import os
 import socket
 import logging
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 from pathlib import Path
 
+from podscript_pipeline.media_cache import get_media_cache, normalize_url
+
 logger = logging.getLogger(__name__)
 
 # Timeout configurations
@@ -11,11 +13,33 @@ DOWNLOAD_SOCKET_TIMEOUT = 30  # seconds per network request
 DOWNLOAD_RETRIES = 3
 THUMBNAIL_TIMEOUT = 10  # seconds for thumbnail download
 
+# "native" keeps the bestaudio stream as delivered (opus/m4a, stream-copied out
+# of its container at most); "mp3" re-encodes to 192 kbps MP3 as before
+YTDLP_AUDIO_MODE = os.getenv("YTDLP_AUDIO_MODE", "native").lower()
+
+AUDIO_MIME_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".aac": "audio/aac",
+    ".flac": "audio/flac",
+    ".ogg": "audio/ogg",
+    ".opus": "audio/ogg",
+    ".webm": "audio/webm",
+    ".mp4": "audio/mp4",
+}
+AUDIO_EXTENSIONS = (".mp3", ".m4a", ".opus", ".webm", ".ogg", ".wav", ".aac", ".flac", ".mp4")
+
+
+def audio_mime_type(path: Path) -> str:
+    """MIME type for a downloaded audio file, by extension."""
+    return AUDIO_MIME_TYPES.get(Path(path).suffix.lower(), "audio/mpeg")
+
 
 def _is_direct_audio_url(url: str) -> bool:
     """Check if URL points directly to an audio file."""
     u = url.lower()
-    audio_extensions = ('.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg', '.wma')
+    audio_extensions = ('.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg', '.opus', '.wma')
     return any(u.endswith(ext) or f'{ext}?' in u for ext in audio_extensions)
 
 
@@ -44,44 +68,141 @@ def _download_thumbnail(info: dict, task_dir: Path) -> None:
         logger.warning(f"Thumbnail download failed (non-fatal): {e}")
 
 
-def _download_direct_audio(url: str, task_dir: Path) -> Tuple[Path, str]:
-    """Download audio file directly from URL."""
-    import httpx
+def _direct_audio_filename(url: str) -> str:
+    """Filename for a direct audio URL, taken from its path."""
     from urllib.parse import urlparse, unquote
 
-    logger.info(f"Downloading direct audio URL: {url[:80]}...")
-
     # Extract filename from URL
     parsed = urlparse(url)
     filename = unquote(Path(parsed.path).name) or "audio.mp3"
 
     # Ensure valid extension
-    if not any(filename.lower().endswith(ext) for ext in ['.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg']):
+    if not any(filename.lower().endswith(ext) for ext in ['.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg', '.opus']):
         filename = "audio.mp3"
+    return filename
 
-    audio_path = task_dir / filename
-
-    with httpx.Client(timeout=300, follow_redirects=True) as client:
-        response = client.get(url)
-        response.raise_for_status()
-        audio_path.write_bytes(response.content)
-
-    # Determine MIME type
-    mime_map = {
-        '.mp3': 'audio/mpeg',
-        '.wav': 'audio/wav',
-        '.m4a': 'audio/mp4',
-        '.aac': 'audio/aac',
-        '.flac': 'audio/flac',
-        '.ogg': 'audio/ogg',
-    }
-    ext = audio_path.suffix.lower()
-    mime_type = mime_map.get(ext, 'audio/mpeg')
+
+def _download_direct_audio(url: str, task_dir: Path) -> Tuple[Path, str]:
+    """Download audio file directly from URL."""
+    from podscript_pipeline.http_download import download_file
+
+    logger.info(f"Downloading direct audio URL: {url[:80]}...")
+
+    audio_path = task_dir / _direct_audio_filename(url)
+
+    # Streamed to disk (resumable, segmented for large files), never held in memory
+    download_file(url, audio_path)
+
+    mime_type = audio_mime_type(audio_path)
 
     logger.info(f"Direct audio downloaded: {audio_path} ({mime_type})")
     return audio_path, mime_type
 
 
+def _ytdlp_options(target_dir: Path, mode: str = YTDLP_AUDIO_MODE) -> dict:
+    """yt-dlp options for extracting audio into target_dir."""
+    if mode == "mp3":
+        extract_audio = {"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "192"}
+    else:
+        # "best" copies the audio stream out of its container without re-encoding
+        # (webm -> .opus); audio-only m4a/opus downloads are left untouched
+        extract_audio = {"key": "FFmpegExtractAudio", "preferredcodec": "best"}
+    return {
+        "format": "bestaudio/best",
+        "outtmpl": str(target_dir / "audio.%(ext)s"),
+        "postprocessors": [extract_audio],
+        "quiet": False,
+        "no_warnings": False,
+        "nocheckcertificate": True,
+
+        # Timeout and retry configurations (P0-2 fix)
+        "socket_timeout": DOWNLOAD_SOCKET_TIMEOUT,
+        "retries": DOWNLOAD_RETRIES,
+        "fragment_retries": DOWNLOAD_RETRIES,
+        "extractor_retries": DOWNLOAD_RETRIES,
+        "file_access_retries": DOWNLOAD_RETRIES,
+        "http_chunk_size": 10485760,  # 10MB chunks
+
+        # Use cookies from browser (optional, for sites requiring login)
+        "cookiesfrombrowser": (
+            os.getenv("YTDLP_COOKIES_BROWSER", "chrome"),
+            None,  # keyring
+            None,  # profile
+            None,  # container
+        ) if os.getenv("YTDLP_USE_COOKIES", "").lower() in ("1", "true") else None,
+    }
+
+
+def _ytdlp_download(task_id: str, info: dict, target_dir: Path) -> Tuple[Path, str]:
+    """Download an already-extracted yt-dlp info dict into target_dir."""
+    import yt_dlp  # type: ignore
+
+    with yt_dlp.YoutubeDL(_ytdlp_options(target_dir)) as ydl:
+        info = ydl.process_ie_result(info, download=True)
+
+        base = Path(ydl.prepare_filename(info))
+
+        # Download thumbnail (P0-3: with timeout)
+        _download_thumbnail(info, target_dir)
+
+        # The postprocessor may have changed the extension (e.g. .webm -> .opus)
+        candidates = [base.with_suffix(ext) for ext in AUDIO_EXTENSIONS]
+        candidates += sorted(target_dir.glob("audio.*"))
+        for audio_path in candidates:
+            if audio_path.suffix.lower() in AUDIO_EXTENSIONS and audio_path.exists():
+                mime_type = audio_mime_type(audio_path)
+                logger.info(f"[{task_id}] Download complete: {audio_path} ({mime_type})")
+                return audio_path, mime_type
+
+        raise RuntimeError("下载完成但未找到音频文件")
+
+
+def _ytdlp_cache_key(info: Dict[str, Any], mode: str = YTDLP_AUDIO_MODE) -> str:
+    """Media cache key for a yt-dlp source: extractor + video id + audio mode (it changes the stored file)."""
+    return f"{info.get('extractor_key') or info.get('extractor')}:{info['id']}:{mode}"
+
+
+def resolve_stream_source(
+    task_id: str, source_url: str, artifacts_dir: str
+) -> Optional[Tuple[str, Dict[str, str], str, Optional[float], Optional[str]]]:
+    """
+    Find a single plain-HTTP audio stream for source_url, for pipelined
+    download-to-upload.
+
+    Direct audio URLs stream as-is. For yt-dlp sources the info is extracted
+    (and the thumbnail saved) without downloading; the selected bestaudio
+    format qualifies when it is one progressive HTTP(S) file. Fragmented
+    (HLS/DASH) or merged formats need yt-dlp/ffmpeg to assemble, so they
+    return None and take the regular download_source path.
+
+    Returns:
+        (media URL, request headers, filename, duration in seconds or None,
+        media cache key or None), or None if the source can't be streamed.
+        The stream is the delivered file as-is, so yt-dlp sources share
+        cache entries with 'native' mode downloads.
+    """
+    if _is_direct_audio_url(source_url):
+        return source_url, {}, _direct_audio_filename(source_url), None, f"url:{normalize_url(source_url)}"
+
+    import yt_dlp  # type: ignore
+
+    task_dir = Path(artifacts_dir) / task_id
+    task_dir.mkdir(parents=True, exist_ok=True)
+    with yt_dlp.YoutubeDL(_ytdlp_options(task_dir)) as ydl:
+        info = ydl.extract_info(source_url, download=False)
+
+    if not info or info.get("requested_formats") or not info.get("url"):
+        return None
+    if info.get("protocol") not in ("http", "https"):
+        logger.info(f"[{task_id}] Format protocol {info.get('protocol')} is not streamable, using regular download")
+        return None
+
+    _download_thumbnail(info, task_dir)
+    filename = f"audio.{info.get('ext') or 'm4a'}"
+    cache_key = _ytdlp_cache_key(info, mode="native") if info.get("id") else None
+    return info["url"], dict(info.get("http_headers") or {}), filename, info.get("duration"), cache_key
+
+
 def download_source(task_id: str, source_url: str, artifacts_dir: str) -> Tuple[Path, str]:
     """
     Download audio/video from URL using yt-dlp.
@@ -89,6 +210,10 @@ def download_source(task_id: str, source_url: str, artifacts_dir: str) -> Tuple[
     Supports 1000+ sites including YouTube, Bilibili, Vimeo, Twitter, etc.
     Falls back to direct download for direct audio URLs.
 
+    Downloads go through the shared media cache (see media_cache.py), keyed
+    by extractor + video id or normalized URL, so media fetched for an
+    earlier task is linked in instead of downloaded again.
+
     Args:
         task_id: Unique task identifier
         source_url: URL to download from
@@ -102,10 +227,17 @@ def download_source(task_id: str, source_url: str, artifacts_dir: str) -> Tuple[
     """
     task_dir = Path(artifacts_dir) / task_id
     task_dir.mkdir(parents=True, exist_ok=True)
+    cache = get_media_cache(artifacts_dir)
 
     # Handle direct audio URLs
     if _is_direct_audio_url(source_url):
         try:
+            if cache:
+                return cache.fetch(
+                    f"url:{normalize_url(source_url)}",
+                    lambda target_dir: _download_direct_audio(source_url, target_dir),
+                    task_dir,
+                )
             return _download_direct_audio(source_url, task_dir)
         except Exception as e:
             logger.error(f"Direct audio download failed: {e}")
@@ -117,71 +249,17 @@ def download_source(task_id: str, source_url: str, artifacts_dir: str) -> Tuple[
 
         logger.info(f"[{task_id}] Starting yt-dlp download for: {source_url[:80]}...")
 
-        outtmpl = str(task_dir / "audio.%(ext)s")
-        ydl_opts = {
-            "format": "bestaudio/best",
-            "outtmpl": outtmpl,
-            "postprocessors": [
-                {
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": "mp3",
-                    "preferredquality": "192",
-                }
-            ],
-            "quiet": False,
-            "no_warnings": False,
-            "nocheckcertificate": True,
-
-            # Timeout and retry configurations (P0-2 fix)
-            "socket_timeout": DOWNLOAD_SOCKET_TIMEOUT,
-            "retries": DOWNLOAD_RETRIES,
-            "fragment_retries": DOWNLOAD_RETRIES,
-            "extractor_retries": DOWNLOAD_RETRIES,
-            "file_access_retries": DOWNLOAD_RETRIES,
-            "http_chunk_size": 10485760,  # 10MB chunks
-
-            # Use cookies from browser (optional, for sites requiring login)
-            "cookiesfrombrowser": (
-                os.getenv("YTDLP_COOKIES_BROWSER", "chrome"),
-                None,  # keyring
-                None,  # profile
-                None,  # container
-            ) if os.getenv("YTDLP_USE_COOKIES", "").lower() in ("1", "true") else None,
-        }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # First try to extract info to check if URL is supported
+        # Extract first: the extractor + video id is the cache key
+        with yt_dlp.YoutubeDL(_ytdlp_options(task_dir)) as ydl:
             logger.info(f"[{task_id}] Extracting info from URL...")
-            info = ydl.extract_info(source_url, download=True)
-
-            if info is None:
-                raise RuntimeError("无法解析此链接，请检查链接是否正确")
-
-            base = ydl.prepare_filename(info)
-            audio_path = Path(base).with_suffix(".mp3")
-
-            # Download thumbnail (P0-3: with timeout)
-            _download_thumbnail(info, task_dir)
-
-            # Check if audio file exists
-            if audio_path.exists():
-                logger.info(f"[{task_id}] Download complete: {audio_path}")
-                return audio_path, "audio/mpeg"
-
-            # Sometimes the file has original extension
-            for ext in [".m4a", ".webm", ".mp4", ".wav", ".ogg"]:
-                alt_path = Path(base).with_suffix(ext)
-                if alt_path.exists():
-                    logger.info(f"[{task_id}] Found audio at: {alt_path}")
-                    return alt_path, "audio/mpeg"
+            info = ydl.extract_info(source_url, download=False)
 
-            # Check for any audio files in task_dir
-            for audio_file in task_dir.glob("audio.*"):
-                if audio_file.suffix.lower() in [".mp3", ".m4a", ".webm", ".wav", ".ogg", ".mp4"]:
-                    logger.info(f"[{task_id}] Found audio file: {audio_file}")
-                    return audio_file, "audio/mpeg"
+        if info is None:
+            raise RuntimeError("无法解析此链接，请检查链接是否正确")
 
-            raise RuntimeError("下载完成但未找到音频文件")
+        if cache and info.get("id"):
+            return cache.fetch(_ytdlp_cache_key(info), lambda target_dir: _ytdlp_download(task_id, info, target_dir), task_dir)
+        return _ytdlp_download(task_id, info, task_dir)
 
     except yt_dlp.utils.DownloadError as e:
         error_msg = str(e)
@@ -0,0 +1,248 @@
+"""
+Streaming HTTP downloader for direct media URLs.
+
+Bodies are streamed to disk as they arrive, so memory use doesn't depend
+on file size. A dropped connection is resumed with an HTTP Range
+request from the last byte written. When the server supports ranges and
+the file is large, it is fetched as several byte-range segments in
+parallel, each written at its own offset of a preallocated file.
+
+stream_download feeds the bytes to a callback in order instead, so a
+download can be piped straight into an upload.
+"""
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Downloader configuration
+HTTP_DOWNLOAD_SEGMENTS = int(os.getenv("HTTP_DOWNLOAD_SEGMENTS", "4"))
+HTTP_SEGMENT_MIN_MB = int(os.getenv("HTTP_SEGMENT_MIN_MB", "16"))
+HTTP_DOWNLOAD_RETRIES = int(os.getenv("HTTP_DOWNLOAD_RETRIES", "5"))
+
+DOWNLOAD_TIMEOUT = httpx.Timeout(30.0, read=60.0)
+
+
+class RangeNotSupported(RuntimeError):
+    """The server ignored a Range request for a segment."""
+
+
+def download_file(
+    url: str,
+    dest: Path,
+    segments: int = HTTP_DOWNLOAD_SEGMENTS,
+    client: Optional[httpx.Client] = None,
+    retries: int = HTTP_DOWNLOAD_RETRIES,
+) -> httpx.Headers:
+    """
+    Download url to dest without buffering it in memory.
+
+    Args:
+        url: HTTP(S) URL to download
+        dest: Destination path (written as dest.part, then renamed)
+        segments: Maximum parallel byte-range segments for large files
+        client: Optional httpx client (one with redirects enabled is created otherwise)
+        retries: Reconnect attempts per segment after a dropped connection
+
+    Returns:
+        Response headers (e.g. for Content-Disposition / Content-Type)
+
+    Raises:
+        httpx.HTTPError: If the download fails after all retries
+    """
+    dest = Path(dest)
+    part = dest.with_name(dest.name + ".part")
+    own_client = client is None
+    if own_client:
+        client = httpx.Client(timeout=DOWNLOAD_TIMEOUT, follow_redirects=True)
+
+    try:
+        final_url, headers, size, ranged = _probe(client, url)
+        min_segment = max(1, int(HTTP_SEGMENT_MIN_MB * 1024 * 1024))
+        count = min(segments, size // min_segment) if ranged and size else 1
+
+        if count > 1:
+            logger.info(f"Downloading {size} bytes in {count} segments: {url[:80]}")
+            _download_segments(client, final_url, part, size, count, retries)
+        else:
+            with open(part, "wb") as f:
+                end = size - 1 if size else None
+                written = _stream_range(client, final_url, f, 0, end, retries, resumable=ranged, whole_file=True)
+                f.truncate(written)
+
+        part.replace(dest)
+        return headers
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    finally:
+        if own_client:
+            client.close()
+
+
+def stream_download(
+    url: str,
+    sink: Callable[[bytes], None],
+    headers: Optional[Dict[str, str]] = None,
+    client: Optional[httpx.Client] = None,
+    retries: int = HTTP_DOWNLOAD_RETRIES,
+) -> Tuple[httpx.Headers, int]:
+    """
+    Stream url to sink in order, chunk by chunk, without writing to disk.
+
+    A dropped connection is resumed from the last byte delivered. If the
+    server answers the resume with the whole body, the bytes already
+    delivered are skipped, so sink sees every byte exactly once.
+
+    Args:
+        url: HTTP(S) URL to download
+        sink: Called with each chunk as it arrives
+        headers: Extra request headers (e.g. those yt-dlp requires for a format URL)
+        client: Optional httpx client (one with redirects enabled is created otherwise)
+        retries: Reconnect attempts after a dropped connection
+
+    Returns:
+        (response headers, bytes delivered)
+
+    Raises:
+        httpx.HTTPError: If the download fails after all retries
+    """
+    own_client = client is None
+    if own_client:
+        client = httpx.Client(timeout=DOWNLOAD_TIMEOUT, follow_redirects=True)
+
+    position = 0
+    first_headers = None
+    expected = 0
+    try:
+        for attempt in range(retries + 1):
+            request_headers = dict(headers or {})
+            if position:
+                request_headers["Range"] = f"bytes={position}-"
+            try:
+                with client.stream("GET", url, headers=request_headers) as resp:
+                    resp.raise_for_status()
+                    if first_headers is None:
+                        first_headers = resp.headers
+                        if not resp.headers.get("content-encoding"):
+                            expected = int(resp.headers.get("content-length") or 0)
+                    skip = position if position and resp.status_code != 206 else 0
+                    for chunk in resp.iter_bytes():
+                        if skip:
+                            if len(chunk) <= skip:
+                                skip -= len(chunk)
+                                continue
+                            chunk, skip = chunk[skip:], 0
+                        sink(chunk)
+                        position += len(chunk)
+
+                if expected and position < expected:
+                    raise httpx.ReadError(f"Connection closed at byte {position} of {expected}")
+                return first_headers, position
+            except httpx.TransportError as e:
+                if attempt == retries:
+                    raise
+                delay = min(2 ** attempt, 10)
+                logger.warning(f"Stream interrupted at byte {position} ({e}), resuming in {delay}s")
+                time.sleep(delay)
+        return first_headers, position
+    finally:
+        if own_client:
+            client.close()
+
+
+def _probe(client: httpx.Client, url: str) -> Tuple[str, httpx.Headers, int, bool]:
+    """
+    Ask for the first byte to learn the size and whether ranges work.
+
+    Returns:
+        (final URL after redirects, headers, size or 0 if unknown, ranges supported)
+    """
+    with client.stream("GET", url, headers={"Range": "bytes=0-0"}) as resp:
+        resp.raise_for_status()
+        final_url = str(resp.url)
+        if resp.status_code == 206:
+            match = re.search(r"/(\d+)$", resp.headers.get("content-range", ""))
+            return final_url, resp.headers, int(match.group(1)) if match else 0, bool(match)
+        # Range ignored: the body is the whole file, which we don't read here
+        size = int(resp.headers.get("content-length") or 0)
+        if resp.headers.get("content-encoding"):
+            size = 0  # Length is of the compressed body
+        return final_url, resp.headers, size, False
+
+
+def _download_segments(client: httpx.Client, url: str, part: Path, size: int, count: int, retries: int) -> None:
+    """Fetch [0, size) as `count` parallel byte ranges into a preallocated file."""
+    with open(part, "wb") as f:
+        f.truncate(size)
+
+    bounds = [(i * size // count, (i + 1) * size // count - 1) for i in range(count)]
+
+    def fetch(start: int, end: int) -> None:
+        with open(part, "r+b") as f:
+            _stream_range(client, url, f, start, end, retries, resumable=True, whole_file=False)
+
+    with ThreadPoolExecutor(max_workers=count, thread_name_prefix="http-segment") as executor:
+        for future in [executor.submit(fetch, start, end) for start, end in bounds]:
+            future.result()
+
+
+def _stream_range(
+    client: httpx.Client,
+    url: str,
+    f: BinaryIO,
+    start: int,
+    end: Optional[int],
+    retries: int,
+    resumable: bool,
+    whole_file: bool,
+) -> int:
+    """
+    Stream bytes [start, end] of url into f at the same offsets.
+
+    After a dropped connection the request is retried from the last byte
+    written (when resumable), or from the beginning otherwise. If the server
+    answers a resume with the full body, a whole-file download starts over;
+    a segment download fails with RangeNotSupported.
+
+    Returns:
+        Offset just past the last byte written
+    """
+    position = start
+    for attempt in range(retries + 1):
+        headers = {}
+        if resumable and (position > 0 or end is not None):
+            headers["Range"] = f"bytes={position}-{'' if end is None else end}"
+        elif not resumable:
+            position = start
+
+        try:
+            with client.stream("GET", url, headers=headers) as resp:
+                resp.raise_for_status()
+                if headers and resp.status_code != 206:
+                    if not whole_file:
+                        raise RangeNotSupported(f"Server ignored Range for {url[:80]}")
+                    position = 0  # Whole body sent; start over
+                f.seek(position)
+                # Written as received, so a drop loses nothing already downloaded
+                for chunk in resp.iter_bytes():
+                    f.write(chunk)
+                    position += len(chunk)
+
+            if end is not None and position <= end:
+                raise httpx.ReadError(f"Connection closed at byte {position} of {end + 1}")
+            return position
+        except httpx.TransportError as e:
+            if attempt == retries:
+                raise
+            delay = min(2 ** attempt, 10)
+            logger.warning(f"Download interrupted at byte {position} ({e}), resuming in {delay}s")
+            time.sleep(delay)
+    return position
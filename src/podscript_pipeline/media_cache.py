@@ -0,0 +1,210 @@
+"""
+Shared cache of downloaded media, so a popular episode is fetched once.
+
+Entries are keyed by yt-dlp extractor + video id (or the normalized URL for
+direct audio links) and live under ARTIFACTS_DIR/.cache/media. A cache hit
+is hard-linked into the task directory (reflinked or copied when hard links
+aren't possible), so it costs no extra disk space or bandwidth.
+
+Each entry is guarded by a file lock: concurrent requests for the same media,
+from any thread or uvicorn worker, wait for the one download in flight
+instead of starting their own. Eviction is LRU by last use, bounded by
+total size, and skips entries that are currently locked.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from filelock import FileLock, Timeout
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+MEDIA_CACHE_ENABLED = os.getenv("MEDIA_CACHE_ENABLED", "1") == "1"
+MEDIA_CACHE_MAX_GB = float(os.getenv("MEDIA_CACHE_MAX_GB", "10"))
+
+INFO_FILE = "info.json"
+TRACKING_PARAMS = ("utm_", "spm", "fbclid", "gclid", "share_source", "share_from")
+
+# Linux FICLONE ioctl (copy-on-write clone on btrfs/XFS)
+_FICLONE = 0x40049409
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for use as a cache key.
+
+    Lowercases scheme and host, drops default ports, fragments and common
+    tracking parameters, and sorts the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if parts.port and (parts.scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((parts.scheme.lower(), host, parts.path or "/", urlencode(query), ""))
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """Hard-link src to dst, falling back to a reflink and then a plain copy."""
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        import fcntl
+
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+        return
+    except (ImportError, OSError):
+        dst.unlink(missing_ok=True)
+    shutil.copy2(src, dst)
+
+
+class MediaCache:
+    """
+    On-disk, size-bounded cache of downloaded media files.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = int(MEDIA_CACHE_MAX_GB * 1024 ** 3)):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Evict least recently used entries above this total size
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._evict_lock = threading.Lock()
+
+    def fetch(
+        self,
+        key: str,
+        download: Callable[[Path], Tuple[Path, str]],
+        task_dir: Path,
+    ) -> Tuple[Path, str]:
+        """
+        Get media for key into task_dir, downloading it only if it isn't cached.
+
+        Args:
+            key: Cache key (e.g. "Youtube:dQw4w9WgXcQ" or "url:<normalized url>")
+            download: Called with an empty directory on a miss; must download
+                into it and return (audio_path, mime_type)
+            task_dir: Directory the cached files are linked into
+
+        Returns:
+            (audio_path in task_dir, mime_type)
+        """
+        entry = self._entry_dir(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        downloaded = False
+
+        with FileLock(str(entry) + ".lock"):
+            info = self._read_info(entry)
+            if info is None:
+                info = self._download(entry, key, download)
+                downloaded = True
+            else:
+                os.utime(entry / INFO_FILE)  # Mark as recently used
+                logger.info(f"Media cache hit: {key}")
+            audio_path = self._link_into(entry, task_dir, info["filename"])
+
+        if downloaded:
+            self.evict()
+        return audio_path, info["mime"]
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._evict_lock:
+            entries = []
+            for info_path in self.cache_dir.glob(f"*/*/{INFO_FILE}"):
+                entry = info_path.parent
+                try:
+                    last_used = info_path.stat().st_mtime
+                    size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+                except FileNotFoundError:
+                    continue
+                entries.append((last_used, size, entry))
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    # Never pull an entry out from under a download or link in progress
+                    with FileLock(str(entry) + ".lock", timeout=0):
+                        shutil.rmtree(entry, ignore_errors=True)
+                except Timeout:
+                    continue
+                total -= size
+                removed += 1
+            if removed:
+                logger.info(f"Media cache: evicted {removed} entries")
+            return removed
+
+    def _download(self, entry: Path, key: str, download: Callable[[Path], Tuple[Path, str]]) -> Dict[str, str]:
+        tmp_dir = entry.with_name(f"{entry.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        try:
+            audio_path, mime = download(tmp_dir)
+            shutil.rmtree(entry, ignore_errors=True)  # Leftover from an interrupted download
+            tmp_dir.rename(entry)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        # Written last: an entry without info.json is incomplete and gets re-downloaded
+        info = {"key": key, "filename": Path(audio_path).name, "mime": mime}
+        (entry / INFO_FILE).write_text(json.dumps(info, ensure_ascii=False), encoding="utf-8")
+        return info
+
+    def _link_into(self, entry: Path, task_dir: Path, filename: str) -> Path:
+        task_dir.mkdir(parents=True, exist_ok=True)
+        for f in entry.iterdir():
+            if f.is_file() and f.name != INFO_FILE:
+                link_or_copy(f, task_dir / f.name)
+        return task_dir / filename
+
+    def _read_info(self, entry: Path) -> Optional[Dict[str, str]]:
+        try:
+            info = json.loads((entry / INFO_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return info if (entry / info.get("filename", "")).is_file() else None
+
+    def _entry_dir(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / digest
+
+
+_caches: Dict[str, MediaCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_media_cache(artifacts_dir: str) -> Optional[MediaCache]:
+    """Get the media cache for an artifacts directory, or None if disabled."""
+    if not MEDIA_CACHE_ENABLED:
+        return None
+    with _caches_lock:
+        if artifacts_dir not in _caches:
+            _caches[artifacts_dir] = MediaCache(Path(artifacts_dir) / ".cache" / "media")
+        return _caches[artifacts_dir]
@@ -0,0 +1,55 @@
+"""
+Lightweight in-process request counters.
+
+Used by the cloud adapters (Tingwu API, object storage) to record request
+counts, errors and latencies per operation for the stats endpoints.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class LatencyStats:
+    """Thread-safe request counters and latencies per operation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ops: Dict[str, Dict[str, float]] = {}
+
+    def record(self, op: str, seconds: float, ok: bool = True) -> None:
+        """Record one request."""
+        with self._lock:
+            stats = self._ops.setdefault(op, {"count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0})
+            stats["count"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["total_s"] += seconds
+            stats["max_s"] = max(stats["max_s"], seconds)
+
+    @contextmanager
+    def timed(self, op: str) -> Iterator[None]:
+        """Record the latency of the enclosed request under op."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(op, time.perf_counter() - start, ok=False)
+            raise
+        self.record(op, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Counts, errors and average/max latency (ms) per operation."""
+        with self._lock:
+            return {
+                op: {
+                    "count": int(s["count"]),
+                    "errors": int(s["errors"]),
+                    "avg_ms": round(s["total_s"] / s["count"] * 1000, 1) if s["count"] else 0.0,
+                    "max_ms": round(s["max_s"] * 1000, 1),
+                }
+                for op, s in self._ops.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._ops.clear()
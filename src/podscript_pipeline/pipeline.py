@@ -1,11 +1,15 @@
+import hashlib
 import logging
+import os
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 
-from podscript_pipeline.download import download_source
-from podscript_pipeline.preprocess import preprocess
-from podscript_pipeline.asr import transcribe, get_available_providers, ASR_PROVIDER_WHISPER
+from podscript_pipeline.download import audio_mime_type, download_source, resolve_stream_source
+from podscript_pipeline.preprocess import preprocess, trim_offset, TARGET_PCM, TARGET_UPLOAD
+from podscript_pipeline.asr import transcribe, get_available_providers, ASR_PROVIDER_WHISPER, ASR_PROVIDER_TINGWU
 from podscript_pipeline.formatters import to_srt, to_markdown, persist_results
+from podscript_shared.config import load_config
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,156 @@ def run_download_only(task_id: str, source_url: str, artifacts_dir: str) -> Tupl
     return str(downloaded), mime
 
 
+def run_download_pipelined(
+    task_id: str,
+    source_url: str,
+    artifacts_dir: str,
+    keep_local: bool = True,
+    log_callback=None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Download audio straight into object storage for Tingwu (step 1, pipelined).
+
+    Bytes flow from the downloader into a streaming upload as they arrive
+    (on OSS, each multipart part is sent as soon as it fills), teed to a
+    local copy. The object is ready for submission after max(download,
+    upload) instead of download + upload.
+
+    The media cache is checked first: on a hit the cached file is uploaded
+    like any local file (skipped if its content key is already in the
+    bucket), and a miss streams into the cache entry. Streamed objects are
+    staged under the task's upload key and moved to the content-addressed
+    key once the digest is known.
+
+    Args:
+        task_id: Unique task identifier
+        source_url: URL to download from
+        artifacts_dir: Directory for the task (and the local copy)
+        keep_local: Keep the audio in the task directory
+        log_callback: Optional callback for progress logging
+
+    Returns:
+        dict with object_key, filename, audio_path (None unless keep_local),
+        mime_type and duration; or None if the source isn't a single HTTP
+        stream (the caller should use run_download_only instead)
+    """
+    from podscript_pipeline.media_cache import get_media_cache
+    from podscript_pipeline.storage import store_audio
+
+    def log(msg: str):
+        logger.info(f"[{task_id}] {msg}")
+        if log_callback:
+            log_callback(msg)
+
+    source = resolve_stream_source(task_id, source_url, artifacts_dir)
+    if source is None:
+        return None
+    media_url, headers, filename, duration, cache_key = source
+
+    cfg = load_config()
+    task_dir = Path(artifacts_dir) / task_id
+    task_dir.mkdir(parents=True, exist_ok=True)
+    mime = audio_mime_type(Path(filename))
+    cache = get_media_cache(artifacts_dir) if cache_key else None
+    streamed: Dict[str, str] = {}
+
+    def download(target_dir: Path) -> Tuple[Path, str]:
+        local_path = target_dir / filename
+        streamed["object_key"] = _stream_to_storage(cfg, task_id, media_url, headers, filename, local_path, log)
+        return local_path, mime
+
+    if cache:
+        audio_path, mime = cache.fetch(cache_key, download, task_dir)
+        object_key = streamed.get("object_key")
+        if object_key is None:
+            log(f"Media cache hit for {cache_key}, uploading cached file")
+            object_key = store_audio(cfg, audio_path)
+        filename = audio_path.name
+        if not keep_local:
+            audio_path.unlink(missing_ok=True)
+    else:
+        audio_path = task_dir / filename
+        object_key = _stream_to_storage(cfg, task_id, media_url, headers, filename, audio_path if keep_local else None, log)
+
+    return {
+        "object_key": object_key,
+        "filename": filename,
+        "audio_path": str(audio_path) if keep_local else None,
+        "mime_type": mime,
+        "duration": duration,
+    }
+
+
+def _stream_to_storage(
+    cfg,
+    task_id: str,
+    media_url: str,
+    headers: Dict[str, str],
+    filename: str,
+    local_path: Optional[Path],
+    log,
+) -> str:
+    """
+    Stream media_url into storage (and local_path, if given), returning the object key.
+
+    The upload is staged under the task's upload key while the SHA-256 is
+    computed on the fly; afterwards it is moved to the content key, or
+    dropped if that object already exists. The upload key is kept when
+    STORAGE_CONTENT_KEYS=0 or the move fails.
+    """
+    from podscript_pipeline.http_download import stream_download
+    from podscript_pipeline.storage import STORAGE_CONTENT_KEYS, digest_object_key, get_backend, upload_object_key
+
+    backend = get_backend(cfg)
+    staging_key = upload_object_key(cfg, task_id, filename)
+    writer = backend.open_writer(staging_key, audio_mime_type(Path(filename)))
+    digest = hashlib.sha256()
+    part = local_path.with_name(local_path.name + ".part") if local_path else None
+
+    log(f"Streaming {media_url[:80]} -> {staging_key}")
+    try:
+        with open(part or os.devnull, "wb") as local:
+            def sink(chunk: bytes):
+                writer.write(chunk)
+                digest.update(chunk)
+                local.write(chunk)
+
+            _, size = stream_download(media_url, sink, headers=headers)
+        writer.commit()
+    except BaseException:
+        writer.abort()
+        if part:
+            part.unlink(missing_ok=True)
+        raise
+    if part:
+        part.replace(local_path)
+    log(f"Streamed {size} bytes to storage")
+
+    if not STORAGE_CONTENT_KEYS:
+        return staging_key
+    object_key = digest_object_key(cfg, digest.hexdigest(), Path(filename).suffix)
+    try:
+        if backend.exists(object_key):
+            backend.delete(staging_key)
+        else:
+            backend.move(staging_key, object_key)
+    except Exception as e:
+        # The upload itself succeeded; submit it under the staging key
+        logger.warning(f"[{task_id}] Moving {staging_key} to {object_key} failed, keeping it: {e}")
+        return staging_key
+    return object_key
+
+
+def _shift_segment(segment: Dict[str, Any], offset: float) -> Dict[str, Any]:
+    return {**segment, "start": segment.get("start", 0) + offset, "end": segment.get("end", 0) + offset}
+
+
+def _shift_transcript(transcript: Dict[str, Any], offset: float) -> None:
+    """Shift segment timestamps by offset seconds (undoing a leading-silence trim)."""
+    if offset:
+        transcript["segments"] = [_shift_segment(seg, offset) for seg in transcript.get("segments", [])]
+
+
 def run_transcribe_only(
     task_id: str,
     audio_path: str,
@@ -33,6 +187,7 @@ def run_transcribe_only(
     language: str = None,
     prompt: str = None,
     log_callback=None,
+    segment_callback=None,
 ) -> Dict[str, Any]:
     """
     Transcribe audio file only (step 2).
@@ -49,9 +204,11 @@ def run_transcribe_only(
             - Whisper: initial_prompt for vocabulary/style (max ~900 chars)
             - Tingwu: custom prompt for LLM post-processing
         log_callback: Optional callback for progress logging
+        segment_callback: Optional callback receiving each segment as soon as
+            it is decoded (for streaming display)
 
     Returns:
-        result dict with srt_path, md_path, meta
+        result dict with srt_path, md_path, segments, meta
     """
     def log(msg: str):
         logger.info(f"[{task_id}] {msg}")
@@ -63,10 +220,20 @@ def run_transcribe_only(
     task_dir.mkdir(parents=True, exist_ok=True)
     input_path = Path(audio_path)
 
+    # Whisper reads 16 kHz PCM directly; cloud ASR gets a compact Opus upload
+    target = TARGET_UPLOAD if provider == ASR_PROVIDER_TINGWU else TARGET_PCM
     log("Preprocessing audio...")
-    processed, _ = preprocess(task_id, input_path, mime_type)
+    processed, _ = preprocess(task_id, input_path, mime_type, target=target)
     log(f"Preprocessed: {processed}")
 
+    # Shift timestamps back if leading silence was trimmed
+    offset = trim_offset(processed)
+    if offset and segment_callback:
+        on_segment = segment_callback
+
+        def segment_callback(seg: Dict[str, Any]) -> None:
+            on_segment(_shift_segment(seg, offset))
+
     log(f"Starting ASR transcription with {provider}...")
     transcript = transcribe(
         task_id=task_id,
@@ -76,7 +243,9 @@ def run_transcribe_only(
         language=language,
         prompt=prompt,
         log_callback=log_callback,
+        segment_callback=segment_callback,
     )
+    _shift_transcript(transcript, offset)
     log(f"ASR complete, segments={len(transcript.get('segments', []))}")
 
     log("Formatting results...")
@@ -85,7 +254,136 @@ def run_transcribe_only(
     srt_path, md_path = persist_results(task_dir, srt_text, md_text)
     log(f"Results saved: srt={srt_path}, md={md_path}")
 
-    return {"srt_path": str(srt_path), "md_path": str(md_path), "meta": {"segments": len(transcript.get("segments", []))}}
+    segments = transcript.get("segments", [])
+    return {
+        "srt_path": str(srt_path),
+        "md_path": str(md_path),
+        "segments": segments,
+        "meta": {"segments": len(segments)},
+    }
+
+
+def start_transcribe_tingwu(
+    task_id: str,
+    audio_path: str,
+    artifacts_dir: str,
+    mime_type: str = "audio/mpeg",
+    prompt: str = None,
+    log_callback=None,
+) -> Future:
+    """
+    Transcribe a local audio file with Tingwu without holding the caller (step 2).
+
+    Preprocessing, upload and submission happen before this returns; the
+    shared poller then tracks the job and results are written from its
+    done-callback.
+
+    Args:
+        task_id: Unique task identifier
+        audio_path: Path to the audio file
+        artifacts_dir: Directory to store results
+        mime_type: MIME type of the audio
+        prompt: Custom prompt for Tingwu LLM post-processing
+        log_callback: Optional callback for progress logging
+
+    Returns:
+        Future resolving to the result dict (srt_path, md_path, segments, meta)
+    """
+    from podscript_pipeline.asr import start_tingwu_transcription
+    from podscript_pipeline.tingwu_poller import then
+
+    def log(msg: str):
+        logger.info(f"[{task_id}] {msg}")
+        if log_callback:
+            log_callback(msg)
+
+    task_dir = Path(artifacts_dir) / task_id
+    task_dir.mkdir(parents=True, exist_ok=True)
+
+    log("Preprocessing audio...")
+    processed, _ = preprocess(task_id, Path(audio_path), mime_type, target=TARGET_UPLOAD)
+    log(f"Preprocessed: {processed}")
+    offset = trim_offset(processed)
+
+    def _finish(transcript: Dict[str, Any]) -> Dict[str, Any]:
+        _shift_transcript(transcript, offset)
+        return _persist_transcript(task_dir, transcript, log)
+
+    log("Starting ASR transcription with tingwu...")
+    return then(start_tingwu_transcription(task_id, processed, prompt=prompt, log_callback=log_callback), _finish)
+
+
+def start_transcribe_remote(
+    task_id: str,
+    audio_url: str,
+    artifacts_dir: str,
+    prompt: str = None,
+    duration_s: Optional[float] = None,
+    log_callback=None,
+) -> Future:
+    """
+    Transcribe audio that is already in object storage with Tingwu (step 2).
+
+    Used for browser-direct uploads: the object is submitted as-is, with no
+    local preprocessing or re-upload. Only submission happens before this
+    returns; the shared poller tracks the job and results are written from
+    its done-callback.
+
+    Args:
+        task_id: Unique task identifier
+        audio_url: Signed URL of the uploaded object
+        artifacts_dir: Directory to store results
+        prompt: Custom prompt for Tingwu LLM post-processing
+        duration_s: Audio duration, used to pace polling
+        log_callback: Optional callback for progress logging
+
+    Returns:
+        Future resolving to the result dict (srt_path, md_path, segments, meta)
+    """
+    from podscript_pipeline.tingwu_adapter import submit_transcribe_job
+    from podscript_pipeline.tingwu_poller import get_poller, then
+
+    def log(msg: str):
+        logger.info(f"[{task_id}] {msg}")
+        if log_callback:
+            log_callback(msg)
+
+    task_dir = Path(artifacts_dir) / task_id
+    task_dir.mkdir(parents=True, exist_ok=True)
+    cfg = load_config()
+
+    log("Submitting transcribe job to Tingwu...")
+    job_id = submit_transcribe_job(cfg, audio_url, custom_prompt=prompt)
+    log(f"Job submitted: {job_id}")
+    future = get_poller().watch(cfg, job_id, duration_s=duration_s)
+    return then(future, lambda transcript: _persist_transcript(task_dir, transcript, log))
+
+
+def run_transcribe_remote(
+    task_id: str,
+    audio_url: str,
+    artifacts_dir: str,
+    prompt: str = None,
+    duration_s: Optional[float] = None,
+    log_callback=None,
+) -> Dict[str, Any]:
+    """Like start_transcribe_remote, but waits for the result."""
+    return start_transcribe_remote(task_id, audio_url, artifacts_dir, prompt, duration_s, log_callback).result()
+
+
+def _persist_transcript(task_dir: Path, transcript: Dict[str, Any], log) -> Dict[str, Any]:
+    """Write result.srt / result.md for a transcript and build the result dict."""
+    log(f"ASR complete, segments={len(transcript.get('segments', []))}")
+    srt_path, md_path = persist_results(task_dir, to_srt(transcript), to_markdown(transcript))
+    log(f"Results saved: srt={srt_path}, md={md_path}")
+
+    segments = transcript.get("segments", [])
+    return {
+        "srt_path": str(srt_path),
+        "md_path": str(md_path),
+        "segments": segments,
+        "meta": {"segments": len(segments)},
+    }
 
 
 def run_pipeline(task_id: str, source_url: str, artifacts_dir: str) -> Dict[str, Any]:
@@ -96,6 +394,7 @@ def run_pipeline(task_id: str, source_url: str, artifacts_dir: str) -> Dict[str,
     downloaded, mime = download_source(task_id, source_url, artifacts_dir)
     processed, _ = preprocess(task_id, downloaded, mime)
     transcript = transcribe(task_id, processed)
+    _shift_transcript(transcript, trim_offset(processed))
 
     srt_text = to_srt(transcript)
     md_text = to_markdown(transcript)
@@ -111,6 +410,7 @@ def run_pipeline_from_file(task_id: str, local_path: str, artifacts_dir: str, co
     input_path = Path(local_path)
     processed, _ = preprocess(task_id, input_path, content_type)
     transcript = transcribe(task_id, processed)
+    _shift_transcript(transcript, trim_offset(processed))
     srt_text = to_srt(transcript)
     md_text = to_markdown(transcript)
     srt_path, md_path = persist_results(task_dir, srt_text, md_text)
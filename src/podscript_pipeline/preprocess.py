@@ -1,14 +1,213 @@
+"""
+Audio preprocessing: decode once into the format the ASR stage needs.
+
+- pcm: 16 kHz mono s16le PCM for Whisper, which then reads samples directly
+  instead of running ffmpeg itself (and chunked mode skips its own decode)
+- upload: 16 kHz mono low-bitrate Opus for cloud ASR, so Tingwu uploads are
+  a fraction of the original MP3/M4A size
+
+Both apply EBU R128 loudness normalization and can optionally trim leading
+and trailing silence. Results are cached in a "preprocessed" directory next
+to the task artifacts, keyed on the source file's size/mtime and the options
+used; a sidecar JSON records those plus the trim offset.
+"""
+import json
+import logging
+import os
+import shutil
+import subprocess
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
+
+from podscript_pipeline.audio import BYTES_PER_SAMPLE, SAMPLE_RATE, decode_to_pcm, pcm_duration
+
+logger = logging.getLogger(__name__)
+
+# Preprocessing configuration
+PREPROCESS_ENABLED = os.getenv("PREPROCESS_ENABLED", "1") == "1"
+PREPROCESS_LOUDNORM = os.getenv("PREPROCESS_LOUDNORM", "1") == "1"
+PREPROCESS_TRIM_SILENCE = os.getenv("PREPROCESS_TRIM_SILENCE", "0") == "1"
+PREPROCESS_UPLOAD_BITRATE = os.getenv("PREPROCESS_UPLOAD_BITRATE", "32k")
 
+TARGET_PCM = "pcm"
+TARGET_UPLOAD = "upload"
 
-def preprocess(task_id: str, input_path: Path, mime: str) -> Tuple[Path, str]:
+MEDIA_SUFFIXES = {".mp4", ".mp3", ".wav", ".m4a", ".aac", ".flac"}
+PREPROCESSED_DIR = "preprocessed"
+LOUDNORM_FILTER = "loudnorm=I=-16:TP=-1.5:LRA=11"
+TRIM_PADDING_S = 0.3  # Silence kept around speech when trimming
+
+
+def preprocess(task_id: str, input_path: Path, mime: str, target: str = TARGET_PCM) -> Tuple[Path, str]:
+    """
+    Prepare a downloaded/uploaded file for ASR.
+
+    Args:
+        task_id: Task identifier for logging
+        input_path: Source media file
+        mime: Source MIME type
+        target: TARGET_PCM (Whisper) or TARGET_UPLOAD (cloud ASR)
+
+    Returns:
+        (processed_path, mime). Falls back to the original file if
+        preprocessing is disabled or ffmpeg fails.
+    """
     suffix = input_path.suffix.lower()
-    is_media = suffix in {".mp4", ".mp3", ".wav", ".m4a", ".aac", ".flac"} or (
+    is_media = suffix in MEDIA_SUFFIXES or (
         mime.startswith("audio/") or mime.startswith("video/")
     )
-    if is_media and input_path.exists():
+    if not (is_media and input_path.exists()):
+        processed = input_path.parent / "processed.txt"
+        processed.write_text(f"processed_from={input_path.name}\n")
+        return processed, mime
+
+    if not PREPROCESS_ENABLED:
         return input_path, mime
-    processed = input_path.parent / "processed.txt"
-    processed.write_text(f"processed_from={input_path.name}\n")
-    return processed, mime
\ No newline at end of file
+
+    options = {
+        "target": target,
+        "loudnorm": PREPROCESS_LOUDNORM,
+        "trim": PREPROCESS_TRIM_SILENCE,
+        "bitrate": PREPROCESS_UPLOAD_BITRATE if target == TARGET_UPLOAD else None,
+    }
+    out_dir = input_path.parent / PREPROCESSED_DIR
+    if target == TARGET_UPLOAD:
+        output_path, output_mime = out_dir / f"{input_path.stem}.opus", "audio/ogg"
+    else:
+        output_path, output_mime = out_dir / f"{input_path.stem}.16k.pcm", "audio/pcm"
+
+    source_stat = input_path.stat()
+    info = {"source": input_path.name, "size": source_stat.st_size, "mtime": source_stat.st_mtime, "options": options}
+    cached = _read_info(output_path)
+    if output_path.exists() and cached and all(cached.get(k) == v for k, v in info.items()):
+        logger.info(f"[{task_id}] Using cached preprocessed audio: {output_path.name}")
+        return output_path, output_mime
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        if target == TARGET_UPLOAD:
+            offset = _encode_upload(input_path, output_path, out_dir)
+        else:
+            offset = _decode_pcm(input_path, output_path)
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"[{task_id}] Preprocessing failed, using original file: {e}")
+        output_path.unlink(missing_ok=True)
+        return input_path, mime
+
+    info["offset"] = offset
+    _info_path(output_path).write_text(json.dumps(info), encoding="utf-8")
+    logger.info(
+        f"[{task_id}] Preprocessed {input_path.name} -> {output_path.name} "
+        f"({source_stat.st_size} -> {output_path.stat().st_size} bytes)"
+    )
+    return output_path, output_mime
+
+
+def trim_offset(processed_path: Path) -> float:
+    """
+    Seconds of leading silence removed from a preprocessed file.
+
+    ASR timestamps must be shifted by this amount to line up with the
+    original media. Returns 0.0 for files that weren't trimmed.
+    """
+    info = _read_info(Path(processed_path))
+    return float(info.get("offset", 0.0)) if info else 0.0
+
+
+def _decode_pcm(input_path: Path, output_path: Path) -> float:
+    """Decode (and normalize/trim) to PCM. Returns the leading trim offset."""
+    raw_path = output_path.with_name(output_path.name + ".tmp")
+    try:
+        if PREPROCESS_LOUDNORM:
+            _run_ffmpeg([
+                "-i", str(input_path), "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+                "-af", LOUDNORM_FILTER, "-f", "s16le", "-acodec", "pcm_s16le", str(raw_path),
+            ])
+        else:
+            decode_to_pcm(input_path, raw_path)
+
+        offset = 0.0
+        if PREPROCESS_TRIM_SILENCE:
+            offset, end = _speech_bounds(raw_path)
+            _copy_pcm_range(raw_path, output_path, offset, end)
+            raw_path.unlink()
+        else:
+            raw_path.replace(output_path)
+        return offset
+    finally:
+        raw_path.unlink(missing_ok=True)
+
+
+def _encode_upload(input_path: Path, output_path: Path, work_dir: Path) -> float:
+    """Encode compact mono Opus for upload. Returns the leading trim offset."""
+    seek = []
+    offset = 0.0
+    if PREPROCESS_TRIM_SILENCE:
+        # Silence detection needs samples of the untrimmed source
+        pcm_path = work_dir / f"{input_path.stem}.vad.pcm"
+        try:
+            decode_to_pcm(input_path, pcm_path)
+            offset, end = _speech_bounds(pcm_path)
+        finally:
+            pcm_path.unlink(missing_ok=True)
+        seek = ["-ss", f"{offset:.3f}", "-t", f"{end - offset:.3f}"]
+
+    filters = ["-af", LOUDNORM_FILTER] if PREPROCESS_LOUDNORM else []
+    _run_ffmpeg([
+        *seek, "-i", str(input_path), "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        *filters, "-c:a", "libopus", "-b:a", PREPROCESS_UPLOAD_BITRATE,
+        "-application", "voip", "-f", "ogg", str(output_path),
+    ])
+    return offset
+
+
+def _speech_bounds(pcm_path: Path) -> Tuple[float, float]:
+    """Find (start, end) of the non-silent part of a PCM file, with padding."""
+    from podscript_pipeline import vad
+
+    duration = pcm_duration(pcm_path)
+    silences = vad.detect_silences(pcm_path)
+    start, end = 0.0, duration
+    if silences and silences[0][0] == 0.0:
+        start = max(0.0, silences[0][1] - TRIM_PADDING_S)
+    if silences and silences[-1][1] >= duration - vad.FRAME_MS / 1000:
+        end = min(duration, silences[-1][0] + TRIM_PADDING_S)
+    if end <= start:
+        return 0.0, duration
+    return start, end
+
+
+def _copy_pcm_range(src: Path, dst: Path, start: float, end: float, block_size: int = 1 << 20) -> None:
+    """Copy the [start, end) seconds of a PCM file to dst without loading it all."""
+    first = int(start * SAMPLE_RATE) * BYTES_PER_SAMPLE
+    remaining = int(end * SAMPLE_RATE) * BYTES_PER_SAMPLE - first
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        fin.seek(first)
+        while remaining > 0:
+            data = fin.read(min(block_size, remaining))
+            if not data:
+                break
+            fout.write(data)
+            remaining -= len(data)
+
+
+def _run_ffmpeg(args: list) -> None:
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg not found")
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-y", "-loglevel", "error", *args],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+
+
+def _info_path(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".json")
+
+
+def _read_info(output_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(_info_path(output_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
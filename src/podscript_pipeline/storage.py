@@ -1,10 +1,33 @@
 """
 Unified storage interface for cloud object storage.
-Supports Alibaba Cloud OSS and Tencent Cloud COS.
+Supports Alibaba Cloud OSS, Tencent Cloud COS, and a local-disk stand-in.
+
+Each provider is a StorageBackend with upload/exists/sign/delete operations
+and per-operation timing. Backends are long-lived and pooled per
+configuration (get_backend), so the OSS bucket / COS client and their
+keep-alive connections are reused across uploads.
+
+Objects are keyed by a SHA-256 of their content, so identical audio is
+uploaded once (later requests only re-sign the URL) and different files that
+share a name, like every yt-dlp "audio.mp3", never overwrite each other.
+
+open_writer accepts an object incrementally (e.g. straight from a
+download); on OSS each part is uploaded as soon as it fills.
 """
 import logging
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
 
+from podscript_pipeline.metrics import LatencyStats
 from podscript_shared.models import AppConfig
 
 logger = logging.getLogger(__name__)
@@ -12,6 +35,550 @@ logger = logging.getLogger(__name__)
 # Storage provider constants
 STORAGE_PROVIDER_OSS = "oss"  # Alibaba Cloud OSS
 STORAGE_PROVIDER_COS = "cos"  # Tencent Cloud COS
+STORAGE_PROVIDER_LOCAL = "local"  # Local disk, served under /artifacts/.storage
+
+# Key uploads by content hash (0 = legacy filename keys, always re-uploaded)
+STORAGE_CONTENT_KEYS = os.getenv("STORAGE_CONTENT_KEYS", "1") == "1"
+
+# OSS upload configuration
+OSS_MULTIPART_THRESHOLD_MB = int(os.getenv("OSS_MULTIPART_THRESHOLD_MB", "32"))
+OSS_PART_SIZE_MB = int(os.getenv("OSS_PART_SIZE_MB", "8"))
+OSS_UPLOAD_THREADS = int(os.getenv("OSS_UPLOAD_THREADS", "4"))
+OSS_COPY_OBJECT_LIMIT = 1024 * 1024 * 1024  # CopyObject rejects larger sources
+OSS_COPY_PART_SIZE = 256 * 1024 * 1024  # Part size for multipart copies above the limit
+
+LOCAL_STORAGE_DIR = ".storage"
+LOCAL_DEFAULT_HOST = "http://127.0.0.1:8001"
+
+
+def content_object_key(cfg: AppConfig, local_file: Path) -> str:
+    """
+    Content-addressed object key: <prefix>/<sha256><ext>.
+
+    Args:
+        cfg: Application config (for the storage prefix)
+        local_file: Path to the local audio file
+
+    Returns:
+        Object key, e.g. "tingwu-audio/3f2a...9c.opus"
+    """
+    from podscript_pipeline.transcript_cache import hash_file
+
+    return digest_object_key(cfg, hash_file(local_file), local_file.suffix)
+
+
+def digest_object_key(cfg: AppConfig, sha256: str, suffix: str) -> str:
+    """Content-addressed object key from an already computed SHA-256 hex digest."""
+    prefix = (cfg.storage_prefix or "tingwu-audio").strip().strip("/")
+    return f"{prefix}/{sha256}{suffix.lower()}"
+
+
+def _sanitize_filename(name: str) -> str:
+    """Make a filename safe for object keys (preserving Chinese and other Unicode characters)."""
+    sanitized = re.sub(r"\s+", "_", name)
+    # Only remove characters that are problematic for object keys: / \ : * ? " < > | and control chars
+    return re.sub(r'[/\\:*?"<>|\x00-\x1f]', "-", sanitized)
+
+
+def filename_object_key(cfg: AppConfig, local_file: Path) -> str:
+    """Legacy object key: <prefix>/<sanitized filename>."""
+    prefix = (cfg.storage_prefix or "tingwu-audio").strip().strip("/")
+    return f"{prefix}/{_sanitize_filename(local_file.name)}"
+
+
+def upload_object_key(cfg: AppConfig, task_id: str, filename: str) -> str:
+    """Object key for a browser-direct upload: <prefix>/uploads/<task_id>/<sanitized filename>."""
+    prefix = (cfg.storage_prefix or "tingwu-audio").strip().strip("/")
+    return f"{prefix}/uploads/{task_id}/{_sanitize_filename(Path(filename).name)}"
+
+
+class StorageBackend(ABC):
+    """
+    Object storage backend. Public operations are timed per operation.
+    """
+
+    name = ""
+    sign_expires_s = 3600
+
+    def __init__(self, cfg: AppConfig):
+        self.cfg = cfg
+        self.stats = LatencyStats()
+
+    def upload(self, local_file: Path, key: str, skip_existing: bool = True) -> str:
+        """
+        Upload a file and return a signed GET URL for it.
+
+        Args:
+            local_file: Path to the local file
+            key: Object key
+            skip_existing: Skip the upload if the object already exists
+                (only safe for content-addressed keys)
+
+        Returns:
+            Signed URL for the object
+        """
+        local_file = Path(local_file)
+        logger.info(f"{self.name}: object_key={key}")
+        if skip_existing and self.exists(key):
+            logger.info(f"{self.name}: Object already exists, skipping upload")
+            return self.sign(key)
+
+        content_type = mimetypes.guess_type(local_file.name)[0] or "application/octet-stream"
+        logger.info(f"{self.name}: Uploading {local_file.name} ({local_file.stat().st_size} bytes, {content_type})...")
+        with self.stats.timed("upload"):
+            self._put(local_file, key, content_type)
+        return self.sign(key)
+
+    def exists(self, key: str) -> bool:
+        """Check whether an object exists (HEAD)."""
+        with self.stats.timed("exists"):
+            return self._exists(key)
+
+    def sign(self, key: str, expires_s: Optional[int] = None) -> str:
+        """Signed GET URL for an object."""
+        with self.stats.timed("sign"):
+            url = self._sign(key, expires_s or self.sign_expires_s)
+        logger.info(f"{self.name}: Generated signed URL (length={len(url)})")
+        return url
+
+    def sign_put(self, key: str, content_type: str, expires_s: Optional[int] = None) -> str:
+        """
+        Presigned PUT URL, so a client can upload an object without the bytes
+        passing through this server. The upload must send the same Content-Type.
+
+        Raises:
+            NotImplementedError: If the backend can't accept direct uploads
+        """
+        with self.stats.timed("sign_put"):
+            return self._sign_put(key, content_type, expires_s or self.sign_expires_s)
+
+    def delete(self, key: str) -> None:
+        """Delete an object (no error if it doesn't exist)."""
+        with self.stats.timed("delete"):
+            self._delete(key)
+
+    def move(self, src_key: str, dst_key: str) -> None:
+        """Rename an object within the bucket (server-side copy, then delete)."""
+        with self.stats.timed("move"):
+            self._copy(src_key, dst_key)
+            self._delete(src_key)
+
+    def open_writer(self, key: str, content_type: str) -> "ObjectWriter":
+        """
+        Start an incremental upload: write() bytes as they arrive, then
+        commit() (or abort()). The default spools to a temporary file and
+        uploads it on commit.
+        """
+        return SpooledWriter(self, key, content_type)
+
+    def _sign_put(self, key: str, content_type: str, expires_s: int) -> str:
+        raise NotImplementedError(f"Storage backend '{self.name}' doesn't support direct uploads")
+
+    def _copy(self, src_key: str, dst_key: str) -> None:
+        raise NotImplementedError(f"Storage backend '{self.name}' doesn't support server-side copies")
+
+    @abstractmethod
+    def _put(self, local_file: Path, key: str, content_type: str) -> None: ...
+
+    @abstractmethod
+    def _exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def _sign(self, key: str, expires_s: int) -> str: ...
+
+    @abstractmethod
+    def _delete(self, key: str) -> None: ...
+
+
+class ObjectWriter(ABC):
+    """Incremental upload of one object (see StorageBackend.open_writer)."""
+
+    def __init__(self, backend: StorageBackend, key: str, content_type: str):
+        self.backend = backend
+        self.key = key
+        self.content_type = content_type
+        self.size = 0
+        self._started = time.perf_counter()
+
+    @abstractmethod
+    def write(self, data: bytes) -> None:
+        """Append bytes to the object."""
+
+    @abstractmethod
+    def commit(self) -> str:
+        """
+        Finish the upload.
+
+        Returns:
+            Signed GET URL for the object
+        """
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Discard the upload."""
+
+    def _committed(self) -> str:
+        self.backend.stats.record("stream_upload", time.perf_counter() - self._started)
+        logger.info(f"{self.backend.name}: Streamed {self.size} bytes to {self.key}")
+        return self.backend.sign(self.key)
+
+
+class SpooledWriter(ObjectWriter):
+    """Spools the bytes to a temporary file and uploads it normally on commit()."""
+
+    def __init__(self, backend: StorageBackend, key: str, content_type: str):
+        super().__init__(backend, key, content_type)
+        self._spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=Path(key).suffix, delete=False)
+
+    def write(self, data: bytes) -> None:
+        self._spool.write(data)
+        self.size += len(data)
+
+    def commit(self) -> str:
+        spool = Path(self._spool.name)
+        try:
+            self._spool.close()
+            self.backend._put(spool, self.key, self.content_type)
+        finally:
+            spool.unlink(missing_ok=True)
+        return self._committed()
+
+    def abort(self) -> None:
+        self._spool.close()
+        Path(self._spool.name).unlink(missing_ok=True)
+
+
+class OSSMultipartWriter(ObjectWriter):
+    """
+    Streams an object to OSS as a multipart upload.
+
+    Each OSS_PART_SIZE_MB part is uploaded on its own thread as soon as it
+    fills, while more bytes keep arriving. At most two parts per upload
+    thread are held in memory; beyond that write() blocks, so a slow upload
+    throttles the producer instead of buffering the whole file.
+    """
+
+    def __init__(self, backend: "OSSBackend", key: str, content_type: str):
+        from podscript_pipeline.tingwu_adapter import _with_retry
+
+        super().__init__(backend, key, content_type)
+        self._bucket = backend.bucket
+        self._part_size = int(OSS_PART_SIZE_MB * 1024 * 1024)
+        self._buffer = bytearray()
+        self._parts = []
+        self._slots = threading.BoundedSemaphore(OSS_UPLOAD_THREADS * 2)
+        self._executor = ThreadPoolExecutor(max_workers=OSS_UPLOAD_THREADS, thread_name_prefix="oss-part")
+        self.upload_id = _with_retry(
+            lambda: self._bucket.init_multipart_upload(key, headers={"Content-Type": content_type}).upload_id,
+            "OSSBackend.init_multipart_upload",
+        )
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        self.size += len(data)
+        while len(self._buffer) >= self._part_size:
+            self._send(bytes(self._buffer[:self._part_size]))
+            del self._buffer[:self._part_size]
+
+    def _send(self, data: bytes) -> None:
+        # Fail fast instead of streaming the rest of the file into a broken upload
+        for future in self._parts:
+            if future.done() and future.exception():
+                raise future.exception()
+        self._slots.acquire()
+        self._parts.append(self._executor.submit(self._upload_part, len(self._parts) + 1, data))
+
+    def _upload_part(self, number: int, data: bytes):
+        import oss2
+        from podscript_pipeline.tingwu_adapter import _with_retry
+
+        try:
+            result = _with_retry(
+                lambda: self._bucket.upload_part(self.key, self.upload_id, number, data),
+                f"OSSBackend.upload_part({number})",
+            )
+            return oss2.models.PartInfo(number, result.etag, size=len(data))
+        finally:
+            self._slots.release()
+
+    def commit(self) -> str:
+        from podscript_pipeline.tingwu_adapter import _with_retry
+
+        if self._buffer or not self._parts:
+            self._send(bytes(self._buffer))
+            self._buffer.clear()
+        try:
+            parts = [future.result() for future in self._parts]
+            _with_retry(
+                lambda: self._bucket.complete_multipart_upload(self.key, self.upload_id, parts),
+                "OSSBackend.complete_multipart_upload",
+            )
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._executor.shutdown(wait=False)
+        return self._committed()
+
+    def abort(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        try:
+            self._bucket.abort_multipart_upload(self.key, self.upload_id)
+        except Exception as e:
+            logger.warning(f"OSSBackend: abort_multipart_upload failed for {self.key}: {e}")
+
+
+class OSSBackend(StorageBackend):
+    """Alibaba Cloud OSS. One long-lived Bucket (and HTTP session) per config."""
+
+    name = "oss"
+    sign_expires_s = 3600
+
+    def __init__(self, cfg: AppConfig):
+        import oss2
+
+        super().__init__(cfg)
+        ak = (cfg.access_key_id or "").strip()
+        sk = (cfg.access_key_secret or "").strip()
+        st = (cfg.security_token or "").strip()
+        auth = oss2.StsAuth(ak, sk, st) if st else oss2.Auth(ak, sk)
+
+        endpoint = cfg.storage_endpoint or f"https://oss-{cfg.storage_region}.aliyuncs.com"
+        logger.info(f"OSSBackend: endpoint={endpoint}, bucket={cfg.storage_bucket}")
+        self.bucket = oss2.Bucket(auth, endpoint, cfg.storage_bucket, connect_timeout=60, session=oss2.Session())
+
+        # Multipart checkpoints, so a retried upload resumes from the parts already sent
+        self.checkpoint_dir = Path(cfg.artifacts_dir) / ".cache" / "oss-upload"
+
+    def _put(self, local_file: Path, key: str, content_type: str) -> None:
+        import oss2
+        from podscript_pipeline.tingwu_adapter import _with_retry
+
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+        # Files above the threshold go up as parallel multipart uploads
+        def _upload():
+            return oss2.resumable_upload(
+                self.bucket, key, str(local_file),
+                store=oss2.ResumableStore(root=str(self.checkpoint_dir)),
+                headers={"Content-Type": content_type},
+                multipart_threshold=OSS_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+                part_size=OSS_PART_SIZE_MB * 1024 * 1024,
+                num_threads=OSS_UPLOAD_THREADS,
+            )
+
+        result = _with_retry(_upload, "OSSBackend.upload")
+        logger.info(f"OSSBackend: Upload response status={result.status}")
+        if result.status != 200:
+            raise RuntimeError(f"OSS upload failed with status: {result.status}")
+
+    def _exists(self, key: str) -> bool:
+        return self.bucket.object_exists(key)
+
+    def _sign(self, key: str, expires_s: int) -> str:
+        return self.bucket.sign_url("GET", key, expires_s)
+
+    def _sign_put(self, key: str, content_type: str, expires_s: int) -> str:
+        return self.bucket.sign_url("PUT", key, expires_s, headers={"Content-Type": content_type})
+
+    def open_writer(self, key: str, content_type: str) -> ObjectWriter:
+        return OSSMultipartWriter(self, key, content_type)
+
+    def _copy(self, src_key: str, dst_key: str) -> None:
+        size = self.bucket.head_object(src_key).content_length
+        if size <= OSS_COPY_OBJECT_LIMIT:
+            self.bucket.copy_object(self.bucket.bucket_name, src_key, dst_key)
+            return
+
+        # Larger objects are copied server-side part by part
+        import oss2
+
+        upload_id = self.bucket.init_multipart_upload(dst_key).upload_id
+        try:
+            parts = []
+            for number, start in enumerate(range(0, size, OSS_COPY_PART_SIZE), start=1):
+                end = min(start + OSS_COPY_PART_SIZE, size) - 1
+                result = self.bucket.upload_part_copy(
+                    self.bucket.bucket_name, src_key, (start, end), dst_key, upload_id, number
+                )
+                parts.append(oss2.models.PartInfo(number, result.etag))
+            self.bucket.complete_multipart_upload(dst_key, upload_id, parts)
+        except Exception:
+            self.bucket.abort_multipart_upload(dst_key, upload_id)
+            raise
+
+    def _delete(self, key: str) -> None:
+        self.bucket.delete_object(key)
+
+
+class COSBackend(StorageBackend):
+    """Tencent Cloud COS. One long-lived CosS3Client (and HTTP session) per config."""
+
+    name = "cos"
+    sign_expires_s = 10800  # Tingwu requires at least 3 hours validity for async processing
+
+    def __init__(self, cfg: AppConfig):
+        from qcloud_cos import CosConfig, CosS3Client
+
+        super().__init__(cfg)
+        secret_id = (cfg.tencent_secret_id or "").strip()
+        secret_key = (cfg.tencent_secret_key or "").strip()
+        region = (cfg.storage_region or "ap-shanghai").strip()
+        self.region = region
+        self.bucket = (cfg.storage_bucket or "").strip()
+
+        if not secret_id or not secret_key:
+            raise ValueError("Tencent Cloud credentials not configured (TENCENT_SECRET_ID, TENCENT_SECRET_KEY)")
+        if not self.bucket:
+            raise ValueError("Storage bucket not configured (STORAGE_BUCKET)")
+
+        logger.info(f"COSBackend: region={region}, bucket={self.bucket}")
+        self.client = CosS3Client(CosConfig(
+            Region=region,
+            SecretId=secret_id,
+            SecretKey=secret_key,
+            Token=None,
+            Scheme='https',
+        ))
+
+    def _put(self, local_file: Path, key: str, content_type: str) -> None:
+        response = self.client.upload_file(
+            Bucket=self.bucket,
+            Key=key,
+            LocalFilePath=str(local_file),
+            EnableMD5=False,
+            ContentType=content_type,
+        )
+        logger.info(f"COSBackend: Upload response ETag={response.get('ETag', 'N/A')}")
+
+    def _exists(self, key: str) -> bool:
+        return self.client.object_exists(Bucket=self.bucket, Key=key)
+
+    def _sign(self, key: str, expires_s: int) -> str:
+        return self.client.get_presigned_url(Method='GET', Bucket=self.bucket, Key=key, Expired=expires_s)
+
+    def _sign_put(self, key: str, content_type: str, expires_s: int) -> str:
+        return self.client.get_presigned_url(
+            Method='PUT', Bucket=self.bucket, Key=key, Expired=expires_s,
+            Headers={"Content-Type": content_type},
+        )
+
+    def _copy(self, src_key: str, dst_key: str) -> None:
+        # copy() switches to a multipart copy for objects CopyObject can't take (> 5 GB)
+        self.client.copy(
+            Bucket=self.bucket, Key=dst_key,
+            CopySource={"Bucket": self.bucket, "Key": src_key, "Region": self.region},
+        )
+
+    def _delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+
+class LocalBackend(StorageBackend):
+    """
+    Local-disk stand-in for offline runs and benchmarks.
+
+    Objects live under ARTIFACTS_DIR/.storage/<bucket> and are served by the
+    API's /artifacts mount; URLs use STORAGE_PUBLIC_HOST (default the local
+    API). The expiry parameter is informational: URLs are not verified.
+    """
+
+    name = "local"
+
+    def __init__(self, cfg: AppConfig):
+        super().__init__(cfg)
+        self.bucket = cfg.storage_bucket or "local"
+        self.root = Path(cfg.artifacts_dir) / LOCAL_STORAGE_DIR / self.bucket
+        self.base_url = (cfg.storage_public_host or LOCAL_DEFAULT_HOST).rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    def _put(self, local_file: Path, key: str, content_type: str) -> None:
+        from podscript_pipeline.media_cache import link_or_copy
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        link_or_copy(local_file, tmp)
+        tmp.replace(path)
+
+    def _exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def _sign(self, key: str, expires_s: int) -> str:
+        expires = int(time.time()) + expires_s
+        return f"{self.base_url}/artifacts/{LOCAL_STORAGE_DIR}/{quote(self.bucket)}/{quote(key)}?expires={expires}"
+
+    def _copy(self, src_key: str, dst_key: str) -> None:
+        self._put(self._path(src_key), dst_key, "")
+
+    def _delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+
+_BACKENDS = {
+    STORAGE_PROVIDER_OSS: OSSBackend,
+    STORAGE_PROVIDER_COS: COSBackend,
+    STORAGE_PROVIDER_LOCAL: LocalBackend,
+}
+
+_backends: Dict[Tuple[str, str], StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def _provider(cfg: AppConfig) -> str:
+    return (cfg.storage_provider or STORAGE_PROVIDER_OSS).lower().strip()
+
+
+def get_backend(cfg: AppConfig, provider: Optional[str] = None) -> StorageBackend:
+    """
+    Get the pooled storage backend for a configuration.
+
+    Backends are created once per provider + storage settings + credentials
+    and reused, so their clients and connections survive between uploads.
+
+    Args:
+        cfg: Application config with cloud credentials
+        provider: Override cfg.storage_provider
+
+    Raises:
+        ValueError: If the storage provider is unknown or misconfigured
+    """
+    provider = (provider or _provider(cfg)).lower().strip()
+    if provider not in _BACKENDS:
+        raise ValueError(
+            f"Unknown storage provider: '{provider}'. "
+            f"Supported: '{STORAGE_PROVIDER_OSS}' (Alibaba), '{STORAGE_PROVIDER_COS}' (Tencent), "
+            f"'{STORAGE_PROVIDER_LOCAL}' (local disk)"
+        )
+    settings = cfg.model_dump_json(include={
+        "access_key_id", "access_key_secret", "security_token", "tencent_secret_id", "tencent_secret_key",
+        "storage_bucket", "storage_region", "storage_endpoint", "storage_public_host", "artifacts_dir",
+    })
+    with _backends_lock:
+        backend = _backends.get((provider, settings))
+        if backend is None:
+            backend = _backends[(provider, settings)] = _BACKENDS[provider](cfg)
+        return backend
+
+
+def storage_stats() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Per-operation timing for each pooled backend, keyed by "<provider>:<bucket>"."""
+    with _backends_lock:
+        backends = list(_backends.values())
+    return {f"{b.name}:{b.cfg.storage_bucket or ''}": b.stats.snapshot() for b in backends}
+
+
+def is_storage_configured(cfg: AppConfig) -> bool:
+    """Whether the configured provider has what it needs to upload."""
+    provider = _provider(cfg) if cfg.storage_provider else None
+    if provider == STORAGE_PROVIDER_LOCAL:
+        return True
+    return bool(provider in (STORAGE_PROVIDER_OSS, STORAGE_PROVIDER_COS) and cfg.storage_bucket and cfg.storage_region)
 
 
 def upload_audio(cfg: AppConfig, local_file: Path) -> str:
@@ -21,6 +588,10 @@ def upload_audio(cfg: AppConfig, local_file: Path) -> str:
     Automatically selects storage provider based on STORAGE_PROVIDER config:
     - 'oss': Alibaba Cloud OSS (default)
     - 'cos': Tencent Cloud COS
+    - 'local': local disk (offline runs and benchmarks)
+
+    The object is keyed by content hash; if it is already in the bucket the
+    upload is skipped and only a new signed URL is generated.
 
     Args:
         cfg: Application config with cloud credentials
@@ -32,27 +603,39 @@ def upload_audio(cfg: AppConfig, local_file: Path) -> str:
     Raises:
         ValueError: If storage provider is not configured or invalid
     """
-    provider = (cfg.storage_provider or STORAGE_PROVIDER_OSS).lower().strip()
-    logger.info(f"upload_audio: Using storage provider '{provider}'")
+    local_file = Path(local_file)
+    backend = get_backend(cfg)
+    logger.info(f"upload_audio: Using storage provider '{backend.name}'")
 
-    if provider == STORAGE_PROVIDER_COS:
-        from podscript_pipeline.cos_adapter import upload_to_cos
-        return upload_to_cos(cfg, local_file)
-    elif provider == STORAGE_PROVIDER_OSS:
-        from podscript_pipeline.tingwu_adapter import upload_to_oss
-        return upload_to_oss(cfg, local_file)
+    if STORAGE_CONTENT_KEYS:
+        return backend.upload(local_file, content_object_key(cfg, local_file))
+    return backend.upload(local_file, filename_object_key(cfg, local_file), skip_existing=False)
+
+
+def store_audio(cfg: AppConfig, local_file: Path) -> str:
+    """
+    Upload an audio file like upload_audio, but return its object key.
+
+    Returns:
+        Object key (content-addressed unless STORAGE_CONTENT_KEYS=0)
+    """
+    local_file = Path(local_file)
+    backend = get_backend(cfg)
+    if STORAGE_CONTENT_KEYS:
+        key = content_object_key(cfg, local_file)
+        backend.upload(local_file, key)
     else:
-        raise ValueError(
-            f"Unknown storage provider: '{provider}'. "
-            f"Supported: '{STORAGE_PROVIDER_OSS}' (Alibaba), '{STORAGE_PROVIDER_COS}' (Tencent)"
-        )
+        key = filename_object_key(cfg, local_file)
+        backend.upload(local_file, key, skip_existing=False)
+    return key
 
 
 def get_storage_provider_name(cfg: AppConfig) -> str:
     """Get human-readable name of the configured storage provider."""
-    provider = (cfg.storage_provider or STORAGE_PROVIDER_OSS).lower().strip()
+    provider = _provider(cfg)
     names = {
         STORAGE_PROVIDER_OSS: "阿里云 OSS",
         STORAGE_PROVIDER_COS: "腾讯云 COS",
+        STORAGE_PROVIDER_LOCAL: "本地存储",
     }
     return names.get(provider, provider)
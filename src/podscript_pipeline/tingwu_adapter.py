@@ -2,17 +2,22 @@
 Alibaba Cloud Tingwu (通义听悟) adapter for audio transcription.
 API Version: 2023-09-30
 Docs: https://help.aliyun.com/zh/tingwu/voice-transcription
+
+API clients are long-lived: one AcsClient per credentials + region (its
+requests session keeps HTTPS connections alive between calls) and one
+shared httpx client for result-URL fetches, so polls don't pay a fresh TLS
+handshake. Request latencies are recorded per operation (request_stats()).
 """
 import logging
 import os
 import json
+import threading
 import time
 import datetime
-import mimetypes
-import re
 from pathlib import Path
-from typing import Dict, Any, Callable, TypeVar
+from typing import Dict, Any, Callable, Optional, Tuple, TypeVar
 
+from podscript_pipeline.metrics import LatencyStats
 from podscript_shared.models import AppConfig
 
 logger = logging.getLogger(__name__)
@@ -31,8 +36,24 @@ NON_RETRYABLE_ERROR_CODES = {
     "SignatureDoesNotMatch",  # Invalid signature
 }
 
+# Client configuration
+TINGWU_REGION = os.getenv("TINGWU_REGION", "cn-beijing")
+TINGWU_POOL_SIZE = int(os.getenv("TINGWU_POOL_SIZE", "10"))  # Keep-alive connections per client
+
 T = TypeVar('T')
 
+_stats = LatencyStats()
+
+
+def _timed(op: str):
+    """Record the latency of the enclosed request under op."""
+    return _stats.timed(op)
+
+
+def request_stats() -> Dict[str, Dict[str, float]]:
+    """Latency counters for Tingwu API and result-fetch requests."""
+    return _stats.snapshot()
+
 
 def _is_retryable_error(error: Exception) -> bool:
     """Check if an error is retryable (transient network/server error)."""
@@ -98,57 +119,30 @@ def _with_retry(
     raise last_exception  # Should not reach here
 
 
-def upload_to_oss(cfg: AppConfig, local_file: Path) -> str:
-    """Upload local audio file to Alibaba Cloud OSS and return signed URL."""
-    import oss2
-
-    logger.info(f"upload_to_oss: Starting upload for {local_file}")
-    logger.debug(f"upload_to_oss: file_size={local_file.stat().st_size} bytes")
-
-    ak = (cfg.access_key_id or "").strip()
-    sk = (cfg.access_key_secret or "").strip()
-    st = (cfg.security_token or "").strip()
-
-    if st:
-        logger.debug("upload_to_oss: Using STS authentication")
-        auth = oss2.StsAuth(ak, sk, st)
-    else:
-        logger.debug("upload_to_oss: Using AK/SK authentication")
-        auth = oss2.Auth(ak, sk)
-
-    endpoint = cfg.storage_endpoint or f"https://oss-{cfg.storage_region}.aliyuncs.com"
-    logger.info(f"upload_to_oss: endpoint={endpoint}, bucket={cfg.storage_bucket}")
-    bucket = oss2.Bucket(auth, endpoint, cfg.storage_bucket, connect_timeout=60)
-
-    # Sanitize filename for OSS (preserve Chinese and other Unicode characters)
-    sanitized = re.sub(r"\s+", "_", local_file.name)
-    # Only remove characters that are problematic for object keys: / \ : * ? " < > | and control chars
-    sanitized = re.sub(r'[/\\:*?"<>|\x00-\x1f]', "-", sanitized)
+def upload_to_oss(cfg: AppConfig, local_file: Path, object_key: Optional[str] = None) -> str:
+    """
+    Upload local audio file to Alibaba Cloud OSS and return signed URL.
 
-    # Build object key with optional prefix
-    prefix = (cfg.storage_prefix or "tingwu-audio").strip().strip("/")
-    object_key = f"{prefix}/{sanitized}"
-    logger.info(f"upload_to_oss: object_key={object_key}")
+    Thin wrapper around the pooled OSS storage backend (see storage.py).
 
-    content_type = mimetypes.guess_type(sanitized)[0] or "application/octet-stream"
-    headers = {"Content-Type": content_type}
-    logger.debug(f"upload_to_oss: content_type={content_type}")
+    Args:
+        cfg: Application config with Alibaba Cloud credentials
+        local_file: Path to the local audio file
+        object_key: Content-addressed key (see storage.content_object_key).
+            If the object already exists the upload is skipped. Defaults to
+            a key derived from the filename, which is always uploaded.
 
-    with open(local_file, "rb") as f:
-        logger.info("upload_to_oss: Uploading file to OSS...")
-        result = bucket.put_object(object_key, f, headers=headers)
-        logger.info(f"upload_to_oss: Upload response status={result.status}")
-        if result.status != 200:
-            logger.error(f"upload_to_oss: Upload failed with status {result.status}")
-            raise RuntimeError(f"OSS upload failed with status: {result.status}")
+    Returns:
+        Signed URL valid for 1 hour
+    """
+    from podscript_pipeline.storage import STORAGE_PROVIDER_OSS, filename_object_key, get_backend
 
-    # Return signed URL valid for 1 hour
-    url = bucket.sign_url("GET", object_key, 3600)
-    logger.info(f"upload_to_oss: Generated signed URL (length={len(url)})")
-    return url
+    backend = get_backend(cfg, STORAGE_PROVIDER_OSS)
+    key = object_key or filename_object_key(cfg, local_file)
+    return backend.upload(local_file, key, skip_existing=object_key is not None)
 
 
-def _create_tingwu_client(cfg: AppConfig):
+def _create_tingwu_client(cfg: AppConfig, region: str = TINGWU_REGION):
     """Create Alibaba Cloud AcsClient for Tingwu API."""
     from aliyunsdkcore.client import AcsClient
     from aliyunsdkcore.auth.credentials import AccessKeyCredential
@@ -158,11 +152,41 @@ def _create_tingwu_client(cfg: AppConfig):
         cfg.access_key_id,
         cfg.access_key_secret
     )
-    client = AcsClient(region_id='cn-beijing', credential=credentials)
+    client = AcsClient(region_id=region, credential=credentials, pool_size=TINGWU_POOL_SIZE)
     logger.debug("_create_tingwu_client: AcsClient created successfully")
     return client
 
 
+_clients: Dict[Tuple[str, str, str], Any] = {}
+_clients_lock = threading.Lock()
+_http_client = None
+
+
+def get_tingwu_client(cfg: AppConfig, region: str = TINGWU_REGION):
+    """
+    Get the pooled AcsClient for cfg's credentials and region.
+
+    Clients are created once and reused, so their keep-alive connections
+    to the Tingwu endpoint survive between submits and polls.
+    """
+    key = (cfg.access_key_id or "", cfg.access_key_secret or "", region)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = _create_tingwu_client(cfg, region)
+        return _clients[key]
+
+
+def _get_http_client():
+    """Shared httpx client for fetching result URLs (connections kept alive)."""
+    global _http_client
+    import httpx
+
+    with _clients_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(timeout=30, limits=httpx.Limits(max_keepalive_connections=TINGWU_POOL_SIZE))
+        return _http_client
+
+
 def _create_common_request(method: str, uri: str):
     """Create CommonRequest for Tingwu API."""
     from aliyunsdkcore.request import CommonRequest
@@ -170,7 +194,7 @@ def _create_common_request(method: str, uri: str):
     logger.debug(f"_create_common_request: method={method}, uri={uri}")
     request = CommonRequest()
     request.set_accept_format('json')
-    request.set_domain('tingwu.cn-beijing.aliyuncs.com')
+    request.set_domain(f'tingwu.{TINGWU_REGION}.aliyuncs.com')
     request.set_version('2023-09-30')
     request.set_protocol_type('https')
     request.set_method(method)
@@ -198,7 +222,7 @@ def submit_transcribe_job(
         Task ID for polling status
     """
     logger.info(f"submit_transcribe_job: Starting, audio_url length={len(audio_url)}")
-    client = _create_tingwu_client(cfg)
+    client = get_tingwu_client(cfg)
 
     # Build request body
     task_key = 'task' + datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')
@@ -242,7 +266,8 @@ def submit_transcribe_job(
         request.set_content(json.dumps(body).encode('utf-8'))
 
         logger.info("submit_transcribe_job: Sending CreateTask request to Tingwu API...")
-        response = client.do_action_with_exception(request)
+        with _timed("create_task"):
+            response = client.do_action_with_exception(request)
         result = json.loads(response)
         logger.info(f"submit_transcribe_job: Response Code={result.get('Code')}, Message={result.get('Message')}")
 
@@ -257,86 +282,75 @@ def submit_transcribe_job(
     return _with_retry(_submit_request, "submit_transcribe_job")
 
 
-def poll_transcribe_result(cfg: AppConfig, task_id: str, timeout_s: int = 600) -> Dict[str, Any]:
+def get_task_status(client, task_id: str, poll_count: int = 1) -> Dict[str, Any]:
     """
-    Poll Tingwu task until completion and return transcription result.
+    Fetch a Tingwu task's current state (GetTask), with retry.
 
     Args:
-        cfg: Application config with Alibaba Cloud credentials
+        client: AcsClient from get_tingwu_client
         task_id: Task ID from submit_transcribe_job
-        timeout_s: Maximum seconds to wait (default 10 minutes)
+        poll_count: Poll number, for logging
 
     Returns:
-        Dict with transcription results including sentences and timing
+        The response's Data dict (TaskStatus, Result, ErrorMessage, ...)
     """
-    import httpx
-
-    logger.info(f"poll_transcribe_result: Starting to poll task_id={task_id}, timeout={timeout_s}s")
-    client = _create_tingwu_client(cfg)
-    start = time.time()
-    poll_count = 0
-
     def _poll_once() -> Dict[str, Any]:
-        """Single poll request with retry."""
         request = _create_common_request('GET', f'/openapi/tingwu/v2/tasks/{task_id}')
-        response = client.do_action_with_exception(request)
+        with _timed("get_task"):
+            response = client.do_action_with_exception(request)
         result = json.loads(response)
 
         if result.get('Code') != '0' and result.get('Code') != 0:
-            logger.error(f"poll_transcribe_result: GetTask failed: {result}")
+            logger.error(f"get_task_status: GetTask failed: {result}")
             raise RuntimeError(f"Tingwu GetTask failed: {result.get('Message', result)}")
 
-        return result
+        return result['Data']
+
+    return _with_retry(
+        _poll_once,
+        f"get_task_status (poll #{poll_count})",
+        max_retries=2  # Fewer retries for individual polls
+    )
+
 
-    def _fetch_transcription(url: str) -> Dict[str, Any]:
-        """Fetch transcription JSON with retry."""
-        logger.info("poll_transcribe_result: Fetching transcription JSON from URL...")
-        resp = httpx.get(url, timeout=30)
-        resp.raise_for_status()
+def fetch_transcription(url: str) -> Dict[str, Any]:
+    """Download a completed task's transcription JSON and parse it."""
+    def _fetch() -> Dict[str, Any]:
+        logger.info("fetch_transcription: Fetching transcription JSON from URL...")
+        with _timed("fetch_result"):
+            resp = _get_http_client().get(url)
+            resp.raise_for_status()
         return resp.json()
 
-    while time.time() - start < timeout_s:
-        poll_count += 1
-        elapsed = int(time.time() - start)
-        logger.info(f"poll_transcribe_result: Poll #{poll_count}, elapsed={elapsed}s")
-
-        # Poll with retry
-        result = _with_retry(
-            _poll_once,
-            f"poll_transcribe_result (poll #{poll_count})",
-            max_retries=2  # Fewer retries for individual polls
-        )
-
-        task_status = result['Data'].get('TaskStatus', '')
-        logger.info(f"poll_transcribe_result: TaskStatus={task_status}")
-
-        if task_status == 'COMPLETED':
-            logger.info("poll_transcribe_result: Task completed successfully")
-            # Get transcription result URL and fetch content
-            transcription_url = result['Data'].get('Result', {}).get('Transcription')
-            logger.info(f"poll_transcribe_result: Transcription URL exists={bool(transcription_url)}")
-            if transcription_url:
-                # Fetch the actual transcription JSON with retry
-                transcription_data = _with_retry(
-                    lambda: _fetch_transcription(transcription_url),
-                    "fetch_transcription_json"
-                )
-                logger.info(f"poll_transcribe_result: Transcription data fetched, keys={list(transcription_data.keys())}")
-                return _parse_transcription(transcription_data)
-            logger.warning("poll_transcribe_result: No transcription URL in result, returning empty")
-            return {'text': '', 'segments': [], 'language': 'zh'}
-
-        elif task_status == 'FAILED':
-            error_msg = result['Data'].get('ErrorMessage', 'Task failed')
-            logger.error(f"poll_transcribe_result: Task failed with error: {error_msg}")
-            raise RuntimeError(f"Tingwu transcription failed: {error_msg}")
-
-        # Still processing, wait and retry
-        logger.debug(f"poll_transcribe_result: Task still processing, waiting 5s...")
-        time.sleep(5)
-
-    logger.error(f"poll_transcribe_result: Timeout after {timeout_s}s, poll_count={poll_count}")
-    raise TimeoutError(f"Tingwu task {task_id} timed out after {timeout_s}s")
+    transcription_data = _with_retry(_fetch, "fetch_transcription_json")
+    logger.info(f"fetch_transcription: Transcription data fetched, keys={list(transcription_data.keys())}")
+    return _parse_transcription(transcription_data)
+
+
+def poll_transcribe_result(
+    cfg: AppConfig,
+    task_id: str,
+    timeout_s: Optional[float] = None,
+    duration_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Wait for a Tingwu task to complete and return the transcription result.
+
+    The job is tracked by the shared TingwuPoller (see tingwu_poller.py);
+    callers that shouldn't block can use get_poller().watch() directly.
+
+    Args:
+        cfg: Application config with Alibaba Cloud credentials
+        task_id: Task ID from submit_transcribe_job
+        timeout_s: Maximum seconds to wait (default scales with duration_s, at least 10 minutes)
+        duration_s: Audio duration in seconds, used to pace polling
+
+    Returns:
+        Dict with transcription results including sentences and timing
+    """
+    from podscript_pipeline.tingwu_poller import get_poller
+
+    return get_poller().watch(cfg, task_id, duration_s=duration_s, timeout_s=timeout_s).result()
 
 
 def _parse_transcription(data: Dict[str, Any]) -> Dict[str, Any]:
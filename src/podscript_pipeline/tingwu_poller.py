@@ -0,0 +1,194 @@
+"""
+Shared poller for in-flight Tingwu jobs.
+
+Instead of each job holding a worker thread in a sleep loop, every
+outstanding Tingwu TaskId is tracked by one asyncio event loop running on
+a single background thread. The blocking SDK calls (GetTask, fetching the
+result JSON) run on a small fixed executor over the adapter's pooled
+clients, so thread usage stays constant however many cloud jobs are pending.
+
+Poll intervals and the timeout scale with the audio duration: a short clip
+is checked every few seconds, a three-hour recording far less often, and it
+is given proportionally longer to finish than the old fixed 600 s.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from podscript_shared.models import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Poller configuration
+TINGWU_POLL_WORKERS = int(os.getenv("TINGWU_POLL_WORKERS", "4"))
+TINGWU_POLL_MIN_S = float(os.getenv("TINGWU_POLL_MIN_S", "5"))
+TINGWU_POLL_MAX_S = float(os.getenv("TINGWU_POLL_MAX_S", "60"))
+TINGWU_TIMEOUT_MIN_S = float(os.getenv("TINGWU_TIMEOUT_MIN_S", "600"))
+TINGWU_TIMEOUT_RATIO = float(os.getenv("TINGWU_TIMEOUT_RATIO", "1.0"))  # Seconds allowed per second of audio
+
+
+def poll_interval(duration_s: Optional[float], elapsed_s: float) -> float:
+    """
+    Seconds to wait before the next status check.
+
+    Starts at 1/120 of the audio duration and stretches the longer the job
+    has been waiting, bounded by TINGWU_POLL_MIN_S and TINGWU_POLL_MAX_S.
+    Unknown durations poll at the minimum interval.
+    """
+    base = (duration_s or 0) / 120
+    interval = base * (1 + elapsed_s / 600)
+    return min(max(interval, TINGWU_POLL_MIN_S), TINGWU_POLL_MAX_S)
+
+
+def poll_timeout(duration_s: Optional[float]) -> float:
+    """Seconds to wait for a job on audio of the given duration."""
+    return max(TINGWU_TIMEOUT_MIN_S, (duration_s or 0) * TINGWU_TIMEOUT_RATIO)
+
+
+class TingwuPoller:
+    """
+    Tracks outstanding Tingwu jobs on one background event loop.
+    """
+
+    def __init__(self, workers: int = TINGWU_POLL_WORKERS):
+        """
+        Initialize the poller (the loop thread starts on first use).
+
+        Args:
+            workers: Threads for the blocking Tingwu SDK/HTTP calls
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="tingwu-poll")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+
+    def watch(
+        self,
+        cfg: AppConfig,
+        job_id: str,
+        duration_s: Optional[float] = None,
+        timeout_s: Optional[float] = None,
+    ) -> Future:
+        """
+        Start tracking a submitted Tingwu job.
+
+        Args:
+            cfg: Application config with Alibaba Cloud credentials
+            job_id: Tingwu TaskId from submit_transcribe_job
+            duration_s: Audio duration, used to pace polling and set the timeout
+            timeout_s: Explicit timeout (defaults to poll_timeout(duration_s))
+
+        Returns:
+            Future resolving to the parsed transcription result. It fails with
+            RuntimeError if the job fails and TimeoutError if it runs too long.
+            Done-callbacks run on the poller's executor, never on the event loop.
+        """
+        future: Future = Future()
+        with self._lock:
+            self._pending[job_id] = future
+        loop = self._ensure_loop()
+        loop.call_soon_threadsafe(self._start, cfg, job_id, duration_s, timeout_s, future)
+        return future
+
+    def pending(self) -> int:
+        """Number of jobs currently being tracked."""
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="tingwu-poller", daemon=True).start()
+            return self._loop
+
+    def _start(self, cfg: AppConfig, job_id: str, duration_s, timeout_s, future: Future) -> None:
+        task = self._loop.create_task(self._poll(cfg, job_id, duration_s, timeout_s))
+        task.add_done_callback(lambda t: self._executor.submit(self._resolve, job_id, t, future))
+
+    def _resolve(self, job_id: str, task: "asyncio.Task", future: Future) -> None:
+        with self._lock:
+            self._pending.pop(job_id, None)
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    async def _call(self, fn: Callable[..., Any], *args) -> Any:
+        return await self._loop.run_in_executor(self._executor, fn, *args)
+
+    async def _poll(self, cfg: AppConfig, job_id: str, duration_s, timeout_s) -> Dict[str, Any]:
+        from podscript_pipeline import tingwu_adapter
+
+        timeout = timeout_s or poll_timeout(duration_s)
+        logger.info(f"TingwuPoller: watching task_id={job_id}, duration={duration_s}, timeout={timeout:.0f}s")
+        client = await self._call(tingwu_adapter.get_tingwu_client, cfg)
+        start = time.monotonic()
+        poll_count = 0
+
+        while True:
+            poll_count += 1
+            data = await self._call(tingwu_adapter.get_task_status, client, job_id, poll_count)
+            task_status = data.get("TaskStatus", "")
+            elapsed = time.monotonic() - start
+            logger.info(f"TingwuPoller: task_id={job_id} poll #{poll_count}, elapsed={elapsed:.0f}s, TaskStatus={task_status}")
+
+            if task_status == "COMPLETED":
+                transcription_url = (data.get("Result") or {}).get("Transcription")
+                if transcription_url:
+                    return await self._call(tingwu_adapter.fetch_transcription, transcription_url)
+                logger.warning(f"TingwuPoller: task_id={job_id} has no transcription URL, returning empty")
+                return {"text": "", "segments": [], "language": "zh"}
+
+            if task_status == "FAILED":
+                error_msg = data.get("ErrorMessage", "Task failed")
+                logger.error(f"TingwuPoller: task_id={job_id} failed: {error_msg}")
+                raise RuntimeError(f"Tingwu transcription failed: {error_msg}")
+
+            if elapsed >= timeout:
+                logger.error(f"TingwuPoller: task_id={job_id} timed out after {timeout:.0f}s, poll_count={poll_count}")
+                raise TimeoutError(f"Tingwu task {job_id} timed out after {timeout:.0f}s")
+
+            await asyncio.sleep(min(poll_interval(duration_s, elapsed), timeout - elapsed))
+
+
+def then(future: Future, fn: Callable[[Any], Any]) -> Future:
+    """
+    Chain fn onto a future without waiting for it.
+
+    Returns:
+        Future resolving to fn(future.result()), run in the done-callback.
+        It fails with the original exception, or whatever fn raises.
+    """
+    chained: Future = Future()
+
+    def _done(done: Future) -> None:
+        if done.cancelled():
+            chained.cancel()
+            return
+        try:
+            chained.set_result(fn(done.result()))
+        except Exception as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(_done)
+    return chained
+
+
+_poller: Optional[TingwuPoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_poller() -> TingwuPoller:
+    """Get the process-wide Tingwu poller."""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = TingwuPoller()
+        return _poller
@@ -0,0 +1,178 @@
+"""
+Content-addressed cache of ASR results.
+
+The same episode is often submitted more than once (same URL, same upload,
+different accounts). Results are keyed on a streaming SHA-256 of the audio
+bytes plus the settings that affect the output (provider, model, language,
+prompt), so a repeat skips Whisper or the paid Tingwu job entirely.
+
+Entries are JSON files under ARTIFACTS_DIR/.cache/transcripts, sharded by
+the first two hex digits of the key. Eviction is LRU by file mtime (touched
+on every hit), bounded by total size and entry count.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "1") == "1"
+TRANSCRIPT_CACHE_MAX_MB = int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "512"))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "5000"))
+
+HASH_CHUNK_SIZE = 1 << 20  # 1 MB
+
+
+# Recent hashes by (path, size, mtime), so the transcript cache and
+# content-addressed uploads don't each read the same file
+_hash_memo: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_hash_memo_lock = threading.Lock()
+HASH_MEMO_SIZE = 256
+
+
+def hash_file(path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """SHA-256 of a file, read in chunks so large media never sits in memory."""
+    st = os.stat(path)
+    memo_key = (str(Path(path).resolve()), st.st_size, st.st_mtime_ns)
+    with _hash_memo_lock:
+        if memo_key in _hash_memo:
+            _hash_memo.move_to_end(memo_key)
+            return _hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    with _hash_memo_lock:
+        _hash_memo[memo_key] = digest.hexdigest()
+        while len(_hash_memo) > HASH_MEMO_SIZE:
+            _hash_memo.popitem(last=False)
+    return digest.hexdigest()
+
+
+def cache_key(
+    audio_hash: str,
+    provider: str,
+    model_name: Optional[str] = None,
+    language: Optional[str] = None,
+    prompt: Optional[str] = None,
+) -> str:
+    """Combine the audio hash and ASR settings into a single cache key."""
+    settings = json.dumps(
+        [audio_hash, provider, model_name or "", language or "", prompt or ""],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(settings.encode("utf-8")).hexdigest()
+
+
+class TranscriptCache:
+    """
+    On-disk LRU cache of transcript result dicts.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024,
+        max_entries: int = TRANSCRIPT_CACHE_MAX_ENTRIES,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Evict least recently used entries above this total size
+            max_entries: Evict least recently used entries above this count
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)  # Mark as recently used
+            return result
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable transcript cache entry {key[:12]}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result (atomically), then evict if over the limits."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not cache transcript {key[:12]}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until within the size/count limits.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            count = len(entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes and count <= self.max_entries:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                count -= 1
+                removed += 1
+            if removed:
+                logger.info(f"Transcript cache: evicted {removed} entries")
+            return removed
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+
+_cache: Optional[TranscriptCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> Optional[TranscriptCache]:
+    """Get the process-wide transcript cache, or None if caching is disabled."""
+    global _cache
+    if not TRANSCRIPT_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            from podscript_shared.config import load_config
+
+            cache_dir = Path(load_config().artifacts_dir) / ".cache" / "transcripts"
+            _cache = TranscriptCache(cache_dir)
+        return _cache
@@ -0,0 +1,111 @@
+"""
+Lightweight energy-based voice activity detection.
+
+Only used to find good places to cut long recordings into chunks, so it
+doesn't need to be precise: it looks for stretches whose short-term energy
+stays near the recording's noise floor.
+"""
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Tuple
+
+from podscript_pipeline.audio import BYTES_PER_SAMPLE, SAMPLE_RATE
+
+FRAME_MS = 30  # Analysis frame length
+NOISE_MARGIN_DB = 10.0  # Frames within this much of the noise floor count as silence
+MAX_SILENCE_DB = -35.0  # Never treat anything louder than this as silence
+MIN_SILENCE_S = 0.4  # Shortest pause worth cutting at
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def frame_energies(pcm_path: Path, frame_ms: int = FRAME_MS, block_s: int = 60) -> "np.ndarray":
+    """
+    Compute per-frame RMS energy (dBFS) of a 16 kHz s16le PCM file.
+
+    The file is read in blocks so multi-hour recordings don't have to fit in
+    memory as float arrays.
+    """
+    import numpy as np  # Installed with openai-whisper
+
+    frame_len = SAMPLE_RATE * frame_ms // 1000
+    block_len = frame_len * (block_s * 1000 // frame_ms)
+    energies = []
+    with open(pcm_path, "rb") as f:
+        while True:
+            data = f.read(block_len * BYTES_PER_SAMPLE)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+            usable = len(samples) // frame_len * frame_len
+            if usable == 0:
+                break
+            frames = samples[:usable].reshape(-1, frame_len)
+            rms = np.sqrt(np.mean(frames * frames, axis=1))
+            energies.append(20 * np.log10(np.maximum(rms, 1e-6)))
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+
+def detect_silences(
+    pcm_path: Path,
+    frame_ms: int = FRAME_MS,
+    min_silence_s: float = MIN_SILENCE_S,
+) -> List[Tuple[float, float]]:
+    """
+    Find silent stretches in a PCM file.
+
+    Args:
+        pcm_path: 16 kHz mono s16le PCM file
+        frame_ms: Analysis frame length in milliseconds
+        min_silence_s: Minimum silence length to report
+
+    Returns:
+        List of (start, end) times in seconds, in order
+    """
+    import numpy as np  # Installed with openai-whisper
+
+    energies = frame_energies(pcm_path, frame_ms)
+    if energies.size == 0:
+        return []
+
+    threshold = min(float(np.percentile(energies, 10)) + NOISE_MARGIN_DB, MAX_SILENCE_DB)
+    silent = energies < threshold
+
+    # Find runs of silent frames via the edges of the boolean mask
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    frame_s = frame_ms / 1000
+    min_frames = max(1, int(min_silence_s / frame_s))
+    return [
+        (start * frame_s, end * frame_s)
+        for start, end in zip(starts, ends)
+        if end - start >= min_frames
+    ]
+
+
+def plan_chunks(
+    duration: float,
+    silences: List[Tuple[float, float]],
+    target_s: float,
+) -> List[Tuple[float, float]]:
+    """
+    Split [0, duration] into chunks of roughly target_s seconds, cutting in silences.
+
+    Each cut is placed in the middle of the longest silence within ±50% of the
+    target length; if there is none, the chunk is cut at exactly target_s.
+
+    Returns:
+        Contiguous list of (start, end) times in seconds
+    """
+    chunks = []
+    position = 0.0
+    while duration - position > target_s * 1.5:
+        low, high = position + target_s * 0.5, position + target_s * 1.5
+        candidates = [(e - s, (s + e) / 2) for s, e in silences if low <= (s + e) / 2 <= high]
+        cut = max(candidates)[1] if candidates else position + target_s
+        chunks.append((position, cut))
+        position = cut
+    chunks.append((position, duration))
+    return chunks
@@ -5,7 +5,6 @@ Docs: https://github.com/openai/whisper
 import logging
 import os
 import sys
-import io
 import re
 import threading
 from pathlib import Path
@@ -14,87 +13,155 @@ from typing import Dict, Any, Optional, Callable
 logger = logging.getLogger(__name__)
 
 
-class TqdmProgressCapture:
-    """Capture tqdm progress output and send to callback."""
+# Whisper's verbose output: "[00:12.340 --> 00:15.000] text" (hours are added past 1h)
+_SEGMENT_LINE = re.compile(r"^\[((?:\d+:)?\d+:\d+\.\d+) --> ((?:\d+:)?\d+:\d+\.\d+)\]\s?(.*)$")
 
-    def __init__(self, callback: Optional[Callable[[str], None]] = None, throttle_percent: int = 5):
-        self.callback = callback
-        self.throttle_percent = throttle_percent  # Only report every N percent
-        self.last_reported_percent = -1
-        self.buffer = ""
-        self._original_stderr = None
-        self._pipe_read = None
-        self._pipe_write = None
-        self._reader_thread = None
-        self._stop_event = threading.Event()
 
-    def __enter__(self):
-        if not self.callback:
-            return self
+def _parse_timestamp(value: str) -> float:
+    """Parse a Whisper timestamp ("mm:ss.fff" or "hh:mm:ss.fff") into seconds."""
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+class _StdoutRouter:
+    """
+    sys.stdout stand-in that sends each thread's output to that thread's
+    SegmentCapture, if it has one, and everything else to the real stream.
+
+    It is installed once and left in place, so captures running at the same
+    time on different threads can't restore each other's streams.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.captures: Dict[int, "SegmentCapture"] = {}
+
+    def write(self, text: str) -> int:
+        capture = self.captures.get(threading.get_ident())
+        if capture is None:
+            return self.stream.write(text)
+        return capture.write(text)
 
-        # Create a pipe to capture stderr
-        self._pipe_read, self._pipe_write = os.pipe()
-        self._original_stderr = os.dup(sys.stderr.fileno())
+    def flush(self):
+        self.stream.flush()
 
-        # Redirect stderr to our pipe
-        os.dup2(self._pipe_write, sys.stderr.fileno())
+    def __getattr__(self, name):
+        # isatty(), encoding, fileno() etc. come from the real stream
+        return getattr(self.stream, name)
 
-        # Start a thread to read from the pipe
-        self._stop_event.clear()
-        self._reader_thread = threading.Thread(target=self._read_progress, daemon=True)
-        self._reader_thread.start()
 
+_router: Optional[_StdoutRouter] = None
+_router_lock = threading.Lock()
+
+
+def _install_router() -> _StdoutRouter:
+    """Install the stdout router (again, if sys.stdout was replaced since)."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = _StdoutRouter(sys.stdout)
+        if sys.stdout is not _router:
+            _router.stream = sys.stdout
+            sys.stdout = _router
+        return _router
+
+
+class SegmentCapture:
+    """
+    Capture the segments Whisper prints in verbose mode as each window is decoded.
+
+    model.transcribe() has no per-segment hook, but with verbose=True it prints
+    every segment to stdout as soon as its 30-second window finishes. While
+    active, this receives the stdout output of the thread that entered it
+    (through a stdout router shared by all captures), parses those lines and
+    hands each segment to segment_callback. Output from other threads is
+    passed through untouched.
+
+    Since verbose mode disables Whisper's tqdm bar, progress is derived from
+    the end time of the latest segment instead. When transcribing a window of a
+    longer recording, `offset` shifts timestamps to the recording's timeline.
+    """
+
+    def __init__(
+        self,
+        segment_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        log_callback: Optional[Callable[[str], None]] = None,
+        duration: float = 0.0,
+        offset: float = 0.0,
+        throttle_percent: int = 5,
+    ):
+        self.segment_callback = segment_callback
+        self.log_callback = log_callback
+        self.duration = duration  # Total duration, for progress
+        self.offset = offset  # Added to timestamps (audio window start)
+        self.throttle_percent = throttle_percent  # Only report every N percent
+        self.last_reported_percent = 0
+        self.count = 0
+        self.buffer = ""
+        self._thread = threading.get_ident()
+        self._previous: Optional["SegmentCapture"] = None
+
+    def __enter__(self):
+        self._thread = threading.get_ident()
+        router = _install_router()
+        with _router_lock:
+            self._previous = router.captures.get(self._thread)
+            router.captures[self._thread] = self
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if not self.callback or self._original_stderr is None:
+        with _router_lock:
+            if self._previous is None:
+                _router.captures.pop(self._thread, None)
+            else:
+                _router.captures[self._thread] = self._previous
+        if self.buffer:
+            self._handle_line(self.buffer)
+            self.buffer = ""
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        while "\n" in self.buffer:
+            line, self.buffer = self.buffer.split("\n", 1)
+            self._handle_line(line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def _handle_line(self, line: str):
+        match = _SEGMENT_LINE.match(line.strip())
+        if not match:
+            return
+        start, end, text = match.groups()
+        segment = {
+            "start": _parse_timestamp(start) + self.offset,
+            "end": _parse_timestamp(end) + self.offset,
+            "text": text.strip(),
+            "speaker": "",
+        }
+        self.count += 1
+        if self.segment_callback:
+            self.segment_callback(segment)
+        self._report_progress(segment["end"])
+
+    def _report_progress(self, position: float):
+        if not self.log_callback or self.duration <= 0:
             return
+        percent = min(100, int(position / self.duration * 100))
+        if percent - self.last_reported_percent >= self.throttle_percent:
+            self.last_reported_percent = percent
+            # Format: "转写进度: 10% (01:23/13:45)"
+            self.log_callback(
+                f"转写进度: {percent}% ({_format_clock(min(position, self.duration))}/{_format_clock(self.duration)})"
+            )
+
 
-        # Restore stderr
-        os.dup2(self._original_stderr, sys.stderr.fileno())
-        os.close(self._original_stderr)
-
-        # Stop the reader thread
-        self._stop_event.set()
-        os.close(self._pipe_write)
-
-        if self._reader_thread:
-            self._reader_thread.join(timeout=1.0)
-
-        os.close(self._pipe_read)
-
-    def _read_progress(self):
-        """Read progress from pipe and parse tqdm output."""
-        try:
-            while not self._stop_event.is_set():
-                # Read available data
-                data = os.read(self._pipe_read, 4096)
-                if not data:
-                    break
-
-                text = data.decode('utf-8', errors='ignore')
-                self._parse_progress(text)
-        except OSError:
-            pass  # Pipe closed
-
-    def _parse_progress(self, text: str):
-        """Parse tqdm progress bar output."""
-        # tqdm format: "10%|██        | 51300/521970 [00:17<02:46, 2825.41frames/s]"
-        # Match percentage and frame info
-        pattern = r'(\d+)%\|[^|]*\|\s*(\d+)/(\d+)\s*\[([^\]]+)\]'
-        matches = re.findall(pattern, text)
-
-        for match in matches:
-            percent, current, total, time_info = match
-            percent_int = int(percent)
-
-            # Throttle: only report if percent changed by threshold or at 100%
-            if percent_int - self.last_reported_percent >= self.throttle_percent or percent_int == 100:
-                self.last_reported_percent = percent_int
-                # Format: "转写进度: 10% (51300/521970) [00:17<02:46]"
-                progress_msg = f"转写进度: {percent}% ({current}/{total}) [{time_info}]"
-                if self.callback:
-                    self.callback(progress_msg)
+def _format_clock(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{secs:02d}"
 
 # Available Whisper models with their properties
 WHISPER_MODELS = {
@@ -113,6 +180,9 @@ WHISPER_MODELS = {
 # Default model to use
 DEFAULT_MODEL = "base"
 
+# Long PCM inputs are transcribed in windows of about this many seconds (bounds memory)
+WHISPER_WINDOW_SECONDS = float(os.getenv("WHISPER_WINDOW_SECONDS", "600"))
+
 # Cache for loaded models
 _model_cache: Dict[str, Any] = {}
 
@@ -185,6 +255,7 @@ def transcribe_audio(
     task: str = "transcribe",
     initial_prompt: Optional[str] = None,
     log_callback: Optional[Callable[[str], None]] = None,
+    segment_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> Dict[str, Any]:
     """
     Transcribe audio file using Whisper.
@@ -201,6 +272,8 @@ def transcribe_audio(
             - Style guidance: "这是一个播客访谈节目"
             Max ~224 tokens (~900 characters).
         log_callback: Optional callback for progress logging
+        segment_callback: Optional callback receiving each segment
+            ({start, end, text, speaker}) as soon as its window is decoded
 
     Returns:
         Dict with transcription results:
@@ -226,7 +299,7 @@ def transcribe_audio(
     # Transcribe with Whisper
     options = {
         "task": task,
-        "verbose": True,  # Enable verbose mode to get progress bar
+        "verbose": True,  # Print each segment as it is decoded (captured below)
     }
     if language:
         options["language"] = language
@@ -234,23 +307,21 @@ def transcribe_audio(
         options["initial_prompt"] = initial_prompt
         log(f"Using initial prompt: {initial_prompt[:50]}...")
 
-    # Capture progress from tqdm and send to callback
-    with TqdmProgressCapture(callback=log_callback):
-        result = model.transcribe(str(audio_path), **options)
+    if audio_path.suffix == ".pcm":
+        # Decoded by the preprocess stage: stream it through memory-mapped windows
+        result = _transcribe_pcm(model, audio_path, options, log_callback, segment_callback)
+    else:
+        audio = whisper.load_audio(str(audio_path))
+        duration = len(audio) / whisper.audio.SAMPLE_RATE
+        # Stream segments (and progress) out while the remaining windows decode
+        with SegmentCapture(segment_callback, log_callback, duration=duration):
+            result = model.transcribe(audio, **options)
+        result = {**result, "segments": _parse_segments(result)}
 
     detected_lang = result.get("language", language or "unknown")
     log(f"Detected language: {detected_lang}")
 
-    # Parse segments
-    segments = []
-    for seg in result.get("segments", []):
-        segments.append({
-            "start": float(seg.get("start", 0)),
-            "end": float(seg.get("end", 0)),
-            "text": seg.get("text", "").strip(),
-            "speaker": "",  # Whisper doesn't do speaker diarization
-        })
-
+    segments = result["segments"]
     log(f"Transcription complete: {len(segments)} segments")
 
     return {
@@ -260,6 +331,123 @@ def transcribe_audio(
     }
 
 
+def _transcribe_pcm(
+    model,
+    pcm_path: Path,
+    options: Dict[str, Any],
+    log_callback: Optional[Callable[[str], None]],
+    segment_callback: Optional[Callable[[Dict[str, Any]], None]],
+) -> Dict[str, Any]:
+    """
+    Transcribe a 16 kHz PCM file window by window.
+
+    model.transcribe() needs the whole waveform (and builds a mel spectrogram
+    of it) in memory, which for a 3-hour episode is ~700 MB of float32 per job.
+    Instead the int16 file is memory-mapped and transcribed in windows of about
+    WHISPER_WINDOW_SECONDS, cut at silences, so only the current window is ever
+    converted to float32 and peak memory no longer grows with episode length.
+    The language detected in the first window is kept for the rest, and the
+    tail of each window's text primes the next one.
+    """
+    from podscript_pipeline import vad
+    from podscript_pipeline.audio import pcm_duration, read_pcm
+
+    duration = pcm_duration(pcm_path)
+    if duration > WHISPER_WINDOW_SECONDS * 1.5:
+        windows = vad.plan_chunks(duration, vad.detect_silences(pcm_path), WHISPER_WINDOW_SECONDS)
+    else:
+        windows = [(0.0, duration)]
+
+    options = dict(options)
+    user_prompt = options.get("initial_prompt")
+    segments: list = []
+    for start, end in windows:
+        audio = read_pcm(pcm_path, start, end)
+        with SegmentCapture(segment_callback, log_callback, duration=duration, offset=start):
+            result = model.transcribe(audio, **options)
+        del audio
+
+        window_segments = _parse_segments(result, offset=start)
+        segments.extend(window_segments)
+        options.setdefault("language", result.get("language"))
+        if not user_prompt and window_segments:
+            options["initial_prompt"] = join_segment_text(window_segments[-5:], options["language"])
+
+    return {
+        "text": join_segment_text(segments, options.get("language")),
+        "segments": segments,
+        "language": options.get("language"),
+    }
+
+
+def join_segment_text(segments: list, language: Optional[str]) -> str:
+    """Join segment texts, without spaces for languages that don't use them."""
+    separator = "" if language in ("zh", "ja", "yue") else " "
+    return separator.join(seg["text"] for seg in segments).strip()
+
+
+def transcribe_window(
+    pcm_path: Path,
+    start: float,
+    end: float,
+    model_name: str = DEFAULT_MODEL,
+    language: Optional[str] = None,
+    task: str = "transcribe",
+    initial_prompt: Optional[str] = None,
+    log_callback: Optional[Callable[[str], None]] = None,
+    segment_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Transcribe one time window of a decoded PCM file (used by chunked mode).
+
+    Segment timestamps are shifted by `start`, so they are relative to the
+    whole recording rather than to the window.
+
+    Args:
+        pcm_path: 16 kHz mono s16le PCM file (see audio.decode_to_pcm)
+        start: Window start in seconds
+        end: Window end in seconds
+        model_name, language, task, initial_prompt: As for transcribe_audio
+        log_callback: Optional callback for progress logging
+        segment_callback: Optional callback receiving each (shifted) segment
+
+    Returns:
+        Dict with text, segments and language, like transcribe_audio
+    """
+    from podscript_pipeline.audio import read_pcm
+
+    model = load_model(model_name)
+    audio = read_pcm(pcm_path, start, end)
+
+    options = {"task": task, "verbose": True}
+    if language:
+        options["language"] = language
+    if initial_prompt:
+        options["initial_prompt"] = initial_prompt
+
+    with SegmentCapture(segment_callback, log_callback, duration=end, offset=start):
+        result = model.transcribe(audio, **options)
+
+    return {
+        "text": result.get("text", "").strip(),
+        "segments": _parse_segments(result, offset=start),
+        "language": result.get("language", language or "unknown"),
+    }
+
+
+def _parse_segments(result: Dict[str, Any], offset: float = 0.0) -> list:
+    """Convert Whisper's result segments into the pipeline's segment dicts."""
+    segments = []
+    for seg in result.get("segments", []):
+        segments.append({
+            "start": float(seg.get("start", 0)) + offset,
+            "end": float(seg.get("end", 0)) + offset,
+            "text": seg.get("text", "").strip(),
+            "speaker": "",  # Whisper doesn't do speaker diarization
+        })
+    return segments
+
+
 def download_model(model_name: str, log_callback: Optional[Callable[[str], None]] = None) -> bool:
     """
     Download a Whisper model (if not already downloaded).
@@ -0,0 +1,196 @@
+"""
+Chunked, parallel Whisper transcription for long recordings.
+
+The audio is decoded once to 16 kHz PCM, split at silences found by the
+energy VAD, and the chunks are transcribed concurrently on the Whisper
+process pool. Segments are stitched back in order with absolute timestamps;
+chunks overlap slightly, and segments repeated in the overlap are dropped.
+"""
+import logging
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from podscript_pipeline import audio, vad
+from podscript_pipeline.whisper_adapter import join_segment_text
+
+logger = logging.getLogger(__name__)
+
+# Chunked mode configuration
+WHISPER_CHUNKED = os.getenv("WHISPER_CHUNKED", "1") == "1"
+WHISPER_CHUNKED_MIN_SECONDS = float(os.getenv("WHISPER_CHUNKED_MIN_SECONDS", "1200"))
+WHISPER_CHUNK_SECONDS = float(os.getenv("WHISPER_CHUNK_SECONDS", "600"))
+CHUNK_OVERLAP_S = 1.0  # Extra audio decoded on each side of a cut
+MIN_CHUNK_SECONDS = 60.0
+
+
+def should_chunk(duration: Optional[float], workers: int) -> bool:
+    """Chunking only pays off for long recordings with more than one worker."""
+    return (
+        WHISPER_CHUNKED
+        and workers > 1
+        and duration is not None
+        and duration >= WHISPER_CHUNKED_MIN_SECONDS
+    )
+
+
+def chunk_length(duration: float, workers: int) -> float:
+    """Pick a chunk length that gives every worker at least one chunk."""
+    return max(MIN_CHUNK_SECONDS, min(WHISPER_CHUNK_SECONDS, duration / workers))
+
+
+class SegmentStitcher:
+    """
+    Merge segments from concurrently transcribed chunks into one ordered stream.
+
+    Segments of the earliest unfinished chunk are emitted immediately; later
+    chunks are buffered until every chunk before them has finished. A segment
+    whose midpoint falls inside text already emitted (the overlap between two
+    chunks) is treated as a duplicate and dropped.
+    """
+
+    def __init__(self, chunk_count: int, segment_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.segment_callback = segment_callback
+        self.segments: List[Dict[str, Any]] = []
+        self._pending: List[List[Dict[str, Any]]] = [[] for _ in range(chunk_count)]
+        self._done = [False] * chunk_count
+        self._next = 0
+        self._last_end = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, index: int, segment: Dict[str, Any]) -> None:
+        """Add a segment (absolute timestamps) produced by chunk `index`."""
+        with self._lock:
+            if index == self._next:
+                self._emit(segment)
+            else:
+                self._pending[index].append(segment)
+
+    def finish(self, index: int) -> None:
+        """Mark chunk `index` as complete and release any buffered chunks."""
+        with self._lock:
+            self._done[index] = True
+            while self._next < len(self._done):
+                for segment in self._pending[self._next]:
+                    self._emit(segment)
+                self._pending[self._next] = []
+                if not self._done[self._next]:
+                    break
+                self._next += 1
+
+    def _emit(self, segment: Dict[str, Any]) -> None:
+        midpoint = (segment["start"] + segment["end"]) / 2
+        if self.segments and midpoint < self._last_end:
+            return
+        self._last_end = max(self._last_end, segment["end"])
+        self.segments.append(segment)
+        if self.segment_callback:
+            self.segment_callback(segment)
+
+
+def transcribe_chunked(
+    audio_path: Path,
+    pool,
+    model_name: str,
+    language: Optional[str] = None,
+    task: str = "transcribe",
+    initial_prompt: Optional[str] = None,
+    log_callback: Optional[Callable[[str], None]] = None,
+    segment_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Transcribe a long recording as parallel chunks on the Whisper process pool.
+
+    Args:
+        audio_path: Media file to transcribe
+        pool: WhisperProcessPool to run the chunks on
+        model_name, language, task, initial_prompt: As for whisper_adapter.transcribe_audio
+        log_callback: Optional callback for progress logging
+        segment_callback: Optional callback receiving segments in order as they
+            become final
+
+    Returns:
+        Dict with text, segments and language, like whisper_adapter.transcribe_audio
+    """
+    def log(msg: str):
+        logger.info(msg)
+        if log_callback:
+            log_callback(msg)
+
+    # Reuse the preprocess stage's PCM when given one; otherwise decode to a scratch file
+    audio_path = Path(audio_path)
+    scratch = audio_path.suffix != ".pcm"
+    pcm_path = audio_path.with_name(f"{audio_path.stem}.16k.pcm") if scratch else audio_path
+    if scratch:
+        audio.decode_to_pcm(audio_path, pcm_path)
+    try:
+        duration = audio.pcm_duration(pcm_path)
+        silences = vad.detect_silences(pcm_path)
+        chunks = vad.plan_chunks(duration, silences, chunk_length(duration, pool.size))
+        log(f"分段并行转写: {len(chunks)} 段, {pool.size} 个进程")
+
+        windows: List[Tuple[float, float]] = [
+            (max(0.0, start - CHUNK_OVERLAP_S), min(duration, end + CHUNK_OVERLAP_S))
+            for start, end in chunks
+        ]
+        # Live stream for the UI; the final transcript is stitched from the chunk results
+        stitcher = SegmentStitcher(len(chunks), segment_callback)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+        completed = [0]
+        progress_lock = threading.Lock()
+
+        def run_chunk(index: int) -> None:
+            start, end = windows[index]
+            result = pool.run(
+                "transcribe_window",
+                {
+                    "pcm_path": pcm_path,
+                    "start": start,
+                    "end": end,
+                    "model_name": model_name,
+                    "language": language,
+                    "task": task,
+                    "initial_prompt": initial_prompt,
+                },
+                model_name=model_name,
+                segment_callback=lambda segment: stitcher.add(index, segment),
+            )
+            stitcher.finish(index)
+            results[index] = result
+            with progress_lock:
+                completed[0] += 1
+                log(f"转写进度: {completed[0] * 100 // len(chunks)}% (分段 {completed[0]}/{len(chunks)})")
+
+        with ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="whisper-chunk") as executor:
+            futures = [executor.submit(run_chunk, i) for i in range(len(chunks))]
+            try:
+                for future in futures:
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        if scratch:
+            pcm_path.unlink(missing_ok=True)
+
+    merged = SegmentStitcher(len(results))
+    for index, result in enumerate(results):
+        for segment in result["segments"]:
+            merged.add(index, segment)
+        merged.finish(index)
+    segments = merged.segments
+
+    languages = Counter(result.get("language") for result in results)
+    detected_lang = language or languages.most_common(1)[0][0]
+    log(f"Detected language: {detected_lang}")
+    log(f"Transcription complete: {len(segments)} segments")
+
+    return {
+        "text": join_segment_text(segments, detected_lang),
+        "segments": segments,
+        "language": detected_lang,
+    }
@@ -0,0 +1,289 @@
+"""
+Process pool for Whisper inference.
+
+Each worker process keeps one Whisper model resident and serves jobs over a
+pipe, so inference runs outside the API process (no GIL contention, and the
+web process never imports torch). Jobs are routed to an idle worker that
+already holds the requested model; workers are started lazily.
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration (defaults to one worker per ASR slot)
+WHISPER_POOL_ENABLED = os.getenv("WHISPER_POOL_ENABLED", "1") == "1"
+WHISPER_POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE") or os.getenv("ASR_WORKERS") or "1")
+
+
+def _worker_main(conn: Connection, torch_threads: int) -> None:
+    """
+    Worker process entry point.
+
+    Protocol (parent -> child): (op, kwargs) tuples, or None to exit.
+    Protocol (child -> parent): ("log", msg), ("segment", dict), then
+    ("result", value) or ("error", exc).
+    """
+    # Split the cores between workers; must be set before torch is imported
+    os.environ.setdefault("OMP_NUM_THREADS", str(torch_threads))
+    os.environ.setdefault("MKL_NUM_THREADS", str(torch_threads))
+
+    from podscript_pipeline import whisper_adapter
+
+    def send_log(msg: str):
+        conn.send(("log", msg))
+
+    def send_segment(segment: dict):
+        conn.send(("segment", segment))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+
+        op, kwargs = message
+        try:
+            if op in ("transcribe", "transcribe_window"):
+                # Keep a single model resident per worker
+                model_name = kwargs.get("model_name")
+                for key in list(whisper_adapter._model_cache):
+                    if not key.startswith(f"{model_name}_"):
+                        del whisper_adapter._model_cache[key]
+                fn = whisper_adapter.transcribe_audio if op == "transcribe" else whisper_adapter.transcribe_window
+                value = fn(log_callback=send_log, segment_callback=send_segment, **kwargs)
+            elif op == "download":
+                value = whisper_adapter.download_model(log_callback=send_log, **kwargs)
+            elif op == "ping":
+                value = os.getpid()
+            else:
+                raise ValueError(f"Unknown whisper worker op: {op}")
+            conn.send(("result", value))
+        except Exception as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    """Parent-side handle for a worker process."""
+
+    def __init__(self, process: multiprocessing.Process, conn: Connection):
+        self.process = process
+        self.conn = conn
+        self.model: Optional[str] = None  # Model currently resident in the worker
+        self.busy = False
+
+
+class WhisperProcessPool:
+    """
+    Fixed-size pool of Whisper worker processes with model-aware routing.
+    """
+
+    def __init__(self, size: int = WHISPER_POOL_SIZE, target: Callable[..., None] = _worker_main):
+        """
+        Initialize the pool (no processes are started until the first job).
+
+        Args:
+            size: Maximum number of worker processes
+            target: Worker entry point (overridable for tests)
+        """
+        self.size = max(1, size)
+        self._target = target
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def transcribe(
+        self,
+        audio_path: Path,
+        model_name: str,
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        initial_prompt: Optional[str] = None,
+        log_callback: Optional[Callable[[str], None]] = None,
+        segment_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Run whisper_adapter.transcribe_audio in a worker holding model_name."""
+        kwargs = {
+            "audio_path": Path(audio_path),
+            "model_name": model_name,
+            "language": language,
+            "task": task,
+            "initial_prompt": initial_prompt,
+        }
+        return self.run(
+            "transcribe",
+            kwargs,
+            model_name=model_name,
+            log_callback=log_callback,
+            segment_callback=segment_callback,
+        )
+
+    def download(self, model_name: str, log_callback: Optional[Callable[[str], None]] = None) -> bool:
+        """Download a model from inside a worker process."""
+        return self.run("download", {"model_name": model_name}, log_callback=log_callback)
+
+    def run(
+        self,
+        op: str,
+        kwargs: Dict[str, Any],
+        model_name: Optional[str] = None,
+        log_callback: Optional[Callable[[str], None]] = None,
+        segment_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Any:
+        """
+        Send a job to a worker and block until it finishes.
+
+        Log messages emitted by the worker are forwarded to log_callback and
+        transcript segments (streamed while decoding) to segment_callback.
+        Exceptions raised in the worker are re-raised here unchanged. If a
+        callback raises, the rest of the job's messages are still drained
+        so the worker's pipe is clean for the next job, then the callback's
+        exception is raised.
+        """
+        worker = self._acquire(model_name)
+        callback_error: Optional[Exception] = None
+        try:
+            try:
+                worker.conn.send((op, kwargs))
+                while True:
+                    kind, payload = worker.conn.recv()
+                    if kind in ("result", "error"):
+                        break
+                    callback = log_callback if kind == "log" else segment_callback
+                    if callback and callback_error is None:
+                        try:
+                            callback(payload)
+                        except Exception as e:
+                            callback_error = e
+            except (EOFError, OSError) as e:
+                logger.error(f"Whisper worker pid={worker.process.pid} died: {e}")
+                self._discard(worker)
+                raise RuntimeError("Whisper worker process exited unexpectedly") from e
+            if kind == "result" and model_name:
+                worker.model = model_name
+        finally:
+            self._release(worker)
+
+        if callback_error is not None:
+            raise callback_error
+        if kind == "error":
+            raise payload
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        """Return worker count, busy count and resident models."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "workers": len(self._workers),
+                "busy": sum(1 for w in self._workers if w.busy),
+                "models": [w.model for w in self._workers],
+            }
+
+    def shutdown(self) -> None:
+        """Stop all worker processes."""
+        with self._cond:
+            self._closed = True
+            workers, self._workers = self._workers, []
+            self._cond.notify_all()
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.conn.close()
+
+    def _acquire(self, model_name: Optional[str]) -> _Worker:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Whisper process pool is shut down")
+                self._prune_dead()
+                worker = self._pick_idle(model_name)
+                if worker is None and len(self._workers) < self.size:
+                    worker = self._spawn()
+                if worker is not None:
+                    worker.busy = True
+                    return worker
+                self._cond.wait()
+
+    def _prune_dead(self) -> None:
+        """Drop idle workers whose process has died (OOM-kill, segfault) so they can be replaced."""
+        for worker in [w for w in self._workers if not w.busy and not w.process.is_alive()]:
+            logger.warning(f"Whisper worker pid={worker.process.pid} exited (code {worker.process.exitcode}), replacing it")
+            self._workers.remove(worker)
+            worker.conn.close()
+
+    def _pick_idle(self, model_name: Optional[str]) -> Optional[_Worker]:
+        """Pick an idle worker, preferring one that already has the model loaded."""
+        idle = [w for w in self._workers if not w.busy]
+        if not idle:
+            return None
+        for worker in idle:
+            if model_name and worker.model == model_name:
+                return worker
+        if model_name and len(self._workers) < self.size:
+            # Load into a fresh worker rather than evicting another model
+            return None
+        for worker in idle:
+            if worker.model is None:
+                return worker
+        return idle[0]
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        torch_threads = max(1, (os.cpu_count() or 1) // self.size)
+        process = self._ctx.Process(
+            target=self._target,
+            args=(child_conn, torch_threads),
+            name=f"whisper-worker-{len(self._workers)}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self._workers.append(worker)
+        logger.info(f"Started Whisper worker pid={process.pid} ({len(self._workers)}/{self.size})")
+        return worker
+
+    def _release(self, worker: _Worker) -> None:
+        with self._cond:
+            worker.busy = False
+            self._cond.notify_all()
+
+    def _discard(self, worker: _Worker) -> None:
+        with self._cond:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.conn.close()
+
+
+_pool: Optional[WhisperProcessPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WhisperProcessPool:
+    """Get the process-wide Whisper pool (created on first use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WhisperProcessPool(WHISPER_POOL_SIZE)
+            atexit.register(_pool.shutdown)
+        return _pool
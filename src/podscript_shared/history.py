@@ -1,18 +1,46 @@
 """
 History Manager module for managing transcription history records.
 
-This module provides a HistoryManager class that handles CRUD operations
-on the history.json file with file locking for concurrent access safety.
+HistoryManager handles CRUD operations on the history.json file with file
+locking for concurrent access safety. The parsed file is cached in process
+(with a task_id lookup) until its mtime/size changes or a write bumps the
+generation, so repeated reads skip decoding and validation. SqliteHistoryManager (the default,
+see create_history_manager) keeps the same API on an indexed SQLite table,
+so a lookup or update touches one row instead of rewriting the whole file;
+an existing history.json is imported into it once.
+
+Both list newest first by (created_at, task_id). list_page walks that order
+with an opaque cursor (keyset pagination), so a page costs the same however
+deep it is and isn't shifted by records added meanwhile; status and tag
+filters run off precomputed per-status / per-tag indexes, and the totals
+and per-tag facet counts are kept alongside them.
+
+HistoryPartitions splits history by user: each user's records live in
+their own store (with its own lock and indexes), so listing and writing
+cost scales with one user's history rather than everyone's.
 """
 
+import base64
+import bisect
+import hashlib
 import json
 import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from filelock import FileLock
 
+try:
+    import orjson
+except ImportError:  # Optional: faster history.json decode/encode
+    orjson = None
+
 from .models import (
     HistoryIndex,
     HistoryRecord,
@@ -21,6 +49,91 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+HISTORY_STORE_BACKEND = os.getenv("HISTORY_STORE", "sqlite")  # 'sqlite' or 'json'
+HISTORY_PARTITION_CACHE = int(os.getenv("HISTORY_PARTITION_CACHE", "256"))  # Per-user stores kept open
+
+_PARTITION_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def _sort_key(record: HistoryRecord) -> Tuple[float, str]:
+    return record.created_at.timestamp(), record.task_id
+
+
+def encode_cursor(record: HistoryRecord) -> str:
+    """Opaque cursor for the page that follows record."""
+    raw = json.dumps(_sort_key(record), ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Decode a cursor from encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(raw)
+        return float(created_at), str(task_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+class _CachedIndex:
+    """A parsed history.json plus its task_id lookup, valid for one file version."""
+
+    __slots__ = ("key", "generation", "index", "by_id", "ordered", "by_status", "by_tag", "views")
+
+    def __init__(self, key: Optional[tuple], generation: int, index: HistoryIndex):
+        self.key = key
+        self.generation = generation
+        self.index = index
+        self.by_id = {r.task_id: r for r in index.records}
+        # Oldest first by (created_at, task_id), plus secondary indexes; built on first list
+        self.ordered: Optional[List[HistoryRecord]] = None
+        self.by_status: Optional[Dict[str, List[HistoryRecord]]] = None
+        self.by_tag: Optional[Dict[str, List[HistoryRecord]]] = None
+        # (status, tag, include_deleted) -> (records oldest first, their sort keys)
+        self.views: Dict[tuple, Tuple[List[HistoryRecord], List[Tuple[float, str]]]] = {}
+
+    def view(
+        self, status: Optional[str], tag: Optional[str], include_deleted: bool
+    ) -> Tuple[List[HistoryRecord], List[Tuple[float, str]]]:
+        """Records matching the filters, oldest first, plus their sort keys for bisecting."""
+        found = self.views.get((status, tag, include_deleted))
+        if found is not None:
+            return found
+
+        if self.ordered is None:
+            self.ordered = sorted(self.index.records, key=_sort_key)
+            by_status, by_tag = defaultdict(list), defaultdict(list)
+            for record in self.ordered:
+                by_status[record.status.value].append(record)
+                for t in dict.fromkeys(record.tags):
+                    by_tag[t].append(record)
+            self.by_status, self.by_tag = dict(by_status), dict(by_tag)
+
+        if tag:
+            base = self.by_tag.get(tag, [])
+        elif status:
+            base = self.by_status.get(status, [])
+        else:
+            base = self.ordered
+        records = [
+            r for r in base
+            # Skip deleted unless explicitly requested; apply status filter if specified
+            if (include_deleted or r.status != HistoryStatus.DELETED) and (not status or r.status.value == status)
+        ]
+        found = self.views[(status, tag, include_deleted)] = (records, [_sort_key(r) for r in records])
+        return found
+
+
+# Parsed indexes per history file, shared by every HistoryManager in the process
+_index_cache: Dict[Path, _CachedIndex] = {}
+_generations: Dict[Path, int] = {}
+_cache_lock = threading.Lock()
+
 
 class HistoryManager:
     """
@@ -39,37 +152,66 @@ class HistoryManager:
         """
         self.history_path = Path(history_path)
         self.lock_path = Path(f"{history_path}.lock")
+        self._lock = FileLock(self.lock_path, timeout=10)
+        self._cache_path = self.history_path.resolve()
 
     def _get_lock(self) -> FileLock:
-        """Get a file lock for thread-safe operations."""
-        return FileLock(self.lock_path, timeout=10)
+        """Get the (reentrant) file lock for thread-safe operations."""
+        return self._lock
+
+    def _file_key(self) -> Optional[tuple]:
+        """Identity of the file's current version (None if it doesn't exist)."""
+        try:
+            st = self.history_path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _cached(self) -> _CachedIndex:
+        """The parsed index, re-read only if the file changed or was written since."""
+        path = self._cache_path
+        cached = _index_cache.get(path)
+        if cached is not None and cached.key == self._file_key() and cached.generation == _generations.get(path, 0):
+            return cached
+
+        with self._get_lock():
+            cached = _CachedIndex(self._file_key(), _generations.get(path, 0), self._read())
+            _index_cache[path] = cached
+        return cached
+
+    def _read(self) -> HistoryIndex:
+        """Read and validate the file (empty index if missing or unreadable)."""
+        if not self.history_path.exists():
+            return HistoryIndex(
+                version="1.0",
+                updated_at=datetime.now(timezone.utc),
+                records=[]
+            )
+
+        try:
+            raw = self.history_path.read_bytes()
+            if orjson is not None:
+                return HistoryIndex.model_validate(orjson.loads(raw))
+            return HistoryIndex.model_validate_json(raw)
+        except Exception as e:
+            logger.error(f"Failed to load history file: {e}")
+            # Return empty index on error, don't crash
+            return HistoryIndex(
+                version="1.0",
+                updated_at=datetime.now(timezone.utc),
+                records=[]
+            )
 
     def load(self) -> HistoryIndex:
         """
-        Load the history index from file.
+        Load the history index (from the in-process cache when the file is unchanged).
 
         Returns:
-            HistoryIndex object (empty if file doesn't exist)
+            HistoryIndex object (empty if file doesn't exist). The records
+            list is the caller's own; the records in it are shared.
         """
-        with self._get_lock():
-            if not self.history_path.exists():
-                return HistoryIndex(
-                    version="1.0",
-                    updated_at=datetime.now(timezone.utc),
-                    records=[]
-                )
-
-            try:
-                data = json.loads(self.history_path.read_text(encoding="utf-8"))
-                return HistoryIndex.model_validate(data)
-            except (json.JSONDecodeError, Exception) as e:
-                logger.error(f"Failed to load history file: {e}")
-                # Return empty index on error, don't crash
-                return HistoryIndex(
-                    version="1.0",
-                    updated_at=datetime.now(timezone.utc),
-                    records=[]
-                )
+        index = self._cached().index
+        return index.model_copy(update={"records": list(index.records)})
 
     def save(self, index: HistoryIndex) -> None:
         """
@@ -87,10 +229,20 @@ class HistoryManager:
 
             # Write with pretty formatting for debugging
             data = index.model_dump(mode="json")
-            self.history_path.write_text(
-                json.dumps(data, ensure_ascii=False, indent=2, default=str),
-                encoding="utf-8"
-            )
+            if orjson is not None:
+                self.history_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                self.history_path.write_text(
+                    json.dumps(data, ensure_ascii=False, indent=2, default=str),
+                    encoding="utf-8"
+                )
+
+            # The new version is known: cache it instead of re-reading it
+            path = self._cache_path
+            with _cache_lock:
+                generation = _generations[path] = _generations.get(path, 0) + 1
+            saved = index.model_copy(update={"records": list(index.records)})
+            _index_cache[path] = _CachedIndex(self._file_key(), generation, saved)
 
     def add_record(self, record: HistoryRecord) -> None:
         """
@@ -101,17 +253,17 @@ class HistoryManager:
         Args:
             record: HistoryRecord to add
         """
-        index = self.load()
-
-        # Check for duplicate task_id
-        existing_ids = {r.task_id for r in index.records}
-        if record.task_id in existing_ids:
-            logger.warning(f"Record with task_id {record.task_id} already exists, skipping")
-            return
-
-        # Add to beginning (most recent first)
-        index.records.insert(0, record)
-        self.save(index)
+        # One lock across load and save, so concurrent writers can't lose records
+        with self._get_lock():
+            # Check for duplicate task_id
+            if record.task_id in self._cached().by_id:
+                logger.warning(f"Record with task_id {record.task_id} already exists, skipping")
+                return
+
+            # Add to beginning (most recent first)
+            index = self.load()
+            index.records.insert(0, record)
+            self.save(index)
         logger.info(f"Added history record: {record.task_id}")
 
     def get_record(self, task_id: str) -> Optional[HistoryRecord]:
@@ -124,11 +276,7 @@ class HistoryManager:
         Returns:
             HistoryRecord if found, None otherwise
         """
-        index = self.load()
-        for record in index.records:
-            if record.task_id == task_id:
-                return record
-        return None
+        return self._cached().by_id.get(task_id)
 
     def update_record(self, task_id: str, **kwargs) -> bool:
         """
@@ -141,21 +289,15 @@ class HistoryManager:
         Returns:
             True if updated, False if not found
         """
-        index = self.load()
-
-        for i, record in enumerate(index.records):
-            if record.task_id == task_id:
-                # Update only provided fields
-                record_data = record.model_dump()
-                for key, value in kwargs.items():
-                    if key in record_data and value is not None:
-                        record_data[key] = value
+        with self._get_lock():
+            index = self.load()
 
-                # Re-validate and update
-                index.records[i] = HistoryRecord.model_validate(record_data)
-                self.save(index)
-                logger.info(f"Updated history record: {task_id}")
-                return True
+            for i, record in enumerate(index.records):
+                if record.task_id == task_id:
+                    index.records[i] = _apply_updates(record, kwargs)
+                    self.save(index)
+                    logger.info(f"Updated history record: {task_id}")
+                    return True
 
         logger.warning(f"Record not found for update: {task_id}")
         return False
@@ -174,46 +316,539 @@ class HistoryManager:
         """
         return self.update_record(task_id, status=HistoryStatus.DELETED)
 
+    def remove_records(self, task_ids: Iterable[str]) -> int:
+        """
+        Permanently remove records (e.g. after moving them to another store).
+
+        Records added meanwhile by other writers are left alone.
+
+        Args:
+            task_ids: Task IDs to remove
+
+        Returns:
+            Number of records removed
+        """
+        wanted = set(task_ids)
+        with self._get_lock():
+            index = self.load()
+            keep = [r for r in index.records if r.task_id not in wanted]
+            removed = len(index.records) - len(keep)
+            if removed:
+                index.records = keep
+                self.save(index)
+        return removed
+
     def list_records(
         self,
         page: int = 1,
         limit: int = 20,
         status: Optional[str] = None,
-        include_deleted: bool = False
+        include_deleted: bool = False,
+        tag: Optional[str] = None,
     ) -> Tuple[List[HistoryRecord], int]:
         """
-        List records with pagination and optional filtering.
+        List records with offset pagination and optional filtering.
+
+        Prefer list_page: records added meanwhile shift later pages here.
 
         Args:
             page: Page number (1-indexed)
             limit: Records per page (max 100)
             status: Optional status filter
             include_deleted: Whether to include deleted records (default: False)
+            tag: Optional tag filter
 
         Returns:
             Tuple of (records list, total count)
         """
-        index = self.load()
+        records, _ = self._cached().view(status, tag, include_deleted)
+        total = len(records)
 
-        # Filter records
-        filtered = []
-        for record in index.records:
-            # Skip deleted unless explicitly requested
-            if not include_deleted and record.status == HistoryStatus.DELETED:
-                continue
+        # Apply pagination (the view is oldest first)
+        limit = min(limit, 100)  # Cap at 100
+        end = max(total - (page - 1) * limit, 0)
+        return records[max(end - limit, 0):end][::-1], total
+
+    def list_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        status: Optional[str] = None,
+        tag: Optional[str] = None,
+        include_deleted: bool = False,
+    ) -> Tuple[List[HistoryRecord], Optional[str]]:
+        """
+        List records newest first, one keyset page at a time.
 
-            # Apply status filter if specified
-            if status and record.status.value != status:
-                continue
+        Args:
+            cursor: next_cursor from the previous page (None for the first page)
+            limit: Records per page (max 100)
+            status: Optional status filter
+            tag: Optional tag filter
+            include_deleted: Whether to include deleted records (default: False)
 
-            filtered.append(record)
+        Returns:
+            Tuple of (records list, next_cursor or None on the last page)
 
-        total = len(filtered)
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        records, keys = self._cached().view(status, tag, include_deleted)
+        end = bisect.bisect_left(keys, decode_cursor(cursor)) if cursor else len(records)
 
-        # Apply pagination
         limit = min(limit, 100)  # Cap at 100
-        start = (page - 1) * limit
-        end = start + limit
-        paginated = filtered[start:end]
+        start = max(end - limit, 0)
+        page = records[start:end][::-1]
+        return page, encode_cursor(page[-1]) if page and start > 0 else None
+
+    def count(self, status: Optional[str] = None, tag: Optional[str] = None, include_deleted: bool = False) -> int:
+        """Number of records matching the filters."""
+        return len(self._cached().view(status, tag, include_deleted)[0])
 
-        return paginated, total
+    def tag_counts(self, status: Optional[str] = None, include_deleted: bool = False) -> Dict[str, int]:
+        """
+        Facet counts: records per tag under the given filters, most used first.
+
+        Returns:
+            Dict of tag -> count (tags with no matching records are omitted)
+        """
+        cached = self._cached()
+        cached.view(status, None, include_deleted)  # Builds the tag index
+        counts = {t: len(cached.view(status, t, include_deleted)[0]) for t in cached.by_tag}
+        return dict(sorted(((t, c) for t, c in counts.items() if c), key=lambda item: (-item[1], item[0])))
+
+
+def _apply_updates(record: HistoryRecord, updates: dict) -> HistoryRecord:
+    """Return record with the provided (non-None, known) fields replaced, re-validated."""
+    record_data = record.model_dump()
+    for key, value in updates.items():
+        if key in record_data and value is not None:
+            record_data[key] = value
+    return HistoryRecord.model_validate(record_data)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_history_created;
+DROP INDEX IF EXISTS idx_history_status;
+CREATE INDEX IF NOT EXISTS idx_history_keyset ON history(created_at, task_id);
+CREATE INDEX IF NOT EXISTS idx_history_status_keyset ON history(status, created_at, task_id);
+
+CREATE TABLE IF NOT EXISTS history_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+-- One row per (tag, record), with the record's sort key and status copied in
+CREATE TABLE IF NOT EXISTS history_tags (
+    tag TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (tag, task_id)
+);
+CREATE INDEX IF NOT EXISTS idx_history_tags_keyset ON history_tags(tag, created_at, task_id);
+CREATE INDEX IF NOT EXISTS idx_history_tags_task ON history_tags(task_id);
+
+CREATE TABLE IF NOT EXISTS history_status_counts (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history_tag_counts (
+    tag TEXT NOT NULL,
+    status TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (tag, status)
+);
+
+-- Tags and counts follow every write to history, whichever code path makes it
+CREATE TRIGGER IF NOT EXISTS trg_history_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_tags (tag, task_id, status, created_at)
+        SELECT DISTINCT value, NEW.task_id, NEW.status, NEW.created_at FROM json_each(NEW.data, '$.tags');
+    INSERT INTO history_status_counts (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_history_delete AFTER DELETE ON history BEGIN
+    DELETE FROM history_tags WHERE task_id = OLD.task_id;
+    UPDATE history_status_counts SET count = count - 1 WHERE status = OLD.status;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_history_update AFTER UPDATE ON history BEGIN
+    DELETE FROM history_tags WHERE task_id = OLD.task_id;
+    INSERT INTO history_tags (tag, task_id, status, created_at)
+        SELECT DISTINCT value, NEW.task_id, NEW.status, NEW.created_at FROM json_each(NEW.data, '$.tags');
+    UPDATE history_status_counts SET count = count - 1 WHERE status = OLD.status;
+    INSERT INTO history_status_counts (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_history_tags_insert AFTER INSERT ON history_tags BEGIN
+    INSERT INTO history_tag_counts (tag, status, count) VALUES (NEW.tag, NEW.status, 1)
+        ON CONFLICT (tag, status) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_history_tags_delete AFTER DELETE ON history_tags BEGIN
+    UPDATE history_tag_counts SET count = count - 1 WHERE tag = OLD.tag AND status = OLD.status;
+END;
+"""
+
+_SCHEMA_VERSION = "2"  # Bumped when derived tables must be rebuilt from history
+
+
+class SqliteHistoryManager(HistoryManager):
+    """
+    SQLite-backed history (WAL mode, one connection per thread).
+
+    Each record is one row: the full record as JSON plus indexed task_id,
+    status and created_at columns, so get/add/update are single index
+    operations and a page of the list is an index range scan. Records are
+    listed newest first by (created_at, task_id). Triggers keep a
+    (tag, created_at, task_id) index in history_tags and per-status /
+    per-tag counts, so tag pages, totals and facets never scan history.
+    """
+
+    def __init__(self, db_path: Path, json_path: Optional[Path] = None):
+        """
+        Initialize the store, creating the schema and importing history.json once.
+
+        Args:
+            db_path: Path to the SQLite database file
+            json_path: Legacy history.json to migrate from (if it exists)
+        """
+        super().__init__(json_path or Path(db_path).with_name("history.json"))
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        self._build_indexes()
+        self._migrate_json()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _build_indexes(self) -> None:
+        """Fill history_tags and the counts from existing rows (once per schema version)."""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT value FROM history_meta WHERE key = 'schema'").fetchone()
+            if row and row["value"] == _SCHEMA_VERSION:
+                return
+            conn.execute("DELETE FROM history_tags")
+            conn.execute("DELETE FROM history_tag_counts")
+            conn.execute("DELETE FROM history_status_counts")
+            conn.execute(
+                "INSERT INTO history_tags (tag, task_id, status, created_at)"
+                " SELECT DISTINCT j.value, h.task_id, h.status, h.created_at FROM history h, json_each(h.data, '$.tags') j"
+            )
+            conn.execute("INSERT INTO history_status_counts (status, count) SELECT status, COUNT(*) FROM history GROUP BY status")
+            conn.execute(
+                "INSERT OR REPLACE INTO history_meta (key, value) VALUES ('schema', ?)", (_SCHEMA_VERSION,)
+            )
+
+    def _migrate_json(self) -> None:
+        """Import the legacy history.json (one-shot; the file is renamed afterwards)."""
+        if not self.history_path.exists():
+            return
+        with self._get_lock():
+            if not self.history_path.exists():
+                return  # Another process migrated it meanwhile
+            index = self._read()
+            with self._conn() as conn:
+                # Oldest first, so ids follow the file's insertion order
+                conn.executemany(
+                    "INSERT OR IGNORE INTO history (task_id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                    [_record_row(r) for r in reversed(index.records)],
+                )
+                _set_updated_at(conn, index.updated_at)
+            migrated = self.history_path.with_name(self.history_path.name + ".migrated")
+            self.history_path.replace(migrated)
+            logger.info(f"Migrated {len(index.records)} history records from {self.history_path} to {self.db_path}")
+
+    def load(self) -> HistoryIndex:
+        rows = self._conn().execute("SELECT data FROM history ORDER BY created_at DESC, task_id DESC").fetchall()
+        updated = self._conn().execute("SELECT value FROM history_meta WHERE key = 'updated_at'").fetchone()
+        return HistoryIndex(
+            version="1.0",
+            updated_at=datetime.fromisoformat(updated["value"]) if updated else datetime.now(timezone.utc),
+            records=[HistoryRecord.model_validate_json(row["data"]) for row in rows],
+        )
+
+    def save(self, index: HistoryIndex) -> None:
+        index.updated_at = datetime.now(timezone.utc)
+        with self._conn() as conn:
+            conn.execute("DELETE FROM history")
+            conn.executemany(
+                "INSERT OR IGNORE INTO history (task_id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                [_record_row(r) for r in reversed(index.records)],
+            )
+            _set_updated_at(conn, index.updated_at)
+
+    def add_record(self, record: HistoryRecord) -> None:
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO history (task_id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                _record_row(record),
+            )
+            if cursor.rowcount == 0:
+                logger.warning(f"Record with task_id {record.task_id} already exists, skipping")
+                return
+            _set_updated_at(conn)
+        logger.info(f"Added history record: {record.task_id}")
+
+    def remove_records(self, task_ids: Iterable[str]) -> int:
+        ids = list(task_ids)
+        with self._conn() as conn:
+            removed = conn.executemany("DELETE FROM history WHERE task_id = ?", [(tid,) for tid in ids]).rowcount
+            if removed:
+                _set_updated_at(conn)
+        return removed
+
+    def get_record(self, task_id: str) -> Optional[HistoryRecord]:
+        row = self._conn().execute("SELECT data FROM history WHERE task_id = ?", (task_id,)).fetchone()
+        return HistoryRecord.model_validate_json(row["data"]) if row else None
+
+    def update_record(self, task_id: str, **kwargs) -> bool:
+        conn = self._conn()
+        with conn:
+            # Write lock up front: the read-modify-write can't interleave with another writer
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT data FROM history WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                logger.warning(f"Record not found for update: {task_id}")
+                return False
+            record = _apply_updates(HistoryRecord.model_validate_json(row["data"]), kwargs)
+            conn.execute(
+                "UPDATE history SET status = ?, data = ? WHERE task_id = ?",
+                (record.status.value, record.model_dump_json(), task_id),
+            )
+            _set_updated_at(conn)
+        logger.info(f"Updated history record: {task_id}")
+        return True
+
+    def list_records(
+        self,
+        page: int = 1,
+        limit: int = 20,
+        status: Optional[str] = None,
+        include_deleted: bool = False,
+        tag: Optional[str] = None,
+    ) -> Tuple[List[HistoryRecord], int]:
+        limit = min(limit, 100)  # Cap at 100
+        records = self._select(status, tag, include_deleted, limit, offset=(page - 1) * limit)
+        return records, self.count(status, tag, include_deleted)
+
+    def list_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        status: Optional[str] = None,
+        tag: Optional[str] = None,
+        include_deleted: bool = False,
+    ) -> Tuple[List[HistoryRecord], Optional[str]]:
+        limit = min(limit, 100)  # Cap at 100
+        after = decode_cursor(cursor) if cursor else None
+        # One extra row tells whether another page follows
+        records = self._select(status, tag, include_deleted, limit + 1, after=after)
+        if len(records) > limit:
+            return records[:limit], encode_cursor(records[limit - 1])
+        return records, None
+
+    def count(self, status: Optional[str] = None, tag: Optional[str] = None, include_deleted: bool = False) -> int:
+        where, params = _status_filter("status", status, include_deleted)
+        if tag:
+            where.insert(0, "tag = ?")
+            params.insert(0, tag)
+        table = "history_tag_counts" if tag else "history_status_counts"
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        (total,) = self._conn().execute(f"SELECT COALESCE(SUM(count), 0) FROM {table} {clause}", params).fetchone()
+        return total
+
+    def tag_counts(self, status: Optional[str] = None, include_deleted: bool = False) -> Dict[str, int]:
+        where, params = _status_filter("status", status, include_deleted)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        rows = self._conn().execute(
+            f"SELECT tag, SUM(count) AS n FROM history_tag_counts {clause}"
+            " GROUP BY tag HAVING n > 0 ORDER BY n DESC, tag",
+            params,
+        ).fetchall()
+        return {row["tag"]: row["n"] for row in rows}
+
+    def _select(
+        self,
+        status: Optional[str],
+        tag: Optional[str],
+        include_deleted: bool,
+        limit: int,
+        offset: int = 0,
+        after: Optional[Tuple[float, str]] = None,
+    ) -> List[HistoryRecord]:
+        """One page newest first, walking the tag index when filtering by tag, else history's own."""
+        k = "t" if tag else "h"
+        source = "history_tags t JOIN history h ON h.task_id = t.task_id" if tag else "history h"
+        where, params = _status_filter(f"{k}.status", status, include_deleted)
+        if tag:
+            where.insert(0, "t.tag = ?")
+            params.insert(0, tag)
+        if after:
+            where.append(f"({k}.created_at, {k}.task_id) < (?, ?)")
+            params.extend(after)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        rows = self._conn().execute(
+            f"SELECT h.data FROM {source} {clause}"
+            f" ORDER BY {k}.created_at DESC, {k}.task_id DESC LIMIT ? OFFSET ?",
+            [*params, limit, offset],
+        ).fetchall()
+        return [HistoryRecord.model_validate_json(row["data"]) for row in rows]
+
+
+def _status_filter(column: str, status: Optional[str], include_deleted: bool) -> Tuple[List[str], List[Any]]:
+    """WHERE terms for the status / deleted filters."""
+    where, params = [], []
+    if not include_deleted:
+        where.append(f"{column} != ?")
+        params.append(HistoryStatus.DELETED.value)
+    if status:
+        where.append(f"{column} = ?")
+        params.append(status)
+    return where, params
+
+
+def _record_row(record: HistoryRecord) -> Tuple[Any, ...]:
+    return record.task_id, record.status.value, record.created_at.timestamp(), record.model_dump_json()
+
+
+def _set_updated_at(conn: sqlite3.Connection, when: Optional[datetime] = None) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO history_meta (key, value) VALUES ('updated_at', ?)",
+        ((when or datetime.now(timezone.utc)).isoformat(),),
+    )
+
+
+def create_history_manager(artifacts_dir: str, backend: str = HISTORY_STORE_BACKEND) -> HistoryManager:
+    """
+    Create the configured history manager.
+
+    Args:
+        artifacts_dir: Directory holding history.db / history.json
+        backend: 'sqlite' (default; imports an existing history.json) or 'json'
+
+    Returns:
+        HistoryManager instance
+    """
+    backend = (backend or "sqlite").lower().strip()
+    if backend == "json":
+        return HistoryManager(Path(artifacts_dir) / "history.json")
+    if backend == "sqlite":
+        return SqliteHistoryManager(Path(artifacts_dir) / "history.db", Path(artifacts_dir) / "history.json")
+    raise ValueError(f"Unknown history store backend: '{backend}'. Supported: 'sqlite', 'json'")
+
+
+class HistoryPartitions:
+    """
+    History partitioned by user_id.
+
+    Each user's records live in their own store under
+    ARTIFACTS_DIR/history/<user_id>/ (history.db or history.json, per the
+    backend), so every partition has its own lock and indexes. Records of
+    tasks without an owner stay in the shared store in ARTIFACTS_DIR. The
+    most recently used partitions are kept open.
+    """
+
+    def __init__(
+        self,
+        artifacts_dir: str,
+        backend: str = HISTORY_STORE_BACKEND,
+        max_open: int = HISTORY_PARTITION_CACHE,
+    ):
+        """
+        Initialize the partitions, opening the shared store.
+
+        Args:
+            artifacts_dir: Directory holding the shared store and history/
+            backend: 'sqlite' or 'json', used for every partition
+            max_open: Maximum user partitions kept open
+        """
+        self.artifacts_dir = Path(artifacts_dir)
+        self.backend = backend
+        self.max_open = max(1, max_open)
+        self.shared = create_history_manager(str(self.artifacts_dir), backend)
+        self._open: "OrderedDict[str, HistoryManager]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def partition_dir(self, user_id: str) -> Path:
+        """Directory of a user's partition (ids that aren't path-safe are hashed)."""
+        name = user_id if _PARTITION_NAME.fullmatch(user_id) else hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+        return self.artifacts_dir / "history" / name
+
+    def get(self, user_id: Optional[str]) -> HistoryManager:
+        """
+        Get a user's history store.
+
+        Args:
+            user_id: Owner of the records (None for the shared store)
+
+        Returns:
+            HistoryManager for the partition (created on first use)
+        """
+        if not user_id:
+            return self.shared
+        return self._partition(self.partition_dir(user_id))
+
+    def _partition(self, path: Path) -> HistoryManager:
+        """Open partition for a directory, from the LRU when it's already open."""
+        with self._lock:
+            manager = self._open.get(path.name)
+            if manager is None:
+                manager = create_history_manager(str(path), self.backend)
+                self._open[path.name] = manager
+                if len(self._open) > self.max_open:
+                    self._open.popitem(last=False)
+            else:
+                self._open.move_to_end(path.name)
+            return manager
+
+    def managers(self) -> Iterator[HistoryManager]:
+        """The shared store, then every user partition on disk."""
+        yield self.shared
+        root = self.artifacts_dir / "history"
+        if root.is_dir():
+            for path in sorted(root.iterdir()):
+                if path.is_dir():
+                    yield self._partition(path)
+
+    def split_shared(self, owner_of: Callable[[str], Optional[str]]) -> int:
+        """
+        Move shared-store records whose task has an owner into that owner's partition.
+
+        The owner saved on the record wins; owner_of covers records saved
+        before owners were recorded.
+
+        Args:
+            owner_of: Returns a task's user_id (None if unknown)
+
+        Returns:
+            Number of records moved
+        """
+        moved = []
+        for record in self.shared.load().records:
+            owner = record.owner or owner_of(record.task_id)
+            if owner:
+                self.get(owner).add_record(record.model_copy(update={"owner": owner}))
+                moved.append(record.task_id)
+        # Only the moved rows: records added to the shared store meanwhile stay
+        if moved:
+            self.shared.remove_records(moved)
+            logger.info(f"Moved {len(moved)} history records from the shared store into user partitions")
+        return len(moved)
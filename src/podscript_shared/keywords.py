@@ -2,12 +2,38 @@
 Keyword extraction module using jieba TF-IDF algorithm.
 
 This module extracts keywords from transcription text for automatic tagging.
+
+jieba loads its dictionary on first use, which takes seconds, and TF-IDF
+is pure Python, so KeywordPool runs extraction in a few worker processes
+that load jieba when they start. backfill_tags tags existing transcripts
+in batches through the same pool.
 """
 
-from typing import List
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional
 
+import jieba
 import jieba.analyse
 
+from .history import HistoryManager
+from .models import HistoryRecord, HistoryStatus, TagsSource
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration (0 runs extraction on one thread in this process)
+KEYWORD_WORKERS = int(os.getenv("KEYWORD_WORKERS", "1"))
+KEYWORD_TEXT_CHARS = 5000  # Only the start of a transcript is analysed
+
+
+def warm_up() -> None:
+    """Load jieba's dictionary and IDF table now rather than on the first extraction."""
+    jieba.initialize()
+    jieba.analyse.extract_tags("预热", topK=1)
+
 
 def extract_keywords(text: str, top_k: int = 5) -> List[str]:
     """
@@ -45,3 +71,128 @@ def extract_keywords_with_weight(text: str, top_k: int = 5) -> List[tuple]:
 
     keywords = jieba.analyse.extract_tags(text, topK=top_k, withWeight=True)
     return list(keywords)
+
+
+def extract_keywords_batch(texts: List[str], top_k: int = 5) -> List[List[str]]:
+    """Extract keywords from several texts (one pool round-trip for the lot)."""
+    return [extract_keywords(text, top_k) for text in texts]
+
+
+class KeywordPool:
+    """
+    Keyword extraction on a small pool of workers with jieba preloaded.
+
+    Workers are processes (started with 'spawn'), so TF-IDF doesn't compete
+    with the API for the GIL; with workers=0 a single in-process thread is
+    used instead. Each worker runs warm_up before taking its first job.
+    """
+
+    def __init__(self, workers: int = KEYWORD_WORKERS):
+        """
+        Initialize the pool (workers start on first use).
+
+        Args:
+            workers: Worker processes (0 for one in-process thread)
+        """
+        self.workers = max(0, workers)
+        if self.workers:
+            self._executor: Executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_up,
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="keywords", initializer=warm_up)
+
+    def submit(self, text: str, top_k: int = 5) -> Future:
+        """Queue one extraction. The future resolves to the keyword list."""
+        return self._executor.submit(extract_keywords, text, top_k)
+
+    def extract(self, text: str, top_k: int = 5) -> List[str]:
+        """Extract keywords on the pool, waiting for the result."""
+        return self.submit(text, top_k).result()
+
+    def extract_many(self, texts: List[str], top_k: int = 5, batch_size: int = 16) -> List[List[str]]:
+        """
+        Extract keywords for many texts, batch_size texts per worker job.
+
+        Returns:
+            Keyword lists in the order of texts
+        """
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        futures = [self._executor.submit(extract_keywords_batch, batch, top_k) for batch in batches]
+        return [keywords for future in futures for keywords in future.result()]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def read_task_text(task_dir: Path) -> Optional[str]:
+    """The start of a finished task's result.md (None if it has none)."""
+    md_path = Path(task_dir) / "result.md"
+    if not md_path.exists():
+        return None
+    with open(md_path, "r", encoding="utf-8") as f:
+        return f.read(KEYWORD_TEXT_CHARS)
+
+
+def needs_tags(record: Optional[HistoryRecord]) -> bool:
+    """
+    Whether keyword extraction should tag a record.
+
+    Records already processed or edited by the user are left alone, as are
+    tagged records from before tags_source was recorded.
+    """
+    return record is not None and record.tags_source is None and not record.tags
+
+
+def backfill_tags(
+    manager: HistoryManager,
+    artifacts_dir: str,
+    pool: KeywordPool,
+    task_ids: Optional[Iterable[str]] = None,
+    batch_size: int = 16,
+) -> int:
+    """
+    Tag completed history records that were never processed (e.g. from
+    before extraction moved off the transcription path). Processed records
+    are marked with tags_source, so empty results aren't extracted again.
+
+    Args:
+        manager: HistoryManager holding the records
+        artifacts_dir: Directory holding the task directories
+        pool: Pool the extraction runs on
+        task_ids: Restrict to these tasks (default: every unprocessed record)
+        batch_size: Texts sent to a worker per job
+
+    Returns:
+        Number of records tagged
+    """
+    wanted = set(task_ids) if task_ids is not None else None
+    pending, texts = [], []
+    for record in manager.load().records:
+        if not needs_tags(record) or record.status != HistoryStatus.COMPLETED:
+            continue
+        if wanted is not None and record.task_id not in wanted:
+            continue
+        text = read_task_text(Path(artifacts_dir) / record.task_id)
+        if text is None:
+            continue
+        if text.strip():
+            pending.append(record.task_id)
+            texts.append(text)
+        else:
+            manager.update_record(record.task_id, tags_source=TagsSource.AUTO)
+    if not texts:
+        return 0
+
+    count = 0
+    for task_id, tags in zip(pending, pool.extract_many(texts, batch_size=batch_size)):
+        # Skip records the user tagged meanwhile
+        if needs_tags(manager.get_record(task_id)):
+            manager.update_record(task_id, tags=tags, tags_source=TagsSource.AUTO)
+            if tags:
+                count += 1
+    logger.info(f"Keyword backfill: tagged {count} of {len(texts)} transcripts")
+    return count
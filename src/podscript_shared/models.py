@@ -20,6 +20,7 @@ class TaskCreateRequest(BaseModel):
     source_url: HttpUrl
     platform: Optional[str] = None
     options: Optional[Dict[str, Any]] = None
+    provider: Optional[str] = None  # ASR provider planned for step 2 ('tingwu' uploads while downloading)
 
 
 class TaskSummary(BaseModel):
@@ -58,6 +59,7 @@ class TaskDetail(BaseModel):
     audio_path: Optional[str] = None  # Path to downloaded audio file
     logs: List[TaskLog] = []  # Task execution logs
     partial_segments: List[TranscriptSegment] = []  # Streaming transcript segments
+    queue_position: Optional[int] = None  # 1-based position in the job queue, None when not waiting
 
 
 class AppConfig(BaseModel):
@@ -71,7 +73,7 @@ class AppConfig(BaseModel):
     tencent_secret_key: Optional[str] = None
 
     # Storage config (provider: 'oss' or 'cos')
-    storage_provider: Optional[str] = None  # 'oss' = Alibaba OSS, 'cos' = Tencent COS
+    storage_provider: Optional[str] = None  # 'oss' = Alibaba OSS, 'cos' = Tencent COS, 'local' = local disk
     storage_bucket: Optional[str] = None
     storage_prefix: Optional[str] = None  # Folder path prefix, e.g., 'audio/tingwu'
     storage_public_host: Optional[str] = None
@@ -244,6 +246,12 @@ class HistoryStatus(str, Enum):
     DELETED = "deleted"
 
 
+class TagsSource(str, Enum):
+    """Who set a history record's tags."""
+    AUTO = "auto"  # Keyword extraction (possibly finding nothing)
+    USER = "user"
+
+
 class HistoryRecord(BaseModel):
     """A single history record in the history index."""
     task_id: str = Field(..., min_length=1, description="Unique task identifier")
@@ -254,10 +262,12 @@ class HistoryRecord(BaseModel):
     duration: int = Field(default=0, ge=0, description="Duration in seconds")
     file_size: int = Field(default=0, ge=0, description="File size in bytes")
     tags: List[str] = Field(default_factory=list, description="Keywords/tags")
+    tags_source: Optional[TagsSource] = Field(default=None, description="Who set the tags (None: not processed yet)")
     created_at: datetime = Field(..., description="Creation time")
     viewed: bool = Field(default=False, description="Whether record has been viewed")
     thumbnail_url: Optional[str] = Field(default=None, description="Thumbnail URL")
     status: HistoryStatus = Field(..., description="Record status")
+    owner: Optional[str] = Field(default=None, description="user_id the task belongs to (None for anonymous tasks)")
 
 
 class HistoryIndex(BaseModel):
@@ -273,9 +283,32 @@ class HistoryListResponse(BaseModel):
     page: int = Field(..., description="Current page number")
     limit: int = Field(..., description="Records per page")
     records: List[HistoryRecord] = Field(..., description="History records")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor for the next page (None on the last page)")
+    facets: Optional[Dict[str, int]] = Field(default=None, description="Record count per tag (first page only)")
 
 
 class HistoryUpdateRequest(BaseModel):
     """Request body for PATCH /history/{task_id}."""
     viewed: Optional[bool] = Field(default=None, description="Mark as viewed")
-    tags: Optional[List[str]] = Field(default=None, description="Update tags")
\ No newline at end of file
+    tags: Optional[List[str]] = Field(default=None, description="Update tags")
+
+
+class SearchHit(BaseModel):
+    """A matching transcript segment."""
+    start: float = Field(..., description="Segment start (seconds)")
+    end: float = Field(..., description="Segment end (seconds)")
+    snippet: str = Field(..., description="HTML-escaped excerpt, matched terms wrapped in <mark>")
+
+
+class SearchResult(BaseModel):
+    """A transcript matching a search query."""
+    task_id: str = Field(..., description="Task identifier")
+    title: Optional[str] = Field(default=None, description="History record title")
+    created_at: Optional[datetime] = Field(default=None, description="History record creation time")
+    hits: List[SearchHit] = Field(..., description="Best matching segments")
+
+
+class SearchResponse(BaseModel):
+    """Response for GET /search endpoint."""
+    query: str = Field(..., description="Search query")
+    results: List[SearchResult] = Field(..., description="Matching transcripts, best first")
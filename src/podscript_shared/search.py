@@ -0,0 +1,275 @@
+"""
+Full-text search over completed transcripts.
+
+Segments are stored in a SQLite FTS5 index (ARTIFACTS_DIR/search.db) and
+fed incrementally as tasks are saved to history. FTS5's built-in tokenizer
+doesn't segment Chinese, so text is pre-tokenized with jieba's search mode
+and indexed as space-separated terms; queries go through the same
+tokenizer and match segments containing every term, ranked by BM25.
+Each segment carries its task's owner, so a search is restricted to the
+caller's transcripts before results are ranked and cut.
+"""
+
+import html
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import jieba
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_CHARS = 120  # Longer segments are cut to a window around the first match
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_docs (
+    task_id TEXT PRIMARY KEY,
+    owner TEXT,
+    segments INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS search_segments (
+    id INTEGER PRIMARY KEY,
+    task_id TEXT NOT NULL,
+    owner TEXT,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_segments_task ON search_segments(task_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(terms);
+"""
+
+_WORD = re.compile(r"\w", re.UNICODE)
+_SRT_TIME = re.compile(r"(\d+):(\d+):(\d+)[,.](\d+)\s*-->\s*(\d+):(\d+):(\d+)[,.](\d+)")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased jieba search-mode terms, without whitespace/punctuation tokens."""
+    return [t for t in (w.strip().lower() for w in jieba.cut_for_search(text or "")) if t and _WORD.search(t)]
+
+
+class TranscriptIndex:
+    """
+    SQLite FTS5 index of transcript segments (WAL mode, one connection per thread).
+
+    FTS rowids are the search_segments ids, so a task's rows can be found
+    (and replaced) through the task_id index without scanning the FTS table.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize the index, creating the schema if needed.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        _drop_ownerless_schema(conn)
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, task_id: str, segments: Iterable[Any], owner: Optional[str] = None) -> int:
+        """
+        Index (or re-index) a task's transcript.
+
+        Args:
+            task_id: Task the segments belong to
+            segments: Dicts or TranscriptSegment objects with start/end/text
+            owner: user_id the task belongs to (None for anonymous tasks)
+
+        Returns:
+            Number of segments indexed
+        """
+        rows = []
+        for seg in segments:
+            seg = seg if isinstance(seg, dict) else seg.model_dump()
+            text = (seg.get("text") or "").strip()
+            if text:
+                rows.append((float(seg.get("start") or 0), float(seg.get("end") or 0), text, " ".join(tokenize(text))))
+
+        with self._conn() as conn:
+            _delete_task(conn, task_id)
+            for start, end, text, terms in rows:
+                cursor = conn.execute(
+                    "INSERT INTO search_segments (task_id, owner, start, end, text) VALUES (?, ?, ?, ?, ?)",
+                    (task_id, owner, start, end, text),
+                )
+                conn.execute("INSERT INTO search_fts (rowid, terms) VALUES (?, ?)", (cursor.lastrowid, terms))
+            conn.execute(
+                "INSERT OR REPLACE INTO search_docs (task_id, owner, segments, indexed_at) VALUES (?, ?, ?, ?)",
+                (task_id, owner, len(rows), time.time()),
+            )
+        logger.info(f"[{task_id}] Indexed {len(rows)} segments for search")
+        return len(rows)
+
+    def remove(self, task_id: str) -> None:
+        """Drop a task from the index."""
+        with self._conn() as conn:
+            _delete_task(conn, task_id)
+            conn.execute("DELETE FROM search_docs WHERE task_id = ?", (task_id,))
+
+    def is_indexed(self, task_id: str) -> bool:
+        """Check whether a task has been indexed."""
+        row = self._conn().execute("SELECT 1 FROM search_docs WHERE task_id = ?", (task_id,)).fetchone()
+        return row is not None
+
+    def indexed_ids(self) -> set:
+        """All indexed task_ids."""
+        return {row["task_id"] for row in self._conn().execute("SELECT task_id FROM search_docs")}
+
+    def search(
+        self, query: str, limit: int = 20, hits_per_task: int = 3, owner: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find transcripts containing every term of query.
+
+        Args:
+            query: Search text (Chinese, English or mixed)
+            limit: Maximum number of tasks returned
+            hits_per_task: Maximum matching segments returned per task
+            owner: Only search this user's transcripts (None: anonymous tasks only)
+
+        Returns:
+            List of {"task_id", "hits": [{"start", "end", "snippet"}]}, best
+            match first. Snippets are HTML-escaped with matched terms in <mark>.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = " ".join('"' + t.replace('"', '""') + '"' for t in dict.fromkeys(terms))
+
+        # Best segments first; enough rows to fill `limit` tasks in the common case
+        rows = self._conn().execute(
+            "SELECT s.task_id, s.start, s.end, s.text FROM search_fts"
+            " JOIN search_segments s ON s.id = search_fts.rowid"
+            " WHERE search_fts MATCH ? AND s.owner IS ? ORDER BY rank LIMIT ?",
+            (match, owner, limit * hits_per_task * 4),
+        ).fetchall()
+
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            hits = results.get(row["task_id"])
+            if hits is None:
+                if len(results) >= limit:
+                    continue
+                hits = results[row["task_id"]] = []
+            if len(hits) < hits_per_task:
+                hits.append({"start": row["start"], "end": row["end"], "snippet": _snippet(row["text"], terms)})
+        return [{"task_id": task_id, "hits": hits} for task_id, hits in results.items()]
+
+
+def _drop_ownerless_schema(conn: sqlite3.Connection) -> None:
+    """Drop an index built before owners were stored; backfill rebuilds it."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(search_segments)")}
+    if columns and "owner" not in columns:
+        logger.info("Search index predates per-owner search, rebuilding")
+        conn.executescript(
+            "DROP TABLE IF EXISTS search_fts; DROP TABLE IF EXISTS search_segments; DROP TABLE IF EXISTS search_docs;"
+        )
+
+
+def _delete_task(conn: sqlite3.Connection, task_id: str) -> None:
+    ids = [(row[0],) for row in conn.execute("SELECT id FROM search_segments WHERE task_id = ?", (task_id,))]
+    conn.executemany("DELETE FROM search_fts WHERE rowid = ?", ids)
+    conn.execute("DELETE FROM search_segments WHERE task_id = ?", (task_id,))
+
+
+def _snippet(text: str, terms: List[str]) -> str:
+    """HTML-escaped excerpt of text around the first match, with terms in <mark>."""
+    pattern = re.compile("|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True)), re.IGNORECASE)
+    first = pattern.search(text)
+    if len(text) > SNIPPET_CHARS:
+        begin = max(0, (first.start() if first else 0) - SNIPPET_CHARS // 3)
+        end = begin + SNIPPET_CHARS
+        text = ("…" if begin else "") + text[begin:end] + ("…" if end < len(text) else "")
+
+    parts, last = [], 0
+    for m in pattern.finditer(text):
+        parts.append(html.escape(text[last:m.start()]))
+        parts.append(f"<mark>{html.escape(m.group())}</mark>")
+        last = m.end()
+    parts.append(html.escape(text[last:]))
+    return "".join(parts)
+
+
+def read_task_segments(task_dir: Path) -> Optional[List[Dict[str, Any]]]:
+    """
+    Load a finished task's segments from result.json, or parse result.srt.
+
+    Returns:
+        Segments, or None if the task has no transcript on disk
+    """
+    json_path = Path(task_dir) / "result.json"
+    if json_path.exists():
+        try:
+            return json.loads(json_path.read_text(encoding="utf-8")).get("segments", [])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable {json_path}: {e}")
+
+    srt_path = Path(task_dir) / "result.srt"
+    if not srt_path.exists():
+        return None
+    segments = []
+    for block in re.split(r"\n\s*\n", srt_path.read_text(encoding="utf-8")):
+        lines = block.strip().splitlines()
+        times = _SRT_TIME.search(lines[1]) if len(lines) >= 2 else None
+        if times:
+            h1, m1, s1, ms1, h2, m2, s2, ms2 = (int(x) for x in times.groups())
+            segments.append({
+                "start": h1 * 3600 + m1 * 60 + s1 + ms1 / 1000,
+                "end": h2 * 3600 + m2 * 60 + s2 + ms2 / 1000,
+                "text": " ".join(lines[2:]),
+            })
+    return segments
+
+
+def backfill(
+    index: TranscriptIndex,
+    task_ids: Iterable[str],
+    artifacts_dir: str,
+    owner_of: Optional[Callable[[str], Optional[str]]] = None,
+) -> int:
+    """
+    Index finished tasks that aren't in the index yet (e.g. from before search existed).
+
+    Args:
+        index: Index to add to
+        task_ids: Candidate tasks
+        artifacts_dir: Directory holding the task directories
+        owner_of: Returns a task's user_id (default: every task is anonymous)
+
+    Returns:
+        Number of tasks indexed
+    """
+    done = index.indexed_ids()
+    count = 0
+    for task_id in task_ids:
+        if task_id in done:
+            continue
+        segments = read_task_segments(Path(artifacts_dir) / task_id)
+        if segments is not None:
+            index.add(task_id, segments, owner=owner_of(task_id) if owner_of else None)
+            count += 1
+    if count:
+        logger.info(f"Search backfill: indexed {count} transcripts")
+    return count
@@ -0,0 +1,768 @@
+"""
+Task store for in-flight transcription tasks.
+
+Replaces the in-memory TASKS / TASK_METADATA / TASK_SOURCES dicts with a
+pluggable store. The SQLite backend (default) survives restarts and can be
+shared by several uvicorn worker processes; finished tasks are evicted
+after a TTL so the store does not grow without bound. Jobs don't survive a
+restart: each queued or in-progress task records the process running its
+job (boot id + pid), and tasks whose owner process is gone are failed at
+startup (fail_interrupted). Tasks owned by sibling workers that are still
+alive are left alone.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .models import TaskDetail, TaskLog, TaskResults, TaskStatus, TranscriptSegment
+
+logger = logging.getLogger(__name__)
+
+# Store configuration
+TASK_STORE_BACKEND = os.getenv("TASK_STORE", "sqlite")  # 'sqlite' or 'memory'
+TASK_TTL_HOURS = float(os.getenv("TASK_TTL_HOURS", "72"))  # Finished tasks kept this long
+EVICT_INTERVAL_S = 600  # Minimum seconds between eviction sweeps
+LOG_BATCH_SIZE = 50  # Buffered log entries flushed at this size...
+LOG_FLUSH_INTERVAL_S = 0.5  # ...or after this many seconds
+
+FINISHED_STATUSES = {TaskStatus.completed, TaskStatus.failed}
+# Statuses of a task whose job is queued or running in its owner process
+IN_PROGRESS_STATUSES = {TaskStatus.queued, TaskStatus.downloading, TaskStatus.transcribing, TaskStatus.formatting}
+
+# Fields of TaskDetail that can be changed through update()
+TASK_FIELDS = {"status", "progress", "error", "results", "audio_path"}
+# Metadata columns; any other metadata key is kept in the extra JSON blob
+META_COLUMNS = {"user_id", "source_url", "credits_deducted"}
+
+
+def _boot_id() -> str:
+    try:
+        return Path("/proc/sys/kernel/random/boot_id").read_text().strip()
+    except OSError:
+        return "unknown"
+
+
+# Owner recorded on tasks whose job runs in this process
+PROCESS_OWNER = f"{_boot_id()}:{os.getpid()}"
+
+
+def owner_alive(owner: Optional[str]) -> bool:
+    """
+    Whether the process recorded as a task's owner is still running.
+
+    Owners from another boot, or that can't be parsed (rows written before
+    owners were recorded), count as gone.
+    """
+    boot_id, _, pid = (owner or "").rpartition(":")
+    if boot_id != _boot_id() or not pid.isdigit():
+        return False
+    if int(pid) == os.getpid():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TaskStore:
+    """
+    Interface for task storage backends.
+
+    Metadata (user_id, source_url, credits_deducted, ...) is stored with the
+    task but never exposed in the TaskDetail API response. Creating a task
+    or moving it into a queued/in-progress status records the store's owner
+    (this process) as the one running its job.
+    """
+
+    _last_evict = 0.0
+    owner = PROCESS_OWNER
+
+    def create(self, task: TaskDetail, claim: bool = True, **meta: Any) -> None:
+        """
+        Insert a new task with optional metadata.
+
+        Args:
+            task: The task
+            claim: Record this process as the owner of the task's job; pass
+                False for tasks no job runs for yet (direct-upload sessions
+                waiting on the client)
+            **meta: Metadata keys
+        """
+        raise NotImplementedError
+
+    def get(self, task_id: str) -> Optional[TaskDetail]:
+        """Return the full task (including logs and segments), or None."""
+        raise NotImplementedError
+
+    def get_summary(self, task_id: str) -> Optional[TaskDetail]:
+        """Return the task without logs and segments (cheap status read), or None."""
+        raise NotImplementedError
+
+    def exists(self, task_id: str) -> bool:
+        """Check whether a task exists."""
+        raise NotImplementedError
+
+    def update(self, task_id: str, **fields: Any) -> None:
+        """Update TaskDetail fields (status, progress, error, results, audio_path)."""
+        raise NotImplementedError
+
+    def transition(self, task_id: str, expected: TaskStatus, **fields: Any) -> bool:
+        """
+        Update fields only if the task is still in the expected status (compare-and-set).
+
+        Returns:
+            True if the task was updated, False if it's missing or its status changed
+        """
+        raise NotImplementedError
+
+    def delete(self, task_id: str) -> None:
+        """Remove a task and its logs/segments."""
+        raise NotImplementedError
+
+    def add_log(self, task_id: str, entry: TaskLog) -> None:
+        """Append a log entry (may be buffered)."""
+        raise NotImplementedError
+
+    def get_logs(self, task_id: str, offset: int = 0) -> List[TaskLog]:
+        """Return log entries starting at offset."""
+        raise NotImplementedError
+
+    def append_segments(self, task_id: str, segments: List[TranscriptSegment]) -> None:
+        """Append transcript segments."""
+        raise NotImplementedError
+
+    def set_segments(self, task_id: str, segments: List[TranscriptSegment]) -> None:
+        """Replace all transcript segments (bumps the segment generation)."""
+        raise NotImplementedError
+
+    def get_segments(self, task_id: str, offset: int = 0) -> List[TranscriptSegment]:
+        """Return transcript segments starting at offset."""
+        raise NotImplementedError
+
+    def get_segment_generation(self, task_id: str) -> int:
+        """Return how many times the task's segment list has been replaced (0 if missing)."""
+        raise NotImplementedError
+
+    def get_meta(self, task_id: str) -> Dict[str, Any]:
+        """Return task metadata ({} if the task does not exist)."""
+        raise NotImplementedError
+
+    def update_meta(self, task_id: str, **meta: Any) -> None:
+        """Update task metadata keys."""
+        raise NotImplementedError
+
+    def list_by_user(self, user_id: str, limit: int = 50) -> List[TaskDetail]:
+        """Return a user's most recent tasks (without logs/segments)."""
+        raise NotImplementedError
+
+    def owners_with_status(self, statuses: Iterable[TaskStatus]) -> Dict[str, Optional[str]]:
+        """Return {task_id: owner} for owned tasks in any of the given statuses."""
+        raise NotImplementedError
+
+    def fail_interrupted(self, message: str) -> List[str]:
+        """
+        Mark queued or in-progress tasks whose owner process is gone as failed.
+
+        Call at startup. Tasks owned by live processes (sibling uvicorn
+        workers, or an old worker still draining during a rolling restart)
+        are not touched, nor are unclaimed direct-upload sessions.
+
+        Args:
+            message: Error message stored on each task
+
+        Returns:
+            The ids of the failed tasks (credits refunds are up to the caller)
+        """
+        owners = self.owners_with_status(IN_PROGRESS_STATUSES)
+        task_ids = [task_id for task_id, owner in owners.items() if not owner_alive(owner)]
+        for task_id in task_ids:
+            self.update(task_id, status=TaskStatus.failed, error={"message": message})
+        if task_ids:
+            logger.warning(f"Marked {len(task_ids)} interrupted tasks as failed")
+        return task_ids
+
+    def evict_expired(self, ttl_seconds: Optional[float] = None) -> int:
+        """Delete finished tasks older than ttl_seconds. Returns count removed."""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Write any buffered data."""
+
+    def maybe_evict(self) -> int:
+        """Run evict_expired() at most once per EVICT_INTERVAL_S."""
+        now = time.time()
+        if now - self._last_evict < EVICT_INTERVAL_S:
+            return 0
+        self._last_evict = now
+        removed = self.evict_expired()
+        if removed:
+            logger.info(f"Evicted {removed} expired tasks")
+        return removed
+
+    @staticmethod
+    def _ttl(ttl_seconds: Optional[float]) -> float:
+        return TASK_TTL_HOURS * 3600 if ttl_seconds is None else ttl_seconds
+
+
+class MemoryTaskStore(TaskStore):
+    """In-process task store (single worker only, lost on restart)."""
+
+    def __init__(self, owner: str = PROCESS_OWNER):
+        self.owner = owner
+        self._tasks: Dict[str, TaskDetail] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._owners: Dict[str, str] = {}
+        self._segment_generations: Dict[str, int] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def create(self, task: TaskDetail, claim: bool = True, **meta: Any) -> None:
+        with self._lock:
+            self._tasks[task.id] = task.model_copy(deep=True)
+            self._meta[task.id] = {"credits_deducted": 0, **meta}
+            if claim:
+                self._owners[task.id] = self.owner
+
+    def get(self, task_id: str) -> Optional[TaskDetail]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return task.model_copy(deep=True) if task else None
+
+    def get_summary(self, task_id: str) -> Optional[TaskDetail]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task:
+                return None
+            return task.model_copy(update={"logs": [], "partial_segments": []}, deep=True)
+
+    def exists(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    def update(self, task_id: str, **fields: Any) -> None:
+        self._update(task_id, fields)
+
+    def transition(self, task_id: str, expected: TaskStatus, **fields: Any) -> bool:
+        return self._update(task_id, fields, expected)
+
+    def _update(self, task_id: str, fields: Dict[str, Any], expected: Optional[TaskStatus] = None) -> bool:
+        _check_fields(fields)
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task or (expected is not None and task.status != expected):
+                return False
+            for key, value in fields.items():
+                setattr(task, key, value)
+            if "status" in fields:
+                if task.status in IN_PROGRESS_STATUSES:
+                    self._owners[task_id] = self.owner
+                if task.status in FINISHED_STATUSES:
+                    self._finished_at[task_id] = time.time()
+                else:
+                    self._finished_at.pop(task_id, None)
+            return True
+
+    def delete(self, task_id: str) -> None:
+        with self._lock:
+            self._tasks.pop(task_id, None)
+            self._meta.pop(task_id, None)
+            self._owners.pop(task_id, None)
+            self._segment_generations.pop(task_id, None)
+            self._finished_at.pop(task_id, None)
+
+    def add_log(self, task_id: str, entry: TaskLog) -> None:
+        with self._lock:
+            if task_id in self._tasks:
+                self._tasks[task_id].logs.append(entry)
+
+    def get_logs(self, task_id: str, offset: int = 0) -> List[TaskLog]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return list(task.logs[offset:]) if task else []
+
+    def append_segments(self, task_id: str, segments: List[TranscriptSegment]) -> None:
+        with self._lock:
+            if task_id in self._tasks:
+                self._tasks[task_id].partial_segments.extend(segments)
+
+    def set_segments(self, task_id: str, segments: List[TranscriptSegment]) -> None:
+        with self._lock:
+            if task_id in self._tasks:
+                self._tasks[task_id].partial_segments = list(segments)
+                self._segment_generations[task_id] = self._segment_generations.get(task_id, 0) + 1
+
+    def get_segments(self, task_id: str, offset: int = 0) -> List[TranscriptSegment]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return list(task.partial_segments[offset:]) if task else []
+
+    def get_segment_generation(self, task_id: str) -> int:
+        with self._lock:
+            return self._segment_generations.get(task_id, 0)
+
+    def get_meta(self, task_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._meta.get(task_id, {}))
+
+    def update_meta(self, task_id: str, **meta: Any) -> None:
+        with self._lock:
+            if task_id in self._meta:
+                self._meta[task_id].update(meta)
+
+    def list_by_user(self, user_id: str, limit: int = 50) -> List[TaskDetail]:
+        with self._lock:
+            ids = [tid for tid, meta in self._meta.items() if meta.get("user_id") == user_id]
+            ids = ids[-limit:][::-1]  # Most recent first (dict keeps insertion order)
+            return [
+                self._tasks[tid].model_copy(update={"logs": [], "partial_segments": []})
+                for tid in ids
+            ]
+
+    def owners_with_status(self, statuses: Iterable[TaskStatus]) -> Dict[str, Optional[str]]:
+        wanted = set(statuses)
+        with self._lock:
+            return {
+                tid: self._owners[tid]
+                for tid, task in self._tasks.items()
+                if task.status in wanted and tid in self._owners
+            }
+
+    def evict_expired(self, ttl_seconds: Optional[float] = None) -> int:
+        cutoff = time.time() - self._ttl(ttl_seconds)
+        with self._lock:
+            expired = [tid for tid, ts in self._finished_at.items() if ts < cutoff]
+            for task_id in expired:
+                self.delete(task_id)
+            return len(expired)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    source_url TEXT,
+    credits_deducted INTEGER NOT NULL DEFAULT 0,
+    extra TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    progress REAL,
+    error TEXT,
+    results TEXT,
+    audio_path TEXT,
+    owner TEXT,
+    segment_generation INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_user ON tasks(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_finished ON tasks(finished_at);
+
+CREATE TABLE IF NOT EXISTS task_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    time TEXT NOT NULL,
+    level TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_task_logs_task ON task_logs(task_id, id);
+
+CREATE TABLE IF NOT EXISTS task_segments (
+    task_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL,
+    speaker TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (task_id, seq)
+);
+"""
+
+
+class SqliteTaskStore(TaskStore):
+    """
+    SQLite-backed task store (WAL mode, one connection per thread).
+
+    Log entries are buffered and written in batches: when the buffer fills,
+    LOG_FLUSH_INTERVAL_S after the first buffered entry, and at exit. Reads
+    from this process flush the buffer first so callers always see their
+    own writes. Segment sequence numbers come from a per-task counter, so
+    appends don't count the task's existing rows.
+    """
+
+    def __init__(self, db_path: Path, owner: str = PROCESS_OWNER):
+        """
+        Initialize the store, creating the schema if needed.
+
+        Args:
+            db_path: Path to the SQLite database file
+            owner: Owner recorded on tasks whose job runs here
+        """
+        self.db_path = Path(db_path)
+        self.owner = owner
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._log_buffer: List[tuple] = []
+        self._log_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._next_seq: Dict[str, int] = {}
+        self._seq_lock = threading.Lock()
+        atexit.register(self.flush)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _add_columns(conn)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---- tasks ----
+
+    def create(self, task: TaskDetail, claim: bool = True, **meta: Any) -> None:
+        now = time.time()
+        columns = {k: meta.pop(k) for k in list(meta) if k in META_COLUMNS}
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO tasks (task_id, user_id, source_url, credits_deducted, extra, status,"
+                " progress, error, results, audio_path, owner, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    task.id,
+                    columns.get("user_id"),
+                    columns.get("source_url"),
+                    columns.get("credits_deducted", 0),
+                    json.dumps(meta, default=str),
+                    task.status.value,
+                    task.progress,
+                    _dump(task.error),
+                    task.results.model_dump_json() if task.results else None,
+                    task.audio_path,
+                    self.owner if claim else None,
+                    now,
+                    now,
+                ),
+            )
+        for entry in task.logs:
+            self.add_log(task.id, entry)
+        if task.partial_segments:
+            self.append_segments(task.id, task.partial_segments)
+
+    def get(self, task_id: str) -> Optional[TaskDetail]:
+        self.flush()
+        row = self._conn().execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        task = _row_to_task(row)
+        task.logs = self.get_logs(task_id)
+        task.partial_segments = self.get_segments(task_id)
+        return task
+
+    def get_summary(self, task_id: str) -> Optional[TaskDetail]:
+        row = self._conn().execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return _row_to_task(row) if row is not None else None
+
+    def exists(self, task_id: str) -> bool:
+        row = self._conn().execute("SELECT 1 FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return row is not None
+
+    def update(self, task_id: str, **fields: Any) -> None:
+        self._update(task_id, fields)
+
+    def transition(self, task_id: str, expected: TaskStatus, **fields: Any) -> bool:
+        return self._update(task_id, fields, expected)
+
+    def _update(self, task_id: str, fields: Dict[str, Any], expected: Optional[TaskStatus] = None) -> bool:
+        _check_fields(fields)
+        if not fields:
+            return False
+        # Keep log ordering consistent with status changes
+        self.flush()
+        assignments = []
+        values: List[Any] = []
+        for key, value in fields.items():
+            if key == "status":
+                status = TaskStatus(value)
+                value = status.value
+                assignments.append("finished_at = ?")
+                values.append(time.time() if status in FINISHED_STATUSES else None)
+                if status in IN_PROGRESS_STATUSES:
+                    assignments.append("owner = ?")
+                    values.append(self.owner)
+            elif key == "error":
+                value = _dump(value)
+            elif key == "results":
+                value = value.model_dump_json() if value is not None else None
+            assignments.append(f"{key} = ?")
+            values.append(value)
+        assignments.append("updated_at = ?")
+        values.extend([time.time(), task_id])
+        where = "task_id = ?"
+        if expected is not None:
+            where += " AND status = ?"
+            values.append(TaskStatus(expected).value)
+        with self._conn() as conn:
+            updated = conn.execute(f"UPDATE tasks SET {', '.join(assignments)} WHERE {where}", values).rowcount
+        if updated and "status" in fields and TaskStatus(fields["status"]) in FINISHED_STATUSES:
+            with self._seq_lock:
+                self._next_seq.pop(task_id, None)
+        return bool(updated)
+
+    def delete(self, task_id: str) -> None:
+        self.flush()
+        with self._conn() as conn:
+            _delete_tasks(conn, [task_id])
+        with self._seq_lock:
+            self._next_seq.pop(task_id, None)
+
+    # ---- logs ----
+
+    def add_log(self, task_id: str, entry: TaskLog) -> None:
+        with self._log_lock:
+            self._log_buffer.append((task_id, entry.time, entry.level, entry.message, task_id))
+            due = (
+                len(self._log_buffer) >= LOG_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= LOG_FLUSH_INTERVAL_S
+            )
+            if not due and self._flush_timer is None:
+                # Nothing may log after this entry: flush it on a timer
+                self._flush_timer = threading.Timer(LOG_FLUSH_INTERVAL_S, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._log_lock:
+            batch, self._log_buffer = self._log_buffer, []
+            self._last_flush = time.monotonic()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not batch:
+                return
+            with self._conn() as conn:
+                conn.executemany(
+                    "INSERT INTO task_logs (task_id, time, level, message)"
+                    " SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM tasks WHERE task_id = ?)",
+                    batch,
+                )
+
+    def get_logs(self, task_id: str, offset: int = 0) -> List[TaskLog]:
+        self.flush()
+        rows = self._conn().execute(
+            "SELECT time, level, message FROM task_logs WHERE task_id = ? ORDER BY id"
+            " LIMIT -1 OFFSET ?",
+            (task_id, offset),
+        ).fetchall()
+        return [TaskLog(time=r["time"], level=r["level"], message=r["message"]) for r in rows]
+
+    # ---- segments ----
+
+    def append_segments(self, task_id: str, segments: List[TranscriptSegment]) -> None:
+        if not segments:
+            return
+        with self._seq_lock, self._conn() as conn:
+            start = self._next_seq.get(task_id)
+            if start is None:
+                (start,) = conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM task_segments WHERE task_id = ?", (task_id,)
+                ).fetchone()
+            self._insert_segments(conn, task_id, start, segments)
+
+    def set_segments(self, task_id: str, segments: List[TranscriptSegment]) -> None:
+        with self._seq_lock, self._conn() as conn:
+            conn.execute("DELETE FROM task_segments WHERE task_id = ?", (task_id,))
+            self._insert_segments(conn, task_id, 0, segments)
+            conn.execute(
+                "UPDATE tasks SET segment_generation = segment_generation + 1 WHERE task_id = ?", (task_id,)
+            )
+
+    def _insert_segments(
+        self, conn: sqlite3.Connection, task_id: str, start: int, segments: List[TranscriptSegment]
+    ) -> None:
+        """Insert segments numbered from start and advance the counter (caller holds _seq_lock)."""
+        conn.executemany(
+            "INSERT INTO task_segments (task_id, seq, start, end, text, speaker)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (task_id, start + i, s.start, s.end, s.text, s.speaker)
+                for i, s in enumerate(segments)
+            ],
+        )
+        self._next_seq[task_id] = start + len(segments)
+
+    def get_segments(self, task_id: str, offset: int = 0) -> List[TranscriptSegment]:
+        rows = self._conn().execute(
+            "SELECT start, end, text, speaker FROM task_segments WHERE task_id = ? AND seq >= ?"
+            " ORDER BY seq",
+            (task_id, offset),
+        ).fetchall()
+        return [
+            TranscriptSegment(start=r["start"], end=r["end"], text=r["text"], speaker=r["speaker"])
+            for r in rows
+        ]
+
+    def get_segment_generation(self, task_id: str) -> int:
+        row = self._conn().execute(
+            "SELECT segment_generation FROM tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        return row["segment_generation"] if row is not None else 0
+
+    # ---- metadata ----
+
+    def get_meta(self, task_id: str) -> Dict[str, Any]:
+        row = self._conn().execute(
+            "SELECT user_id, source_url, credits_deducted, extra FROM tasks WHERE task_id = ?",
+            (task_id,),
+        ).fetchone()
+        if row is None:
+            return {}
+        meta = json.loads(row["extra"] or "{}")
+        meta.update(
+            user_id=row["user_id"],
+            source_url=row["source_url"],
+            credits_deducted=row["credits_deducted"],
+        )
+        return meta
+
+    def update_meta(self, task_id: str, **meta: Any) -> None:
+        columns = {k: meta.pop(k) for k in list(meta) if k in META_COLUMNS}
+        with self._conn() as conn:
+            if columns:
+                assignments = ", ".join(f"{k} = ?" for k in columns)
+                conn.execute(
+                    f"UPDATE tasks SET {assignments} WHERE task_id = ?",
+                    [*columns.values(), task_id],
+                )
+            if meta:
+                row = conn.execute("SELECT extra FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+                if row is not None:
+                    extra = json.loads(row["extra"] or "{}")
+                    extra.update(meta)
+                    conn.execute(
+                        "UPDATE tasks SET extra = ? WHERE task_id = ?",
+                        (json.dumps(extra, default=str), task_id),
+                    )
+
+    # ---- queries & maintenance ----
+
+    def list_by_user(self, user_id: str, limit: int = 50) -> List[TaskDetail]:
+        rows = self._conn().execute(
+            "SELECT * FROM tasks WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+            (user_id, limit),
+        ).fetchall()
+        return [_row_to_task(r) for r in rows]
+
+    def owners_with_status(self, statuses: Iterable[TaskStatus]) -> Dict[str, Optional[str]]:
+        values = [TaskStatus(s).value for s in statuses]
+        if not values:
+            return {}
+        rows = self._conn().execute(
+            f"SELECT task_id, owner FROM tasks WHERE owner IS NOT NULL"
+            f" AND status IN ({', '.join('?' for _ in values)})",
+            values,
+        ).fetchall()
+        return {r["task_id"]: r["owner"] for r in rows}
+
+    def evict_expired(self, ttl_seconds: Optional[float] = None) -> int:
+        self.flush()
+        cutoff = time.time() - self._ttl(ttl_seconds)
+        with self._conn() as conn:
+            ids = [
+                r["task_id"]
+                for r in conn.execute(
+                    "SELECT task_id FROM tasks WHERE finished_at IS NOT NULL AND finished_at < ?",
+                    (cutoff,),
+                )
+            ]
+            _delete_tasks(conn, ids)
+        return len(ids)
+
+
+# Columns added after the first release: (name, definition, value for existing rows)
+_ADDED_COLUMNS = [
+    # Jobs of the previous version can't be attributed; fail them at startup
+    ("owner", "TEXT", "'legacy'"),
+    ("segment_generation", "INTEGER NOT NULL DEFAULT 0", None),
+]
+
+
+def _add_columns(conn: sqlite3.Connection) -> None:
+    """Add columns missing from databases created by an older version."""
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(tasks)")}
+    for name, definition, fill in _ADDED_COLUMNS:
+        if name in columns:
+            continue
+        try:
+            with conn:
+                conn.execute(f"ALTER TABLE tasks ADD COLUMN {name} {definition}")
+                if fill is not None:
+                    conn.execute(f"UPDATE tasks SET {name} = {fill}")
+        except sqlite3.OperationalError as e:
+            # Another worker process migrated the table first
+            if "duplicate column" not in str(e):
+                raise
+
+
+def _check_fields(fields: Dict[str, Any]) -> None:
+    unknown = set(fields) - TASK_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown task fields: {sorted(unknown)}")
+
+
+def _dump(value: Any) -> Optional[str]:
+    return json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+
+
+def _row_to_task(row: sqlite3.Row) -> TaskDetail:
+    return TaskDetail(
+        id=row["task_id"],
+        status=TaskStatus(row["status"]),
+        progress=row["progress"],
+        error=json.loads(row["error"]) if row["error"] else None,
+        results=TaskResults.model_validate_json(row["results"]) if row["results"] else None,
+        audio_path=row["audio_path"],
+    )
+
+
+def _delete_tasks(conn: sqlite3.Connection, task_ids: List[str]) -> None:
+    if not task_ids:
+        return
+    rows = [(tid,) for tid in task_ids]
+    conn.executemany("DELETE FROM task_logs WHERE task_id = ?", rows)
+    conn.executemany("DELETE FROM task_segments WHERE task_id = ?", rows)
+    conn.executemany("DELETE FROM tasks WHERE task_id = ?", rows)
+
+
+def create_task_store(artifacts_dir: str, backend: str = TASK_STORE_BACKEND) -> TaskStore:
+    """
+    Create the configured task store.
+
+    Args:
+        artifacts_dir: Directory holding the SQLite database (tasks.db)
+        backend: 'sqlite' (default) or 'memory'
+
+    Returns:
+        TaskStore instance
+    """
+    backend = (backend or "sqlite").lower().strip()
+    if backend == "memory":
+        return MemoryTaskStore()
+    if backend == "sqlite":
+        return SqliteTaskStore(Path(artifacts_dir) / "tasks.db")
+    raise ValueError(f"Unknown task store backend: '{backend}'. Supported: 'sqlite', 'memory'")
@@ -1,5 +1,6 @@
 import json
 import tempfile
+import threading
 import time
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -8,7 +9,7 @@ from unittest.mock import patch, MagicMock
 import jwt
 from fastapi.testclient import TestClient
 
-from podscript_api.main import app, TASKS, TASK_METADATA
+from podscript_api.main import app, task_store
 from podscript_api.middleware.auth import CurrentUser
 from podscript_shared.history import HistoryManager
 from podscript_shared.models import (
@@ -98,8 +99,7 @@ def test_transcribe_wrong_status():
         task = r.json()
         task_id = task["id"]
         # Force status to queued (before download complete)
-        TASKS[task_id].status = TaskStatus.queued
-        TASKS[task_id].audio_path = None
+        task_store.update(task_id, status=TaskStatus.queued, audio_path=None)
         # Try to transcribe before downloaded
         r2 = client.post(f"/tasks/{task_id}/transcribe", cookies=cookies)
         assert r2.status_code == 400
@@ -123,12 +123,124 @@ def test_transcribe_no_audio_path():
         r = client.post("/tasks", json={"source_url": "https://example.com/media"}, cookies=cookies)
         task = r.json()
         task_id = task["id"]
-        TASKS[task_id].status = TaskStatus.downloaded
-        TASKS[task_id].audio_path = None
+        task_store.update(task_id, status=TaskStatus.downloaded, audio_path=None)
         r2 = client.post(f"/tasks/{task_id}/transcribe", cookies=cookies)
         assert r2.status_code == 400
 
 
+def test_transcribe_claims_task_before_charging(tmp_path):
+    """A submit that loses the race for the task is rejected before credits are deducted."""
+    from fastapi import HTTPException
+    from unittest.mock import AsyncMock
+
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"x")
+    deduct = AsyncMock(side_effect=HTTPException(status_code=402, detail="no credits"))
+    with patch("podscript_api.middleware.auth.load_config", return_value=get_mock_config()), \
+            patch("podscript_api.main.deduct_user_credits", deduct), \
+            patch("podscript_api.main._get_audio_duration", return_value=60.0):
+        cookies = get_test_auth_cookie()
+        r = client.post("/tasks", json={"source_url": "https://example.com/media"}, cookies=cookies)
+        task_id = r.json()["id"]
+        task_store.update(task_id, status=TaskStatus.downloaded, audio_path=str(audio))
+
+        # A failed charge releases the claim
+        r2 = client.post(f"/tasks/{task_id}/transcribe", cookies=cookies)
+        assert r2.status_code == 402
+        assert task_store.get_summary(task_id).status == TaskStatus.downloaded
+
+        # Another request claimed the task between the status check and the charge
+        real_transition = task_store.transition
+
+        def lose_race(tid, expected, **fields):
+            real_transition(tid, TaskStatus.downloaded, status=TaskStatus.queued)
+            return real_transition(tid, expected, **fields)
+
+        deduct.reset_mock()
+        with patch.object(task_store, "transition", side_effect=lose_race):
+            r3 = client.post(f"/tasks/{task_id}/transcribe", cookies=cookies)
+        assert r3.status_code == 409
+        deduct.assert_not_called()
+
+
+def test_direct_upload_disabled():
+    """Test that direct uploads answer 501 so the client falls back to /tasks/upload."""
+    with patch("podscript_api.middleware.auth.load_config", return_value=get_mock_config()):
+        cookies = get_test_auth_cookie()
+        r = client.post("/uploads", json={"filename": "a.mp3"}, cookies=cookies)
+        assert r.status_code == 501
+
+
+def test_direct_upload_session_and_complete():
+    """Test the presigned-PUT upload flow leaves the task ready to transcribe."""
+    backend = MagicMock()
+    backend.sign_put.return_value = "https://bucket.example.com/put?sig=1"
+    backend.exists.return_value = True
+    with patch("podscript_api.middleware.auth.load_config", return_value=get_mock_config()), \
+            patch("podscript_api.main.DIRECT_UPLOAD_ENABLED", True), \
+            patch("podscript_pipeline.storage.get_backend", return_value=backend):
+        cookies = get_test_auth_cookie()
+        r = client.post("/uploads", json={"filename": "My Episode.mp3", "size": 3}, cookies=cookies)
+        assert r.status_code == 200
+        session = r.json()
+        assert session["upload_url"] == "https://bucket.example.com/put?sig=1"
+        assert session["headers"] == {"Content-Type": "audio/mpeg"}
+        key = backend.sign_put.call_args[0][0]
+        assert key.endswith(f"/uploads/{session['task_id']}/My_Episode.mp3")
+
+        r2 = client.post(f"/uploads/{session['task_id']}/complete", cookies=cookies)
+        assert r2.status_code == 200
+        assert r2.json()["status"] == "downloaded"
+        backend.exists.assert_called_with(key)
+        assert task_store.get_meta(session["task_id"])["object_key"] == key
+
+        # Completing again (e.g. after transcription started) is rejected
+        task_store.update(session["task_id"], status=TaskStatus.transcribing)
+        r3 = client.post(f"/uploads/{session['task_id']}/complete", cookies=cookies)
+        assert r3.status_code == 409
+        assert task_store.get_summary(session["task_id"]).status == TaskStatus.transcribing
+
+
+def test_tingwu_stats_requires_auth():
+    """Test that the Tingwu/storage counters are not public."""
+    assert client.get("/asr/tingwu/stats").status_code == 401
+    with patch("podscript_api.middleware.auth.load_config", return_value=get_mock_config()):
+        r = client.get("/asr/tingwu/stats", cookies=get_test_auth_cookie())
+        assert r.status_code == 200
+        assert "pending_jobs" in r.json()
+
+
+def test_artifacts_only_serve_task_files():
+    """Databases and history under ARTIFACTS_DIR are not reachable through /artifacts."""
+    from podscript_api.main import static_dir
+
+    task_dir = static_dir / "0123456789ab"
+    task_dir.mkdir(parents=True, exist_ok=True)
+    (task_dir / "result.md").write_text("# ok", encoding="utf-8")
+    (static_dir / "history" / "u1").mkdir(parents=True, exist_ok=True)
+    (static_dir / "history" / "u1" / "history.db").write_bytes(b"secret")
+
+    assert client.get("/artifacts/0123456789ab/result.md").text == "# ok"
+    assert client.get("/artifacts/tasks.db").status_code == 404
+    assert client.get("/artifacts/search.db").status_code == 404
+    assert client.get("/artifacts/history/u1/history.db").status_code == 404
+    assert client.get("/artifacts/.cache/media/x").status_code == 404
+
+
+def test_media_info_treats_downloaded_webm_as_audio():
+    """yt-dlp / pipelined downloads (audio.webm) are audio-only; other .webm files may be video."""
+    from podscript_api.main import _media_type, static_dir
+
+    task_dir = static_dir / "abcdefabcdef"
+    task_dir.mkdir(parents=True, exist_ok=True)
+    (task_dir / "audio.webm").write_bytes(b"x")
+
+    r = client.get("/media-info/abcdefabcdef")
+    assert r.json() == {"media_url": "/artifacts/abcdefabcdef/audio.webm", "media_type": "audio"}
+    assert _media_type(Path("talk.mp3")) == MediaType.AUDIO
+    assert _media_type(Path("talk.webm"), probe=False) == MediaType.VIDEO
+
+
 def test_get_task_not_found():
     r = client.get("/tasks/nonexistent999")
     assert r.status_code == 404
@@ -141,6 +253,78 @@ def test_get_results_not_found():
 
 # ============== History API Tests (T013, T014) ==============
 
+def _parse_sse(body: str):
+    """Split an SSE body into (event, id, data) tuples."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], fields.get("id"), fields.get("data")))
+    return events
+
+
+def _create_finished_task(task_id: str):
+    from podscript_shared.models import TaskDetail, TaskLog, TranscriptSegment
+
+    task_store.create(TaskDetail(id=task_id, status=TaskStatus.transcribing))
+    for i in range(2):
+        task_store.add_log(task_id, TaskLog(time="12:00:00", level="info", message=f"log {i}"))
+    task_store.append_segments(
+        task_id, [TranscriptSegment(start=float(i), end=float(i + 1), text=f"seg {i}") for i in range(3)]
+    )
+    task_store.update(task_id, status=TaskStatus.completed, progress=1.0)
+    task_store.flush()
+
+
+def test_task_events_not_found():
+    r = client.get("/tasks/nonexistent/events")
+    assert r.status_code == 404
+
+
+def test_task_events_stream():
+    """A finished task streams its logs, segments, final status and an end event."""
+    _create_finished_task("sse-task")
+    r = client.get("/tasks/sse-task/events")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(r.text)
+    kinds = [e[0] for e in events]
+    assert kinds == ["log", "log", "segment", "segment", "segment", "status", "end"]
+    assert events[4][1] == "2:3:0"
+    assert json.loads(events[5][2])["status"] == "completed"
+    task_store.delete("sse-task")
+
+
+def test_task_events_resume_from_last_event_id():
+    """Reconnecting with Last-Event-ID skips events already delivered."""
+    _create_finished_task("sse-resume")
+    r = client.get("/tasks/sse-resume/events", headers={"Last-Event-ID": "2:1"})
+    kinds = [e[0] for e in _parse_sse(r.text)]
+    assert kinds == ["segment", "segment", "status", "end"]
+    task_store.delete("sse-resume")
+
+
+def test_task_events_reset_when_segments_replaced():
+    """Replacing the segment list sends a reset, then the new list from the start."""
+    from podscript_shared.models import TranscriptSegment
+
+    _create_finished_task("sse-reset")
+    task_store.set_segments("sse-reset", [TranscriptSegment(start=0.0, end=2.0, text="final")])
+    # A client that had received 2 logs and 3 streamed segments reconnects
+    r = client.get("/tasks/sse-reset/events", headers={"Last-Event-ID": "2:3:0"})
+    events = _parse_sse(r.text)
+    assert [e[0] for e in events] == ["reset", "segment", "status", "end"]
+    assert events[0][1] == "2:0:1"
+    assert json.loads(events[1][2])["text"] == "final"
+    assert events[1][1] == "2:1:1"
+
+    # Resuming within the current generation doesn't reset
+    r = client.get("/tasks/sse-reset/events", headers={"Last-Event-ID": "2:1:1"})
+    assert [e[0] for e in _parse_sse(r.text)] == ["status", "end"]
+    task_store.delete("sse-reset")
+
+
 class TestHistoryAPI:
     """Tests for history API endpoints."""
 
@@ -242,6 +426,34 @@ class TestHistoryAPI:
             import shutil
             shutil.rmtree(tmpdir)
 
+    def test_get_history_cursor_and_facets(self):
+        """GET /history pages by cursor and returns tag facets on the first page."""
+        history_path, tmpdir = self._create_temp_history_with_records()
+        try:
+            with patch("podscript_api.main.get_history_manager") as mock:
+                mock.return_value = HistoryManager(history_path)
+                r = client.get("/history?limit=2")
+                data = r.json()
+                assert [rec["task_id"] for rec in data["records"]] == ["test00000002ab", "test00000001ab"]
+                assert data["facets"] == {"test": 3, "tag0": 1, "tag1": 1, "tag2": 1}
+                assert data["next_cursor"]
+
+                r = client.get(f"/history?limit=2&cursor={data['next_cursor']}")
+                data = r.json()
+                assert [rec["task_id"] for rec in data["records"]] == ["test00000000ab"]
+                assert data["next_cursor"] is None
+                assert data["facets"] is None
+                assert data["total"] == 3
+
+                r = client.get("/history?tag=tag1")
+                assert [rec["task_id"] for rec in r.json()["records"]] == ["test00000001ab"]
+                assert r.json()["total"] == 1
+
+                assert client.get("/history?cursor=bogus").status_code == 400
+        finally:
+            import shutil
+            shutil.rmtree(tmpdir)
+
     def test_get_history_record_by_id(self):
         """GET /history/{task_id} returns single record."""
         history_path, tmpdir = self._create_temp_history_with_records()
@@ -304,6 +516,7 @@ class TestHistoryAPI:
                 # Verify the update
                 r2 = client.get("/history/test00000001ab")
                 assert r2.json()["tags"] == new_tags
+                assert r2.json()["tags_source"] == "user"
         finally:
             import shutil
             shutil.rmtree(tmpdir)
@@ -350,4 +563,93 @@ class TestHistoryAPI:
             with patch("podscript_api.main.get_history_manager") as mock:
                 mock.return_value = HistoryManager(history_path)
                 r = client.delete("/history/nonexistent12")
-                assert r.status_code == 404
\ No newline at end of file
+                assert r.status_code == 404
+
+    def test_history_is_partitioned_by_user(self):
+        """Each user lists and edits only their own history; anonymous callers are refused when auth is on."""
+        from podscript_shared.history import HistoryPartitions
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            partitions = HistoryPartitions(tmpdir)
+            record = HistoryRecord(
+                task_id="mine00000001ab",
+                title="Mine",
+                source_type=SourceType.UPLOAD,
+                media_type=MediaType.AUDIO,
+                created_at=datetime.now(timezone.utc),
+                status=HistoryStatus.COMPLETED,
+            )
+            partitions.get(TEST_USER_ID).add_record(record)
+            with patch("podscript_api.middleware.auth.load_config", return_value=get_mock_config()), \
+                    patch("podscript_api.main.get_history_partitions", return_value=partitions):
+                cookies = get_test_auth_cookie()
+                r = client.get("/history", cookies=cookies)
+                assert [rec["task_id"] for rec in r.json()["records"]] == ["mine00000001ab"]
+                assert client.patch("/history/mine00000001ab", json={"viewed": True}, cookies=cookies).status_code == 200
+
+                assert client.get("/history").status_code == 401
+                assert client.get("/history/mine00000001ab").status_code == 401
+                assert client.patch("/history/mine00000001ab", json={"viewed": False}).status_code == 401
+                assert client.delete("/history/mine00000001ab").status_code == 401
+                assert client.get("/search?q=test").status_code == 401
+            assert partitions.get(TEST_USER_ID).get_record("mine00000001ab").viewed
+
+    def test_saved_task_is_tagged_after_postprocessing(self):
+        """save_task_to_history writes the record at once; tags are patched in off the ASR path."""
+        from podscript_api import main
+        from podscript_shared.history import HistoryPartitions
+        from podscript_shared.keywords import KeywordPool, extract_keywords
+
+        text = "人工智能和机器学习是当前最热门的技术领域。深度学习推动了人工智能的发展。"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            task_id = "post00000001ab"
+            (Path(tmpdir) / task_id).mkdir()
+            (Path(tmpdir) / task_id / "result.md").write_text(text, encoding="utf-8")
+            partitions = HistoryPartitions(tmpdir)
+            pool = KeywordPool(workers=0)
+            release = threading.Event()
+
+            def blocked_index():
+                release.wait(2)  # Post-processing is still running when save returns
+                return MagicMock()
+
+            try:
+                with patch.object(main.cfg, "artifacts_dir", tmpdir), \
+                        patch("podscript_api.main.get_history_partitions", return_value=partitions), \
+                        patch("podscript_api.main.get_keyword_pool", return_value=pool), \
+                        patch("podscript_api.main.get_transcript_index", side_effect=blocked_index):
+                    main.save_task_to_history(task_id)
+                    assert partitions.shared.get_record(task_id).tags == []
+
+                    release.set()
+                    deadline = time.time() + 5
+                    while not partitions.shared.get_record(task_id).tags and time.time() < deadline:
+                        time.sleep(0.05)
+                assert partitions.shared.get_record(task_id).tags == extract_keywords(text)
+            finally:
+                pool.shutdown()
+
+    def test_search_returns_history_metadata(self):
+        """GET /search joins index hits with history records and hides deleted ones."""
+        from podscript_shared.search import TranscriptIndex
+
+        history_path, tmpdir = self._create_temp_history_with_records()
+        try:
+            index = TranscriptIndex(Path(tmpdir) / "search.db")
+            index.add("test00000000ab", [{"start": 1, "end": 2, "text": "关于人工智能的讨论"}])
+            index.add("test00000001ab", [{"start": 3, "end": 4, "text": "人工智能与播客"}])
+            manager = HistoryManager(history_path)
+            manager.delete_record("test00000001ab")
+            with patch("podscript_api.main.get_history_manager", return_value=manager), \
+                    patch("podscript_api.main.get_transcript_index", return_value=index):
+                r = client.get("/search", params={"q": "人工智能"})
+                assert r.status_code == 200
+                results = r.json()["results"]
+                assert [res["task_id"] for res in results] == ["test00000000ab"]
+                assert results[0]["title"] == "Test Task 0"
+                assert results[0]["hits"][0]["start"] == 1
+
+                assert client.get("/search").status_code == 422
+        finally:
+            import shutil
+            shutil.rmtree(tmpdir)
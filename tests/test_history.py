@@ -3,20 +3,33 @@ Unit tests for HistoryManager and keyword extraction.
 """
 
 import json
+import sqlite3
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
 
-from podscript_shared.history import HistoryManager
-from podscript_shared.keywords import extract_keywords, extract_keywords_with_weight
+from podscript_shared.history import (
+    HistoryManager,
+    HistoryPartitions,
+    SqliteHistoryManager,
+    create_history_manager,
+    decode_cursor,
+)
+from podscript_shared.keywords import (
+    KeywordPool,
+    backfill_tags,
+    extract_keywords,
+    extract_keywords_with_weight,
+)
 from podscript_shared.models import (
     HistoryIndex,
     HistoryRecord,
     HistoryStatus,
     MediaType,
     SourceType,
+    TagsSource,
 )
 
 
@@ -352,6 +365,273 @@ class TestHistoryManagerListRecords:
         # Should not error, limit internally capped
 
 
+class TestHistoryManagerCache:
+    """Tests for the in-process read cache."""
+
+    def test_unchanged_file_is_not_reparsed(self, history_manager, sample_record, monkeypatch):
+        history_manager.add_record(sample_record)
+        history_manager.get_record(sample_record.task_id)
+
+        reads = []
+        original = HistoryManager._read
+        monkeypatch.setattr(HistoryManager, "_read", lambda self: reads.append(1) or original(self))
+        for _ in range(3):
+            assert history_manager.get_record(sample_record.task_id).title == sample_record.title
+            assert history_manager.list_records()[1] == 1
+        assert reads == []
+
+    def test_external_change_invalidates(self, temp_history_path, history_manager, sample_record):
+        history_manager.add_record(sample_record)
+        assert history_manager.get_record(sample_record.task_id) is not None
+
+        # Another process rewrites the file
+        data = json.loads(temp_history_path.read_text(encoding="utf-8"))
+        data["records"][0]["title"] = "Renamed elsewhere"
+        temp_history_path.write_text(json.dumps(data), encoding="utf-8")
+
+        assert history_manager.get_record(sample_record.task_id).title == "Renamed elsewhere"
+
+    def test_writes_visible_to_other_instances(self, temp_history_path, sample_record):
+        reader = HistoryManager(temp_history_path)
+        assert reader.list_records()[1] == 0
+
+        HistoryManager(temp_history_path).add_record(sample_record)
+        assert reader.get_record(sample_record.task_id) is not None
+
+    def test_load_returns_independent_list(self, history_manager, sample_record):
+        history_manager.add_record(sample_record)
+        history_manager.load().records.clear()
+        assert len(history_manager.load().records) == 1
+
+
+# ============== SqliteHistoryManager Tests ==============
+
+def _record(i, status=HistoryStatus.COMPLETED, created_at=None):
+    return HistoryRecord(
+        task_id=f"task{i:012d}",
+        title=f"Task {i}",
+        source_type=SourceType.YOUTUBE,
+        media_type=MediaType.VIDEO,
+        created_at=created_at or datetime(2025, 1, 1, 0, 0, i, tzinfo=timezone.utc),
+        status=status,
+    )
+
+
+class TestSqliteHistoryManager:
+    """Tests for the SQLite history backend."""
+
+    def test_crud_and_ordering(self, tmp_path):
+        manager = SqliteHistoryManager(tmp_path / "history.db")
+        for i in range(5):
+            manager.add_record(_record(i, HistoryStatus.FAILED if i == 3 else HistoryStatus.COMPLETED))
+        manager.add_record(_record(0))  # Duplicate skipped
+
+        records, total = manager.list_records(page=1, limit=2)
+        assert total == 5
+        assert [r.task_id for r in records] == ["task000000000004", "task000000000003"]
+
+        assert manager.update_record("task000000000001", viewed=True, tags=["AI"])
+        assert not manager.update_record("missing", viewed=True)
+        assert manager.delete_record("task000000000002")
+
+        # A fresh instance sees the same rows
+        reopened = SqliteHistoryManager(tmp_path / "history.db")
+        record = reopened.get_record("task000000000001")
+        assert record.viewed and record.tags == ["AI"]
+        assert reopened.list_records()[1] == 4
+        assert reopened.list_records(status="failed")[1] == 1
+        assert reopened.list_records(include_deleted=True)[1] == 5
+
+    def test_migrates_history_json_once(self, tmp_path):
+        legacy = HistoryManager(tmp_path / "history.json")
+        for i in range(3):
+            legacy.add_record(_record(i, created_at=datetime(2025, 1, 1, tzinfo=timezone.utc)))
+        order = [r.task_id for r in legacy.load().records]
+
+        manager = create_history_manager(str(tmp_path))
+        assert isinstance(manager, SqliteHistoryManager)
+        records, total = manager.list_records()
+        assert total == 3
+        # Same created_at: ties are ordered by task_id, newest first
+        assert [r.task_id for r in records] == order
+        assert not (tmp_path / "history.json").exists()
+        assert (tmp_path / "history.json.migrated").exists()
+
+        manager.delete_record("task000000000000")
+        assert create_history_manager(str(tmp_path)).list_records()[1] == 2
+
+    def test_json_backend_still_available(self, tmp_path):
+        manager = create_history_manager(str(tmp_path), backend="json")
+        manager.add_record(_record(1))
+        assert (tmp_path / "history.json").exists()
+        with pytest.raises(ValueError):
+            create_history_manager(str(tmp_path), backend="redis")
+
+
+# ============== Cursor Pagination Tests ==============
+
+@pytest.fixture(params=["json", "sqlite"])
+def any_manager(request, tmp_path):
+    """A history manager of each backend."""
+    return create_history_manager(str(tmp_path), backend=request.param)
+
+
+def _walk(manager, **filters):
+    """All task_ids reachable by following next_cursor, plus the page count."""
+    seen, cursor, pages = [], None, 0
+    while True:
+        records, cursor = manager.list_page(cursor=cursor, limit=3, **filters)
+        seen += [r.task_id for r in records]
+        pages += 1
+        if cursor is None:
+            return seen, pages
+
+
+class TestHistoryCursorPagination:
+    """Tests for list_page, count and tag_counts on both backends."""
+
+    def test_walks_newest_first(self, any_manager):
+        for i in range(8):
+            # Pairs share a created_at; task_id breaks the tie
+            any_manager.add_record(_record(i, created_at=datetime(2025, 1, 1, 0, 0, i // 2, tzinfo=timezone.utc)))
+        any_manager.delete_record("task000000000005")
+
+        seen, pages = _walk(any_manager)
+        assert seen == [f"task{i:012d}" for i in (7, 6, 4, 3, 2, 1, 0)]
+        assert pages == 3
+        assert any_manager.count() == 7
+        assert any_manager.count(include_deleted=True) == 8
+        # Offset pages use the same order
+        assert [r.task_id for r in any_manager.list_records(page=2, limit=3)[0]] == seen[3:6]
+
+    def test_pages_stable_under_inserts(self, any_manager):
+        for i in range(1, 7):
+            any_manager.add_record(_record(i))
+        first, cursor = any_manager.list_page(limit=3)
+
+        # A newer and an older record arrive while the user scrolls
+        any_manager.add_record(_record(9))
+        any_manager.add_record(_record(0))
+        second, _ = any_manager.list_page(cursor=cursor, limit=3)
+        assert [r.task_id for r in first + second] == [f"task{i:012d}" for i in (6, 5, 4, 3, 2, 1)]
+
+    def test_status_and_tag_filters(self, any_manager):
+        for i in range(6):
+            record = _record(i, HistoryStatus.FAILED if i % 3 == 0 else HistoryStatus.COMPLETED)
+            record.tags = ["AI"] + (["访谈"] if i % 2 else [])
+            any_manager.add_record(record)
+        any_manager.update_record("task000000000004", tags=["访谈", "访谈"])
+        any_manager.delete_record("task000000000005")
+
+        assert _walk(any_manager, tag="访谈")[0] == ["task000000000004", "task000000000003", "task000000000001"]
+        assert _walk(any_manager, status="failed", tag="AI")[0] == ["task000000000003", "task000000000000"]
+        assert _walk(any_manager, tag="missing")[0] == []
+        assert any_manager.count(tag="AI") == 4
+        assert any_manager.count(status="failed") == 2
+        assert any_manager.tag_counts() == {"AI": 4, "访谈": 3}
+        assert any_manager.tag_counts(status="failed") == {"AI": 2, "访谈": 1}
+        assert any_manager.tag_counts(include_deleted=True) == {"AI": 5, "访谈": 4}
+
+    def test_invalid_cursor(self, any_manager):
+        with pytest.raises(ValueError):
+            any_manager.list_page(cursor="not-a-cursor")
+
+    def test_cursor_round_trip(self, any_manager):
+        for i in range(3):
+            any_manager.add_record(_record(i))
+        _, cursor = any_manager.list_page(limit=1)
+        assert decode_cursor(cursor) == (datetime(2025, 1, 1, 0, 0, 2, tzinfo=timezone.utc).timestamp(), "task000000000002")
+
+    def test_sqlite_builds_indexes_for_existing_db(self, tmp_path):
+        db = tmp_path / "history.db"
+        record = _record(1)
+        record.tags = ["AI"]
+        SqliteHistoryManager(db).add_record(record)
+
+        # Simulate a database from before the tag/count tables existed
+        with sqlite3.connect(db) as conn:
+            conn.execute("DROP TABLE history_tags")
+            conn.execute("DROP TABLE history_tag_counts")
+            conn.execute("DROP TABLE history_status_counts")
+            conn.execute("DELETE FROM history_meta WHERE key = 'schema'")
+
+        manager = SqliteHistoryManager(db)
+        assert manager.count() == 1
+        assert manager.tag_counts() == {"AI": 1}
+        assert _walk(manager, tag="AI")[0] == ["task000000000001"]
+
+
+# ============== HistoryPartitions Tests ==============
+
+class TestHistoryPartitions:
+    """Tests for per-user history partitions."""
+
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_users_are_isolated(self, tmp_path, backend):
+        partitions = HistoryPartitions(str(tmp_path), backend=backend)
+        partitions.get("alice").add_record(_record(1))
+        partitions.get("bob").add_record(_record(2))
+        partitions.get(None).add_record(_record(3))
+
+        assert [r.task_id for r in partitions.get("alice").list_page()[0]] == ["task000000000001"]
+        assert partitions.get("bob").get_record("task000000000001") is None
+        assert partitions.get(None) is partitions.shared
+        assert partitions.shared.count() == 1
+        assert (tmp_path / "history" / "alice").is_dir()
+        assert sorted(m.count() for m in partitions.managers()) == [1, 1, 1]
+
+    def test_unsafe_user_id_is_hashed(self, tmp_path):
+        partitions = HistoryPartitions(str(tmp_path))
+        path = partitions.partition_dir("../../etc")
+        assert path.parent == tmp_path / "history"
+        assert len(path.name) == 64
+
+    def test_evicted_partition_reopens(self, tmp_path):
+        partitions = HistoryPartitions(str(tmp_path), max_open=1)
+        partitions.get("alice").add_record(_record(1))
+        partitions.get("bob")  # Evicts alice
+        assert partitions.get("alice").get_record("task000000000001") is not None
+
+    def test_split_shared_moves_owned_records(self, tmp_path):
+        partitions = HistoryPartitions(str(tmp_path))
+        for i in range(3):
+            partitions.shared.add_record(_record(i))
+
+        owners = {"task000000000000": "alice", "task000000000002": "alice"}
+        assert partitions.split_shared(owners.get) == 2
+        assert [r.task_id for r in partitions.shared.load().records] == ["task000000000001"]
+        assert [r.task_id for r in partitions.get("alice").list_page()[0]] == ["task000000000002", "task000000000000"]
+        assert partitions.split_shared(owners.get) == 0
+
+    def test_split_shared_prefers_record_owner(self, tmp_path):
+        partitions = HistoryPartitions(str(tmp_path))
+        partitions.shared.add_record(_record(1).model_copy(update={"owner": "alice"}))
+
+        # No task metadata left for the task, but the record names its owner
+        assert partitions.split_shared(lambda task_id: None) == 1
+        assert partitions.shared.count() == 0
+        assert partitions.get("alice").get_record("task000000000001").owner == "alice"
+
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_split_shared_keeps_records_added_meanwhile(self, tmp_path, backend):
+        partitions = HistoryPartitions(str(tmp_path), backend=backend)
+        partitions.shared.add_record(_record(1))
+
+        def owner_of(task_id):
+            # Another writer adds an anonymous record while the split runs
+            partitions.shared.add_record(_record(2))
+            return "alice"
+
+        assert partitions.split_shared(owner_of) == 1
+        assert [r.task_id for r in partitions.shared.load().records] == ["task000000000002"]
+
+    def test_managers_reuse_open_partitions(self, tmp_path):
+        partitions = HistoryPartitions(str(tmp_path))
+        alice = partitions.get("alice")
+        hashed = partitions.get("a/b")
+        assert list(partitions.managers())[1:] == sorted([alice, hashed], key=lambda m: m.db_path.parent.name)
+
+
 # ============== Keyword Extraction Tests ==============
 
 class TestKeywordExtraction:
@@ -395,3 +675,67 @@ class TestKeywordExtraction:
 
         assert len(keywords) <= 5
         assert isinstance(keywords, list)
+
+
+class TestKeywordPool:
+    """Tests for pooled and batch keyword extraction."""
+
+    TEXTS = [
+        "人工智能和机器学习是当前最热门的技术领域。深度学习推动了人工智能的发展。",
+        "",
+        "播客转写让音频内容可以被搜索，播客节目的文字稿也方便阅读。",
+    ]
+
+    def test_thread_pool_matches_direct_extraction(self):
+        pool = KeywordPool(workers=0)
+        try:
+            assert pool.extract(self.TEXTS[0], top_k=3) == extract_keywords(self.TEXTS[0], top_k=3)
+            expected = [extract_keywords(t) for t in self.TEXTS]
+            assert pool.extract_many(self.TEXTS, batch_size=2) == expected
+        finally:
+            pool.shutdown()
+
+    def test_process_pool(self):
+        pool = KeywordPool(workers=1)
+        try:
+            assert pool.extract_many(self.TEXTS) == [extract_keywords(t) for t in self.TEXTS]
+        finally:
+            pool.shutdown()
+
+    def test_backfill_tags_untagged_records(self, tmp_path):
+        manager = create_history_manager(str(tmp_path))
+        for i, text in enumerate(self.TEXTS):
+            manager.add_record(_record(i))
+            (tmp_path / f"task{i:012d}").mkdir()
+            (tmp_path / f"task{i:012d}" / "result.md").write_text(text, encoding="utf-8")
+        manager.add_record(_record(3))  # No transcript on disk
+        manager.update_record("task000000000002", tags=["手动"])
+
+        pool = KeywordPool(workers=0)
+        try:
+            assert backfill_tags(manager, str(tmp_path), pool) == 1
+            assert backfill_tags(manager, str(tmp_path), pool) == 0
+        finally:
+            pool.shutdown()
+        assert manager.get_record("task000000000000").tags == extract_keywords(self.TEXTS[0])
+        assert manager.get_record("task000000000001").tags == []
+        assert manager.get_record("task000000000002").tags == ["手动"]
+        assert manager.get_record("task000000000001").tags_source == TagsSource.AUTO  # Empty: not retried
+
+    def test_backfill_skips_processed_and_user_cleared_records(self, tmp_path):
+        manager = create_history_manager(str(tmp_path))
+        for i in range(2):
+            manager.add_record(_record(i))
+            (tmp_path / f"task{i:012d}").mkdir()
+            (tmp_path / f"task{i:012d}" / "result.md").write_text(self.TEXTS[0], encoding="utf-8")
+        manager.update_record("task000000000000", tags=[], tags_source=TagsSource.USER)  # Cleared by the user
+        manager.update_record("task000000000001", tags_source=TagsSource.AUTO)  # Extraction found nothing
+
+        pool = KeywordPool(workers=0)
+        try:
+            assert backfill_tags(manager, str(tmp_path), pool) == 0
+        finally:
+            pool.shutdown()
+        assert manager.get_record("task000000000000").tags == []
+        assert manager.get_record("task000000000001").tags == []
+
@@ -0,0 +1,118 @@
+"""
+Tests for the streaming/resumable HTTP downloader (against a mock transport).
+"""
+
+import re
+import threading
+
+import httpx
+import pytest
+
+from podscript_pipeline import http_download
+from podscript_pipeline.http_download import RangeNotSupported, download_file
+
+DATA = bytes(range(256)) * 4096  # 1 MB
+
+
+class _Server:
+    """Mock HTTP server with optional Range support and a one-time dropped connection."""
+
+    def __init__(self, ranges=True, drop_after=None, intact=1):
+        self.ranges = ranges
+        self.drop_after = drop_after  # Cut the first download (not probe) response after this many bytes
+        self.intact = intact  # Requests served whole before the drop (the probe)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def handler(self, request):
+        range_header = request.headers.get("range")
+        with self.lock:
+            self.requests.append(range_header)
+        headers = {"content-disposition": 'attachment; filename="ep.mp3"'}
+
+        if self.ranges and range_header:
+            start, end = re.match(r"bytes=(\d+)-(\d*)", range_header).groups()
+            start, end = int(start), int(end) if end else len(DATA) - 1
+            body = DATA[start:end + 1]
+            headers["content-range"] = f"bytes {start}-{end}/{len(DATA)}"
+            status = 206
+        else:
+            body, status = DATA, 200
+
+        if self.drop_after is not None and len(self.requests) > self.intact and len(body) > self.drop_after:
+            cut, self.drop_after = self.drop_after, None
+            return httpx.Response(status, headers=headers, stream=_DroppingStream(body[:cut]))
+        return httpx.Response(status, headers=headers, content=body)
+
+    def client(self):
+        return httpx.Client(transport=httpx.MockTransport(self.handler))
+
+
+class _DroppingStream(httpx.SyncByteStream):
+    """Yields some bytes, then fails like a reset connection."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def __iter__(self):
+        yield self.data
+        raise httpx.ReadError("connection reset")
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_download.time, "sleep", lambda s: None)
+
+
+def test_single_stream_download(tmp_path):
+    server = _Server()
+    headers = download_file("http://x/ep.mp3", tmp_path / "a.mp3", segments=1, client=server.client())
+    assert (tmp_path / "a.mp3").read_bytes() == DATA
+    assert "ep.mp3" in headers["content-disposition"]
+    assert not (tmp_path / "a.mp3.part").exists()
+
+
+def test_resumes_after_dropped_connection(tmp_path):
+    server = _Server(drop_after=300_000)
+    download_file("http://x/ep.mp3", tmp_path / "a.mp3", segments=1, client=server.client())
+    assert (tmp_path / "a.mp3").read_bytes() == DATA
+    assert server.requests[-1] == f"bytes=300000-{len(DATA) - 1}"
+
+
+def test_restarts_when_server_has_no_ranges(tmp_path):
+    server = _Server(ranges=False, drop_after=300_000)
+    download_file("http://x/ep.mp3", tmp_path / "a.mp3", segments=4, client=server.client())
+    assert (tmp_path / "a.mp3").read_bytes() == DATA
+    assert server.requests[1:] == [None, None]
+
+
+def test_parallel_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_download, "HTTP_SEGMENT_MIN_MB", 0.25)
+    server = _Server(drop_after=100_000)
+    download_file("http://x/ep.mp3", tmp_path / "a.mp3", segments=4, client=server.client())
+    assert (tmp_path / "a.mp3").read_bytes() == DATA
+    segment_requests = [r for r in server.requests[1:] if r]
+    assert len(segment_requests) == 5  # 4 segments + 1 resume
+
+
+def test_segment_fails_if_range_ignored(tmp_path):
+    server = _Server()
+    client = server.client()
+    with open(tmp_path / "f", "wb") as f, pytest.raises(RangeNotSupported):
+        server.ranges = False
+        http_download._stream_range(client, "http://x/a", f, 100, 200, 0, resumable=True, whole_file=False)
+
+
+def test_stream_resumes_in_order():
+    server = _Server(drop_after=300_000, intact=0)
+    received = bytearray()
+    _, size = http_download.stream_download("http://x/ep.mp3", received.extend, client=server.client())
+    assert bytes(received) == DATA and size == len(DATA)
+    assert server.requests == [None, "bytes=300000-"]
+
+
+def test_stream_skips_resent_bytes_without_ranges():
+    server = _Server(ranges=False, drop_after=300_000, intact=0)
+    received = bytearray()
+    http_download.stream_download("http://x/ep.mp3", received.extend, client=server.client())
+    assert bytes(received) == DATA
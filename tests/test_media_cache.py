@@ -0,0 +1,98 @@
+"""
+Tests for the shared media download cache.
+"""
+
+import threading
+import time
+
+import pytest
+
+from podscript_pipeline.media_cache import MediaCache, normalize_url
+
+
+def _downloader(calls, size=100, delay=0.0):
+    """Fake download: writes audio.mp3 and thumbnail.jpg into the target dir."""
+    def download(target_dir):
+        calls.append(target_dir)
+        time.sleep(delay)
+        audio = target_dir / "audio.mp3"
+        audio.write_bytes(b"x" * size)
+        (target_dir / "thumbnail.jpg").write_bytes(b"jpg")
+        return audio, "audio/mpeg"
+    return download
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.COM:443/a.mp3?b=2&a=1&utm_source=x#t=5") == \
+        "https://example.com/a.mp3?a=1&b=2"
+    assert normalize_url("http://example.com:8080/a.mp3") == "http://example.com:8080/a.mp3"
+
+
+class TestMediaCache:
+    """Tests for MediaCache."""
+
+    def test_second_fetch_links_cached_file(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+        calls = []
+
+        first, mime = cache.fetch("Youtube:abc", _downloader(calls), tmp_path / "t1")
+        second, _ = cache.fetch("Youtube:abc", _downloader(calls), tmp_path / "t2")
+
+        assert len(calls) == 1
+        assert mime == "audio/mpeg"
+        assert first == tmp_path / "t1" / "audio.mp3"
+        assert second.read_bytes() == first.read_bytes()
+        assert (tmp_path / "t2" / "thumbnail.jpg").exists()
+        assert second.stat().st_ino == first.stat().st_ino  # Hard-linked, not copied
+
+    def test_concurrent_fetches_download_once(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+        calls = []
+        download = _downloader(calls, delay=0.2)
+        results = []
+
+        def fetch(i):
+            results.append(cache.fetch("Youtube:abc", download, tmp_path / f"t{i}"))
+
+        threads = [threading.Thread(target=fetch, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert len(results) == 4
+        assert all(path.exists() for path, _ in results)
+
+    def test_failed_download_is_not_cached(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+
+        def fail(target_dir):
+            (target_dir / "partial").write_bytes(b"x")
+            raise RuntimeError("network down")
+
+        with pytest.raises(RuntimeError):
+            cache.fetch("Youtube:abc", fail, tmp_path / "t1")
+
+        calls = []
+        cache.fetch("Youtube:abc", _downloader(calls), tmp_path / "t1")
+        assert len(calls) == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache", max_bytes=400)  # Room for two entries
+        calls = []
+        cache.fetch("a", _downloader(calls), tmp_path / "t1")
+        time.sleep(0.02)
+        cache.fetch("b", _downloader(calls), tmp_path / "t2")
+        time.sleep(0.02)
+        cache.fetch("a", _downloader(calls), tmp_path / "t3")  # Refresh "a"
+        time.sleep(0.02)
+        cache.fetch("c", _downloader(calls), tmp_path / "t4")  # Over budget: "b" goes
+
+        assert len(calls) == 3
+        cache.fetch("a", _downloader(calls), tmp_path / "t5")
+        assert len(calls) == 3
+        cache.fetch("b", _downloader(calls), tmp_path / "t6")
+        assert len(calls) == 4
+        # Task copies survive eviction of the cache entry
+        assert (tmp_path / "t2" / "audio.mp3").exists()
@@ -1,3 +1,4 @@
+import hashlib
 from pathlib import Path
 
 from podscript_pipeline.pipeline import run_pipeline
@@ -9,4 +10,152 @@ def test_run_pipeline(tmp_path: Path):
     res = run_pipeline("t123", "https://example.com/media", str(artifacts))
     assert Path(res["srt_path"]).exists()
     assert Path(res["md_path"]).exists()
-    assert res["meta"]["segments"] == 2
\ No newline at end of file
+    assert res["meta"]["segments"] == 2
+
+def test_segment_capture_streams_verbose_segments():
+    """Segments printed by Whisper's verbose mode are parsed as they appear."""
+    from podscript_pipeline.whisper_adapter import SegmentCapture
+
+    segments, logs = [], []
+    with SegmentCapture(segments.append, logs.append, duration=100.0):
+        print("Detected language: Chinese")
+        print("[00:00.000 --> 00:04.500] 大家好")
+        print("[01:00:01.250 --> 01:00:02.000]  hello")
+    assert segments == [
+        {"start": 0.0, "end": 4.5, "text": "大家好", "speaker": ""},
+        {"start": 3601.25, "end": 3602.0, "text": "hello", "speaker": ""},
+    ]
+    assert logs == ["转写进度: 100% (01:40/01:40)"]
+
+
+def test_segment_captures_on_concurrent_threads():
+    """Overlapping captures on two threads each get their own thread's segments."""
+    import sys
+    import threading
+
+    from podscript_pipeline.whisper_adapter import SegmentCapture
+
+    second_entered, first_exited = threading.Event(), threading.Event()
+    results = {}
+
+    def first():
+        segments = []
+        with SegmentCapture(segments.append):
+            second_entered.wait(5)
+            print("[00:01.000 --> 00:02.000] first")
+        first_exited.set()  # Exits while the other capture is still active
+        results["first"] = [seg["text"] for seg in segments]
+
+    def second():
+        segments = []
+        with SegmentCapture(segments.append):
+            second_entered.set()
+            first_exited.wait(5)
+            print("[00:03.000 --> 00:04.000] second")
+        results["second"] = [seg["text"] for seg in segments]
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert results == {"first": ["first"], "second": ["second"]}
+    assert not isinstance(sys.stdout, SegmentCapture)
+
+
+def test_pcm_transcribed_in_bounded_windows(tmp_path, monkeypatch):
+    """Long PCM input is fed to Whisper window by window with shifted timestamps."""
+    import numpy as np
+
+    from podscript_pipeline import whisper_adapter
+
+    class FakeModel:
+        def __init__(self):
+            self.calls = []
+
+        def transcribe(self, audio, **options):
+            self.calls.append((len(audio), options.get("language")))
+            seconds = len(audio) / 16000
+            print(f"[00:00.000 --> {int(seconds) // 60:02d}:{seconds % 60:06.3f}] part")
+            return {"language": "zh", "segments": [{"start": 0.0, "end": seconds, "text": "part"}]}
+
+    pcm = tmp_path / "audio.16k.pcm"
+    # Continuous noise (no silences), so windows are cut at exactly the target length
+    np.random.default_rng(0).integers(-8000, 8000, 16000 * 250, dtype=np.int16).tofile(pcm)
+    monkeypatch.setattr(whisper_adapter, "WHISPER_WINDOW_SECONDS", 100.0)
+
+    model = FakeModel()
+    streamed = []
+    result = whisper_adapter._transcribe_pcm(model, pcm, {"task": "transcribe"}, None, streamed.append)
+
+    assert [n for n, _ in model.calls] == [16000 * 100, 16000 * 150]
+    assert [lang for _, lang in model.calls] == [None, "zh"]
+    assert [(s["start"], s["end"]) for s in result["segments"]] == [(0.0, 100.0), (100.0, 250.0)]
+    assert [s["start"] for s in streamed] == [0.0, 100.0]
+    assert result["text"] == "partpart"
+
+
+def test_ytdlp_native_mode_keeps_delivered_codec(tmp_path):
+    """Native mode stream-copies the audio; mp3 mode re-encodes as before."""
+    from podscript_pipeline.download import _ytdlp_options, audio_mime_type
+
+    native = _ytdlp_options(tmp_path, mode="native")["postprocessors"]
+    assert native == [{"key": "FFmpegExtractAudio", "preferredcodec": "best"}]
+    mp3 = _ytdlp_options(tmp_path, mode="mp3")["postprocessors"]
+    assert mp3[0]["preferredcodec"] == "mp3"
+
+    assert audio_mime_type(tmp_path / "audio.opus") == "audio/ogg"
+    assert audio_mime_type(tmp_path / "audio.m4a") == "audio/mp4"
+    assert audio_mime_type(tmp_path / "audio.mp3") == "audio/mpeg"
+
+
+def test_pipelined_download_streams_into_storage(tmp_path, monkeypatch):
+    """Bytes go to the bucket and the local copy in one pass; no file is read back."""
+    from podscript_pipeline import http_download, pipeline, storage
+    from podscript_shared.models import AppConfig
+
+    cfg = AppConfig(storage_provider="local", storage_bucket="b", artifacts_dir=str(tmp_path))
+    monkeypatch.setattr(pipeline, "load_config", lambda: cfg)
+    monkeypatch.setattr(storage, "_backends", {})
+
+    streamed = []
+
+    def fake_stream(url, sink, headers=None):
+        streamed.append(url)
+        for chunk in (b"ab", b"cd"):
+            sink(chunk)
+        return {}, 4
+
+    monkeypatch.setattr(http_download, "stream_download", fake_stream)
+    result = pipeline.run_download_pipelined("t1", "https://cdn.example.com/ep%201.mp3", str(tmp_path))
+
+    # Staged under the task's upload key, then moved to the content key
+    bucket = tmp_path / ".storage" / "b"
+    assert result["object_key"] == f"tingwu-audio/{hashlib.sha256(b'abcd').hexdigest()}.mp3"
+    assert result["mime_type"] == "audio/mpeg"
+    assert Path(result["audio_path"]).read_bytes() == b"abcd"
+    assert (bucket / result["object_key"]).read_bytes() == b"abcd"
+    assert not (bucket / "tingwu-audio" / "uploads" / "t1" / "ep_1.mp3").exists()
+
+    remote_only = pipeline.run_download_pipelined("t2", "https://cdn.example.com/a.mp3", str(tmp_path), keep_local=False)
+    assert remote_only["audio_path"] is None
+    assert remote_only["object_key"] == result["object_key"]
+    assert not (tmp_path / "t2" / "a.mp3").exists()
+    assert not (bucket / "tingwu-audio" / "uploads" / "t2" / "a.mp3").exists()
+
+    # Same URL again: served from the media cache, nothing streamed
+    again = pipeline.run_download_pipelined("t3", "https://cdn.example.com/a.mp3?utm_source=x", str(tmp_path))
+    assert len(streamed) == 2
+    assert again["object_key"] == result["object_key"]
+    assert Path(again["audio_path"]).read_bytes() == b"abcd"
+
+
+    # A failed move keeps the streamed object under its staging key
+    def fail_move(src, dst):
+        raise RuntimeError("copy rejected")
+
+    monkeypatch.setattr(storage.get_backend(cfg), "move", fail_move)
+    monkeypatch.setattr(storage.get_backend(cfg), "exists", lambda key: False)
+    kept = pipeline.run_download_pipelined("t4", "https://cdn.example.com/b.mp3", str(tmp_path))
+    assert kept["object_key"] == "tingwu-audio/uploads/t4/b.mp3"
+    assert (bucket / kept["object_key"]).read_bytes() == b"abcd"
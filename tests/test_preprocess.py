@@ -0,0 +1,82 @@
+"""
+Tests for the audio preprocessing stage (ffmpeg is faked).
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from podscript_pipeline import preprocess as pre
+from podscript_pipeline.audio import SAMPLE_RATE, pcm_duration
+
+
+def _fake_ffmpeg(calls):
+    """Replace ffmpeg with a writer of 1 s silence + 2 s tone + 1 s silence."""
+    def run(args):
+        calls.append(args)
+        rng = np.random.default_rng(0)
+        quiet = rng.uniform(-0.001, 0.001, SAMPLE_RATE)
+        loud = rng.uniform(-0.3, 0.3, 2 * SAMPLE_RATE)
+        samples = (np.concatenate([quiet, loud, quiet]) * 32767).astype(np.int16)
+        samples.tofile(args[-1])
+    return run
+
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(b"fake mp3")
+    return path
+
+
+def test_non_media_input_passes_through(tmp_path):
+    src = tmp_path / "notes.bin"
+    src.write_text("x")
+    processed, mime = pre.preprocess("t1", src, "application/octet-stream")
+    assert processed.name == "processed.txt"
+
+
+def test_falls_back_to_original_when_ffmpeg_fails(media, monkeypatch):
+    def fail(args):
+        raise RuntimeError("ffmpeg not found")
+
+    monkeypatch.setattr(pre, "_run_ffmpeg", fail)
+    processed, mime = pre.preprocess("t1", media, "audio/mpeg")
+    assert processed == media
+    assert mime == "audio/mpeg"
+
+
+def test_pcm_output_is_cached(media, monkeypatch):
+    calls = []
+    monkeypatch.setattr(pre, "_run_ffmpeg", _fake_ffmpeg(calls))
+
+    processed, mime = pre.preprocess("t1", media, "audio/mpeg")
+    assert processed == media.parent / "preprocessed" / "audio.16k.pcm"
+    assert mime == "audio/pcm"
+    assert pcm_duration(processed) == pytest.approx(4.0)
+    assert pre.trim_offset(processed) == 0.0
+
+    again, _ = pre.preprocess("t1", media, "audio/mpeg")
+    assert again == processed
+    assert len(calls) == 1
+
+
+def test_trim_silence_records_offset(media, monkeypatch):
+    monkeypatch.setattr(pre, "_run_ffmpeg", _fake_ffmpeg([]))
+    monkeypatch.setattr(pre, "PREPROCESS_TRIM_SILENCE", True)
+
+    processed, _ = pre.preprocess("t1", media, "audio/mpeg")
+    offset = pre.trim_offset(processed)
+    assert offset == pytest.approx(1.0 - pre.TRIM_PADDING_S, abs=0.05)
+    assert pcm_duration(processed) == pytest.approx(2.0 + 2 * pre.TRIM_PADDING_S, abs=0.1)
+
+
+def test_upload_target_encodes_opus(media, monkeypatch):
+    calls = []
+    monkeypatch.setattr(pre, "_run_ffmpeg", _fake_ffmpeg(calls))
+
+    processed, mime = pre.preprocess("t1", media, "audio/mpeg", target=pre.TARGET_UPLOAD)
+    assert processed.suffix == ".opus"
+    assert mime == "audio/ogg"
+    assert "libopus" in calls[0]
@@ -0,0 +1,154 @@
+"""
+Unit tests for the download/transcription job scheduler.
+"""
+
+import threading
+import time
+
+import pytest
+
+from podscript_api.scheduler import JobQueue, JobScheduler
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestJobQueue:
+    """Tests for JobQueue."""
+
+    def test_runs_submitted_job(self):
+        """Submitted jobs are executed on a worker thread."""
+        queue = JobQueue("test", max_workers=1)
+        done = threading.Event()
+        queue.submit("job1", done.set)
+        assert done.wait(timeout=2)
+        queue.shutdown()
+
+    def test_concurrency_is_capped(self):
+        """No more than max_workers jobs run at the same time."""
+        queue = JobQueue("test", max_workers=2)
+        release = threading.Event()
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def job():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            release.wait(timeout=2)
+            with lock:
+                active.pop()
+
+        for i in range(5):
+            queue.submit(f"job{i}", job)
+
+        assert _wait_until(lambda: queue.stats()["running"] == 2)
+        assert queue.stats()["waiting"] == 3
+        release.set()
+        assert _wait_until(lambda: queue.stats() == {"waiting": 0, "running": 0, "max_workers": 2})
+        assert max(peak) == 2
+        queue.shutdown()
+
+    def test_fifo_order_and_positions(self):
+        """Waiting jobs report their 1-based FIFO position."""
+        queue = JobQueue("test", max_workers=1)
+        release = threading.Event()
+        order = []
+
+        queue.submit("blocker", release.wait, 2)
+        assert _wait_until(lambda: queue.is_running("blocker"))
+
+        for name in ("a", "b", "c"):
+            queue.submit(name, order.append, name)
+
+        assert queue.position("blocker") is None
+        assert queue.position("a") == 1
+        assert queue.position("c") == 3
+        assert queue.position("unknown") is None
+
+        release.set()
+        assert _wait_until(lambda: len(order) == 3)
+        assert order == ["a", "b", "c"]
+        queue.shutdown()
+
+    def test_duplicate_job_rejected(self):
+        """The same job ID cannot be queued twice."""
+        queue = JobQueue("test", max_workers=1)
+        release = threading.Event()
+        queue.submit("job", release.wait, 2)
+        with pytest.raises(ValueError):
+            queue.submit("job", release.wait, 2)
+        release.set()
+        queue.shutdown()
+
+    def test_failing_job_does_not_kill_worker(self):
+        """An exception in one job does not stop later jobs."""
+        queue = JobQueue("test", max_workers=1)
+        done = threading.Event()
+
+        def boom():
+            raise RuntimeError("boom")
+
+        queue.submit("bad", boom)
+        queue.submit("good", done.set)
+        assert done.wait(timeout=2)
+        queue.shutdown()
+
+
+class TestJobScheduler:
+    """Tests for JobScheduler."""
+
+    def test_download_and_asr_slots_are_independent(self):
+        """A busy ASR slot does not block downloads."""
+        scheduler = JobScheduler(download_workers=1, asr_workers=1)
+        release = threading.Event()
+        downloaded = threading.Event()
+
+        scheduler.submit_transcription("t1", release.wait, 2)
+        scheduler.submit_transcription("t2", release.wait, 2)
+        scheduler.submit_download("d1", downloaded.set)
+
+        assert downloaded.wait(timeout=2)
+        assert scheduler.queue_position("t2") == 1
+        assert scheduler.stats()["asr"]["running"] == 1
+        release.set()
+        scheduler.downloads.shutdown()
+        scheduler.transcriptions.shutdown()
+
+    def test_postprocessing_does_not_hold_asr_slot(self):
+        """Post-processing runs on its own queue while the ASR slot moves on."""
+        scheduler = JobScheduler(asr_workers=1, postprocess_workers=1)
+        release = threading.Event()
+        transcribed = threading.Event()
+
+        scheduler.submit_postprocess("t1", release.wait, 2)
+        scheduler.submit_transcription("t2", transcribed.set)
+
+        assert transcribed.wait(timeout=2)
+        assert scheduler.stats()["postprocess"]["running"] == 1
+        release.set()
+        scheduler.postprocessing.shutdown()
+        scheduler.transcriptions.shutdown()
+
+    def test_cloud_jobs_do_not_take_asr_slots(self):
+        """Cloud transcriptions run while every ASR slot is busy."""
+        scheduler = JobScheduler(asr_workers=1, cloud_workers=1)
+        release = threading.Event()
+        submitted = threading.Event()
+
+        scheduler.submit_transcription("t1", release.wait, 2)
+        scheduler.submit_transcription("t2", release.wait, 2)
+        scheduler.submit_cloud("c1", submitted.set)
+        assert submitted.wait(timeout=2)
+        assert scheduler.queue_position("t2") == 1
+        assert scheduler.stats()["cloud"]["max_workers"] == 1
+        release.set()
+        scheduler.cloud.shutdown()
+        scheduler.transcriptions.shutdown()
@@ -0,0 +1,109 @@
+"""
+Tests for the transcript full-text search index.
+"""
+
+import pytest
+
+from podscript_shared.search import TranscriptIndex, backfill, read_task_segments, tokenize
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TranscriptIndex(tmp_path / "search.db")
+    index.add("ep1", [
+        {"start": 0.0, "end": 5.0, "text": "今天我们聊聊人工智能的泡沫"},
+        {"start": 5.0, "end": 9.0, "text": "Large language models are <everywhere>"},
+    ])
+    index.add("ep2", [
+        {"start": 12.5, "end": 20.0, "text": "人工智能改变了播客的制作方式"},
+    ])
+    return index
+
+
+def test_tokenize_segments_chinese():
+    terms = tokenize("人工智能的泡沫, GPT-4!")
+    assert "人工智能" in terms and "泡沫" in terms and "gpt" in terms
+    assert "," not in terms and "!" not in terms
+
+
+class TestTranscriptIndex:
+    """Tests for TranscriptIndex."""
+
+    def test_chinese_query_matches_both_tasks(self, index):
+        results = index.search("人工智能")
+        assert {r["task_id"] for r in results} == {"ep1", "ep2"}
+        hit = next(r for r in results if r["task_id"] == "ep2")["hits"][0]
+        assert (hit["start"], hit["end"]) == (12.5, 20.0)
+        assert "<mark>人工智能</mark>" in hit["snippet"]
+
+    def test_all_terms_must_match(self, index):
+        assert [r["task_id"] for r in index.search("人工智能 泡沫")] == ["ep1"]
+        assert index.search("人工智能 火星") == []
+
+    def test_english_is_case_insensitive_and_escaped(self, index):
+        results = index.search("LANGUAGE models")
+        assert results[0]["task_id"] == "ep1"
+        snippet = results[0]["hits"][0]["snippet"]
+        assert "<mark>language</mark>" in snippet and "&lt;everywhere&gt;" in snippet
+
+    def test_reindex_and_remove(self, index):
+        index.add("ep2", [{"start": 0, "end": 1, "text": "完全不同的内容"}])
+        assert [r["task_id"] for r in index.search("人工智能")] == ["ep1"]
+        index.remove("ep1")
+        assert index.search("人工智能") == []
+        assert index.indexed_ids() == {"ep2"}
+
+    def test_punctuation_only_query(self, index):
+        assert index.search("?!") == []
+
+    def test_search_is_scoped_to_owner(self, index):
+        # Another user's better matches must not use up this user's limit
+        for i in range(5):
+            index.add(f"bob{i}", [{"start": 0, "end": 1, "text": "人工智能 人工智能 人工智能"}], owner="bob")
+        index.add("alice1", [{"start": 0, "end": 1, "text": "顺便提到人工智能"}], owner="alice")
+
+        assert [r["task_id"] for r in index.search("人工智能", limit=1, owner="alice")] == ["alice1"]
+        assert len(index.search("人工智能", owner="bob")) == 5
+        assert {r["task_id"] for r in index.search("人工智能")} == {"ep1", "ep2"}
+
+    def test_index_without_owners_is_rebuilt(self, tmp_path):
+        import sqlite3
+
+        db = tmp_path / "old.db"
+        with sqlite3.connect(db) as conn:
+            conn.executescript(
+                "CREATE TABLE search_docs (task_id TEXT PRIMARY KEY, segments INTEGER NOT NULL, indexed_at REAL NOT NULL);"
+                "CREATE TABLE search_segments (id INTEGER PRIMARY KEY, task_id TEXT NOT NULL, start REAL NOT NULL,"
+                " end REAL NOT NULL, text TEXT NOT NULL);"
+                "CREATE VIRTUAL TABLE search_fts USING fts5(terms);"
+                "INSERT INTO search_docs VALUES ('old', 1, 0);"
+            )
+        index = TranscriptIndex(db)
+        assert index.indexed_ids() == set()
+        index.add("new", [{"start": 0, "end": 1, "text": "内容"}], owner="alice")
+        assert index.search("内容", owner="alice")[0]["task_id"] == "new"
+
+
+def test_backfill_reads_srt(tmp_path):
+    task_dir = tmp_path / "old1"
+    task_dir.mkdir()
+    (task_dir / "result.srt").write_text(
+        "1\n00:00:01,000 --> 00:00:03,500\n旧的节目内容\n\n2\n00:01:00,000 --> 00:01:02,000\nsecond line\n",
+        encoding="utf-8",
+    )
+    assert read_task_segments(task_dir)[1] == {"start": 60.0, "end": 62.0, "text": "second line"}
+
+    index = TranscriptIndex(tmp_path / "search.db")
+    assert backfill(index, ["old1", "missing"], str(tmp_path)) == 1
+    assert index.search("节目")[0]["hits"][0]["start"] == 1.0
+    assert backfill(index, ["old1"], str(tmp_path)) == 0
+
+
+def test_backfill_records_owner(tmp_path):
+    (tmp_path / "old2").mkdir()
+    (tmp_path / "old2" / "result.json").write_text('{"segments": [{"start": 0, "end": 1, "text": "旧节目"}]}', encoding="utf-8")
+
+    index = TranscriptIndex(tmp_path / "search.db")
+    assert backfill(index, ["old2"], str(tmp_path), owner_of={"old2": "alice"}.get) == 1
+    assert index.search("节目") == []
+    assert index.search("节目", owner="alice")[0]["task_id"] == "old2"
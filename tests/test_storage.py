@@ -0,0 +1,211 @@
+"""
+Tests for content-addressed cloud storage uploads.
+"""
+
+import pytest
+
+from podscript_pipeline import storage
+from podscript_pipeline.storage import content_object_key, get_backend, upload_audio
+from podscript_shared.models import AppConfig
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(storage, "_backends", {})
+
+
+def test_content_key_depends_on_bytes_not_name(tmp_path):
+    cfg = AppConfig(storage_prefix="/audio/tingwu/")
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = tmp_path / "a" / "audio.mp3"
+    same = tmp_path / "b" / "Episode 1.MP3"
+    other = tmp_path / "b" / "audio.mp3"
+    first.write_bytes(b"one")
+    same.write_bytes(b"one")
+    other.write_bytes(b"two")
+
+    key = content_object_key(cfg, first)
+    assert key.startswith("audio/tingwu/") and key.endswith(".mp3")
+    assert content_object_key(cfg, same) == key
+    assert content_object_key(cfg, other) != key
+
+
+class TestLocalBackend:
+    """Tests for the local-disk storage backend."""
+
+    def _cfg(self, tmp_path):
+        return AppConfig(storage_provider="local", storage_bucket="b", artifacts_dir=str(tmp_path / "artifacts"))
+
+    def test_upload_skips_existing_content(self, tmp_path):
+        cfg = self._cfg(tmp_path)
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"one")
+
+        url = upload_audio(cfg, audio)
+        assert upload_audio(cfg, audio).split("?")[0] == url.split("?")[0]
+
+        backend = get_backend(cfg)
+        assert backend is get_backend(cfg)  # Pooled
+        key = content_object_key(cfg, audio)
+        assert url.startswith(f"http://127.0.0.1:8001/artifacts/.storage/b/{key}?expires=")
+        assert (tmp_path / "artifacts" / ".storage" / "b" / key).read_bytes() == b"one"
+        assert backend.stats.snapshot()["upload"]["count"] == 1
+        assert backend.stats.snapshot()["exists"]["count"] == 2
+
+    def test_filename_keys_always_upload(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(storage, "STORAGE_CONTENT_KEYS", False)
+        cfg = self._cfg(tmp_path)
+        audio = tmp_path / "my audio.mp3"
+        audio.write_bytes(b"one")
+
+        upload_audio(cfg, audio)
+        audio.write_bytes(b"two")
+        upload_audio(cfg, audio)
+
+        backend = get_backend(cfg)
+        assert backend.stats.snapshot()["upload"]["count"] == 2
+        assert backend.exists("tingwu-audio/my_audio.mp3")
+        backend.delete("tingwu-audio/my_audio.mp3")
+        assert not backend.exists("tingwu-audio/my_audio.mp3")
+
+    def test_rejects_keys_outside_root(self, tmp_path):
+        with pytest.raises(ValueError):
+            get_backend(self._cfg(tmp_path)).exists("../../etc/passwd")
+
+
+def test_unknown_provider():
+    with pytest.raises(ValueError):
+        get_backend(AppConfig(storage_provider="s3"))
+
+
+class TestSignPut:
+    """Tests for presigned PUT URLs used by browser-direct uploads."""
+
+    def test_upload_key_is_per_task(self):
+        cfg = AppConfig(storage_prefix="audio")
+        assert storage.upload_object_key(cfg, "abc123", "../My Episode.mp3") == "audio/uploads/abc123/My_Episode.mp3"
+
+    def test_oss_signs_put_with_content_type(self, tmp_path):
+        cfg = AppConfig(
+            storage_provider="oss", storage_bucket="podcasts", storage_region="cn-beijing",
+            access_key_id="ak", access_key_secret="sk", artifacts_dir=str(tmp_path),
+        )
+        url = get_backend(cfg).sign_put("audio/uploads/t1/a.mp3", "audio/mpeg", 600)
+        assert url.startswith("https://podcasts.oss-cn-beijing.aliyuncs.com/audio%2Fuploads%2Ft1%2Fa.mp3?")
+        assert "Signature=" in url
+
+    def test_local_backend_has_no_direct_upload(self, tmp_path):
+        cfg = AppConfig(storage_provider="local", storage_bucket="b", artifacts_dir=str(tmp_path))
+        with pytest.raises(NotImplementedError):
+            get_backend(cfg).sign_put("k", "audio/mpeg")
+
+
+class _FakeBucket:
+    """Records multipart calls made against an OSS bucket."""
+
+    bucket_name = "podcasts"
+
+    def __init__(self, size=0):
+        self.size = size
+        self.parts = {}
+        self.completed = None
+        self.aborted = False
+        self.copied = None
+
+    def init_multipart_upload(self, key, headers=None):
+        self.headers = headers
+        return type("R", (), {"upload_id": "up-1"})()
+
+    def upload_part(self, key, upload_id, number, data):
+        self.parts[number] = data
+        return type("R", (), {"etag": f"etag-{number}"})()
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        self.completed = [(p.part_number, p.etag) for p in parts]
+
+    def abort_multipart_upload(self, key, upload_id):
+        self.aborted = True
+
+    def head_object(self, key):
+        return type("R", (), {"content_length": self.size})()
+
+    def copy_object(self, bucket_name, src_key, dst_key):
+        self.copied = (src_key, dst_key)
+
+    def upload_part_copy(self, bucket_name, src_key, byte_range, dst_key, upload_id, number):
+        self.parts[number] = byte_range
+        return type("R", (), {"etag": f"etag-{number}"})()
+
+    def sign_url(self, method, key, expires, headers=None):
+        return f"https://bucket/{key}?signed"
+
+
+class TestObjectWriter:
+    """Tests for incremental (streamed) uploads."""
+
+    def test_local_writer_spools_then_uploads(self, tmp_path):
+        cfg = AppConfig(storage_provider="local", storage_bucket="b", artifacts_dir=str(tmp_path))
+        backend = get_backend(cfg)
+        writer = backend.open_writer("uploads/t1/audio.m4a", "audio/mp4")
+        writer.write(b"one")
+        writer.write(b"two")
+        url = writer.commit()
+
+        assert "/artifacts/.storage/b/uploads/t1/audio.m4a?" in url
+        assert (tmp_path / ".storage" / "b" / "uploads" / "t1" / "audio.m4a").read_bytes() == b"onetwo"
+        assert backend.stats.snapshot()["stream_upload"]["count"] == 1
+
+    def _oss(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(storage, "OSS_PART_SIZE_MB", 4 / (1024 * 1024))  # 4-byte parts
+        cfg = AppConfig(
+            storage_provider="oss", storage_bucket="podcasts", storage_region="cn-beijing",
+            access_key_id="ak", access_key_secret="sk", artifacts_dir=str(tmp_path),
+        )
+        backend = get_backend(cfg)
+        backend.bucket = _FakeBucket()
+        return backend
+
+    def test_oss_uploads_parts_as_they_fill(self, tmp_path, monkeypatch):
+        backend = self._oss(tmp_path, monkeypatch)
+        writer = backend.open_writer("k.mp3", "audio/mpeg")
+        for chunk in (b"abc", b"defgh", b"ij"):
+            writer.write(chunk)
+        writer.commit()
+
+        bucket = backend.bucket
+        assert bucket.headers == {"Content-Type": "audio/mpeg"}
+        assert [bucket.parts[n] for n in sorted(bucket.parts)] == [b"abcd", b"efgh", b"ij"]
+        assert bucket.completed == [(1, "etag-1"), (2, "etag-2"), (3, "etag-3")]
+
+    def test_oss_failed_part_aborts_upload(self, tmp_path, monkeypatch):
+        from podscript_pipeline import tingwu_adapter
+
+        monkeypatch.setattr(tingwu_adapter.time, "sleep", lambda s: None)
+        backend = self._oss(tmp_path, monkeypatch)
+
+        def fail(*args):
+            raise RuntimeError("part lost")
+
+        backend.bucket.upload_part = fail
+        writer = backend.open_writer("k.mp3", "audio/mpeg")
+        writer.write(b"abcdefgh")
+        with pytest.raises(RuntimeError):
+            writer.commit()
+        assert backend.bucket.aborted and backend.bucket.completed is None
+
+    def test_oss_copies_large_objects_in_parts(self, tmp_path, monkeypatch):
+        backend = self._oss(tmp_path, monkeypatch)
+        monkeypatch.setattr(storage, "OSS_COPY_OBJECT_LIMIT", 8)
+        monkeypatch.setattr(storage, "OSS_COPY_PART_SIZE", 4)
+
+        backend.bucket = _FakeBucket(size=8)
+        backend._copy("a.mp3", "b.mp3")
+        assert backend.bucket.copied == ("a.mp3", "b.mp3")
+
+        backend.bucket = _FakeBucket(size=10)
+        backend._copy("a.mp3", "b.mp3")
+        bucket = backend.bucket
+        assert bucket.copied is None
+        assert [bucket.parts[n] for n in sorted(bucket.parts)] == [(0, 3), (4, 7), (8, 9)]
+        assert bucket.completed == [(1, "etag-1"), (2, "etag-2"), (3, "etag-3")]
@@ -0,0 +1,250 @@
+"""
+Unit tests for the task store backends.
+"""
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+from podscript_shared.models import TaskDetail, TaskLog, TaskResults, TaskStatus, TranscriptSegment
+from podscript_shared.task_store import PROCESS_OWNER, MemoryTaskStore, SqliteTaskStore, create_task_store, owner_alive
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Run each test against both backends."""
+    return create_task_store(str(tmp_path), backend=request.param)
+
+
+def _log(message: str) -> TaskLog:
+    return TaskLog(time="12:00:00", level="info", message=message)
+
+
+def _dead_pid() -> int:
+    """Pid of a process that has exited."""
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def _segment(i: int) -> TranscriptSegment:
+    return TranscriptSegment(start=float(i), end=float(i + 1), text=f"seg {i}")
+
+
+class TestTaskStore:
+    """Behaviour shared by all backends."""
+
+    def test_create_and_get(self, store):
+        store.create(TaskDetail(id="t1", status=TaskStatus.queued, progress=0.0), user_id="u1")
+        task = store.get("t1")
+        assert task.id == "t1"
+        assert task.status == TaskStatus.queued
+        assert store.exists("t1")
+        assert store.get("missing") is None
+
+    def test_update_fields(self, store):
+        store.create(TaskDetail(id="t1", status=TaskStatus.queued))
+        results = TaskResults(srt_url="/a.srt", markdown_url="/a.md", meta={"segments": 2})
+        store.update(
+            "t1",
+            status=TaskStatus.completed,
+            progress=1.0,
+            audio_path="/tmp/a.mp3",
+            results=results,
+            error={"message": "none"},
+        )
+        task = store.get("t1")
+        assert task.status == TaskStatus.completed
+        assert task.progress == 1.0
+        assert task.audio_path == "/tmp/a.mp3"
+        assert task.results == results
+        assert task.error == {"message": "none"}
+
+    def test_update_rejects_unknown_field(self, store):
+        store.create(TaskDetail(id="t1", status=TaskStatus.queued))
+        with pytest.raises(ValueError):
+            store.update("t1", logs=[])
+
+    def test_logs_in_order_with_offset(self, store):
+        store.create(TaskDetail(id="t1", status=TaskStatus.queued))
+        for i in range(5):
+            store.add_log("t1", _log(f"msg {i}"))
+        assert [log.message for log in store.get("t1").logs] == [f"msg {i}" for i in range(5)]
+        assert [log.message for log in store.get_logs("t1", offset=3)] == ["msg 3", "msg 4"]
+
+    def test_logs_for_unknown_task_ignored(self, store):
+        store.add_log("missing", _log("x"))
+        store.flush()
+        assert store.get_logs("missing") == []
+
+    def test_segments_append_and_replace(self, store):
+        store.create(TaskDetail(id="t1", status=TaskStatus.transcribing))
+        store.append_segments("t1", [_segment(0), _segment(1)])
+        store.append_segments("t1", [_segment(2)])
+        assert [s.text for s in store.get("t1").partial_segments] == ["seg 0", "seg 1", "seg 2"]
+        assert [s.text for s in store.get_segments("t1", offset=2)] == ["seg 2"]
+
+        store.set_segments("t1", [_segment(5)])
+        assert [s.text for s in store.get_segments("t1")] == ["seg 5"]
+
+    def test_metadata(self, store):
+        store.create(
+            TaskDetail(id="t1", status=TaskStatus.queued),
+            user_id="u1",
+            source_url="https://example.com/a",
+        )
+        store.update_meta("t1", credits_deducted=3, object_key="audio/abc.mp3")
+        meta = store.get_meta("t1")
+        assert meta["user_id"] == "u1"
+        assert meta["source_url"] == "https://example.com/a"
+        assert meta["credits_deducted"] == 3
+        assert meta["object_key"] == "audio/abc.mp3"
+        assert store.get_meta("missing") == {}
+
+    def test_list_by_user(self, store):
+        for i in range(3):
+            store.create(TaskDetail(id=f"t{i}", status=TaskStatus.queued), user_id="u1")
+            time.sleep(0.01)
+        store.create(TaskDetail(id="other", status=TaskStatus.queued), user_id="u2")
+        tasks = store.list_by_user("u1")
+        assert [t.id for t in tasks] == ["t2", "t1", "t0"]
+
+    def test_evict_only_finished_tasks(self, store):
+        store.create(TaskDetail(id="done", status=TaskStatus.queued))
+        store.create(TaskDetail(id="running", status=TaskStatus.queued))
+        store.add_log("done", _log("x"))
+        store.update("done", status=TaskStatus.completed)
+        store.update("running", status=TaskStatus.transcribing)
+
+        assert store.evict_expired(ttl_seconds=3600) == 0
+        assert store.evict_expired(ttl_seconds=0) == 1
+        assert store.get("done") is None
+        assert store.get("running") is not None
+
+    def test_fail_interrupted(self, store):
+        store.create(TaskDetail(id="queued", status=TaskStatus.queued))
+        store.create(TaskDetail(id="running", status=TaskStatus.queued))
+        store.create(TaskDetail(id="ready", status=TaskStatus.downloaded))
+        store.create(TaskDetail(id="done", status=TaskStatus.completed))
+        store.create(TaskDetail(id="upload", status=TaskStatus.queued), claim=False)
+        store.create(TaskDetail(id="mine", status=TaskStatus.queued))
+        # Jobs claimed by a process that no longer exists
+        store.owner = f"{PROCESS_OWNER.rpartition(':')[0]}:{_dead_pid()}"
+        store.update("queued", status=TaskStatus.queued)
+        store.update("running", status=TaskStatus.transcribing)
+        store.owner = PROCESS_OWNER
+
+        assert sorted(store.fail_interrupted("restarted")) == ["queued", "running"]
+        assert store.get_summary("running").status == TaskStatus.failed
+        assert store.get_summary("running").error == {"message": "restarted"}
+        assert store.get_summary("ready").status == TaskStatus.downloaded
+        assert store.get_summary("upload").status == TaskStatus.queued
+        assert store.get_summary("mine").status == TaskStatus.queued
+        assert store.fail_interrupted("restarted") == []
+
+    def test_transition_is_compare_and_set(self, store):
+        store.create(TaskDetail(id="t1", status=TaskStatus.downloaded))
+        assert store.transition("t1", TaskStatus.downloaded, status=TaskStatus.queued)
+        assert not store.transition("t1", TaskStatus.downloaded, status=TaskStatus.queued)
+        assert not store.transition("missing", TaskStatus.downloaded, status=TaskStatus.queued)
+        assert store.get_summary("t1").status == TaskStatus.queued
+
+    def test_set_segments_bumps_generation(self, store):
+        store.create(TaskDetail(id="t1", status=TaskStatus.transcribing))
+        store.append_segments("t1", [_segment(0)])
+        assert store.get_segment_generation("t1") == 0
+        store.set_segments("t1", [_segment(5)])
+        assert store.get_segment_generation("t1") == 1
+        assert store.get_segment_generation("missing") == 0
+
+    def test_delete(self, store):
+        store.create(TaskDetail(id="t1", status=TaskStatus.queued))
+        store.delete("t1")
+        assert not store.exists("t1")
+
+
+class TestSqliteTaskStore:
+    """SQLite-specific behaviour."""
+
+    def test_persists_across_instances(self, tmp_path):
+        """A new store instance (restart / other worker) sees existing tasks."""
+        first = SqliteTaskStore(tmp_path / "tasks.db")
+        first.create(TaskDetail(id="t1", status=TaskStatus.queued), user_id="u1")
+        first.add_log("t1", _log("hello"))
+        first.flush()
+
+        second = SqliteTaskStore(tmp_path / "tasks.db")
+        task = second.get("t1")
+        assert task is not None
+        assert [log.message for log in task.logs] == ["hello"]
+        assert second.get_meta("t1")["user_id"] == "u1"
+
+    def test_buffered_log_is_flushed_without_further_writes(self, tmp_path):
+        """A lone log entry reaches the database on the flush timer."""
+        first = SqliteTaskStore(tmp_path / "tasks.db")
+        first.create(TaskDetail(id="t1", status=TaskStatus.queued))
+        first.add_log("t1", _log("one"))
+        first.add_log("t1", _log("last"))
+
+        second = SqliteTaskStore(tmp_path / "tasks.db")
+        deadline = time.time() + 5
+        while len(second.get_logs("t1")) < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        assert [log.message for log in second.get_logs("t1")] == ["one", "last"]
+
+    def test_segment_seq_continues_after_restart(self, tmp_path):
+        first = SqliteTaskStore(tmp_path / "tasks.db")
+        first.create(TaskDetail(id="t1", status=TaskStatus.transcribing))
+        first.append_segments("t1", [_segment(0), _segment(1)])
+
+        second = SqliteTaskStore(tmp_path / "tasks.db")
+        second.append_segments("t1", [_segment(2)])
+        second.append_segments("t1", [_segment(3)])
+        assert [s.text for s in second.get_segments("t1", offset=2)] == ["seg 2", "seg 3"]
+        second.set_segments("t1", [_segment(9)])
+        second.append_segments("t1", [_segment(10)])
+        assert [s.text for s in second.get_segments("t1")] == ["seg 9", "seg 10"]
+
+    def test_sibling_worker_tasks_not_failed(self, tmp_path):
+        """Startup leaves jobs of live sibling workers alone."""
+        sibling = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            boot_id = PROCESS_OWNER.rpartition(":")[0]
+            other = SqliteTaskStore(tmp_path / "tasks.db", owner=f"{boot_id}:{sibling.pid}")
+            other.create(TaskDetail(id="t1", status=TaskStatus.transcribing))
+            assert owner_alive(other.owner)
+
+            store = SqliteTaskStore(tmp_path / "tasks.db")
+            assert store.fail_interrupted("restarted") == []
+            assert store.get_summary("t1").status == TaskStatus.transcribing
+        finally:
+            sibling.kill()
+            sibling.wait()
+        assert store.fail_interrupted("restarted") == ["t1"]
+
+    def test_tasks_from_before_owners_are_failed(self, tmp_path):
+        """Databases without an owner column are migrated; their running tasks count as interrupted."""
+        import sqlite3
+
+        conn = sqlite3.connect(tmp_path / "tasks.db")
+        conn.execute(
+            "CREATE TABLE tasks (task_id TEXT PRIMARY KEY, user_id TEXT, source_url TEXT,"
+            " credits_deducted INTEGER NOT NULL DEFAULT 0, extra TEXT NOT NULL DEFAULT '{}',"
+            " status TEXT NOT NULL, progress REAL, error TEXT, results TEXT, audio_path TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL, finished_at REAL)"
+        )
+        conn.execute("INSERT INTO tasks (task_id, status, created_at, updated_at) VALUES ('old', 'transcribing', 0, 0)")
+        conn.commit()
+        conn.close()
+
+        store = SqliteTaskStore(tmp_path / "tasks.db")
+        assert store.fail_interrupted("restarted") == ["old"]
+
+    def test_unknown_backend_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            create_task_store(str(tmp_path), backend="redis")
+
+    def test_memory_backend_factory(self, tmp_path):
+        assert isinstance(create_task_store(str(tmp_path), backend="memory"), MemoryTaskStore)
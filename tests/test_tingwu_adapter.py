@@ -0,0 +1,102 @@
+"""
+Tests for Tingwu client pooling and request latency counters.
+"""
+
+import pytest
+
+from podscript_pipeline import storage, tingwu_adapter
+from podscript_shared.models import AppConfig
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(tingwu_adapter, "_clients", {})
+    monkeypatch.setattr(tingwu_adapter, "_stats", tingwu_adapter.LatencyStats())
+    monkeypatch.setattr(storage, "_backends", {})
+
+
+def test_clients_are_pooled_by_credentials_and_region(monkeypatch):
+    created = []
+    monkeypatch.setattr(tingwu_adapter, "_create_tingwu_client", lambda cfg, region: created.append(region) or object())
+
+    a = AppConfig(access_key_id="ak", access_key_secret="sk")
+    b = AppConfig(access_key_id="ak2", access_key_secret="sk")
+    first = tingwu_adapter.get_tingwu_client(a)
+    assert tingwu_adapter.get_tingwu_client(a) is first
+    assert tingwu_adapter.get_tingwu_client(b) is not first
+    assert tingwu_adapter.get_tingwu_client(a, region="cn-shanghai") is not first
+    assert len(created) == 3
+
+
+def test_get_task_status_records_latency(monkeypatch):
+    class FakeClient:
+        def __init__(self):
+            self.calls = 0
+
+        def do_action_with_exception(self, request):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("HTTP Status: 503")
+            return b'{"Code": "0", "Data": {"TaskStatus": "ONGOING"}}'
+
+    monkeypatch.setattr(tingwu_adapter.time, "sleep", lambda s: None)
+    data = tingwu_adapter.get_task_status(FakeClient(), "t1")
+
+    assert data == {"TaskStatus": "ONGOING"}
+    stats = tingwu_adapter.request_stats()["get_task"]
+    assert stats["count"] == 2
+    assert stats["errors"] == 1
+    assert stats["max_ms"] >= stats["avg_ms"] >= 0
+
+
+def test_upload_to_oss_is_resumable_multipart(tmp_path, monkeypatch):
+    import oss2
+
+    calls = []
+
+    class Result:
+        status = 200
+
+    def fake_resumable_upload(bucket, key, filename, **kwargs):
+        calls.append((key, kwargs))
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")  # Retried; resumes from the checkpoint
+        return Result()
+
+    monkeypatch.setattr(oss2, "resumable_upload", fake_resumable_upload)
+    monkeypatch.setattr(tingwu_adapter.time, "sleep", lambda s: None)
+    audio = tmp_path / "my episode.mp3"
+    audio.write_bytes(b"x" * 100)
+    cfg = AppConfig(
+        access_key_id="ak", access_key_secret="sk", storage_bucket="bucket",
+        storage_region="cn-beijing", artifacts_dir=str(tmp_path / "artifacts"),
+    )
+
+    url = tingwu_adapter.upload_to_oss(cfg, audio)
+
+    assert url.startswith("https://bucket.oss-cn-beijing.aliyuncs.com/tingwu-audio")
+    assert len(calls) == 2
+    key, kwargs = calls[-1]
+    assert key == "tingwu-audio/my_episode.mp3"
+    assert kwargs["part_size"] == storage.OSS_PART_SIZE_MB * 1024 * 1024
+    assert kwargs["num_threads"] == storage.OSS_UPLOAD_THREADS
+    assert kwargs["store"].dir.startswith(str(tmp_path / "artifacts" / ".cache" / "oss-upload"))
+
+
+def test_upload_to_oss_skips_existing_object(tmp_path, monkeypatch):
+    import oss2
+
+    uploads = []
+    monkeypatch.setattr(oss2, "resumable_upload", lambda *a, **kw: uploads.append(a))
+    monkeypatch.setattr(oss2.Bucket, "object_exists", lambda self, key, **kw: True)
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"x")
+    cfg = AppConfig(
+        access_key_id="ak", access_key_secret="sk", storage_bucket="bucket",
+        storage_region="cn-beijing", artifacts_dir=str(tmp_path / "artifacts"),
+    )
+
+    url = tingwu_adapter.upload_to_oss(cfg, audio, object_key="tingwu-audio/abc.mp3")
+
+    assert uploads == []
+    assert "abc.mp3" in url
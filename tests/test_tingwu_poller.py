@@ -0,0 +1,92 @@
+"""
+Tests for the shared Tingwu job poller.
+"""
+
+import threading
+
+import pytest
+
+from podscript_pipeline import tingwu_adapter, tingwu_poller
+from podscript_pipeline.tingwu_poller import TingwuPoller, poll_interval, poll_timeout, then
+from podscript_shared.models import AppConfig
+
+
+@pytest.fixture
+def fake_tingwu(monkeypatch):
+    """Fake GetTask: each job completes on its Nth poll; "fail-*" jobs fail."""
+    polls = {}
+    lock = threading.Lock()
+
+    def get_task_status(client, job_id, poll_count=1):
+        with lock:
+            polls[job_id] = polls.get(job_id, 0) + 1
+            count = polls[job_id]
+        if job_id.startswith("fail"):
+            return {"TaskStatus": "FAILED", "ErrorMessage": "bad audio"}
+        if job_id.startswith("never") or count < 3:
+            return {"TaskStatus": "ONGOING"}
+        return {"TaskStatus": "COMPLETED", "Result": {"Transcription": f"http://x/{job_id}.json"}}
+
+    monkeypatch.setattr(tingwu_adapter, "get_tingwu_client", lambda cfg: object())
+    monkeypatch.setattr(tingwu_adapter, "get_task_status", get_task_status)
+    monkeypatch.setattr(tingwu_adapter, "fetch_transcription", lambda url: {"text": url, "segments": []})
+    monkeypatch.setattr(tingwu_poller, "poll_interval", lambda duration_s, elapsed_s: 0.01)
+    return polls
+
+
+def test_interval_and_timeout_scale_with_duration():
+    assert poll_interval(None, 0) == tingwu_poller.TINGWU_POLL_MIN_S
+    assert poll_interval(60, 0) == tingwu_poller.TINGWU_POLL_MIN_S
+    assert poll_interval(3600, 0) > poll_interval(1800, 0)
+    assert poll_interval(3600, 1200) > poll_interval(3600, 0)
+    assert poll_interval(10 * 3600, 3600) == tingwu_poller.TINGWU_POLL_MAX_S
+
+    assert poll_timeout(None) == tingwu_poller.TINGWU_TIMEOUT_MIN_S
+    assert poll_timeout(3 * 3600) > poll_timeout(60)
+
+
+class TestTingwuPoller:
+    """Tests for TingwuPoller."""
+
+    def test_many_jobs_share_fixed_threads(self, fake_tingwu):
+        poller = TingwuPoller(workers=2)
+        threads_before = threading.active_count()
+
+        futures = [poller.watch(AppConfig(), f"job{i}") for i in range(20)]
+        results = [f.result(timeout=10) for f in futures]
+
+        assert [r["text"] for r in results] == [f"http://x/job{i}.json" for i in range(20)]
+        assert all(fake_tingwu[f"job{i}"] == 3 for i in range(20))
+        assert threading.active_count() - threads_before <= 3  # Loop thread + 2 workers
+        assert poller.pending() == 0
+
+    def test_failed_job_raises(self, fake_tingwu):
+        future = TingwuPoller().watch(AppConfig(), "fail-1")
+        with pytest.raises(RuntimeError, match="bad audio"):
+            future.result(timeout=10)
+
+    def test_timeout(self, fake_tingwu):
+        future = TingwuPoller().watch(AppConfig(), "never-1", timeout_s=0.05)
+        with pytest.raises(TimeoutError):
+            future.result(timeout=10)
+
+    def test_callbacks_run_off_the_event_loop(self, fake_tingwu):
+        done = threading.Event()
+        names = []
+
+        def on_done(future):
+            names.append(threading.current_thread().name)
+            done.set()
+
+        TingwuPoller().watch(AppConfig(), "job-cb").add_done_callback(on_done)
+        assert done.wait(10)
+        assert names[0].startswith("tingwu-poll")
+        assert names[0] != "tingwu-poller"
+
+    def test_then_chains_without_blocking(self, fake_tingwu):
+        chained = then(TingwuPoller().watch(AppConfig(), "job-then"), lambda result: result["text"].upper())
+        assert chained.result(timeout=10) == "HTTP://X/JOB-THEN.JSON"
+
+        failed = then(TingwuPoller().watch(AppConfig(), "fail-then"), lambda result: result)
+        with pytest.raises(RuntimeError, match="bad audio"):
+            failed.result(timeout=10)
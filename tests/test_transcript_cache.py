@@ -0,0 +1,87 @@
+"""
+Tests for the content-addressed transcript cache.
+"""
+
+import os
+import time
+
+from podscript_pipeline import asr, transcript_cache
+from podscript_pipeline.transcript_cache import TranscriptCache, cache_key, hash_file
+
+
+def _result(n: int):
+    return {"text": "hi", "segments": [{"start": float(i), "end": float(i + 1), "text": "hi"} for i in range(n)]}
+
+
+class TestTranscriptCache:
+    """Tests for TranscriptCache."""
+
+    def test_key_depends_on_audio_and_settings(self, tmp_path):
+        a = tmp_path / "a.mp3"
+        a.write_bytes(b"audio" * 1000)
+        h = hash_file(a, chunk_size=7)
+        assert h == hash_file(a)
+
+        base = cache_key(h, "whisper", "base", "zh", None)
+        assert base == cache_key(h, "whisper", "base", "zh", "")
+        assert base != cache_key(h, "whisper", "small", "zh", None)
+        assert base != cache_key(h, "whisper", "base", "en", None)
+        assert base != cache_key(h, "whisper", "base", "zh", "术语")
+        assert base != cache_key(h, "tingwu", "base", "zh", None)
+
+    def test_roundtrip(self, tmp_path):
+        cache = TranscriptCache(tmp_path)
+        assert cache.get("ab" * 32) is None
+        cache.put("ab" * 32, _result(2))
+        assert cache.get("ab" * 32) == _result(2)
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = TranscriptCache(tmp_path, max_entries=2)
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        cache.put(keys[0], _result(1))
+        cache.put(keys[1], _result(1))
+        past = time.time() - 100
+        os.utime(cache._path(keys[1]), (past, past))
+        cache.get(keys[0])  # keys[0] is now the most recently used
+
+        cache.put(keys[2], _result(1))
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[2]) is not None
+
+    def test_evicts_by_size(self, tmp_path):
+        cache = TranscriptCache(tmp_path, max_bytes=1)
+        cache.put("cd" * 32, _result(5))
+        assert cache.get("cd" * 32) is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = TranscriptCache(tmp_path)
+        path = cache._path("ef" * 32)
+        path.parent.mkdir(parents=True)
+        path.write_text("{not json")
+        assert cache.get("ef" * 32) is None
+        assert not path.exists()
+
+
+def test_transcribe_hit_skips_asr(tmp_path, monkeypatch):
+    """A second identical request is served from the cache."""
+    audio = tmp_path / "a.mp3"
+    audio.write_bytes(b"audio")
+    cache = TranscriptCache(tmp_path / "cache")
+    monkeypatch.setattr(transcript_cache, "get_transcript_cache", lambda: cache)
+
+    calls = []
+
+    def fake_provider(*args):
+        calls.append(args)
+        return _result(3)
+
+    monkeypatch.setattr(asr, "_transcribe_with_provider", fake_provider)
+
+    first = asr.transcribe("t1", audio, provider="whisper", model_name="base")
+    second = asr.transcribe("t2", audio, provider="whisper", model_name="base")
+    assert first == second == _result(3)
+    assert len(calls) == 1
+
+    asr.transcribe("t3", audio, provider="whisper", model_name="small")
+    assert len(calls) == 2
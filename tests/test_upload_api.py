@@ -5,7 +5,7 @@ from unittest.mock import patch
 import jwt
 from fastapi.testclient import TestClient
 
-from podscript_api.main import app, TASKS
+from podscript_api.main import app, task_store
 from podscript_pipeline.pipeline import run_pipeline_from_file
 from podscript_shared.models import AppConfig
 
@@ -46,7 +46,7 @@ def test_upload_endpoint(tmp_path: Path):
         r = client.post("/tasks/upload", files=files, cookies=cookies)
         assert r.status_code == 200
         task_id = r.json()["id"]
-        assert task_id in TASKS
+        assert task_store.exists(task_id)
 
 
 def test_upload_requires_auth(tmp_path: Path):
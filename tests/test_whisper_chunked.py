@@ -0,0 +1,131 @@
+"""
+Tests for VAD-based chunking and parallel chunk stitching.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from podscript_pipeline import audio, vad, whisper_chunked
+from podscript_pipeline.whisper_chunked import SegmentStitcher, transcribe_chunked
+
+
+def _write_pcm(path, pattern):
+    """Write 16 kHz s16le PCM from a list of (seconds, is_speech) pairs."""
+    rng = np.random.default_rng(0)
+    parts = []
+    for seconds, speech in pattern:
+        n = int(seconds * audio.SAMPLE_RATE)
+        amplitude = 0.3 if speech else 0.001
+        parts.append(rng.uniform(-amplitude, amplitude, n))
+    samples = (np.concatenate(parts) * 32767).astype(np.int16)
+    samples.tofile(path)
+    return path
+
+
+def _seg(start, end, text):
+    return {"start": start, "end": end, "text": text, "speaker": ""}
+
+
+class TestVad:
+    """Tests for silence detection and chunk planning."""
+
+    def test_detects_silences(self, tmp_path):
+        pcm = _write_pcm(tmp_path / "a.pcm", [(3, True), (1, False), (3, True), (2, False), (1, True)])
+        silences = vad.detect_silences(pcm)
+        assert len(silences) == 2
+        assert silences[0][0] == pytest.approx(3.0, abs=0.1)
+        assert silences[1][1] == pytest.approx(9.0, abs=0.1)
+
+    def test_read_pcm_window(self, tmp_path):
+        pcm = _write_pcm(tmp_path / "a.pcm", [(2, False), (2, True)])
+        assert audio.pcm_duration(pcm) == pytest.approx(4.0)
+        window = audio.read_pcm(pcm, 1.0, 3.0)
+        assert window.dtype == np.float32
+        assert len(window) == 2 * audio.SAMPLE_RATE
+
+    def test_plan_chunks_cuts_in_silence(self):
+        silences = [(95.0, 96.0), (150.0, 154.0), (290.0, 291.0)]
+        chunks = vad.plan_chunks(400.0, silences, target_s=100.0)
+        assert chunks[0] == (0.0, 95.5)
+        assert chunks[-1][1] == 400.0
+        assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+    def test_plan_chunks_without_silence(self):
+        chunks = vad.plan_chunks(250.0, [], target_s=100.0)
+        assert chunks == [(0.0, 100.0), (100.0, 250.0)]
+
+
+class TestSegmentStitcher:
+    """Tests for ordering and overlap de-duplication."""
+
+    def test_later_chunks_wait_for_earlier_ones(self):
+        emitted = []
+        stitcher = SegmentStitcher(2, emitted.append)
+        stitcher.add(1, _seg(10, 12, "b"))
+        stitcher.add(0, _seg(0, 2, "a"))
+        assert [s["text"] for s in emitted] == ["a"]
+        stitcher.finish(1)
+        assert [s["text"] for s in emitted] == ["a"]
+        stitcher.finish(0)
+        assert [s["text"] for s in emitted] == ["a", "b"]
+
+    def test_overlap_duplicates_dropped(self):
+        stitcher = SegmentStitcher(2)
+        stitcher.add(0, _seg(0, 5, "first"))
+        stitcher.add(0, _seg(5, 9.5, "tail"))
+        stitcher.finish(0)
+        stitcher.add(1, _seg(8.8, 9.6, "tail"))
+        stitcher.add(1, _seg(9.6, 12, "next"))
+        stitcher.finish(1)
+        assert [s["text"] for s in stitcher.segments] == ["first", "tail", "next"]
+
+
+class _FakePool:
+    """Pool stand-in that 'transcribes' each window as one segment per second."""
+
+    size = 3
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def run(self, op, kwargs, model_name=None, log_callback=None, segment_callback=None):
+        with self.lock:
+            self.calls.append((op, kwargs["start"], kwargs["end"]))
+        segments = [
+            _seg(float(t), float(t + 1), f"s{t}")
+            for t in range(int(np.ceil(kwargs["start"])), int(kwargs["end"]))
+        ]
+        for segment in segments:
+            segment_callback(segment)
+        return {"text": "", "segments": segments, "language": "en"}
+
+
+def test_transcribe_chunked_stitches_in_order(tmp_path, monkeypatch):
+    """Chunks run on the pool and come back as one ordered, de-duplicated transcript."""
+    pattern = [(50, True), (1, False)] * 6
+    monkeypatch.setattr(audio, "decode_to_pcm", lambda src, dst: _write_pcm(dst, pattern))
+    monkeypatch.setattr(whisper_chunked, "MIN_CHUNK_SECONDS", 10.0)
+    monkeypatch.setattr(whisper_chunked, "WHISPER_CHUNK_SECONDS", 100.0)
+
+    pool = _FakePool()
+    streamed = []
+    result = transcribe_chunked(tmp_path / "a.mp3", pool, "base", segment_callback=streamed.append)
+
+    assert len(pool.calls) > 1
+    assert all(op == "transcribe_window" for op, _, _ in pool.calls)
+    starts = [s["start"] for s in result["segments"]]
+    assert starts == sorted(starts)
+    assert len(starts) == len(set(starts)) == 306
+    assert [s["start"] for s in streamed] == starts
+    assert result["language"] == "en"
+    assert not (tmp_path / "a.16k.pcm").exists()
+
+
+def test_should_chunk():
+    assert whisper_chunked.should_chunk(3600, workers=4)
+    assert not whisper_chunked.should_chunk(3600, workers=1)
+    assert not whisper_chunked.should_chunk(60, workers=4)
+    assert not whisper_chunked.should_chunk(None, workers=4)
@@ -0,0 +1,107 @@
+"""
+Tests for the Whisper process pool (routing and IPC, using a fake worker).
+"""
+
+import os
+
+import pytest
+
+from podscript_pipeline.whisper_pool import WhisperProcessPool
+
+
+def _fake_worker(conn, torch_threads):
+    """Stand-in worker: echoes the request instead of running Whisper."""
+    while True:
+        message = conn.recv()
+        if message is None:
+            return
+        op, kwargs = message
+        if op == "open":
+            try:
+                open(kwargs["path"])
+            except OSError as e:
+                conn.send(("error", e))
+        elif op == "transcribe":
+            conn.send(("log", f"loading {kwargs['model_name']}"))
+            conn.send(("segment", {"start": 0.0, "end": 1.0, "text": "hello"}))
+            conn.send(("result", {"pid": os.getpid(), "model": kwargs["model_name"]}))
+        else:
+            conn.send(("error", ValueError(f"bad op {op}")))
+
+
+@pytest.fixture
+def pool():
+    p = WhisperProcessPool(size=2, target=_fake_worker)
+    yield p
+    p.shutdown()
+
+
+def test_transcribe_runs_in_worker_process(pool, tmp_path):
+    """Jobs run in a child process and forward log messages."""
+    logs = []
+    result = pool.transcribe(tmp_path / "a.wav", model_name="base", log_callback=logs.append)
+    assert result["model"] == "base"
+    assert result["pid"] != os.getpid()
+    assert logs == ["loading base"]
+
+
+def test_jobs_routed_to_worker_with_resident_model(pool, tmp_path):
+    """A second job for the same model reuses the same worker."""
+    first = pool.transcribe(tmp_path / "a.wav", model_name="base")
+    other = pool.transcribe(tmp_path / "a.wav", model_name="small")
+    again = pool.transcribe(tmp_path / "a.wav", model_name="base")
+
+    assert first["pid"] == again["pid"]
+    assert other["pid"] != first["pid"]
+    assert sorted(pool.stats()["models"]) == ["base", "small"]
+
+
+def test_worker_errors_are_reraised(pool):
+    """Exceptions raised in the worker propagate to the caller."""
+    with pytest.raises(ValueError, match="bad op"):
+        pool.run("unknown", {})
+    assert pool.stats()["busy"] == 0
+
+
+def test_segments_streamed_before_result(pool, tmp_path):
+    """Segments sent by the worker reach segment_callback as they arrive."""
+    segments = []
+    pool.transcribe(tmp_path / "a.wav", model_name="base", segment_callback=segments.append)
+    assert segments == [{"start": 0.0, "end": 1.0, "text": "hello"}]
+
+
+def test_worker_oserror_keeps_worker(pool, tmp_path):
+    """An OSError raised in the worker is the job's error, not a dead worker."""
+    first = pool.transcribe(tmp_path / "a.wav", model_name="base")
+    with pytest.raises(FileNotFoundError):
+        pool.run("open", {"path": str(tmp_path / "missing.wav")}, model_name="base")
+    again = pool.transcribe(tmp_path / "a.wav", model_name="base")
+    assert again["pid"] == first["pid"]
+
+
+def test_dead_idle_worker_is_replaced(tmp_path):
+    """A worker that died while idle is replaced instead of blocking the pool."""
+    pool = WhisperProcessPool(size=1, target=_fake_worker)
+    try:
+        first = pool.transcribe(tmp_path / "a.wav", model_name="base")
+        worker = pool._workers[0]
+        worker.process.kill()
+        worker.process.join()
+        again = pool.transcribe(tmp_path / "a.wav", model_name="base")
+        assert again["pid"] != first["pid"]
+        assert pool.stats()["workers"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_callback_error_drains_job(pool, tmp_path):
+    """A failing callback doesn't leave the job's messages for the next one."""
+    def fail(msg):
+        raise RuntimeError("store down")
+
+    with pytest.raises(RuntimeError, match="store down"):
+        pool.transcribe(tmp_path / "a.wav", model_name="base", log_callback=fail)
+    logs = []
+    result = pool.transcribe(tmp_path / "a.wav", model_name="base", log_callback=logs.append)
+    assert result["model"] == "base"
+    assert logs == ["loading base"]